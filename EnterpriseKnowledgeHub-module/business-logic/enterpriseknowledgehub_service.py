@@ -17,14 +17,38 @@ Enhanced with enterprise knowledge management best practices
 
 import logging
 import json
+import os
+import tempfile
 import time
 import uuid
-from typing import Dict, List, Any, Optional, Union
-from datetime import datetime, timezone
-from dataclasses import dataclass, asdict
+from dataclasses import replace
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
 import hashlib
 import re
 
+# Shared plugin runtime from the repository src package; the plugin host
+# serves this module with the repository root importable
+from src.article_catalog import ArticleCatalog
+from src.deadline import deadline_expired
+from src.dedup import DeduplicatingIndex
+from src.expert_index import ExpertIndex, normalize_presence
+from src.federation import FederatedSearch
+from src.graph_batch import GRAPH_BATCH_URL, GraphBatch
+from src.http_client import HttpClient
+from src.ingestion import CheckpointStore, DeltaIngestor, SegmentStore
+from src.knowledge_graph import (
+    EDGE_ABOUT, EDGE_AUTHORED, EDGE_DISCUSSES, EDGE_EXPERT_IN, EDGE_PARTICIPATES,
+    NODE_CONVERSATION, NODE_DOCUMENT, NODE_PERSON, NODE_TOPIC, KnowledgeGraph, KnowledgeGraphBuilder
+)
+from src.models import JsonModel, json_model
+from src.plugin_runtime import CachePolicy, PluginRuntime, operation
+from src.search_index import SearchIndex, tokenize
+from src.security_trimming import GroupMembershipCache, current_principal
+from src.suggestions import DEFAULT_TOP_K, QueryLog, SuggestionIndex, TrendingCounter, normalize_phrase
+from src.vector_index import HashingEmbedder, VectorIndex
+
 # Configure structured logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,8 +57,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class KnowledgeItem:
+@json_model
+class KnowledgeItem(JsonModel):
     """Structured knowledge item representation"""
     id: str
     title: str
@@ -52,8 +76,8 @@ class KnowledgeItem:
             self.id = str(uuid.uuid4())
 
 
-@dataclass
-class ExpertProfile:
+@json_model
+class ExpertProfile(JsonModel):
     """Expert profile with knowledge areas"""
     user_id: str
     display_name: str
@@ -63,20 +87,307 @@ class ExpertProfile:
     recent_contributions: int
     contact_preference: str
     availability_status: str
+    department: str = ""
+
+
+# Documents the knowledge index starts with, as (item, body text)
+SEED_DOCUMENTS = [
+    (KnowledgeItem(
+        id="kb-doc-001",
+        title="Azure Architecture Best Practices",
+        content_type="Technical Guide",
+        author="Sarah Johnson",
+        created_date="2025-06-15",
+        last_modified="2025-07-20",
+        relevance_score=0.95,
+        topic_categories=["Azure", "Architecture", "Cloud Computing"],
+        expertise_level="intermediate",
+        access_level="internal"
+    ), "Reference architectures for resilient cloud workloads on Azure: landing zones, "
+       "networking, identity, scalability and cost management."),
+    (KnowledgeItem(
+        id="kb-doc-002",
+        title="DevOps Implementation Strategy",
+        content_type="Process Document",
+        author="Mike Chen",
+        created_date="2025-07-01",
+        last_modified="2025-07-22",
+        relevance_score=0.88,
+        topic_categories=["DevOps", "CI/CD", "Automation"],
+        expertise_level="advanced",
+        access_level="internal"
+    ), "Rolling out continuous integration and delivery pipelines, infrastructure as code "
+       "and release automation across engineering teams."),
+    (KnowledgeItem(
+        id="kb-doc-003",
+        title="Security Compliance Checklist",
+        content_type="Checklist",
+        author="Emma Rodriguez",
+        created_date="2025-05-20",
+        last_modified="2025-07-18",
+        relevance_score=0.82,
+        topic_categories=["Security", "Compliance", "Risk Management"],
+        expertise_level="expert",
+        access_level="confidential"
+    ), "Controls to verify before go-live: data classification, access reviews, encryption, "
+       "logging and incident response readiness."),
+]
+
+# Most documents one search returns
+MAX_SEARCH_LIMIT = 50
+
+# Expert profiles the expert index starts with
+SEED_EXPERTS = [
+    ExpertProfile(
+        user_id="user-001",
+        display_name="Dr. Sarah Johnson",
+        email="sarah.johnson@company.com",
+        expertise_areas=["Azure Architecture", "Cloud Security", "DevOps"],
+        credibility_score=0.92,
+        recent_contributions=23,
+        contact_preference="Teams/Email",
+        availability_status="Available",
+        department="Engineering"
+    ),
+    ExpertProfile(
+        user_id="user-002",
+        display_name="Mike Chen",
+        email="mike.chen@company.com",
+        expertise_areas=["Machine Learning", "Data Analytics", "Python"],
+        credibility_score=0.89,
+        recent_contributions=18,
+        contact_preference="Email/Phone",
+        availability_status="Busy until Friday",
+        department="Data Science"
+    ),
+    ExpertProfile(
+        user_id="user-003",
+        display_name="Emma Rodriguez",
+        email="emma.rodriguez@company.com",
+        expertise_areas=["Cybersecurity", "Compliance", "Risk Management"],
+        credibility_score=0.94,
+        recent_contributions=31,
+        contact_preference="Teams",
+        availability_status="Available",
+        department="Security"
+    )
+]
+
+# Teams conversations linked into the knowledge graph
+SEED_CONVERSATIONS = [
+    {
+        "id": "conv-001",
+        "title": "API Gateway Implementation Discussion",
+        "source": "Teams Chat",
+        "date": "2025-07-18",
+        "participants": ["user-001", "user-002"],
+        "topics": ["API", "Azure", "Architecture"]
+    },
+    {
+        "id": "conv-002",
+        "title": "Quarterly Access Review Planning",
+        "source": "Teams Chat",
+        "date": "2025-07-16",
+        "participants": ["user-003"],
+        "topics": ["Security", "Compliance"]
+    }
+]
+
+# Honorifics ignored when matching document authors to expert profiles
+NAME_TITLES = frozenset({"dr", "mr", "mrs", "ms", "prof"})
+
+# Weight of knowledge graph connections relative to the expertise match in find_experts
+GRAPH_EXPERT_WEIGHT = 0.5
+
+# Articles the catalog starts with
+SEED_ARTICLES = [
+    {
+        "id": "art-001",
+        "title": "Implementing Zero Trust Architecture",
+        "summary": "Comprehensive guide to implementing Zero Trust security principles in enterprise environments.",
+        "author": "Security Team",
+        "category": "Security",
+        "published_date": "2025-07-15",
+        "read_time_minutes": 12,
+        "complexity_level": "Advanced",
+        "tags": ["Security", "Zero Trust", "Enterprise"],
+        "view_count": 1247,
+        "rating": 4.7,
+        "url": "https://kb.company.com/articles/zero-trust-guide"
+    },
+    {
+        "id": "art-002",
+        "title": "Microservices Design Patterns",
+        "summary": "Best practices and common patterns for designing scalable microservices architectures.",
+        "author": "Architecture Guild",
+        "category": "Technology",
+        "published_date": "2025-07-10",
+        "read_time_minutes": 15,
+        "complexity_level": "Intermediate",
+        "tags": ["Microservices", "Architecture", "Design Patterns"],
+        "view_count": 892,
+        "rating": 4.5,
+        "url": "https://kb.company.com/articles/microservices-patterns"
+    },
+    {
+        "id": "art-003",
+        "title": "Data Privacy Compliance Framework",
+        "summary": "Step-by-step framework for ensuring data privacy compliance across global regulations.",
+        "author": "Legal & Compliance",
+        "category": "Compliance",
+        "published_date": "2025-07-08",
+        "read_time_minutes": 20,
+        "complexity_level": "Expert",
+        "tags": ["Privacy", "Compliance", "GDPR", "CCPA"],
+        "view_count": 567,
+        "rating": 4.8,
+        "url": "https://kb.company.com/articles/privacy-compliance"
+    },
+    {
+        "id": "art-004",
+        "title": "Azure Cost Optimization Playbook",
+        "summary": "Rightsizing, reservations and budget alerts for keeping cloud spend under control.",
+        "author": "Cloud Center of Excellence",
+        "category": "Technology",
+        "published_date": "2025-07-21",
+        "read_time_minutes": 10,
+        "complexity_level": "Intermediate",
+        "tags": ["Azure", "Cost Management", "Cloud"],
+        "view_count": 430,
+        "rating": 4.4,
+        "url": "https://kb.company.com/articles/azure-cost-optimization"
+    },
+    {
+        "id": "art-005",
+        "title": "Incident Response Runbook",
+        "summary": "Triage, containment and communication steps for security incidents.",
+        "author": "Security Team",
+        "category": "Security",
+        "published_date": "2025-06-30",
+        "read_time_minutes": 9,
+        "complexity_level": "Intermediate",
+        "tags": ["Security", "Incident Response", "Operations"],
+        "view_count": 815,
+        "rating": 4.6,
+        "url": "https://kb.company.com/articles/incident-response"
+    },
+    {
+        "id": "art-006",
+        "title": "Change Management Process Guide",
+        "summary": "How changes are proposed, reviewed, approved and rolled out across teams.",
+        "author": "Process Office",
+        "category": "Process",
+        "published_date": "2025-06-18",
+        "read_time_minutes": 7,
+        "complexity_level": "Beginner",
+        "tags": ["Process", "Change Management", "Operations"],
+        "view_count": 298,
+        "rating": 4.1,
+        "url": "https://kb.company.com/articles/change-management"
+    }
+]
+
+# Autocomplete weight of each indexed title or topic, and of each successful query
+CORPUS_SUGGESTION_WEIGHT = 1.0
+QUERY_SUGGESTION_WEIGHT = 1.0
+
+# Hits per search whose topics count towards trending topics
+TRENDING_HITS_PER_QUERY = 3
+
+# Categories every unified search returns
+SEARCH_CATEGORIES = ("documents", "people", "conversations")
+
+# Relative date ranges accepted by unified search, in days
+DATE_RANGE_DAYS = {"last_week": 7, "last_month": 30, "last_quarter": 90, "last_year": 365}
+
+# FAQs the question matcher starts with
+SEED_FAQS = [
+    {
+        "id": "faq-001",
+        "question": "How do I set up Azure DevOps pipelines?",
+        "answer": "Azure DevOps pipelines can be configured using YAML files or the visual editor. Start by creating a new pipeline, connecting your repository, and defining build/deployment stages.",
+        "category": "DevOps",
+        "confidence_score": 0.96,
+        "last_updated": "2025-07-20",
+        "helpful_votes": 87,
+        "related_links": [
+            "Azure DevOps Documentation",
+            "Pipeline Templates Gallery"
+        ]
+    },
+    {
+        "id": "faq-002",
+        "question": "What are the best practices for Azure security?",
+        "answer": "Key Azure security practices include enabling MFA, using Azure AD, implementing least privilege access, enabling monitoring and alerting, and regular security assessments.",
+        "category": "Security",
+        "confidence_score": 0.94,
+        "last_updated": "2025-07-18",
+        "helpful_votes": 124,
+        "related_links": [
+            "Azure Security Center",
+            "Security Best Practices Guide"
+        ]
+    },
+    {
+        "id": "faq-003",
+        "question": "How to optimize Azure costs?",
+        "answer": "Cost optimization strategies include right-sizing resources, using reserved instances, implementing auto-scaling, monitoring usage patterns, and using cost management tools.",
+        "category": "Cost Management",
+        "confidence_score": 0.91,
+        "last_updated": "2025-07-15",
+        "helpful_votes": 65,
+        "related_links": [
+            "Azure Cost Management",
+            "Cost Optimization Guide"
+        ]
+    }
+]
+
+# Lowest cosine similarity at which a FAQ matches a topic
+FAQ_MIN_MATCH_SCORE = 0.2
+
+# Groups granted each access level; restricted documents only list their own groups.
+# Override with KNOWLEDGE_HUB_ACCESS_GROUPS, a JSON object of level to Entra group ids
+ACCESS_LEVEL_GROUPS = {
+    "public": ["everyone"],
+    "internal": ["employees"],
+    "confidential": ["confidential-readers"],
+    "restricted": []
+}
+
+# Directory used for group memberships when Graph is not enabled
+SIMULATED_GROUP_MEMBERSHIPS = {
+    "user-001": ["employees"],
+    "user-002": ["employees"],
+    "user-003": ["employees", "confidential-readers"]
+}
+
+# Presence of up to PRESENCE_BATCH_SIZE users per Graph call
+GRAPH_PRESENCE_URL = "https://graph.microsoft.com/v1.0/communications/getPresencesByUserId"
+PRESENCE_BATCH_SIZE = 650
+
+# Latency budgets of the timer-driven operations in seconds; the timers run
+# them without a request deadline, inside the host's 5 minute function timeout
+SYNC_BUDGET_SECONDS = 240.0
+PRESENCE_REFRESH_BUDGET_SECONDS = 90.0
+
+# Transitive group memberships of a user, paged by Graph
+GRAPH_MEMBER_OF_URL = ("https://graph.microsoft.com/v1.0/users/{user_id}"
+                       "/transitiveMemberOf/microsoft.graph.group?$select=id&$top=999")
 
 
 class EnterpriseKnowledgeHubService:
     """Enterprise Knowledge Hub Service - Enterprise Edition"""
     
-    def __init__(self):
-        # Azure SDK imports with fallback
+    def __init__(self, credential=None, secret_client=None, http_client=None):
+        # Azure SDK imports with fallback; the plugin host injects shared clients
         try:
             from azure.identity import DefaultAzureCredential
             from azure.keyvault.secrets import SecretClient
             
-            self.credential = DefaultAzureCredential()
-            self.key_vault_url = "https://kvf46zzw7hdeclarat.vault.azure.net/"
-            self.secret_client = SecretClient(
+            self.credential = credential or DefaultAzureCredential()
+            self.key_vault_url = getattr(secret_client, 'vault_url', None) or "https://kvf46zzw7hdeclarat.vault.azure.net/"
+            self.secret_client = secret_client or SecretClient(
                 vault_url=self.key_vault_url,
                 credential=self.credential
             )
@@ -89,11 +400,234 @@ class EnterpriseKnowledgeHubService:
             
         self.session_id = str(uuid.uuid4())
         
+        # Pooled downstream client, shared across plugins when hosted
+        self.http_client = http_client or HttpClient(credential=self.credential)
+        
+        # Live Graph lookups for unified search; simulated results otherwise
+        self.graph_enabled = os.getenv('KNOWLEDGE_HUB_GRAPH_ENABLED', 'false').lower() == 'true'
+        self.graph_batch_url = os.getenv('GRAPH_BATCH_URL', GRAPH_BATCH_URL)
+        self.presence_url = os.getenv('GRAPH_PRESENCE_URL', GRAPH_PRESENCE_URL)
+        
         # Knowledge service endpoints
         self.sharepoint_endpoint = "https://graph.microsoft.com/v1.0/sites"
         self.search_endpoint = "https://graph.microsoft.com/v1.0/search/query"
         self.people_endpoint = "https://graph.microsoft.com/v1.0/people"
         
+        # Security trimming: document ACLs by access level, cached caller memberships
+        self.access_groups = {**ACCESS_LEVEL_GROUPS, **json.loads(os.getenv('KNOWLEDGE_HUB_ACCESS_GROUPS') or '{}')}
+        self.memberships = GroupMembershipCache(
+            self._resolve_groups, ttl=float(os.getenv('KNOWLEDGE_HUB_MEMBERSHIP_TTL', '300'))
+        )
+        
+        # Knowledge index over title, topics and body; near-duplicate copies
+        # are collapsed into their cluster's canonical document on the way in
+        self.index = SearchIndex()
+        self.dedup = DeduplicatingIndex(
+            self.index, threshold=float(os.getenv('KNOWLEDGE_HUB_DUPLICATE_THRESHOLD', '0.8'))
+        )
+        for item, body in SEED_DOCUMENTS:
+            self.index_item(item, body)
+        
+        # Expert index over expertise areas, with presence refreshed on a schedule
+        self.experts = ExpertIndex()
+        for profile in SEED_EXPERTS:
+            self.experts.upsert(profile)
+        
+        # FAQ question matcher over hashed sentence vectors
+        self.embedder = HashingEmbedder()
+        self.faq_index = VectorIndex(self.embedder.dimensions)
+        self.faqs: Dict[str, Dict[str, Any]] = {}
+        for faq in SEED_FAQS:
+            self.index_faq(faq)
+        
+        # Incremental ingestion from the SharePoint drive delta feed
+        self.ingestor = None
+        site_id = os.getenv('KNOWLEDGE_HUB_SITE_ID')
+        delta_url = os.getenv('KNOWLEDGE_HUB_DELTA_URL') or (
+            f"{self.sharepoint_endpoint}/{site_id}/drive/root/delta" if site_id else None
+        )
+        if delta_url:
+            state_dir = os.getenv('KNOWLEDGE_HUB_INDEX_DIR') or os.path.join(tempfile.gettempdir(), 'knowledge-index')
+            self.ingestor = DeltaIngestor(
+                self.http_client, delta_url, self.dedup, self._drive_item_record,
+                CheckpointStore(state_dir), SegmentStore(os.path.join(state_dir, 'segments')),
+                feed=site_id or 'knowledge-hub',
+                document_factory=lambda data: KnowledgeItem(**data)
+            )
+            self.ingestor.restore()
+        
+        # Unified search fans out to every source at once; live Graph results
+        # are registered first so they lead rank ties
+        self.federation = FederatedSearch(timeout=float(os.getenv('KNOWLEDGE_HUB_FEDERATION_TIMEOUT', '5')))
+        if self.graph_enabled:
+            self.federation.register('microsoft_graph', self._graph_document_search)
+        self.federation.register('knowledge_index', self._index_source)
+        self.federation.register('expert_directory', self._expert_source)
+        self.federation.register('knowledge_graph', self._conversation_source)
+        
+        # Knowledge graph over documents, people, topics and conversations;
+        # the last snapshot is memory-mapped when ingestion state is kept
+        self.graph_path = os.path.join(state_dir, 'knowledge-graph.kg') if self.ingestor else None
+        if self.graph_path and os.path.exists(self.graph_path):
+            self.graph = KnowledgeGraph.load(self.graph_path)
+        else:
+            self.refresh_knowledge_graph()
+        
+        # Article catalog ranked by relevance, rating and decayed popularity
+        self.articles = ArticleCatalog(
+            half_life=float(os.getenv('KNOWLEDGE_HUB_ARTICLE_HALF_LIFE', str(7 * 86400)))
+        )
+        for article in SEED_ARTICLES:
+            self.articles.upsert(article)
+        
+        # Autocomplete over titles, topics and a bounded log of successful
+        # queries, visible to readers of the documents they lead to; trending
+        # topics over a sliding window of searches
+        self.suggestions = SuggestionIndex()
+        self._suggested: Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]] = {}
+        self.query_log = QueryLog(
+            self.suggestions, capacity=int(os.getenv('KNOWLEDGE_HUB_QUERY_LOG_SIZE', '1000')),
+            weight=QUERY_SUGGESTION_WEIGHT
+        )
+        self.trending = TrendingCounter(window=float(os.getenv('KNOWLEDGE_HUB_TRENDING_WINDOW', '3600')))
+        self.refresh_suggestions()
+        
+    def index_item(self, item: KnowledgeItem, body: str = "", groups: Optional[List[str]] = None) -> None:
+        """Add or replace a knowledge item in the search index, unless it duplicates one"""
+        self.dedup.upsert(
+            item.id,
+            {"title": item.title, "topic_categories": item.topic_categories, "body": body},
+            {"content_type": item.content_type, "access_level": item.access_level},
+            item,
+            self._document_acl(item.access_level, groups)
+        )
+        
+    @staticmethod
+    def _person_name(name: str) -> str:
+        """Normalized person name for matching authors to experts"""
+        return ' '.join(part for part in tokenize(name) if part not in NAME_TITLES)
+        
+    def build_knowledge_graph(self) -> KnowledgeGraph:
+        """Link indexed documents, experts and conversations through people and topic terms"""
+        builder = KnowledgeGraphBuilder()
+        
+        def link_topics(key: str, topics: Any, edge_type: int):
+            for term in tokenize(topics):
+                builder.add_node(f"topic:{term}", NODE_TOPIC)
+                builder.add_edge(key, f"topic:{term}", edge_type)
+        
+        people = {}
+        for user_id in self.experts.user_ids():
+            profile = self.experts.get(user_id)
+            key = f"person:{user_id}"
+            builder.add_node(key, NODE_PERSON)
+            people[self._person_name(profile.display_name)] = key
+            link_topics(key, profile.expertise_areas, EDGE_EXPERT_IN)
+        
+        for doc_id, item in self.index.items():
+            key = f"document:{doc_id}"
+            builder.add_node(key, NODE_DOCUMENT)
+            author = self._person_name(item.author)
+            if author:
+                author_key = people.get(author) or f"person:{author}"
+                builder.add_node(author_key, NODE_PERSON)
+                builder.add_edge(author_key, key, EDGE_AUTHORED)
+            link_topics(key, item.topic_categories, EDGE_ABOUT)
+        
+        for conversation in SEED_CONVERSATIONS:
+            key = f"conversation:{conversation['id']}"
+            builder.add_node(key, NODE_CONVERSATION)
+            for user_id in conversation["participants"]:
+                builder.add_node(f"person:{user_id}", NODE_PERSON)
+                builder.add_edge(f"person:{user_id}", key, EDGE_PARTICIPATES)
+            link_topics(key, conversation["topics"], EDGE_DISCUSSES)
+        
+        return builder.build()
+        
+    def refresh_knowledge_graph(self) -> None:
+        """Rebuild the knowledge graph and persist its snapshot"""
+        graph = self.build_knowledge_graph()
+        if self.graph_path:
+            graph.save(self.graph_path)
+        self.graph = graph
+        
+    def related_nodes(self, query: str, node_type: int, limit: int = 10) -> List[Tuple[str, float]]:
+        """Graph nodes of a type within two hops of the query's topics, keyed without their type prefix"""
+        topics = [f"topic:{term}" for term in tokenize(query)]
+        return [
+            (key.split(':', 1)[1], score)
+            for key, score in self.graph.related(topics, node_type, max_depth=2, limit=limit)
+        ]
+        
+    def refresh_suggestions(self) -> None:
+        """Bring title and topic completions in line with the knowledge index"""
+        current = {
+            doc_id: ((item.title, *item.topic_categories), self.index.acl(doc_id))
+            for doc_id, item in self.index.items()
+        }
+        for doc_id, (phrases, acl) in list(self._suggested.items()):
+            if current.get(doc_id) != (phrases, acl):
+                for phrase in phrases:
+                    self.suggestions.add(phrase, -CORPUS_SUGGESTION_WEIGHT, acl)
+                del self._suggested[doc_id]
+        for doc_id, (phrases, acl) in current.items():
+            if doc_id not in self._suggested:
+                for phrase in phrases:
+                    self.suggestions.add(phrase, CORPUS_SUGGESTION_WEIGHT, acl)
+                self._suggested[doc_id] = (phrases, acl)
+        
+    def index_faq(self, faq: Dict[str, Any]) -> None:
+        """Add or replace a FAQ in the question matcher"""
+        self.faqs[faq["id"]] = faq
+        self.faq_index.add(faq["id"], self.embedder.embed(f"{faq['question']} {faq.get('category', '')}"))
+        
+    def _document_acl(self, access_level: str, groups: Optional[List[str]] = None) -> List[str]:
+        """Principals allowed to read a document of an access level, plus any explicit groups"""
+        return list(self.access_groups.get(access_level, [])) + list(groups or [])
+        
+    def _resolve_groups(self, user_id: str) -> List[str]:
+        """Group ids a user belongs to, directly or through nested groups"""
+        if not self.graph_enabled:
+            return SIMULATED_GROUP_MEMBERSHIPS.get(user_id, ["employees"])
+        
+        groups = []
+        url = GRAPH_MEMBER_OF_URL.format(user_id=quote(user_id))
+        while url:
+            page = self.http_client.get(url).json()
+            groups.extend(group["id"] for group in page.get("value", []))
+            url = page.get("@odata.nextLink")
+        return groups
+        
+    def _drive_item_record(self, item: Dict[str, Any], text: str):
+        """Index record for a SharePoint drive item and its extracted text"""
+        columns = (item.get('listItem') or {}).get('fields') or {}
+        topics = columns.get('TopicCategories') or []
+        if isinstance(topics, str):
+            topics = [topic.strip() for topic in topics.split(';') if topic.strip()]
+        groups = columns.get('AllowedGroups') or []
+        if isinstance(groups, str):
+            groups = [group.strip() for group in groups.split(';') if group.strip()]
+        knowledge_item = KnowledgeItem(
+            id=item['id'],
+            title=columns.get('Title') or os.path.splitext(item.get('name', ''))[0],
+            content_type=columns.get('ContentType') or 'Document',
+            author=((item.get('createdBy') or {}).get('user') or {}).get('displayName', ''),
+            created_date=(item.get('createdDateTime') or '')[:10],
+            last_modified=(item.get('lastModifiedDateTime') or '')[:10],
+            relevance_score=0.0,
+            topic_categories=topics,
+            expertise_level=columns.get('ExpertiseLevel') or 'intermediate',
+            access_level=(columns.get('AccessLevel') or 'internal').lower()
+        )
+        body = ' '.join(part for part in (item.get('description'), text) if part)
+        return (
+            knowledge_item.id,
+            {"title": knowledge_item.title, "topic_categories": topics, "body": body},
+            {"content_type": knowledge_item.content_type, "access_level": knowledge_item.access_level},
+            knowledge_item.to_dict(),
+            self._document_acl(knowledge_item.access_level, groups)
+        )
+        
     def _get_secret(self, secret_name: str) -> str:
         """Retrieve secret from Azure Key Vault"""
         if not self.azure_available or not self.secret_client:
@@ -107,6 +641,7 @@ class EnterpriseKnowledgeHubService:
             logger.error(f"Failed to retrieve secret {secret_name}: {e}")
             raise
 
+    @operation(body=True)
     def search_documents(self, query_params: Dict[str, Any]) -> Dict[str, Any]:
         """Search for documents across enterprise knowledge bases"""
         start_time = time.time()
@@ -114,74 +649,66 @@ class EnterpriseKnowledgeHubService:
         try:
             query = query_params.get('query', '')
             content_types = query_params.get('content_types', ['all'])
-            limit = query_params.get('limit', 10)
+            access_levels = query_params.get('access_levels', ['all'])
+            limit = max(1, min(int(query_params.get('limit', 10)), MAX_SEARCH_LIMIT))
+            expand_duplicates = str(query_params.get('expand_duplicates', False)).lower() == 'true'
             
             logger.info(f"Searching documents: query='{query}', types={content_types}")
             
-            # Simulate intelligent document search
+            # Results are trimmed to documents the caller's groups may read
+            principals = self.memberships.principals(current_principal())
+            hits = self.index.search(query, limit, filters={
+                "content_type": content_types,
+                "access_level": access_levels
+            }, principals=principals)
+            
+            # Relevance is the BM25 score relative to the best hit
+            top_score = hits[0][1] if hits else 0.0
             documents = [
-                KnowledgeItem(
-                    id="kb-doc-001",
-                    title="Azure Architecture Best Practices",
-                    content_type="Technical Guide",
-                    author="Sarah Johnson",
-                    created_date="2025-06-15",
-                    last_modified="2025-07-20",
-                    relevance_score=0.95,
-                    topic_categories=["Azure", "Architecture", "Cloud Computing"],
-                    expertise_level="intermediate",
-                    access_level="internal"
-                ),
-                KnowledgeItem(
-                    id="kb-doc-002",
-                    title="DevOps Implementation Strategy",
-                    content_type="Process Document",
-                    author="Mike Chen",
-                    created_date="2025-07-01",
-                    last_modified="2025-07-22",
-                    relevance_score=0.88,
-                    topic_categories=["DevOps", "CI/CD", "Automation"],
-                    expertise_level="advanced",
-                    access_level="internal"
-                ),
-                KnowledgeItem(
-                    id="kb-doc-003",
-                    title="Security Compliance Checklist",
-                    content_type="Checklist",
-                    author="Emma Rodriguez",
-                    created_date="2025-05-20",
-                    last_modified="2025-07-18",
-                    relevance_score=0.82,
-                    topic_categories=["Security", "Compliance", "Risk Management"],
-                    expertise_level="expert",
-                    access_level="confidential"
-                )
+                replace(item, relevance_score=round(score / top_score, 3)) if top_score else item
+                for item, score in hits
             ]
             
+            # Collapsed copies share their canonical's ACL, so they are readable too
+            duplicates = {
+                item.id: [duplicate for _, duplicate in self.dedup.duplicates(item.id)]
+                for item, _ in hits
+            } if expand_duplicates else None
+            
+            # Successful queries feed autocomplete for readers of their best hit,
+            # and the topics of the best hits feed trending topics
+            if hits and tokenize(query):
+                self.query_log.add(query, self.index.acl(hits[0][0].id))
+                topics = (topic for item, _ in hits[:TRENDING_HITS_PER_QUERY] for topic in item.topic_categories)
+                for topic in dict.fromkeys(topics):
+                    self.trending.add(topic)
+            
+            # Insights are optional; drop them when the request budget is spent
+            if deadline_expired():
+                return {
+                    "success": True,
+                    "documents": documents,
+                    **({"duplicates": duplicates} if expand_duplicates else {}),
+                    "partial": True,
+                    "processing_time_ms": (time.time() - start_time) * 1000
+                }
+            
             # Additional search insights
             search_insights = {
-                "total_documents_searched": 15420,
+                "total_documents_searched": len(self.index),
+                "duplicates_collapsed": self.dedup.duplicate_count,
                 "search_execution_time_ms": (time.time() - start_time) * 1000,
                 "query_interpretation": {
                     "intent": "Technical documentation search",
-                    "key_terms": query.lower().split() if query else [],
+                    "key_terms": tokenize(query),
                     "suggested_refinements": [
-                        "Add specific technology stack",
-                        "Include time range filter",
-                        "Specify department or team"
-                    ]
-                },
-                "content_distribution": {
-                    "Technical Guides": 45,
-                    "Process Documents": 23,
-                    "Best Practices": 18,
-                    "Checklists": 12,
-                    "Training Materials": 8
+                        phrase for phrase, _ in self.suggestions.complete(query, principals, 4)
+                        if phrase != normalize_phrase(query).strip()
+                    ][:3]
                 },
+                "content_distribution": self.index.facet_counts("content_type"),
                 "trending_topics": [
-                    {"topic": "AI/ML Implementation", "popularity": 89},
-                    {"topic": "Cloud Migration", "popularity": 76},
-                    {"topic": "Security Frameworks", "popularity": 64}
+                    {"topic": topic, "popularity": count} for topic, count in self.trending.top(3)
                 ]
             }
             
@@ -189,7 +716,8 @@ class EnterpriseKnowledgeHubService:
             
             return {
                 "success": True,
-                "documents": [asdict(doc) for doc in documents],
+                "documents": documents,
+                **({"duplicates": duplicates} if expand_duplicates else {}),
                 "search_insights": search_insights,
                 "processing_time_ms": processing_time
             }
@@ -202,58 +730,89 @@ class EnterpriseKnowledgeHubService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'prefix': '', 'limit': 8})
+    def suggest_queries(self, prefix: str, limit: int = 8) -> Dict[str, Any]:
+        """Complete a partially typed knowledge search"""
+        start_time = time.time()
+        
+        try:
+            limit = max(1, min(int(limit), DEFAULT_TOP_K))
+            principals = self.memberships.principals(current_principal())
+            suggestions = [
+                {"text": phrase, "weight": weight}
+                for phrase, weight in self.suggestions.complete(prefix, principals, limit)
+            ]
+            return {
+                "success": True,
+                "prefix": prefix,
+                "suggestions": suggestions,
+                "trending_topics": [
+                    {"topic": topic, "popularity": count} for topic, count in self.trending.top(5)
+                ],
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to suggest queries: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+
+    @operation(budget=SYNC_BUDGET_SECONDS)
+    def sync_knowledge_index(self) -> Dict[str, Any]:
+        """Ingest SharePoint changes since the last sync into the knowledge index"""
+        start_time = time.time()
+        
+        if self.ingestor is None:
+            return {
+                "success": False,
+                "error": "Knowledge index ingestion is not configured",
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+        
+        try:
+            stats = self.ingestor.sync()
+            logger.info(f"Knowledge index sync: {stats}")
+            if stats['upserted'] or stats['deleted']:
+                self.refresh_knowledge_graph()
+                self.refresh_suggestions()
+            return {
+                "success": True,
+                "sync": stats,
+                "documents_indexed": len(self.index),
+                "duplicates_collapsed": self.dedup.duplicate_count,
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to sync knowledge index: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+
+    @operation(params={'topic': '', 'limit': 10}, coalesce=True,
+               cache=CachePolicy(ttl=600, stale_ttl=1200))
     def get_faq(self, topic: str, limit: int = 10) -> Dict[str, Any]:
         """Get frequently asked questions for specific topics"""
         start_time = time.time()
         
         try:
             logger.info(f"Getting FAQ for topic: {topic}")
+            limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
             
-            # Simulate FAQ retrieval
-            faqs = [
-                {
-                    "id": "faq-001",
-                    "question": "How do I set up Azure DevOps pipelines?",
-                    "answer": "Azure DevOps pipelines can be configured using YAML files or the visual editor. Start by creating a new pipeline, connecting your repository, and defining build/deployment stages.",
-                    "category": "DevOps",
-                    "confidence_score": 0.96,
-                    "last_updated": "2025-07-20",
-                    "helpful_votes": 87,
-                    "related_links": [
-                        "Azure DevOps Documentation",
-                        "Pipeline Templates Gallery"
-                    ]
-                },
-                {
-                    "id": "faq-002",
-                    "question": "What are the best practices for Azure security?",
-                    "answer": "Key Azure security practices include enabling MFA, using Azure AD, implementing least privilege access, enabling monitoring and alerting, and regular security assessments.",
-                    "category": "Security",
-                    "confidence_score": 0.94,
-                    "last_updated": "2025-07-18",
-                    "helpful_votes": 124,
-                    "related_links": [
-                        "Azure Security Center",
-                        "Security Best Practices Guide"
-                    ]
-                },
-                {
-                    "id": "faq-003",
-                    "question": "How to optimize Azure costs?",
-                    "answer": "Cost optimization strategies include right-sizing resources, using reserved instances, implementing auto-scaling, monitoring usage patterns, and using cost management tools.",
-                    "category": "Cost Management",
-                    "confidence_score": 0.91,
-                    "last_updated": "2025-07-15",
-                    "helpful_votes": 65,
-                    "related_links": [
-                        "Azure Cost Management",
-                        "Cost Optimization Guide"
-                    ]
-                }
-            ]
+            if topic.strip():
+                # Nearest questions to the topic by hashed sentence vectors
+                matches = self.faq_index.search(self.embedder.embed(topic), limit, min_score=FAQ_MIN_MATCH_SCORE)
+                faqs = [dict(self.faqs[faq_id], match_score=round(score, 3)) for faq_id, score in matches]
+            else:
+                faqs = list(self.faqs.values())[:limit]
             
             faq_analytics = {
-                "total_faqs_available": 156,
+                "total_faqs_available": len(self.faq_index),
                 "most_searched_categories": [
                     {"category": "DevOps", "search_count": 234},
                     {"category": "Security", "search_count": 189},
@@ -267,7 +826,7 @@ class EnterpriseKnowledgeHubService:
             
             return {
                 "success": True,
-                "faqs": faqs[:limit],
+                "faqs": faqs,
                 "analytics": faq_analytics,
                 "processing_time_ms": processing_time
             }
@@ -280,56 +839,38 @@ class EnterpriseKnowledgeHubService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
-    def find_experts(self, expertise_area: str, availability: str = "all") -> Dict[str, Any]:
+    @operation(params={'expertise_area': '', 'availability': 'all', 'limit': 10})
+    def find_experts(self, expertise_area: str, availability: str = "all", limit: int = 10) -> Dict[str, Any]:
         """Find internal experts for specific knowledge areas"""
         start_time = time.time()
         
         try:
             logger.info(f"Finding experts for: {expertise_area}, availability: {availability}")
+            limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
             
-            # Simulate expert finding
-            experts = [
-                ExpertProfile(
-                    user_id="user-001",
-                    display_name="Dr. Sarah Johnson",
-                    email="sarah.johnson@company.com",
-                    expertise_areas=["Azure Architecture", "Cloud Security", "DevOps"],
-                    credibility_score=0.92,
-                    recent_contributions=23,
-                    contact_preference="Teams/Email",
-                    availability_status="Available"
-                ),
-                ExpertProfile(
-                    user_id="user-002",
-                    display_name="Mike Chen",
-                    email="mike.chen@company.com",
-                    expertise_areas=["Machine Learning", "Data Analytics", "Python"],
-                    credibility_score=0.89,
-                    recent_contributions=18,
-                    contact_preference="Email/Phone",
-                    availability_status="Busy until Friday"
-                ),
-                ExpertProfile(
-                    user_id="user-003",
-                    display_name="Emma Rodriguez",
-                    email="emma.rodriguez@company.com",
-                    expertise_areas=["Cybersecurity", "Compliance", "Risk Management"],
-                    credibility_score=0.94,
-                    recent_contributions=31,
-                    contact_preference="Teams",
-                    availability_status="Available"
-                )
-            ]
+            # Experts ranked by matching expertise, credibility and recent activity
+            states = None if availability in (None, '', 'all') else [normalize_presence(availability)]
+            hits = self.experts.search(expertise_area, MAX_SEARCH_LIMIT, availability=states)
+            
+            # Experts connected to the topics through documents and conversations rank higher
+            connected = dict(self.related_nodes(expertise_area, NODE_PERSON, MAX_SEARCH_LIMIT))
+            matched = {profile.user_id for profile, _ in hits}
+            for user_id in connected:
+                profile = self.experts.get(user_id)
+                if profile and user_id not in matched and (
+                        states is None or normalize_presence(profile.availability_status) in states):
+                    hits.append((profile, 0.0))
+            top_match = max((weight for _, weight in hits), default=0.0) or 1.0
+            top_connection = max(connected.values(), default=0.0) or 1.0
+            hits.sort(key=lambda hit: -(
+                hit[1] / top_match + GRAPH_EXPERT_WEIGHT * connected.get(hit[0].user_id, 0.0) / top_connection
+            ))
+            experts = [profile for profile, _ in hits[:limit]]
             
             expert_insights = {
-                "total_experts_in_system": 1247,
-                "expertise_distribution": {
-                    "Technology": 487,
-                    "Business": 312,
-                    "Design": 201,
-                    "Operations": 147,
-                    "Legal": 100
-                },
+                "total_experts_in_system": len(self.experts),
+                "expertise_distribution": self.experts.area_counts(5),
+                "availability_distribution": self.experts.presence_counts(),
                 "collaboration_metrics": {
                     "average_response_time": "4.2 hours",
                     "satisfaction_score": 4.6,
@@ -351,7 +892,7 @@ class EnterpriseKnowledgeHubService:
             
             return {
                 "success": True,
-                "experts": [asdict(expert) for expert in experts],
+                "experts": experts,
                 "insights": expert_insights,
                 "processing_time_ms": processing_time
             }
@@ -364,71 +905,80 @@ class EnterpriseKnowledgeHubService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
-    def get_articles(self, topic: str, category: str = "all") -> Dict[str, Any]:
+    @operation(budget=PRESENCE_REFRESH_BUDGET_SECONDS)
+    def refresh_expert_availability(self) -> Dict[str, Any]:
+        """Refresh expert availability from Microsoft Teams presence"""
+        start_time = time.time()
+        
+        if not self.graph_enabled:
+            return {
+                "success": False,
+                "error": "Presence refresh requires KNOWLEDGE_HUB_GRAPH_ENABLED",
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+        
+        try:
+            user_ids = list(self.experts.user_ids())
+            statuses = {}
+            for offset in range(0, len(user_ids), PRESENCE_BATCH_SIZE):
+                # Presence lookups are read-only, so the POST is safe to retry
+                response = self.http_client.post(
+                    self.presence_url, json_body={"ids": user_ids[offset:offset + PRESENCE_BATCH_SIZE]},
+                    retry=True
+                )
+                statuses.update(
+                    (presence["id"], presence.get("availability", "PresenceUnknown"))
+                    for presence in response.json().get("value", [])
+                )
+            changed = self.experts.refresh_presence(statuses)
+            
+            return {
+                "success": True,
+                "experts_refreshed": len(statuses),
+                "status_changes": changed,
+                "availability_distribution": self.experts.presence_counts(),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to refresh expert availability: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+
+    # Not response cached: rankings follow live views and are served from the
+    # catalog's top-N views
+    @operation(params={'topic': '', 'category': 'all', 'limit': 10}, coalesce=True)
+    def get_articles(self, topic: str, category: str = "all", limit: int = 10) -> Dict[str, Any]:
         """Get knowledge articles for specific topics"""
         start_time = time.time()
         
         try:
             logger.info(f"Getting articles for topic: {topic}, category: {category}")
+            limit = max(1, min(int(limit), MAX_SEARCH_LIMIT))
             
-            # Simulate article retrieval
+            # Articles ranked by relevance, rating and recent popularity
             articles = [
-                {
-                    "id": "art-001",
-                    "title": "Implementing Zero Trust Architecture",
-                    "summary": "Comprehensive guide to implementing Zero Trust security principles in enterprise environments.",
-                    "author": "Security Team",
-                    "published_date": "2025-07-15",
-                    "read_time_minutes": 12,
-                    "complexity_level": "Advanced",
-                    "tags": ["Security", "Zero Trust", "Enterprise"],
-                    "view_count": 1247,
-                    "rating": 4.7,
-                    "url": "https://kb.company.com/articles/zero-trust-guide"
-                },
-                {
-                    "id": "art-002",
-                    "title": "Microservices Design Patterns",
-                    "summary": "Best practices and common patterns for designing scalable microservices architectures.",
-                    "author": "Architecture Guild",
-                    "published_date": "2025-07-10",
-                    "read_time_minutes": 15,
-                    "complexity_level": "Intermediate",
-                    "tags": ["Microservices", "Architecture", "Design Patterns"],
-                    "view_count": 892,
-                    "rating": 4.5,
-                    "url": "https://kb.company.com/articles/microservices-patterns"
-                },
-                {
-                    "id": "art-003",
-                    "title": "Data Privacy Compliance Framework",
-                    "summary": "Step-by-step framework for ensuring data privacy compliance across global regulations.",
-                    "author": "Legal & Compliance",
-                    "published_date": "2025-07-08",
-                    "read_time_minutes": 20,
-                    "complexity_level": "Expert",
-                    "tags": ["Privacy", "Compliance", "GDPR", "CCPA"],
-                    "view_count": 567,
-                    "rating": 4.8,
-                    "url": "https://kb.company.com/articles/privacy-compliance"
-                }
+                dict(article, match_score=round(score, 3))
+                for article, score in self.articles.search(topic, category, limit)
             ]
             
             content_analytics = {
-                "total_articles": 2340,
+                "total_articles": len(self.articles),
                 "popular_categories": [
-                    {"category": "Technology", "article_count": 987},
-                    {"category": "Security", "article_count": 456},
-                    {"category": "Process", "article_count": 343},
-                    {"category": "Compliance", "article_count": 234}
+                    {"category": name, "article_count": count}
+                    for name, count in sorted(self.articles.category_counts().items(), key=lambda item: -item[1])
                 ],
+                "popular_tags": self.articles.tag_counts(5),
                 "reading_metrics": {
-                    "average_read_time": "8.5 minutes",
+                    "average_read_time": f"{self.articles.average('read_time_minutes'):.1f} minutes",
                     "completion_rate": "73%",
                     "user_engagement": "High"
                 },
                 "quality_metrics": {
-                    "average_rating": 4.3,
+                    "average_rating": round(self.articles.average('rating'), 2),
                     "peer_review_percentage": 89,
                     "update_frequency": "Weekly"
                 }
@@ -451,50 +1001,193 @@ class EnterpriseKnowledgeHubService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'article_id': ''})
+    def view_article(self, article_id: str) -> Dict[str, Any]:
+        """Open a knowledge article, counting the view towards its popularity"""
+        start_time = time.time()
+        
+        try:
+            if not self.articles.record_view(article_id):
+                return {
+                    "success": False,
+                    "error": f"Article not found: {article_id}",
+                    "processing_time_ms": (time.time() - start_time) * 1000
+                }
+            return {
+                "success": True,
+                "article": self.articles.get(article_id),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+            
+        except Exception as e:
+            logger.error(f"Failed to view article: {e}")
+            return {
+                "success": False,
+                "error": str(e),
+                "processing_time_ms": (time.time() - start_time) * 1000
+            }
+
+    def _graph_document_search(self, query: str, size: int = 10) -> Dict[str, Any]:
+        """
+        Fetch SharePoint and OneDrive documents from Graph search; None if the search failed
+
+        The service calls Graph with an app-only token, which cannot use
+        /me/people or search chatMessage entities, so people and conversations
+        come from the expert directory and knowledge graph sources instead.
+        """
+        with GraphBatch(self.http_client, self.graph_batch_url) as batch:
+            documents = batch.post('/search/query', {"requests": [{
+                "entityTypes": ["driveItem", "listItem"],
+                "query": {"queryString": query},
+                "size": size
+            }]})
+        
+        if not documents.ok:
+            return {"documents": None}
+        containers = (documents.response_body or {}).get("value", [{}])[0].get("hitsContainers", [])
+        return {"documents": [{
+            "id": hit.get("hitId"),
+            "title": hit.get("resource", {}).get("name"),
+            "type": hit.get("resource", {}).get("@odata.type", "").rsplit(".", 1)[-1],
+            "source": "SharePoint",
+            "relevance": hit.get("rank"),
+            "summary": hit.get("summary"),
+            "last_updated": hit.get("resource", {}).get("lastModifiedDateTime")
+        } for hit in (containers[0].get("hits", []) if containers else [])]}
+
+    def _index_source(self, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Documents from the knowledge index the caller may read"""
+        hits = self.index.search(query, limit, principals=self.memberships.principals(current_principal()))
+        top_score = hits[0][1] if hits else 0.0
+        return {"documents": [{
+            "id": item.id,
+            "title": item.title,
+            "type": item.content_type,
+            "source": "Knowledge Hub",
+            "relevance": round(score / top_score, 3) if top_score else 0.0,
+            "last_updated": item.last_modified
+        } for item, score in hits]}
+        
+    def _expert_source(self, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """People from the expert index"""
+        hits = self.experts.search(query, limit)
+        top_weight = hits[0][1] if hits else 0.0
+        return {"people": [{
+            "id": profile.user_id,
+            "name": profile.display_name,
+            "expertise_match": round(weight / top_weight, 3) if top_weight else 0.0,
+            "availability": profile.availability_status,
+            "department": profile.department
+        } for profile, weight in hits]}
+        
+    def _conversation_source(self, query: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Conversations linked to the query's topics in the knowledge graph"""
+        conversations = {conversation["id"]: conversation for conversation in SEED_CONVERSATIONS}
+        related = self.related_nodes(query, NODE_CONVERSATION, limit)
+        top_score = related[0][1] if related else 0.0
+        return {"conversations": [{
+            "id": conversation_id,
+            "title": conversations[conversation_id]["title"],
+            "source": conversations[conversation_id]["source"],
+            "relevance": round(score / top_score, 3) if top_score else 0.0,
+            "participants": len(conversations[conversation_id]["participants"]),
+            "date": conversations[conversation_id]["date"]
+        } for conversation_id, score in related if conversation_id in conversations]}
+
+    def _recommendations(self, query: str, limit: int = 5) -> Dict[str, List[Dict[str, Any]]]:
+        """Documents, experts and conversations linked to the query's topics in the knowledge graph"""
+        principals = self.memberships.principals(current_principal())
+        documents = []
+        for doc_id, score in self.related_nodes(query, NODE_DOCUMENT, MAX_SEARCH_LIMIT):
+            item = self.index.get(doc_id)
+            if item is not None and self.index.can_read(doc_id, principals):
+                documents.append({"id": doc_id, "title": item.title, "author": item.author,
+                                  "connection_strength": round(score, 3)})
+                if len(documents) == limit:
+                    break
+        
+        experts = []
+        for user_id, score in self.related_nodes(query, NODE_PERSON, MAX_SEARCH_LIMIT):
+            profile = self.experts.get(user_id)
+            if profile is not None:
+                experts.append({"user_id": user_id, "display_name": profile.display_name,
+                                "connection_strength": round(score, 3)})
+                if len(experts) == limit:
+                    break
+        
+        titles = {conversation["id"]: conversation["title"] for conversation in SEED_CONVERSATIONS}
+        conversations = [
+            {"id": conversation_id, "title": titles.get(conversation_id, ""),
+             "connection_strength": round(score, 3)}
+            for conversation_id, score in self.related_nodes(query, NODE_CONVERSATION, limit)
+        ]
+        return {"documents": documents, "experts": experts, "conversations": conversations}
+
+    @staticmethod
+    def _result_filters(content_types: Any, departments: Any,
+                        date_range: Any) -> Dict[str, List[Callable[[Dict[str, Any]], bool]]]:
+        """
+        Unified search filters as result predicates per category
+
+        content_types applies to document types, departments to people and
+        date_range to document and conversation dates. Results without the
+        filtered field are excluded. Filters set to 'all' are left out.
+
+        Raises:
+            ValueError: If date_range is not 'all' or a DATE_RANGE_DAYS key
+        """
+        def selected(values: Any) -> Optional[set]:
+            values = [values] if isinstance(values, str) else list(values or [])
+            return None if not values or 'all' in values else {str(value).lower() for value in values}
+        
+        filters: Dict[str, List[Callable[[Dict[str, Any]], bool]]] = {}
+        types = selected(content_types)
+        if types:
+            filters.setdefault("documents", []).append(
+                lambda item: str(item.get("type") or "").lower() in types)
+        groups = selected(departments)
+        if groups:
+            filters.setdefault("people", []).append(
+                lambda item: str(item.get("department") or "").lower() in groups)
+        if date_range and date_range != 'all':
+            if date_range not in DATE_RANGE_DAYS:
+                raise ValueError(f"Unknown date_range: {date_range}")
+            cutoff = (datetime.now(timezone.utc) - timedelta(days=DATE_RANGE_DAYS[date_range])).date().isoformat()
+            filters.setdefault("documents", []).append(
+                lambda item: str(item.get("last_updated") or "")[:10] >= cutoff)
+            filters.setdefault("conversations", []).append(
+                lambda item: str(item.get("date") or "")[:10] >= cutoff)
+        return filters
+
+    @operation(body=True)
     def search_content(self, search_params: Dict[str, Any]) -> Dict[str, Any]:
         """Unified content search across all knowledge sources"""
         start_time = time.time()
         
         try:
             query = search_params.get('query', '')
+            limit = max(1, min(int(search_params.get('limit', 10)), MAX_SEARCH_LIMIT))
             content_types = search_params.get('content_types', ['all'])
             departments = search_params.get('departments', ['all'])
             date_range = search_params.get('date_range', 'all')
             
             logger.info(f"Unified content search: query='{query}'")
             
-            # Simulate unified search results
+            # Every source is queried at once under the request deadline and
+            # their rankings are fused per category; filters apply to the
+            # fused results, so more are fetched when filtering
+            filters = self._result_filters(content_types, departments, date_range)
+            federated = self.federation.search(query, MAX_SEARCH_LIMIT if filters else limit)
+            results = {}
+            for category in SEARCH_CATEGORIES:
+                ranked = federated.results.get(category, [])
+                checks = filters.get(category)
+                if checks:
+                    ranked = [item for item in ranked if all(check(item) for check in checks)][:limit]
+                results[category] = ranked
             search_results = {
-                "documents": [
-                    {
-                        "id": "doc-unified-001",
-                        "title": "Enterprise API Strategy",
-                        "type": "Strategic Document",
-                        "source": "SharePoint",
-                        "relevance": 0.94,
-                        "department": "Engineering",
-                        "last_updated": "2025-07-20"
-                    }
-                ],
-                "people": [
-                    {
-                        "id": "person-001",
-                        "name": "Alex Thompson",
-                        "role": "API Architect",
-                        "expertise_match": 0.91,
-                        "department": "Engineering"
-                    }
-                ],
-                "conversations": [
-                    {
-                        "id": "conv-001",
-                        "title": "API Gateway Implementation Discussion",
-                        "source": "Teams Chat",
-                        "relevance": 0.87,
-                        "participants": 8,
-                        "date": "2025-07-18"
-                    }
-                ],
+                **results,
+                "unavailable_sources": federated.unavailable,
                 "knowledge_insights": {
                     "knowledge_gaps": [
                         "API versioning strategies",
@@ -511,17 +1204,32 @@ class EnterpriseKnowledgeHubService:
                 }
             }
             
+            # Related content from the knowledge graph, without further Graph calls
+            search_results["recommendations"] = self._recommendations(query)
+            
+            # Sources that failed or missed the deadline make the results partial;
+            # the remaining analytics are dropped when the request budget is spent
+            if federated.partial or deadline_expired():
+                return {
+                    "success": True,
+                    "search_results": search_results,
+                    "partial": True,
+                    "analytics": {"sources": federated.sources},
+                    "processing_time_ms": (time.time() - start_time) * 1000
+                }
+            
             # Advanced search analytics
             search_analytics = {
+                "sources": federated.sources,
                 "search_quality": {
                     "precision_score": 0.92,
                     "recall_score": 0.87,
                     "user_satisfaction": 4.4
                 },
                 "content_coverage": {
-                    "documents_indexed": 45678,
-                    "people_profiles": 3421,
-                    "conversation_threads": 12890
+                    "documents_indexed": len(self.index),
+                    "people_profiles": len(self.experts),
+                    "conversation_threads": len(SEED_CONVERSATIONS)
                 },
                 "intelligence_features": {
                     "auto_suggestions": True,
@@ -549,124 +1257,10 @@ class EnterpriseKnowledgeHubService:
             }
 
 
-def main(req) -> Union[Dict[str, Any], str]:
+# Shared runtime serving every EnterpriseKnowledgeHub operation
+runtime = PluginRuntime('EnterpriseKnowledgeHub', EnterpriseKnowledgeHubService)
+
+
+def main(req) -> Union[Any, str]:
     """Main entry point for EnterpriseKnowledgeHub plugin"""
-    
-    try:
-        # Import Azure Functions if available
-        try:
-            import azure.functions as func
-            if not isinstance(req, func.HttpRequest):
-                return json.dumps({
-                    "error": "Invalid request type - Azure Functions required"
-                })
-        except ImportError:
-            logger.warning("Azure Functions not available - using simulation mode")
-            
-        # Parse request parameters
-        if hasattr(req, 'params'):
-            operation = req.params.get('operation')
-        else:
-            operation = getattr(req, 'operation', None)
-            
-        if not operation:
-            error_response = {
-                "error": "Missing 'operation' parameter",
-                "available_operations": [
-                    "search_documents",
-                    "get_faq",
-                    "find_experts",
-                    "get_articles",
-                    "search_content"
-                ]
-            }
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Get request body
-        try:
-            if hasattr(req, 'get_json'):
-                body = req.get_json()
-                if not body:
-                    body = {}
-            else:
-                body = getattr(req, 'body', {})
-        except (ValueError, AttributeError):
-            error_response = {"error": "Invalid JSON in request body"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Initialize service
-        service = EnterpriseKnowledgeHubService()
-        
-        # Route to appropriate operation
-        if operation == 'search_documents':
-            result = service.search_documents(body)
-        elif operation == 'get_faq':
-            result = service.get_faq(
-                body.get('topic', ''),
-                body.get('limit', 10)
-            )
-        elif operation == 'find_experts':
-            result = service.find_experts(
-                body.get('expertise_area', ''),
-                body.get('availability', 'all')
-            )
-        elif operation == 'get_articles':
-            result = service.get_articles(
-                body.get('topic', ''),
-                body.get('category', 'all')
-            )
-        elif operation == 'search_content':
-            result = service.search_content(body)
-        else:
-            error_response = {"error": f"Unknown operation: {operation}"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Return response
-        try:
-            return func.HttpResponse(
-                json.dumps(result, indent=2),
-                status_code=200,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        logger.error(f"EnterpriseKnowledgeHub error: {e}")
-        error_response = {
-            "error": "Internal server error",
-            "details": str(e)
-        }
-        
-        try:
-            return func.HttpResponse(
-                json.dumps(error_response),
-                status_code=500,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(error_response)
+    return runtime.handle(req)
@@ -21,7 +21,12 @@ import time
 import uuid
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timezone
-from dataclasses import dataclass, asdict, field
+from dataclasses import field
+
+# Shared plugin runtime from the repository src package; the plugin host
+# serves this module with the repository root importable
+from src.models import JsonModel, json_model
+from src.plugin_runtime import CachePolicy, PluginRuntime, operation
 
 # Configure structured logging
 logging.basicConfig(
@@ -31,8 +36,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class GovernanceEvent:
+@json_model
+class GovernanceEvent(JsonModel):
     """Structured governance event for audit tracking"""
     event_type: str
     resource_id: str
@@ -51,15 +56,15 @@ class GovernanceEvent:
 class PurviewGovernanceConnectorService:
     """Microsoft Purview Governance Connector Service - Enterprise Edition"""
     
-    def __init__(self):
-        # Azure SDK imports with fallback
+    def __init__(self, credential=None, secret_client=None):
+        # Azure SDK imports with fallback; the plugin host injects shared clients
         try:
             from azure.identity import DefaultAzureCredential
             from azure.keyvault.secrets import SecretClient
             
-            self.credential = DefaultAzureCredential()
-            self.key_vault_url = "https://kvf46zzw7hdeclarat.vault.azure.net/"
-            self.secret_client = SecretClient(
+            self.credential = credential or DefaultAzureCredential()
+            self.key_vault_url = getattr(secret_client, 'vault_url', None) or "https://kvf46zzw7hdeclarat.vault.azure.net/"
+            self.secret_client = secret_client or SecretClient(
                 vault_url=self.key_vault_url,
                 credential=self.credential
             )
@@ -85,6 +90,7 @@ class PurviewGovernanceConnectorService:
             logger.error(f"Failed to retrieve secret {secret_name}: {e}")
             raise
 
+    @operation(params={'resource_id': '', 'include_sensitivity': True})
     def get_dataclassification(self, resource_id: str, include_sensitivity: bool = True) -> Dict[str, Any]:
         """Get data classification and sensitivity labels for resources"""
         start_time = time.time()
@@ -130,6 +136,7 @@ class PurviewGovernanceConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'resource_id': '', 'policies': None})
     def check_compliance(self, resource_id: str, policies: List[str] = None) -> Dict[str, Any]:
         """Check compliance status against governance policies"""
         start_time = time.time()
@@ -167,6 +174,7 @@ class PurviewGovernanceConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'resource_id': '', 'time_range_hours': 24})
     def audit_data_access(self, resource_id: str, time_range_hours: int = 24) -> Dict[str, Any]:
         """Audit data access patterns and generate security insights"""
         start_time = time.time()
@@ -202,6 +210,8 @@ class PurviewGovernanceConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'policy_type': 'all'}, coalesce=True,
+               cache=CachePolicy(ttl=300, stale_ttl=600))
     def get_governance_policies(self, policy_type: str = "all") -> Dict[str, Any]:
         """Get governance policies and their enforcement status"""
         start_time = time.time()
@@ -238,6 +248,7 @@ class PurviewGovernanceConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'report_type': 'executive', 'time_period': 'last_30_days'})
     def generate_compliance_report(self, report_type: str = "executive", time_period: str = "last_30_days") -> Dict[str, Any]:
         """Generate comprehensive compliance reports"""
         start_time = time.time()
@@ -272,6 +283,7 @@ class PurviewGovernanceConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'data_asset_id': '', 'lineage_depth': 3})
     def track_data_lineage(self, data_asset_id: str, lineage_depth: int = 3) -> Dict[str, Any]:
         """Track data lineage and dependencies across the organization"""
         start_time = time.time()
@@ -313,431 +325,18 @@ class PurviewGovernanceConnectorService:
             }
 
 
-def main(req) -> Union[Dict[str, Any], str]:
-    """Main entry point for PurviewGovernanceConnector plugin"""
-    
-    try:
-        # Import Azure Functions if available
-        try:
-            import azure.functions as func
-            if not isinstance(req, func.HttpRequest):
-                return json.dumps({
-                    "error": "Invalid request type - Azure Functions required"
-                })
-        except ImportError:
-            logger.warning("Azure Functions not available - using simulation mode")
-            
-        # Parse request parameters
-        if hasattr(req, 'params'):
-            operation = req.params.get('operation')
-        else:
-            operation = getattr(req, 'operation', None)
-            
-        if not operation:
-            error_response = {
-                "error": "Missing 'operation' parameter",
-                "available_operations": [
-                    "get_dataclassification",
-                    "check_compliance", 
-                    "audit_data_access",
-                    "get_governance_policies",
-                    "generate_compliance_report",
-                    "track_data_lineage"
-                ]
-            }
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Get request body
-        try:
-            if hasattr(req, 'get_json'):
-                body = req.get_json()
-                if not body:
-                    body = {}
-            else:
-                body = getattr(req, 'body', {})
-        except (ValueError, AttributeError):
-            error_response = {"error": "Invalid JSON in request body"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Initialize service
-        service = PurviewGovernanceConnectorService()
-        
-        # Route to appropriate operation
-        if operation == 'get_dataclassification':
-            result = service.get_dataclassification(
-                body.get('resource_id', ''),
-                body.get('include_sensitivity', True)
-            )
-        elif operation == 'check_compliance':
-            result = service.check_compliance(
-                body.get('resource_id', ''),
-                body.get('policies')
-            )
-        elif operation == 'audit_data_access':
-            result = service.audit_data_access(
-                body.get('resource_id', ''),
-                body.get('time_range_hours', 24)
-            )
-        elif operation == 'get_governance_policies':
-            result = service.get_governance_policies(
-                body.get('policy_type', 'all')
-            )
-        elif operation == 'generate_compliance_report':
-            result = service.generate_compliance_report(
-                body.get('report_type', 'executive'),
-                body.get('time_period', 'last_30_days')
-            )
-        elif operation == 'track_data_lineage':
-            result = service.track_data_lineage(
-                body.get('data_asset_id', ''),
-                body.get('lineage_depth', 3)
-            )
-        else:
-            error_response = {"error": f"Unknown operation: {operation}"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Return response
-        try:
-            return func.HttpResponse(
-                json.dumps(result, indent=2),
-                status_code=200,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        logger.error(f"PurviewGovernanceConnector error: {e}")
-        error_response = {
-            "error": "Internal server error",
-            "details": str(e)
-        }
-        
-        try:
-            return func.HttpResponse(
-                json.dumps(error_response),
-                status_code=500,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(error_response)
-            
-        except Exception as e:
-            logger.error(f"GetDataClassification operation failed: {e}")
-            raise
-
-    def checkcompliance(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """CheckCompliance operation implementation"""
-        try:
-            logger.info(f"Executing CheckCompliance with query: {query}")
-            
-            # TODO: Implement CheckCompliance business logic
-            # This is a template - replace with actual implementation
-            
-            results = [
-                {
-                    "id": f"{query}-{i}",
-                    "title": f"CheckCompliance Result {i}",
-                    "description": f"Sample result for {query}",
-                    "url": f"https://example.com/result/{i}",
-                    "relevance": 0.9 - (i * 0.1)
-                }
-                for i in range(min(limit, 5))
-            ]
-            
-            return {
-                "results": results,
-                "total": len(results),
-                "query": query,
-                "operation": "CheckCompliance"
-            }
-            
-        except Exception as e:
-            logger.error(f"CheckCompliance operation failed: {e}")
-            raise
+# Shared runtime serving every PurviewGovernanceConnector operation
+runtime = PluginRuntime('PurviewGovernanceConnector', PurviewGovernanceConnectorService)
 
-    def auditdataaccess(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """AuditDataAccess operation implementation"""
-        try:
-            logger.info(f"Executing AuditDataAccess with query: {query}")
-            
-            # TODO: Implement AuditDataAccess business logic
-            # This is a template - replace with actual implementation
-            
-            results = [
-                {
-                    "id": f"{query}-{i}",
-                    "title": f"AuditDataAccess Result {i}",
-                    "description": f"Sample result for {query}",
-                    "url": f"https://example.com/result/{i}",
-                    "relevance": 0.9 - (i * 0.1)
-                }
-                for i in range(min(limit, 5))
-            ]
-            
-            return {
-                "results": results,
-                "total": len(results),
-                "query": query,
-                "operation": "AuditDataAccess"
-            }
-            
-        except Exception as e:
-            logger.error(f"AuditDataAccess operation failed: {e}")
-            raise
 
-    def get_governancepolicies(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """GetGovernancePolicies operation implementation"""
-        try:
-            logger.info(f"Executing GetGovernancePolicies with query: {query}")
-            
-            # TODO: Implement GetGovernancePolicies business logic
-            # This is a template - replace with actual implementation
-            
-            results = [
-                {
-                    "id": f"{query}-{i}",
-                    "title": f"GetGovernancePolicies Result {i}",
-                    "description": f"Sample result for {query}",
-                    "url": f"https://example.com/result/{i}",
-                    "relevance": 0.9 - (i * 0.1)
-                }
-                for i in range(min(limit, 5))
-            ]
-            
-            return {
-                "results": results,
-                "total": len(results),
-                "query": query,
-                "operation": "GetGovernancePolicies"
-            }
-            
-        except Exception as e:
-            logger.error(f"GetGovernancePolicies operation failed: {e}")
-            raise
-
-    def generatecompliancereport(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """GenerateComplianceReport operation implementation"""
-        try:
-            logger.info(f"Executing GenerateComplianceReport with query: {query}")
-            
-            # TODO: Implement GenerateComplianceReport business logic
-            # This is a template - replace with actual implementation
-            
-            results = [
-                {
-                    "id": f"{query}-{i}",
-                    "title": f"GenerateComplianceReport Result {i}",
-                    "description": f"Sample result for {query}",
-                    "url": f"https://example.com/result/{i}",
-                    "relevance": 0.9 - (i * 0.1)
-                }
-                for i in range(min(limit, 5))
-            ]
-            
-            return {
-                "results": results,
-                "total": len(results),
-                "query": query,
-                "operation": "GenerateComplianceReport"
-            }
-            
-        except Exception as e:
-            logger.error(f"GenerateComplianceReport operation failed: {e}")
-            raise
-
-    def trackdatalineage(self, query: str, limit: int = 10) -> Dict[str, Any]:
-        """TrackDataLineage operation implementation"""
-        try:
-            logger.info(f"Executing TrackDataLineage with query: {query}")
-            
-            # TODO: Implement TrackDataLineage business logic
-            # This is a template - replace with actual implementation
-            
-            results = [
-                {
-                    "id": f"{query}-{i}",
-                    "title": f"TrackDataLineage Result {i}",
-                    "description": f"Sample result for {query}",
-                    "url": f"https://example.com/result/{i}",
-                    "relevance": 0.9 - (i * 0.1)
-                }
-                for i in range(min(limit, 5))
-            ]
-            
-            return {
-                "results": results,
-                "total": len(results),
-                "query": query,
-                "operation": "TrackDataLineage"
-            }
-            
-        except Exception as e:
-            logger.error(f"TrackDataLineage operation failed: {e}")
-            raise
-
-# Azure Function HTTP handlers - Clean Wrapper
-def main(req) -> Union[Dict[str, Any], str]:
+def main(req) -> Union[Any, str]:
     """Main entry point for PurviewGovernanceConnector plugin"""
-    
-    try:
-        # Import Azure Functions if available
-        try:
-            import azure.functions as func
-            if not isinstance(req, func.HttpRequest):
-                return json.dumps({
-                    "error": "Invalid request type - Azure Functions required"
-                })
-        except ImportError:
-            logger.warning("Azure Functions not available - using simulation mode")
-            
-        # Parse request parameters
-        if hasattr(req, 'params'):
-            operation = req.params.get('operation')
-        else:
-            operation = getattr(req, 'operation', None)
-            
-        if not operation:
-            error_response = {
-                "error": "Missing 'operation' parameter",
-                "available_operations": [
-                    "get_dataclassification",
-                    "check_compliance", 
-                    "audit_data_access",
-                    "get_governance_policies",
-                    "generate_compliance_report",
-                    "track_data_lineage"
-                ]
-            }
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Get request body
-        try:
-            if hasattr(req, 'get_json'):
-                body = req.get_json()
-                if not body:
-                    body = {}
-            else:
-                body = getattr(req, 'body', {})
-        except (ValueError, AttributeError):
-            error_response = {"error": "Invalid JSON in request body"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Initialize service
-        service = PurviewGovernanceConnectorService()
-        
-        # Route to appropriate operation
-        if operation == 'get_dataclassification':
-            result = service.get_dataclassification(
-                body.get('resource_id', ''),
-                body.get('include_sensitivity', True)
-            )
-        elif operation == 'check_compliance':
-            result = service.check_compliance(
-                body.get('resource_id', ''),
-                body.get('policies')
-            )
-        elif operation == 'audit_data_access':
-            result = service.audit_data_access(
-                body.get('resource_id', ''),
-                body.get('time_range_hours', 24)
-            )
-        elif operation == 'get_governance_policies':
-            result = service.get_governance_policies(
-                body.get('policy_type', 'all')
-            )
-        elif operation == 'generate_compliance_report':
-            result = service.generate_compliance_report(
-                body.get('report_type', 'executive'),
-                body.get('time_period', 'last_30_days')
-            )
-        elif operation == 'track_data_lineage':
-            result = service.track_data_lineage(
-                body.get('data_asset_id', ''),
-                body.get('lineage_depth', 3)
-            )
-        else:
-            error_response = {"error": f"Unknown operation: {operation}"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Return response
-        try:
-            return func.HttpResponse(
-                json.dumps(result, indent=2),
-                status_code=200,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        logger.error(f"PurviewGovernanceConnector error: {e}")
-        error_response = {
-            "error": "Internal server error",
-            "details": str(e)
-        }
-        
-        try:
-            return func.HttpResponse(
-                json.dumps(error_response),
-                status_code=500,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(error_response)
+    return runtime.handle(req)
 
 
 # Entry point for Azure Functions
 if __name__ == '__main__':
-    # For local testing
+    # For local testing; run from the repository root with PYTHONPATH=.
     class MockRequest:
         def __init__(self, operation, body=None):
             self.operation = operation
@@ -21,10 +21,15 @@ import time
 import uuid
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timezone
-from dataclasses import dataclass, asdict, field
+from dataclasses import field
 import base64
 import io
 
+# Shared plugin runtime from the repository src package; the plugin host
+# serves this module with the repository root importable
+from src.models import JsonModel, json_model
+from src.plugin_runtime import CachePolicy, PluginRuntime, operation
+
 # Configure structured logging
 logging.basicConfig(
     level=logging.INFO,
@@ -33,8 +38,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class DocumentProcessingResult:
+@json_model
+class DocumentProcessingResult(JsonModel):
     """Structured document processing result"""
     document_id: str
     processing_type: str
@@ -50,8 +55,8 @@ class DocumentProcessingResult:
             self.timestamp = datetime.now(timezone.utc).isoformat()
 
 
-@dataclass
-class SynapseAnalysisJob:
+@json_model
+class SynapseAnalysisJob(JsonModel):
     """Azure Synapse analysis job tracking"""
     job_id: str
     pipeline_name: str
@@ -66,15 +71,15 @@ class SynapseAnalysisJob:
 class SyntexSynapseConnectorService:
     """Microsoft Syntex + Azure Synapse Connector Service - Enterprise Edition"""
     
-    def __init__(self):
-        # Azure SDK imports with fallback
+    def __init__(self, credential=None, secret_client=None):
+        # Azure SDK imports with fallback; the plugin host injects shared clients
         try:
             from azure.identity import DefaultAzureCredential
             from azure.keyvault.secrets import SecretClient
             
-            self.credential = DefaultAzureCredential()
-            self.key_vault_url = "https://kvf46zzw7hdeclarat.vault.azure.net/"
-            self.secret_client = SecretClient(
+            self.credential = credential or DefaultAzureCredential()
+            self.key_vault_url = getattr(secret_client, 'vault_url', None) or "https://kvf46zzw7hdeclarat.vault.azure.net/"
+            self.secret_client = secret_client or SecretClient(
                 vault_url=self.key_vault_url,
                 credential=self.credential
             )
@@ -105,6 +110,7 @@ class SyntexSynapseConnectorService:
             logger.error(f"Failed to retrieve secret {secret_name}: {e}")
             raise
 
+    @operation(body=True)
     def process_document(self, document_data: Dict[str, Any]) -> Dict[str, Any]:
         """Process documents using Microsoft Syntex pre-built models"""
         start_time = time.time()
@@ -187,7 +193,7 @@ class SyntexSynapseConnectorService:
             
             return {
                 "success": True,
-                "processing_result": asdict(processing_result),
+                "processing_result": processing_result,
                 "insights": document_insights,
                 "session_id": self.session_id
             }
@@ -200,6 +206,7 @@ class SyntexSynapseConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'document_id': '', 'extraction_fields': None})
     def extract_document_data(self, document_id: str, extraction_fields: Optional[List[str]] = None) -> Dict[str, Any]:
         """Extract specific data fields from processed documents"""
         start_time = time.time()
@@ -289,6 +296,7 @@ class SyntexSynapseConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def classify_content(self, content_data: Dict[str, Any]) -> Dict[str, Any]:
         """Classify and categorize content using AI models"""
         start_time = time.time()
@@ -374,6 +382,7 @@ class SyntexSynapseConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def analyze_form(self, form_data: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze forms using Azure Form Recognizer and Syntex models"""
         start_time = time.time()
@@ -446,6 +455,8 @@ class SyntexSynapseConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(params={'model_category': 'all'}, coalesce=True,
+               cache=CachePolicy(ttl=3600, stale_ttl=3600, tenant_scoped=False))
     def get_prebuilt_models(self, model_category: str = "all") -> Dict[str, Any]:
         """Get available pre-built models from Microsoft Syntex"""
         start_time = time.time()
@@ -535,6 +546,7 @@ class SyntexSynapseConnectorService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def run_synapse_analysis(self, analysis_config: Dict[str, Any]) -> Dict[str, Any]:
         """Run Azure Synapse analytics pipeline on processed documents"""
         start_time = time.time()
@@ -560,7 +572,7 @@ class SyntexSynapseConnectorService:
             
             # Simulate analysis results
             analysis_results = {
-                "job_details": asdict(synapse_job),
+                "job_details": synapse_job,
                 "preliminary_insights": {
                     "documents_processed": len(input_documents),
                     "total_amount_processed": 247350.75,
@@ -629,123 +641,10 @@ class SyntexSynapseConnectorService:
             }
 
 
-def main(req) -> Union[Dict[str, Any], str]:
+# Shared runtime serving every SyntexSynapseConnector operation
+runtime = PluginRuntime('SyntexSynapseConnector', SyntexSynapseConnectorService)
+
+
+def main(req) -> Union[Any, str]:
     """Main entry point for SyntexSynapseConnector plugin"""
-    
-    try:
-        # Import Azure Functions if available
-        try:
-            import azure.functions as func
-            if not isinstance(req, func.HttpRequest):
-                return json.dumps({
-                    "error": "Invalid request type - Azure Functions required"
-                })
-        except ImportError:
-            logger.warning("Azure Functions not available - using simulation mode")
-            
-        # Parse request parameters
-        if hasattr(req, 'params'):
-            operation = req.params.get('operation')
-        else:
-            operation = getattr(req, 'operation', None)
-            
-        if not operation:
-            error_response = {
-                "error": "Missing 'operation' parameter",
-                "available_operations": [
-                    "process_document",
-                    "extract_document_data",
-                    "classify_content",
-                    "analyze_form",
-                    "get_prebuilt_models",
-                    "run_synapse_analysis"
-                ]
-            }
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Get request body
-        try:
-            if hasattr(req, 'get_json'):
-                body = req.get_json()
-                if not body:
-                    body = {}
-            else:
-                body = getattr(req, 'body', {})
-        except (ValueError, AttributeError):
-            error_response = {"error": "Invalid JSON in request body"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Initialize service
-        service = SyntexSynapseConnectorService()
-        
-        # Route to appropriate operation
-        if operation == 'process_document':
-            result = service.process_document(body)
-        elif operation == 'extract_document_data':
-            result = service.extract_document_data(
-                body.get('document_id', ''),
-                body.get('extraction_fields')
-            )
-        elif operation == 'classify_content':
-            result = service.classify_content(body)
-        elif operation == 'analyze_form':
-            result = service.analyze_form(body)
-        elif operation == 'get_prebuilt_models':
-            result = service.get_prebuilt_models(
-                body.get('model_category', 'all')
-            )
-        elif operation == 'run_synapse_analysis':
-            result = service.run_synapse_analysis(body)
-        else:
-            error_response = {"error": f"Unknown operation: {operation}"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Return response
-        try:
-            return func.HttpResponse(
-                json.dumps(result, indent=2),
-                status_code=200,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        logger.error(f"SyntexSynapseConnector error: {e}")
-        error_response = {
-            "error": "Internal server error",
-            "details": str(e)
-        }
-        
-        try:
-            return func.HttpResponse(
-                json.dumps(error_response),
-                status_code=500,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(error_response)
+    return runtime.handle(req)
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for plugin requests served by the plugin host
+
+Runs a local stand-in for a downstream dependency (Graph, Key Vault,
+Synapse) in a separate process with a fixed response latency, mounts a
+plugin whose operation calls it through the shared HttpClient and
+resilience registry, then drives the same number of requests through:
+
+- before: runtime.handle called inline by an async route, so every
+          blocking downstream call stalls the event loop
+- after:  PluginHost.handle, as used by plugin_endpoint, which runs the
+          plugin on the executor under the request deadline with
+          downstream concurrency bounded by the dependency bulkhead
+
+Both modes admit at most --concurrency requests at a time, matching
+host.json maxConcurrentRequests.
+
+Usage:
+    python benchmarks/bench_async_endpoints.py --requests 2000 --latency-ms 20
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+import azure.functions as func
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.http_client import HttpClient
+from src.plugin_host import PluginHost
+from src.plugin_runtime import PluginRuntime, operation
+from src.resilience import ResilienceRegistry
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _run_stand_in(port: int, latency_ms: float):
+    """Downstream stand-in answering every request after a fixed latency"""
+    body = json.dumps({'value': [{'id': '1', 'name': 'stand-in'}]}).encode()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            time.sleep(latency_ms / 1000)
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), Handler)
+    server.request_queue_size = 1024
+    server.serve_forever()
+
+
+def _wait_for_port(port: int, timeout: float = 10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError("Stand-in server did not start")
+
+
+class BenchService:
+    """Plugin service making one downstream call per request through the shared client"""
+
+    # Stand-in downstream, set before the plugin is mounted
+    url = ''
+
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        self.http_client = http_client
+
+    @operation(params={'query': ''})
+    def search(self, query: str):
+        response = self.http_client.get(f"{self.url}/search", params={'q': query}, dependency='graph')
+        return {'results': response.json()['value']}
+
+
+def _host(url: str, downstream_limit: int) -> PluginHost:
+    resilience = ResilienceRegistry(limits={'graph': downstream_limit})
+    http_client = HttpClient(resilience=resilience, pool_size=downstream_limit)
+    host = PluginHost(resilience=resilience, http_client=http_client)
+    BenchService.url = url
+    host.mount(PluginRuntime('Bench', BenchService))
+    return host
+
+
+def _request(i: int) -> func.HttpRequest:
+    return func.HttpRequest(
+        method='POST', url='/api/plugins/bench/search',
+        body=json.dumps({'query': str(i)}).encode(),
+        route_params={'plugin': 'bench', 'operation': 'search'}
+    )
+
+
+async def _drive(serve, total: int, concurrency: int) -> float:
+    admission = asyncio.Semaphore(concurrency)
+
+    async def admitted(i: int):
+        async with admission:
+            response = await serve(_request(i))
+            if response.status_code != 200:
+                raise RuntimeError(f"Request failed: {response.get_body()[:200]!r}")
+
+    start = time.perf_counter()
+    await asyncio.gather(*(admitted(i) for i in range(total)))
+    return total / (time.perf_counter() - start)
+
+
+def bench_inline(host: PluginHost, total: int, concurrency: int) -> float:
+    """Plugin handled on the event loop; returns requests per second"""
+    runtime = host.plugins['bench']
+
+    async def serve(req):
+        return runtime.handle(req)
+
+    return asyncio.run(_drive(serve, total, concurrency))
+
+
+def bench_host(host: PluginHost, total: int, concurrency: int, threads: int) -> float:
+    """Plugin handled by PluginHost.handle; returns requests per second"""
+    async def run() -> float:
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=threads))
+        return await _drive(lambda req: host.handle('bench', req), total, concurrency)
+
+    return asyncio.run(run())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000, help='Requests per mode')
+    parser.add_argument('--concurrency', type=int, default=100, help='Concurrent requests admitted')
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Stand-in downstream latency')
+    parser.add_argument('--threads', type=int, default=100, help='Executor threads for plugin requests')
+    parser.add_argument('--downstream-limit', type=int, default=100,
+                        help='Bulkhead limit and connection pool size for the downstream')
+    args = parser.parse_args()
+
+    port = _free_port()
+    server = multiprocessing.Process(target=_run_stand_in, args=(port, args.latency_ms), daemon=True)
+    server.start()
+    try:
+        _wait_for_port(port)
+        host = _host(f"http://127.0.0.1:{port}", args.downstream_limit)
+
+        # Warm up connections on both paths
+        bench_inline(host, 50, args.concurrency)
+        bench_host(host, 50, args.concurrency, args.threads)
+
+        inline_rps = bench_inline(host, args.requests, args.concurrency)
+        host_rps = bench_host(host, args.requests, args.concurrency, args.threads)
+    finally:
+        server.terminate()
+        server.join()
+
+    print(f"Requests: {args.requests}  concurrency: {args.concurrency}  "
+          f"downstream latency: {args.latency_ms:.0f} ms")
+    print(f"{'mode':<8}{'config':<32}{'req/s':>10}")
+    print(f"{'before':<8}{'inline on the event loop':<32}{inline_rps:>10.0f}")
+    print(f"{'after':<8}{f'plugin host, {args.threads} threads':<32}{host_rps:>10.0f}")
+    print(f"speedup: {host_rps / inline_rps:.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Memory and serialization benchmark for plugin result models
+
+Builds the same knowledge-item result set three ways and serializes it as a
+plugin response:
+
+- before:   regular dataclasses serialized with json.dumps(asdict(...))
+- slotted:  @json_model slotted instances serialized with models.dumps
+- columnar: ModelColumns holding one list per field, serialized with models.dumps
+
+Memory is the tracemalloc peak for building the records; per-record values
+other than the id are shared so the numbers reflect container overhead.
+
+Usage:
+    python benchmarks/bench_models.py --records 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass
+from typing import List
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from src.models import JsonModel, ModelColumns, dumps, json_model
+
+TAGS = ['Security', 'Zero Trust', 'Enterprise']
+
+
+@dataclass
+class KnowledgeItemDataclass:
+    id: str
+    title: str
+    content_type: str
+    author: str
+    created_date: str
+    last_modified: str
+    relevance_score: float
+    topic_categories: List[str]
+    expertise_level: str
+    access_level: str
+
+
+@json_model
+class KnowledgeItemModel(JsonModel):
+    id: str
+    title: str
+    content_type: str
+    author: str
+    created_date: str
+    last_modified: str
+    relevance_score: float
+    topic_categories: List[str]
+    expertise_level: str
+    access_level: str
+
+
+def _values(i: int) -> tuple:
+    return (f"doc-{i}", 'Implementing Zero Trust Architecture', 'article', 'Security Team',
+            '2025-07-15', '2025-07-20', 0.92, TAGS, 'advanced', 'internal')
+
+
+def build_dataclasses(count: int) -> list:
+    return [KnowledgeItemDataclass(*_values(i)) for i in range(count)]
+
+
+def build_slotted(count: int) -> list:
+    return [KnowledgeItemModel(*_values(i)) for i in range(count)]
+
+
+def build_columnar(count: int) -> ModelColumns:
+    rows = ModelColumns(KnowledgeItemModel)
+    for i in range(count):
+        rows.append(*_values(i))
+    return rows
+
+
+def serialize_before(rows: list) -> str:
+    return json.dumps({'success': True, 'documents': [asdict(row) for row in rows]})
+
+
+def serialize_after(rows) -> str:
+    return dumps({'success': True, 'documents': rows})
+
+
+def measure_memory(build, count: int) -> float:
+    """Peak bytes per record while building the result set"""
+    gc.collect()
+    tracemalloc.start()
+    rows = build(count)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del rows
+    return peak / count
+
+
+def measure_throughput(rows, serialize, repeat: int) -> float:
+    """Records serialized per second, best of repeat runs"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        serialize(rows)
+        best = min(best, time.perf_counter() - start)
+    return len(rows) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--records', type=int, default=100000, help='Records per result set')
+    parser.add_argument('--repeat', type=int, default=3, help='Serialization runs per mode')
+    args = parser.parse_args()
+
+    modes = [
+        ('before', 'dataclass + asdict', build_dataclasses, serialize_before),
+        ('slotted', '@json_model + dumps', build_slotted, serialize_after),
+        ('columnar', 'ModelColumns + dumps', build_columnar, serialize_after),
+    ]
+
+    reference = json.loads(serialize_before(build_dataclasses(10)))
+    for _, _, build, serialize in modes[1:]:
+        assert json.loads(serialize(build(10))) == reference
+
+    print(f"Records: {args.records}")
+    print(f"{'mode':<10}{'config':<24}{'bytes/record':>14}{'MB/100k':>10}{'records/s':>14}")
+    for name, config, build, serialize in modes:
+        per_record = measure_memory(build, args.records)
+        rows = build(args.records)
+        rate = measure_throughput(rows, serialize, args.repeat)
+        print(f"{name:<10}{config:<24}{per_record:>14.0f}{per_record * 100000 / 1e6:>10.1f}{rate:>14.0f}")
+
+
+if __name__ == '__main__':
+    main()
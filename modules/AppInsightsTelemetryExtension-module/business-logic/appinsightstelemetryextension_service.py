@@ -21,7 +21,12 @@ import time
 import uuid
 from typing import Dict, List, Any, Optional, Union
 from datetime import datetime, timezone
-from dataclasses import dataclass, asdict, field
+from dataclasses import field
+
+# Shared plugin runtime from the repository src package; the plugin host
+# serves this module with the repository root importable
+from src.models import JsonModel, json_model
+from src.plugin_runtime import PluginRuntime, operation
 
 # Configure structured logging
 logging.basicConfig(
@@ -31,8 +36,8 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-@dataclass
-class TelemetryEvent:
+@json_model
+class TelemetryEvent(JsonModel):
     """Structured telemetry event"""
     event_name: str
     event_type: str
@@ -52,15 +57,15 @@ class TelemetryEvent:
 class AppInsightsTelemetryExtensionService:
     """Application Insights Telemetry Extension Service"""
     
-    def __init__(self):
-        # Azure SDK imports with fallback
+    def __init__(self, credential=None, secret_client=None):
+        # Azure SDK imports with fallback; the plugin host injects shared clients
         try:
             from azure.identity import DefaultAzureCredential
             from azure.keyvault.secrets import SecretClient
             
-            self.credential = DefaultAzureCredential()
-            self.key_vault_url = "https://kvf46zzw7hdeclarat.vault.azure.net/"
-            self.secret_client = SecretClient(
+            self.credential = credential or DefaultAzureCredential()
+            self.key_vault_url = getattr(secret_client, 'vault_url', None) or "https://kvf46zzw7hdeclarat.vault.azure.net/"
+            self.secret_client = secret_client or SecretClient(
                 vault_url=self.key_vault_url,
                 credential=self.credential
             )
@@ -86,6 +91,7 @@ class AppInsightsTelemetryExtensionService:
             logger.error(f"Failed to retrieve secret {secret_name}: {e}")
             raise
 
+    @operation(body=True)
     def track_custom_event(self, event_data: Dict[str, Any]) -> Dict[str, Any]:
         """Track custom telemetry events with structured data"""
         start_time = time.time()
@@ -113,7 +119,7 @@ class AppInsightsTelemetryExtensionService:
             # Log structured event
             logger.info("Custom event tracked", extra={
                 'event_id': str(uuid.uuid4()),
-                'event_data': asdict(event)
+                'event_data': event.to_dict()
             })
             
             duration_ms = (time.time() - start_time) * 1000
@@ -136,6 +142,7 @@ class AppInsightsTelemetryExtensionService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def track_performance_metrics(
         self, 
         metrics_data: Dict[str, Any]
@@ -183,6 +190,7 @@ class AppInsightsTelemetryExtensionService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def analyze_user_behavior(
         self, 
         behavior_data: Dict[str, Any]
@@ -253,6 +261,7 @@ class AppInsightsTelemetryExtensionService:
                 "processing_time_ms": (time.time() - start_time) * 1000
             }
 
+    @operation(body=True)
     def generate_telemetry_dashboard(
         self, 
         dashboard_config: Dict[str, Any]
@@ -343,118 +352,10 @@ class AppInsightsTelemetryExtensionService:
             }
 
 
-# Azure Functions HTTP endpoints (requires azure-functions package)
-def main(req) -> Union[Dict[str, Any], str]:
+# Shared runtime serving every AppInsightsTelemetryExtension operation
+runtime = PluginRuntime('AppInsightsTelemetryExtension', AppInsightsTelemetryExtensionService)
+
+
+def main(req) -> Union[Any, str]:
     """Main entry point for AppInsightsTelemetryExtension plugin"""
-    
-    try:
-        # Import Azure Functions if available
-        try:
-            import azure.functions as func
-            if not isinstance(req, func.HttpRequest):
-                return json.dumps({
-                    "error": "Invalid request type - Azure Functions required"
-                })
-        except ImportError:
-            # Fallback for testing without Azure Functions
-            logger.warning("Azure Functions not available - using simulation mode")
-            
-        # Parse request parameters
-        if hasattr(req, 'params'):
-            operation = req.params.get('operation')
-        else:
-            # Fallback for testing
-            operation = getattr(req, 'operation', None)
-            
-        if not operation:
-            error_response = {
-                "error": "Missing 'operation' parameter",
-                "available_operations": [
-                    "track_custom_event",
-                    "track_performance_metrics", 
-                    "analyze_user_behavior",
-                    "generate_telemetry_dashboard"
-                ]
-            }
-            
-            if hasattr(req, 'params'):
-                try:
-                    return func.HttpResponse(
-                        json.dumps(error_response),
-                        status_code=400,
-                        mimetype="application/json"
-                    )
-                except NameError:
-                    return json.dumps(error_response)
-            else:
-                return json.dumps(error_response)
-        
-        # Get request body
-        try:
-            if hasattr(req, 'get_json'):
-                body = req.get_json()
-                if not body:
-                    body = {}
-            else:
-                body = getattr(req, 'body', {})
-        except (ValueError, AttributeError):
-            error_response = {"error": "Invalid JSON in request body"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Initialize service
-        service = AppInsightsTelemetryExtensionService()
-        
-        # Route to appropriate operation
-        if operation == 'track_custom_event':
-            result = service.track_custom_event(body)
-        elif operation == 'track_performance_metrics':
-            result = service.track_performance_metrics(body)
-        elif operation == 'analyze_user_behavior':
-            result = service.analyze_user_behavior(body)
-        elif operation == 'generate_telemetry_dashboard':
-            result = service.generate_telemetry_dashboard(body)
-        else:
-            error_response = {"error": f"Unknown operation: {operation}"}
-            
-            try:
-                return func.HttpResponse(
-                    json.dumps(error_response),
-                    status_code=400,
-                    mimetype="application/json"
-                )
-            except NameError:
-                return json.dumps(error_response)
-        
-        # Return response
-        try:
-            return func.HttpResponse(
-                json.dumps(result, indent=2),
-                status_code=200,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(result, indent=2)
-        
-    except Exception as e:
-        logger.error(f"AppInsightsTelemetryExtension error: {e}")
-        error_response = {
-            "error": "Internal server error",
-            "details": str(e)
-        }
-        
-        try:
-            return func.HttpResponse(
-                json.dumps(error_response),
-                status_code=500,
-                mimetype="application/json"
-            )
-        except NameError:
-            return json.dumps(error_response)
\ No newline at end of file
+    return runtime.handle(req)
@@ -0,0 +1,358 @@
+"""
+Article catalog module for Microsoft 365 Copilot Plugin
+Tag and category indexes, blended ranking and incrementally maintained top-N views
+"""
+
+import heapq
+import math
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, Hashable, List, Mapping, Optional, Set, Tuple
+
+from .search_index import SearchIndex
+
+# Ranking weights of text relevance, rating and popularity
+RELEVANCE_WEIGHT = 0.6
+RATING_WEIGHT = 0.25
+POPULARITY_WEIGHT = 0.15
+
+# Highest article rating
+MAX_RATING = 5.0
+
+# Decayed views at which popularity reaches half its weight
+POPULARITY_SATURATION = 50.0
+
+# Seconds for a view's contribution to popularity to halve
+DEFAULT_POPULARITY_HALF_LIFE = 7 * 86400.0
+
+# Articles kept per materialized view
+DEFAULT_VIEW_SIZE = 20
+
+# Seconds after which views are rebuilt to catch up with popularity decay
+DEFAULT_VIEW_REBUILD_INTERVAL = 300.0
+
+# Views queued for incremental view updates; a full queue forces a rebuild
+DEFAULT_MAX_PENDING_VIEWS = 4096
+
+# Text fields of an article and their weights
+ARTICLE_FIELD_WEIGHTS = {'title': 3.0, 'tags': 2.0, 'summary': 1.0}
+
+# Key of the view over every article
+ALL_ARTICLES = ('all', '')
+
+
+def _key(value: Any) -> str:
+    return str(value or '').strip().lower()
+
+
+def _timestamp(value: Any) -> Optional[float]:
+    """Seconds since the epoch of an ISO date, or None"""
+    try:
+        parsed = datetime.fromisoformat(str(value))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+class ShardedCounter:
+    """
+    Counters sharded per thread
+
+    Each thread adds to its own dictionary, so concurrent writers never
+    share a cache line or take a lock; a thread's shard is registered once
+    on its first write. Reads sum the shards, trading a slower read for
+    uncontended writes.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards: List[Dict[Hashable, float]] = []
+        self._register_lock = threading.Lock()
+
+    def _shard(self) -> Dict[Hashable, float]:
+        shard = getattr(self._local, 'shard', None)
+        if shard is None:
+            shard = self._local.shard = {}
+            with self._register_lock:
+                self._shards.append(shard)
+        return shard
+
+    def add(self, key: Hashable, amount: float = 1):
+        """Add to a key's count"""
+        shard = self._shard()
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, key: Hashable) -> float:
+        """Current count of a key"""
+        return sum(shard.get(key, 0) for shard in list(self._shards))
+
+    def snapshot(self) -> Dict[Hashable, float]:
+        """Current count of every key"""
+        totals: Dict[Hashable, float] = {}
+        for shard in list(self._shards):
+            for key, amount in shard.copy().items():
+                totals[key] = totals.get(key, 0) + amount
+        return totals
+
+    def discard(self, key: Hashable):
+        """Reset a key in every shard"""
+        for shard in list(self._shards):
+            shard.pop(key, None)
+
+
+class ArticleCatalog:
+    """
+    Knowledge articles ranked by relevance, rating and recent popularity
+
+    Text queries are scored with BM25 over title, tags and summary, and
+    categories are facet bitmaps of the same index; tags map to their
+    articles directly. Popularity uses forward decay: a view at time t
+    adds exp((t - landmark) / tau) to the article's sharded counter, so
+    counts are never rewritten as they age and the decayed value at any
+    time is the sum scaled by exp(-(now - landmark) / tau).
+
+    Queries without text, or whose text is exactly a tag, rank by rating
+    and popularity alone and are served from top-N views per category,
+    per tag and overall. Views are updated incrementally for the articles
+    viewed since the last read, and rebuilt every rebuild_interval so
+    decay catches up with articles that were not viewed. Pending views are
+    a bounded queue; once it fills up, the next read rebuilds the views
+    instead of replaying it.
+    """
+
+    def __init__(self, view_size: int = DEFAULT_VIEW_SIZE,
+                 half_life: float = DEFAULT_POPULARITY_HALF_LIFE,
+                 rebuild_interval: float = DEFAULT_VIEW_REBUILD_INTERVAL,
+                 clock: Callable[[], float] = time.time,
+                 max_pending_views: int = DEFAULT_MAX_PENDING_VIEWS):
+        """
+        Initialize article catalog
+
+        Args:
+            view_size: Articles kept per materialized view
+            half_life: Seconds for a view's popularity contribution to halve
+            rebuild_interval: Seconds between full view rebuilds
+            clock: Source of the current time in seconds since the epoch
+            max_pending_views: Views queued before the next read rebuilds the views
+        """
+        self.view_size = view_size
+        self.tau = half_life / math.log(2)
+        self.rebuild_interval = rebuild_interval
+        self.clock = clock
+        self.landmark = clock()
+
+        self.index = SearchIndex(ARTICLE_FIELD_WEIGHTS, facets=('category',))
+        self.views = ShardedCounter()
+        self.popularity = ShardedCounter()
+        self._articles: Dict[str, Dict[str, Any]] = {}
+        self._base_views: Dict[str, int] = {}
+        self._tags: Dict[str, Set[str]] = {}
+        self._tag_labels: Dict[str, str] = {}
+        self._topviews: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+        # Oldest entries drop out of a full queue, so a full queue is never replayed
+        self._viewed: Deque[str] = deque(maxlen=max_pending_views)
+        self._built_at: Optional[float] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._articles)
+
+    def __contains__(self, article_id: str) -> bool:
+        return article_id in self._articles
+
+    def upsert(self, article: Mapping[str, Any]):
+        """
+        Add or replace an article
+
+        The article's view_count seeds its total views, and its popularity
+        as if those views happened on its published_date.
+        """
+        article = dict(article)
+        article_id = article['id']
+        with self._lock:
+            self._remove(article_id)
+            self._articles[article_id] = article
+            self._base_views[article_id] = int(article.get('view_count') or 0)
+            published = _timestamp(article.get('published_date'))
+            self.popularity.add(article_id, self._base_views[article_id] * self._weight(
+                self.landmark if published is None else published))
+            self.index.upsert(
+                article_id,
+                {'title': article.get('title'), 'tags': article.get('tags'), 'summary': article.get('summary')},
+                {'category': article.get('category', '')},
+                article_id
+            )
+            for tag in article.get('tags') or ():
+                self._tags.setdefault(_key(tag), set()).add(article_id)
+                self._tag_labels.setdefault(_key(tag), tag)
+            self._built_at = None
+
+    def remove(self, article_id: str) -> bool:
+        """
+        Remove an article
+
+        Returns:
+            Whether the article was in the catalog
+        """
+        with self._lock:
+            removed = self._remove(article_id)
+            if removed:
+                self._built_at = None
+            return removed
+
+    def _remove(self, article_id: str) -> bool:
+        article = self._articles.pop(article_id, None)
+        if article is None:
+            return False
+        self.index.remove(article_id)
+        for tag in article.get('tags') or ():
+            members = self._tags.get(_key(tag))
+            if members is not None:
+                members.discard(article_id)
+                if not members:
+                    del self._tags[_key(tag)], self._tag_labels[_key(tag)]
+        self.views.discard(article_id)
+        self.popularity.discard(article_id)
+        del self._base_views[article_id]
+        return True
+
+    def _weight(self, at: float) -> float:
+        return math.exp((at - self.landmark) / self.tau)
+
+    def record_view(self, article_id: str) -> bool:
+        """
+        Count a view of an article without taking the catalog lock
+
+        Returns:
+            Whether the article is in the catalog
+        """
+        if article_id not in self._articles:
+            return False
+        self.views.add(article_id)
+        self.popularity.add(article_id, self._weight(self.clock()))
+        self._viewed.append(article_id)
+        return True
+
+    def view_count(self, article_id: str) -> int:
+        """Total views of an article"""
+        return self._base_views.get(article_id, 0) + int(self.views.value(article_id))
+
+    def decayed_views(self, article_id: str) -> float:
+        """Views weighted by their age, as of now"""
+        return self.popularity.value(article_id) / self._weight(self.clock())
+
+    def get(self, article_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of an article with its current view count"""
+        article = self._articles.get(article_id)
+        return None if article is None else dict(article, view_count=self.view_count(article_id))
+
+    def _static_score(self, article_id: str, decayed: float) -> float:
+        rating = float(self._articles[article_id].get('rating') or 0.0)
+        return (RATING_WEIGHT * min(rating / MAX_RATING, 1.0)
+                + POPULARITY_WEIGHT * decayed / (decayed + POPULARITY_SATURATION))
+
+    def _view_keys(self, article_id: str) -> List[Tuple[str, str]]:
+        article = self._articles[article_id]
+        keys = [ALL_ARTICLES, ('category', _key(article.get('category')))]
+        keys.extend(('tag', _key(tag)) for tag in article.get('tags') or ())
+        return keys
+
+    def _refresh_views(self):
+        now = self.clock()
+        if (self._built_at is None or now - self._built_at >= self.rebuild_interval
+                or len(self._viewed) >= self._viewed.maxlen):
+            self._viewed.clear()
+            scale = self._weight(now)
+            popularity = self.popularity.snapshot()
+            members: Dict[Tuple[str, str], List[Tuple[float, str]]] = {}
+            for article_id in self._articles:
+                score = self._static_score(article_id, popularity.get(article_id, 0.0) / scale)
+                for key in self._view_keys(article_id):
+                    members.setdefault(key, []).append((score, article_id))
+            self._topviews = {
+                key: heapq.nsmallest(self.view_size, entries, key=lambda entry: (-entry[0], entry[1]))
+                for key, entries in members.items()
+            }
+            self._built_at = now
+            return
+
+        viewed = set()
+        while self._viewed:
+            viewed.add(self._viewed.popleft())
+        for article_id in viewed & self._articles.keys():
+            score = self._static_score(article_id, self.decayed_views(article_id))
+            for key in self._view_keys(article_id):
+                view = self._topviews.setdefault(key, [])
+                entries = [entry for entry in view if entry[1] != article_id]
+                # Views only raise scores, so an article outside the view
+                # can only enter it by beating the last entry
+                if len(entries) == len(view) and len(view) >= self.view_size and score <= view[-1][0]:
+                    continue
+                entries.append((score, article_id))
+                entries.sort(key=lambda entry: (-entry[0], entry[1]))
+                self._topviews[key] = entries[:self.view_size]
+
+    def search(self, topic: str = '', category: str = 'all', limit: int = 10) -> List[Tuple[Dict[str, Any], float]]:
+        """
+        Rank articles for a topic
+
+        Args:
+            topic: Free text, a tag, or empty for the top articles
+            category: Category name, or 'all'
+            limit: Number of articles returned
+
+        Returns:
+            (article, score) pairs, best first, with current view counts
+        """
+        if limit <= 0:
+            return []
+        category_key = '' if _key(category) in ('', 'all') else _key(category)
+        topic_key = _key(topic)
+
+        with self._lock:
+            if not topic_key or topic_key in self._tags:
+                if not topic_key:
+                    key = ('category', category_key) if category_key else ALL_ARTICLES
+                else:
+                    key = ('tag', topic_key)
+                if limit <= self.view_size and (not topic_key or not category_key):
+                    self._refresh_views()
+                    ranked = self._topviews.get(key, [])[:limit]
+                    return [(self.get(article_id), score) for score, article_id in ranked]
+                candidates = [(article_id, 0.0) for article_id in (
+                    self._tags[topic_key] if topic_key else self._articles
+                ) if not category_key or _key(self._articles[article_id].get('category')) == category_key]
+            else:
+                hits = self.index.search(topic, len(self._articles),
+                                         filters={'category': [category_key] if category_key else None})
+                top_score = hits[0][1] if hits else 0.0
+                candidates = [(article_id, score / top_score) for article_id, score in hits if top_score]
+
+            scale = self._weight(self.clock())
+            ranked = heapq.nsmallest(limit, (
+                (RELEVANCE_WEIGHT * relevance
+                 + self._static_score(article_id, self.popularity.value(article_id) / scale), article_id)
+                for article_id, relevance in candidates
+            ), key=lambda entry: (-entry[0], entry[1]))
+            return [(self.get(article_id), score) for score, article_id in ranked]
+
+    def category_counts(self) -> Dict[str, int]:
+        """Article count per category"""
+        return self.index.facet_counts('category')
+
+    def tag_counts(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Article count per tag, most used first"""
+        with self._lock:
+            counts = sorted(((self._tag_labels[tag], len(members)) for tag, members in self._tags.items()),
+                            key=lambda item: (-item[1], item[0]))
+        return dict(counts if limit is None else counts[:limit])
+
+    def average(self, field: str) -> float:
+        """Mean of a numeric article field"""
+        with self._lock:
+            values = [float(article.get(field) or 0.0) for article in self._articles.values()]
+        return sum(values) / len(values) if values else 0.0
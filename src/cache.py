@@ -0,0 +1,377 @@
+"""
+Cache module for Microsoft 365 Copilot Plugin
+In-process TTL cache and tiered response cache shared by the plugin host
+"""
+
+import fnmatch
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from .models import dumps
+
+try:
+    import redis
+except ImportError:
+    redis = None
+
+logger = logging.getLogger('copilot_plugin')
+
+_MISSING = object()
+
+# Cache lookup states
+CACHE_FRESH = 'fresh'
+CACHE_STALE = 'stale'
+CACHE_MISS = 'miss'
+
+
+class TTLCache:
+    """
+    Thread-safe LRU cache with a fixed time-to-live per entry
+
+    Expired entries are dropped on access; the least recently used entry is
+    evicted once maxsize is reached.
+    """
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 1024):
+        """
+        Initialize TTL cache
+
+        Args:
+            ttl: Seconds an entry stays valid
+            maxsize: Maximum number of entries kept
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Get a cached value, or default when missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None):
+        """Store a value, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Get a cached value, calling loader and caching its result on a miss"""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            value = loader()
+            self.set(key, value, ttl)
+        return value
+
+    def invalidate(self, key: Hashable):
+        """Remove a single entry"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def invalidate_matching(self, pattern: str) -> int:
+        """Remove all string keys matching a glob pattern; returns the number removed"""
+        with self._lock:
+            keys = [key for key in self._entries if isinstance(key, str) and fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._entries[key]
+            return len(keys)
+
+    def clear(self):
+        """Remove all entries"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class CachedSecretClient:
+    """
+    Key Vault SecretClient wrapper caching get_secret results
+
+    Other client methods are passed through to the wrapped client, so the
+    wrapper can be handed to any code expecting a SecretClient. Cache misses
+    go through guard(fn, *args, **kwargs) when one is given.
+    """
+
+    def __init__(self, client: Any, cache: TTLCache,
+                 guard: Optional[Callable[..., Any]] = None):
+        self.client = client
+        self.cache = cache
+        self.guard = guard
+
+    def get_secret(self, name: str, version: Optional[str] = None, **kwargs) -> Any:
+        """Get a secret, served from the cache while it is fresh"""
+        return self.cache.get_or_load(
+            ('secret', getattr(self.client, 'vault_url', None), name, version),
+            lambda: self._load(name, version, **kwargs)
+        )
+
+    def _load(self, name: str, version: Optional[str], **kwargs) -> Any:
+        if self.guard is None:
+            return self.client.get_secret(name, version, **kwargs)
+        return self.guard(self.client.get_secret, name, version, **kwargs)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.client, name)
+
+
+@dataclass(frozen=True)
+class CachePolicy:
+    """
+    Response cache declaration for a plugin operation
+
+    Attributes:
+        ttl: Seconds a cached response is served as fresh
+        key: Body fields the response depends on; None uses every declared
+             parameter, or the whole body for body operations
+        tenant_scoped: Keep separate entries per tenant
+        stale_ttl: Additional seconds a stale response is served while it is
+                   refreshed in the background
+    """
+    ttl: float = 300.0
+    key: Optional[Tuple[str, ...]] = None
+    tenant_scoped: bool = True
+    stale_ttl: float = 0.0
+
+
+@dataclass(frozen=True)
+class CacheEntry:
+    """Cached value with its freshness deadline in wall-clock seconds"""
+    value: Any
+    fresh_until: float
+    stale_until: float
+
+    def state(self, now: float) -> str:
+        if now < self.fresh_until:
+            return CACHE_FRESH
+        if now < self.stale_until:
+            return CACHE_STALE
+        return CACHE_MISS
+
+
+class LocalSharedStore:
+    """
+    In-process stand-in for a shared L2 store
+
+    Mirrors the subset of Redis semantics the tiered cache uses: bytes values,
+    per-key expiry and pattern deletes. Used for local development and tests.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Tuple[float, bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.time():
+                del self._values[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: bytes, ttl: float):
+        with self._lock:
+            self._values[key] = (time.time() + ttl, value)
+
+    def delete_matching(self, pattern: str) -> int:
+        with self._lock:
+            keys = [key for key in self._values if fnmatch.fnmatchcase(key, pattern)]
+            for key in keys:
+                del self._values[key]
+            return len(keys)
+
+
+class RedisStore:
+    """Shared L2 store backed by Redis (requires the redis package)"""
+
+    def __init__(self, url: str):
+        if redis is None:
+            raise ImportError("redis package is required for RedisStore")
+        self.client = redis.Redis.from_url(url)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.client.get(key)
+
+    def set(self, key: str, value: bytes, ttl: float):
+        self.client.set(key, value, px=max(int(ttl * 1000), 1))
+
+    def delete_matching(self, pattern: str) -> int:
+        keys = list(self.client.scan_iter(match=pattern, count=500))
+        return self.client.delete(*keys) if keys else 0
+
+
+def create_shared_store(url: Optional[str]) -> Optional[Any]:
+    """
+    Create the L2 store for a configured URL
+
+    'local' selects the in-process stand-in, redis:// and rediss:// URLs use
+    Redis when the package is installed; anything else disables L2.
+    """
+    if not url:
+        return None
+    if url == 'local':
+        return LocalSharedStore()
+    if url.startswith(('redis://', 'rediss://')):
+        if redis is None:
+            logger.warning("redis package not installed - shared response cache disabled")
+            return None
+        return RedisStore(url)
+    logger.warning(f"Unsupported shared cache URL scheme: {url.split(':', 1)[0]}")
+    return None
+
+
+class TieredCache:
+    """
+    Two-level response cache
+
+    L1 is an in-process LRU; the optional L2 store is shared between
+    instances and holds JSON-encoded entries. Stale entries are served while
+    a single background refresh per key replaces them.
+    """
+
+    def __init__(self, l1: Optional[TTLCache] = None, l2: Optional[Any] = None,
+                 refresh_workers: int = 2):
+        """
+        Initialize tiered cache
+
+        Args:
+            l1: In-process cache, defaults to a new TTLCache
+            l2: Optional shared store (LocalSharedStore, RedisStore)
+            refresh_workers: Background threads for stale-while-revalidate
+        """
+        self.l1 = l1 if l1 is not None else TTLCache()
+        self.l2 = l2
+        self._refreshing: set = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix='cache-refresh')
+        self.stats = {CACHE_FRESH: 0, CACHE_STALE: 0, CACHE_MISS: 0, 'l2_hits': 0, 'refreshes': 0}
+
+    def _read(self, key: str) -> Optional[CacheEntry]:
+        entry = self.l1.get(key)
+        if entry is not None or self.l2 is None:
+            return entry
+
+        try:
+            raw = self.l2.get(key)
+        except Exception as e:
+            logger.warning(f"Shared cache read failed: {e}")
+            return None
+        if raw is None:
+            return None
+
+        data = json.loads(raw)
+        entry = CacheEntry(data['value'], data['fresh_until'], data['stale_until'])
+        remaining = entry.stale_until - time.time()
+        if remaining > 0:
+            self.l1.set(key, entry, ttl=remaining)
+            self.stats['l2_hits'] += 1
+        return entry
+
+    def set(self, key: str, value: Any, ttl: float, stale_ttl: float = 0.0):
+        """Store a value in both tiers"""
+        now = time.time()
+        entry = CacheEntry(value, now + ttl, now + ttl + stale_ttl)
+        self.l1.set(key, entry, ttl=ttl + stale_ttl)
+        if self.l2 is not None:
+            try:
+                self.l2.set(key, dumps({
+                    'value': value,
+                    'fresh_until': entry.fresh_until,
+                    'stale_until': entry.stale_until
+                }).encode('utf-8'), ttl + stale_ttl)
+            except Exception as e:
+                logger.warning(f"Shared cache write failed: {e}")
+
+    def get(self, key: str) -> Tuple[Any, str]:
+        """Get a value and its state: fresh, stale or miss"""
+        entry = self._read(key)
+        state = entry.state(time.time()) if entry is not None else CACHE_MISS
+        return (entry.value if state != CACHE_MISS else None), state
+
+    def get_or_load(self, key: str, loader: Callable[[], Any], ttl: float,
+                    stale_ttl: float = 0.0,
+                    cacheable: Optional[Callable[[Any], bool]] = None) -> Tuple[Any, str]:
+        """
+        Get a cached value or load and store it
+
+        Stale values are returned immediately and refreshed in the background.
+
+        Args:
+            key: Cache key
+            loader: Function producing the value on a miss or refresh
+            ttl: Seconds the value is fresh
+            stale_ttl: Additional seconds the value may be served stale
+            cacheable: Optional predicate; loaded values failing it are not stored
+
+        Returns:
+            Tuple of the value and the lookup state
+        """
+        value, state = self.get(key)
+        self.stats[state] += 1
+        if state == CACHE_FRESH:
+            return value, state
+        if state == CACHE_STALE:
+            self._refresh(key, loader, ttl, stale_ttl, cacheable)
+            return value, state
+
+        value = loader()
+        if cacheable is None or cacheable(value):
+            self.set(key, value, ttl, stale_ttl)
+        return value, state
+
+    def _refresh(self, key: str, loader: Callable[[], Any], ttl: float, stale_ttl: float,
+                 cacheable: Optional[Callable[[Any], bool]]):
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                value = loader()
+                if cacheable is None or cacheable(value):
+                    self.set(key, value, ttl, stale_ttl)
+                    self.stats['refreshes'] += 1
+            except Exception as e:
+                logger.warning(f"Background cache refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._executor.submit(refresh)
+
+    def purge(self, pattern: str = '*') -> int:
+        """
+        Remove entries matching a glob pattern from both tiers
+
+        Returns:
+            Number of entries removed from L1 and L2
+        """
+        removed = self.l1.invalidate_matching(pattern)
+        if self.l2 is not None:
+            removed += self.l2.delete_matching(pattern)
+        return removed
@@ -0,0 +1,97 @@
+"""
+Coalescing module for Microsoft 365 Copilot Plugin
+Single-flight execution of identical concurrent calls
+"""
+
+import json
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+# Seconds a coalesced caller waits for the in-flight call by default
+DEFAULT_COALESCE_TIMEOUT = 30.0
+
+
+class CoalescedCallTimeout(TimeoutError):
+    """Raised when a coalesced caller gives up waiting for the in-flight call"""
+    status_code = 504
+
+
+class _Call:
+    """In-flight call shared by its leader and waiting callers"""
+
+    __slots__ = ('done', 'result', 'error', 'waiters')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+        self.waiters = 0
+
+
+def fingerprint(*parts: Any) -> str:
+    """Canonical key for call arguments, independent of dict ordering"""
+    return json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+
+
+class SingleFlight:
+    """
+    Runs identical concurrent calls once
+
+    The first caller for a key executes the function; callers arriving while
+    it is in flight wait for and share its result or exception. Nothing is
+    kept once the call completes, so results are never stale. Shared results
+    are the same object for every caller and must not be mutated.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self.executions = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any],
+           timeout: Optional[float] = DEFAULT_COALESCE_TIMEOUT) -> Tuple[Any, bool]:
+        """
+        Execute fn once for all concurrent callers with the same key
+
+        Args:
+            key: Call fingerprint
+            fn: Function to execute
+            timeout: Seconds a waiting caller waits for the in-flight call
+
+        Returns:
+            Tuple of the result and whether it was shared from another call
+
+        Raises:
+            CoalescedCallTimeout: If a waiting caller times out
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                call = self._calls[key] = _Call()
+                self.executions += 1
+                leader = True
+            else:
+                call.waiters += 1
+                self.coalesced += 1
+                leader = False
+
+        if leader:
+            try:
+                call.result = fn()
+            except BaseException as e:
+                call.error = e
+            finally:
+                with self._lock:
+                    del self._calls[key]
+                call.done.set()
+        elif not call.done.wait(timeout):
+            raise CoalescedCallTimeout(f"Timed out after {timeout}s waiting for in-flight call")
+
+        if call.error is not None:
+            raise call.error
+        return call.result, not leader
+
+    def in_flight(self) -> int:
+        """Number of distinct calls currently executing"""
+        return len(self._calls)
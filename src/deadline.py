@@ -0,0 +1,130 @@
+"""
+Deadline module for Microsoft 365 Copilot Plugin
+Per-request latency budgets propagated through a context variable
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator, Mapping, Optional
+
+# Header carrying the caller's remaining budget in milliseconds
+DEADLINE_HEADER = 'X-Request-Budget-Ms'
+
+# Budget applied to plugin operations without their own default
+DEFAULT_BUDGET_SECONDS = 30.0
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request's latency budget is spent"""
+    status_code = 504
+
+    def __init__(self, stage: str, overrun: float):
+        super().__init__(f"Deadline exceeded at {stage} by {overrun * 1000:.0f} ms")
+        self.stage = stage
+        self.overrun = overrun
+
+
+class Deadline:
+    """Absolute point on the monotonic clock by which a request must finish"""
+
+    __slots__ = ('expires_at', 'budget')
+
+    def __init__(self, budget: float):
+        self.budget = budget
+        self.expires_at = time.monotonic() + budget
+
+    def remaining(self) -> float:
+        """Seconds left, never negative"""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def check(self, stage: str = 'check'):
+        """
+        Raise if the deadline has passed
+
+        Raises:
+            DeadlineExceeded: If no time remains
+        """
+        overrun = time.monotonic() - self.expires_at
+        if overrun >= 0:
+            raise DeadlineExceeded(stage, overrun)
+
+
+_current_deadline: ContextVar[Optional[Deadline]] = ContextVar('copilot_plugin_deadline', default=None)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the current request, if one is set"""
+    return _current_deadline.get()
+
+
+@contextmanager
+def deadline_scope(budget: Optional[float]) -> Iterator[Optional[Deadline]]:
+    """
+    Run a block under a latency budget
+
+    Scopes only ever tighten: a nested budget longer than the time left on
+    the enclosing deadline keeps the enclosing deadline.
+
+    Usage:
+        with deadline_scope(2.0):
+            service.search(...)
+    """
+    enclosing = _current_deadline.get()
+    deadline = enclosing
+    if budget is not None and (enclosing is None or budget < enclosing.remaining()):
+        deadline = Deadline(budget)
+    token = _current_deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current_deadline.reset(token)
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left on the current deadline, or default when none is set"""
+    deadline = _current_deadline.get()
+    return default if deadline is None else deadline.remaining()
+
+
+def deadline_expired() -> bool:
+    """Whether the current request has used up its budget"""
+    deadline = _current_deadline.get()
+    return deadline is not None and deadline.expired
+
+
+def check_deadline(stage: str = 'check'):
+    """
+    Raise if the current request has used up its budget
+
+    Raises:
+        DeadlineExceeded: If a deadline is set and has passed
+    """
+    deadline = _current_deadline.get()
+    if deadline is not None:
+        deadline.check(stage)
+
+
+def bounded_timeout(timeout: Optional[float]) -> Optional[float]:
+    """Clamp a downstream call timeout to the time left on the current deadline"""
+    deadline = _current_deadline.get()
+    if deadline is None:
+        return timeout
+    left = deadline.remaining()
+    return left if timeout is None else min(timeout, left)
+
+
+def request_budget(headers: Optional[Mapping[str, Any]]) -> Optional[float]:
+    """Budget in seconds from the request budget header, if present and valid"""
+    if not headers:
+        return None
+    value = headers.get(DEADLINE_HEADER)
+    try:
+        budget_ms = float(value)
+    except (TypeError, ValueError):
+        return None
+    return max(budget_ms, 0.0) / 1000
@@ -0,0 +1,291 @@
+"""
+Dedup module for Microsoft 365 Copilot Plugin
+Near-duplicate detection with MinHash signatures and LSH banding
+"""
+
+import threading
+import zlib
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+from .search_index import tokenize
+
+# Hash functions per signature
+DEFAULT_NUM_PERM = 128
+
+# Words per shingle
+DEFAULT_SHINGLE_SIZE = 3
+
+# LSH bands; with 128 hashes, 16 bands of 8 rows make pairs above about
+# 0.7 similarity likely to share a bucket
+DEFAULT_BANDS = 16
+
+# Estimated Jaccard similarity at which documents are duplicates
+DEFAULT_THRESHOLD = 0.8
+
+# Shingles hashed per block, bounding the temporary hash matrix
+_BLOCK = 4096
+
+
+def shingles(text: Any, size: int = DEFAULT_SHINGLE_SIZE) -> Set[int]:
+    """
+    32-bit hashes of the word shingles of a text
+
+    Texts shorter than one shingle are a single shingle of all their words.
+    """
+    words = tokenize(text)
+    if not words:
+        return set()
+    if len(words) <= size:
+        return {zlib.crc32(' '.join(words).encode('utf-8'))}
+    return {
+        zlib.crc32(' '.join(words[start:start + size]).encode('utf-8'))
+        for start in range(len(words) - size + 1)
+    }
+
+
+class MinHasher:
+    """
+    MinHash signatures from a universal hash family
+
+    Hash function i maps a 32-bit shingle x to the high 32 bits of
+    a_i * x + b_i mod 2**64 (multiply-shift hashing), with a_i odd; a
+    signature keeps each function's minimum over a document's shingles.
+    The share of positions where two signatures agree estimates the
+    Jaccard similarity of the shingle sets. All functions are applied at
+    once as one array operation per block of shingles.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, shingle_size: int = DEFAULT_SHINGLE_SIZE,
+                 seed: int = 1):
+        """
+        Initialize MinHasher
+
+        Args:
+            num_perm: Hash functions per signature
+            shingle_size: Words per shingle
+            seed: Seed of the hash family; signatures only compare under the same seed
+        """
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        # Array arithmetic on uint64 wraps, which is the modulus 2**64
+        self._a = rng.integers(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64, endpoint=False) | np.uint64(1)
+        self._b = rng.integers(0, 1 << 64, size=(num_perm, 1), dtype=np.uint64, endpoint=False)
+
+    def signature(self, text: Any) -> Optional[np.ndarray]:
+        """Signature of a text, or None when it has no words"""
+        hashes = shingles(text, self.shingle_size)
+        if not hashes:
+            return None
+        values = np.fromiter(hashes, dtype=np.uint64, count=len(hashes))
+        signature = np.full(self.num_perm, 1 << 32, dtype=np.uint64)
+        for start in range(0, len(values), _BLOCK):
+            block = values[start:start + _BLOCK]
+            np.minimum(signature, ((self._a * block + self._b) >> np.uint64(32)).min(axis=1), out=signature)
+        return signature
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures"""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+class LSHIndex:
+    """
+    Locality-sensitive hashing over MinHash signatures
+
+    Signatures are cut into bands and every band is a bucket key, so two
+    documents become candidates when any band matches exactly. With b
+    bands of r rows, a pair of similarity s collides with probability
+    1 - (1 - s**r)**b, sharply separating near-duplicates from the rest.
+    """
+
+    def __init__(self, num_perm: int = DEFAULT_NUM_PERM, bands: int = DEFAULT_BANDS):
+        """
+        Initialize LSH index
+
+        Args:
+            num_perm: Signature length; must be a multiple of bands
+            bands: Number of bands
+
+        Raises:
+            ValueError: If num_perm is not a multiple of bands
+        """
+        if num_perm % bands:
+            raise ValueError(f"{num_perm} hashes cannot be split into {bands} bands")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: Dict[Tuple[int, bytes], Set[str]] = {}
+        self._keys: Dict[str, List[Tuple[int, bytes]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _band_keys(self, signature: np.ndarray) -> List[Tuple[int, bytes]]:
+        return [(band, signature[band * self.rows:(band + 1) * self.rows].tobytes()) for band in range(self.bands)]
+
+    def insert(self, key: str, signature: np.ndarray):
+        """Add or replace the signature of a key"""
+        self.remove(key)
+        band_keys = self._band_keys(signature)
+        for band_key in band_keys:
+            self._buckets.setdefault(band_key, set()).add(key)
+        self._keys[key] = band_keys
+
+    def remove(self, key: str) -> bool:
+        """Remove a key; returns whether it was indexed"""
+        band_keys = self._keys.pop(key, None)
+        if band_keys is None:
+            return False
+        for band_key in band_keys:
+            bucket = self._buckets[band_key]
+            bucket.discard(key)
+            if not bucket:
+                del self._buckets[band_key]
+        return True
+
+    def candidates(self, signature: np.ndarray) -> Set[str]:
+        """Keys sharing at least one band with the signature"""
+        found: Set[str] = set()
+        for band_key in self._band_keys(signature):
+            found.update(self._buckets.get(band_key, ()))
+        return found
+
+
+class DeduplicatingIndex:
+    """
+    Collapses near-duplicate documents in front of a search index
+
+    Documents are grouped into clusters of near-duplicates. Only each
+    cluster's canonical document, the first one seen, is written to the
+    wrapped index; the others are kept aside and can be expanded at query
+    time. Only canonical documents are in the LSH index, so a new document
+    is compared with one representative per cluster.
+
+    Documents only join a cluster whose canonical has the same ACL and
+    facet values. A collapsed copy is therefore never hidden from a
+    caller or a filter that the canonical would not also satisfy. When a
+    canonical document is removed, the next member of its cluster takes
+    its place in the index.
+    """
+
+    def __init__(self, index: Any, hasher: Optional[MinHasher] = None, bands: int = DEFAULT_BANDS,
+                 threshold: float = DEFAULT_THRESHOLD):
+        """
+        Initialize deduplicating index
+
+        Args:
+            index: SearchIndex receiving canonical documents
+            hasher: Signature builder, defaults to a MinHasher with default settings
+            bands: LSH bands
+            threshold: Estimated similarity at which documents are duplicates
+        """
+        self.index = index
+        self.hasher = hasher or MinHasher()
+        self.lsh = LSHIndex(self.hasher.num_perm, bands)
+        self.threshold = threshold
+        self._records: Dict[str, Tuple[Mapping[str, Any], Optional[Mapping[str, Any]], Any,
+                                       Optional[Tuple[str, ...]], Optional[np.ndarray]]] = {}
+        self._canonical: Dict[str, str] = {}
+        self._members: Dict[str, List[str]] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        """Documents held, including collapsed duplicates"""
+        return len(self._records)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._records
+
+    @property
+    def duplicate_count(self) -> int:
+        """Documents collapsed into another document's cluster"""
+        return len(self._records) - len(self._members)
+
+    def _group(self, doc_id: str) -> Tuple[Any, ...]:
+        _, facets, _, acl, _ = self._records[doc_id]
+        return (tuple(sorted(acl)) if acl is not None else None,
+                tuple(sorted((facets or {}).items())))
+
+    def upsert(self, doc_id: str, fields: Mapping[str, Any], facets: Optional[Mapping[str, Any]] = None,
+               document: Any = None, acl: Optional[Iterable[str]] = None) -> str:
+        """
+        Add or replace a document, collapsing it into a matching cluster
+
+        Returns:
+            The canonical document id of the document's cluster
+        """
+        signature = self.hasher.signature([str(value) for value in fields.values() if value])
+        acl = None if acl is None else tuple(acl)
+        with self._lock:
+            self._remove(doc_id)
+            self._records[doc_id] = (fields, facets, document, acl, signature)
+
+            canonical = None
+            if signature is not None:
+                group = self._group(doc_id)
+                best = self.threshold
+                for candidate in sorted(self.lsh.candidates(signature)):
+                    score = similarity(signature, self._records[candidate][4])
+                    if score >= best and self._group(candidate) == group:
+                        canonical, best = candidate, score
+
+            if canonical is not None:
+                self._canonical[doc_id] = canonical
+                self._members[canonical].append(doc_id)
+                return canonical
+
+            self._promote(doc_id)
+            return doc_id
+
+    def _promote(self, doc_id: str):
+        fields, facets, document, acl, signature = self._records[doc_id]
+        self._canonical[doc_id] = doc_id
+        self._members.setdefault(doc_id, [doc_id])
+        if signature is not None:
+            self.lsh.insert(doc_id, signature)
+        self.index.upsert(doc_id, fields, facets, document, acl)
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        Remove a document; the next member of its cluster replaces a removed canonical
+
+        Returns:
+            Whether the document was held
+        """
+        with self._lock:
+            return self._remove(doc_id)
+
+    def _remove(self, doc_id: str) -> bool:
+        if doc_id not in self._records:
+            return False
+        canonical = self._canonical.pop(doc_id)
+        del self._records[doc_id]
+        if canonical != doc_id:
+            self._members[canonical].remove(doc_id)
+            return True
+
+        members = self._members.pop(doc_id)[1:]
+        self.lsh.remove(doc_id)
+        self.index.remove(doc_id)
+        if members:
+            successor = members[0]
+            self._members[successor] = members
+            for member in members:
+                self._canonical[member] = successor
+            self._promote(successor)
+        return True
+
+    def canonical(self, doc_id: str) -> Optional[str]:
+        """Canonical document of a document's cluster"""
+        return self._canonical.get(doc_id)
+
+    def duplicates(self, doc_id: str) -> List[Tuple[str, Any]]:
+        """(doc_id, document) of the other members of a document's cluster"""
+        with self._lock:
+            canonical = self._canonical.get(doc_id)
+            if canonical is None:
+                return []
+            return [(member, self._records[member][2]) for member in self._members[canonical] if member != doc_id]
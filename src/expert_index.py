@@ -0,0 +1,388 @@
+"""
+Expert index module for Microsoft 365 Copilot Plugin
+Expertise postings with precomputed weights, trie term expansion and availability bitmaps
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from dataclasses import replace
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from .search_index import Bitmap, tokenize
+
+# Normalized presence states used as availability filters
+PRESENCE_AVAILABLE = 'available'
+PRESENCE_BUSY = 'busy'
+PRESENCE_AWAY = 'away'
+PRESENCE_OFFLINE = 'offline'
+PRESENCE_UNKNOWN = 'unknown'
+
+# Graph presence availability values and free-text statuses by leading word
+_PRESENCE_PREFIXES = (
+    ('available', PRESENCE_AVAILABLE),
+    ('busy', PRESENCE_BUSY),
+    ('donotdisturb', PRESENCE_BUSY),
+    ('inacall', PRESENCE_BUSY),
+    ('inameeting', PRESENCE_BUSY),
+    ('away', PRESENCE_AWAY),
+    ('berightback', PRESENCE_AWAY),
+    ('outofoffice', PRESENCE_AWAY),
+    ('offline', PRESENCE_OFFLINE),
+)
+
+# Contributions at which the recency weight reaches about 63% of its range
+RECENCY_SCALE = 10.0
+
+# Weight of a term matched by prefix or by edit distance instead of exactly
+PREFIX_MATCH_WEIGHT = 0.8
+FUZZY_MATCH_WEIGHT = 0.6
+
+# Most expansions considered per query term
+MAX_EXPANSIONS = 50
+
+
+def normalize_presence(status: Optional[str]) -> str:
+    """Presence state of a Graph availability value or a free-text status"""
+    key = re.sub(r'[^a-z]', '', (status or '').lower())
+    for prefix, state in _PRESENCE_PREFIXES:
+        if key.startswith(prefix):
+            return state
+    return PRESENCE_UNKNOWN
+
+
+def expertise_weight(credibility: float, contributions: int) -> float:
+    """Static weight of an expert: credibility scaled by recent activity"""
+    recency = 1 - math.exp(-max(contributions, 0) / RECENCY_SCALE)
+    return credibility * (0.5 + 0.5 * recency)
+
+
+class _TrieNode:
+    __slots__ = ('children', 'term')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.term: Optional[str] = None
+
+
+class TermTrie:
+    """
+    Character trie over expertise terms
+
+    Prefix lookups walk to the prefix node and enumerate below it. Fuzzy
+    lookups walk the trie once, carrying one Levenshtein row per node, and
+    prune branches whose row minimum already exceeds the allowed distance,
+    so shared prefixes are only compared once. Misspellings rarely touch
+    the first letter, so fuzzy walks only start below it by default,
+    which keeps them to a small slice of the trie.
+    """
+
+    def __init__(self):
+        self.root = _TrieNode()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __contains__(self, term: str) -> bool:
+        node = self._find(term)
+        return node is not None and node.term is not None
+
+    def add(self, term: str):
+        node = self.root
+        for char in term:
+            node = node.children.setdefault(char, _TrieNode())
+        if node.term is None:
+            node.term = term
+            self._size += 1
+
+    def discard(self, term: str):
+        path = [self.root]
+        for char in term:
+            node = path[-1].children.get(char)
+            if node is None:
+                return
+            path.append(node)
+        if path[-1].term is None:
+            return
+        path[-1].term = None
+        self._size -= 1
+        # Prune branches left without terms
+        for depth in range(len(term), 0, -1):
+            node = path[depth]
+            if node.term is not None or node.children:
+                break
+            del path[depth - 1].children[term[depth - 1]]
+
+    def _find(self, prefix: str) -> Optional[_TrieNode]:
+        node = self.root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return None
+        return node
+
+    def with_prefix(self, prefix: str, limit: int = MAX_EXPANSIONS) -> List[str]:
+        """Terms starting with prefix, shortest first"""
+        node = self._find(prefix)
+        if node is None:
+            return []
+        terms = []
+        level = [node]
+        while level and len(terms) < limit:
+            next_level = []
+            for current in level:
+                if current.term is not None:
+                    terms.append(current.term)
+                next_level.extend(current.children[char] for char in sorted(current.children))
+            level = next_level
+        return terms[:limit]
+
+    def within(self, term: str, max_distance: int, fixed_prefix: int = 1) -> List[Tuple[str, int]]:
+        """
+        Terms within a Levenshtein distance of term, closest first
+
+        Args:
+            term: Term to match
+            max_distance: Largest edit distance accepted
+            fixed_prefix: Leading characters that must match exactly
+        """
+        results: List[Tuple[str, int]] = []
+        fixed_prefix = min(fixed_prefix, len(term))
+        start = self._find(term[:fixed_prefix])
+        if start is None:
+            return results
+        # Distances of the fixed prefix against every prefix of term
+        first_row = [abs(fixed_prefix - column) for column in range(len(term) + 1)]
+
+        def walk(node: _TrieNode, char: str, previous: List[int]):
+            row = [previous[0] + 1]
+            for column in range(1, len(term) + 1):
+                row.append(min(
+                    row[column - 1] + 1,
+                    previous[column] + 1,
+                    previous[column - 1] + (term[column - 1] != char)
+                ))
+            if node.term is not None and row[-1] <= max_distance:
+                results.append((node.term, row[-1]))
+            if min(row) <= max_distance:
+                for next_char, child in node.children.items():
+                    walk(child, next_char, row)
+
+        if start.term is not None and first_row[-1] <= max_distance:
+            results.append((start.term, first_row[-1]))
+        for char, child in start.children.items():
+            walk(child, char, first_row)
+        results.sort(key=lambda item: (item[1], item[0]))
+        return results[:MAX_EXPANSIONS]
+
+
+class ExpertIndex:
+    """
+    Inverted index from expertise terms to experts
+
+    Each expertise area is split into normalized terms; every term holds a
+    posting list of expert numbers with the expert's precomputed weight
+    (credibility scaled by recent contributions), so ranking is a sum over
+    postings with no per-profile work. Query terms that are not indexed
+    are expanded by prefix ("kube" -> "kubernetes") and edit distance
+    ("secuirty" -> "security") through the term trie. Presence is kept as
+    one bitmap per state, swapped wholesale on every refresh.
+    """
+
+    def __init__(self):
+        self._profiles: List[Optional[Any]] = []
+        self._weights: List[float] = []
+        self._terms: List[Tuple[str, ...]] = []
+        self._numbers: Dict[str, int] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._trie = TermTrie()
+        self._areas: Counter = Counter()
+        self._area_labels: Dict[str, str] = {}
+        self._presence: Dict[str, Bitmap] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self._numbers
+
+    def upsert(self, profile: Any) -> int:
+        """
+        Add or replace an expert profile
+
+        Args:
+            profile: ExpertProfile-like object with user_id, expertise_areas,
+                     credibility_score, recent_contributions and availability_status
+
+        Returns:
+            Expert number assigned to this version
+        """
+        weight = expertise_weight(profile.credibility_score, profile.recent_contributions)
+        areas = [area.strip() for area in profile.expertise_areas if area.strip()]
+        terms = tuple(dict.fromkeys(term for area in areas for term in tokenize(area)))
+        state = normalize_presence(profile.availability_status)
+
+        with self._lock:
+            self._remove(profile.user_id)
+            number = len(self._profiles)
+            self._profiles.append(profile)
+            self._weights.append(weight)
+            self._terms.append(terms)
+            self._numbers[profile.user_id] = number
+            for term in terms:
+                postings = self._postings.get(term)
+                if postings is None:
+                    postings = self._postings[term] = {}
+                    self._trie.add(term)
+                postings[number] = weight
+            for area in areas:
+                key = area.lower()
+                self._area_labels.setdefault(key, area)
+                self._areas[key] += 1
+            self._presence.setdefault(state, Bitmap()).add(number)
+            return number
+
+    def remove(self, user_id: str) -> bool:
+        """
+        Remove an expert
+
+        Returns:
+            Whether the expert was indexed
+        """
+        with self._lock:
+            return self._remove(user_id)
+
+    def _remove(self, user_id: str) -> bool:
+        number = self._numbers.pop(user_id, None)
+        if number is None:
+            return False
+        profile = self._profiles[number]
+        for term in self._terms[number]:
+            postings = self._postings[term]
+            del postings[number]
+            if not postings:
+                del self._postings[term]
+                self._trie.discard(term)
+        for area in profile.expertise_areas:
+            key = area.strip().lower()
+            if key and self._areas[key] > 0:
+                self._areas[key] -= 1
+                if not self._areas[key]:
+                    del self._areas[key]
+        for bitmap in self._presence.values():
+            bitmap.discard(number)
+        self._profiles[number] = None
+        self._terms[number] = ()
+        return True
+
+    def get(self, user_id: str) -> Optional[Any]:
+        """Profile of an expert, or None"""
+        number = self._numbers.get(user_id)
+        return None if number is None else self._profiles[number]
+
+    def user_ids(self) -> Iterator[str]:
+        return iter(list(self._numbers))
+
+    def area_counts(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """Experts per expertise area, most common first"""
+        return {self._area_labels[key]: count for key, count in self._areas.most_common(limit)}
+
+    def presence_counts(self) -> Dict[str, int]:
+        """Experts per presence state"""
+        return {state: len(bitmap) for state, bitmap in self._presence.items() if len(bitmap)}
+
+    def refresh_presence(self, statuses: Mapping[str, str]) -> int:
+        """
+        Apply presence for a set of experts
+
+        Presence bitmaps are rebuilt and swapped in one step, so concurrent
+        lookups see either the old or the new availability. Experts missing
+        from statuses keep their current state.
+
+        Args:
+            statuses: Graph availability value or free-text status per user id
+
+        Returns:
+            Number of experts whose status changed
+        """
+        with self._lock:
+            changed = 0
+            for user_id, status in statuses.items():
+                number = self._numbers.get(user_id)
+                profile = None if number is None else self._profiles[number]
+                if profile is not None and profile.availability_status != status:
+                    self._profiles[number] = replace(profile, availability_status=status)
+                    changed += 1
+
+            presence: Dict[str, Bitmap] = {}
+            for number in self._numbers.values():
+                state = normalize_presence(self._profiles[number].availability_status)
+                presence.setdefault(state, Bitmap()).add(number)
+            self._presence = presence
+            return changed
+
+    def _expand(self, term: str, prefix: bool, fuzzy: bool) -> List[Tuple[str, float]]:
+        """Indexed terms a query term matches, with their match weights"""
+        expansions = {term: 1.0} if term in self._postings else {}
+        if prefix and len(term) >= 2:
+            for candidate in self._trie.with_prefix(term):
+                expansions.setdefault(candidate, PREFIX_MATCH_WEIGHT)
+        if fuzzy and not expansions and len(term) >= 4:
+            max_distance = 1 if len(term) < 8 else 2
+            for candidate, _ in self._trie.within(term, max_distance):
+                expansions.setdefault(candidate, FUZZY_MATCH_WEIGHT)
+        return list(expansions.items())
+
+    def search(self, query: str, limit: int = 10, availability: Optional[Iterable[str]] = None,
+               prefix: bool = True, fuzzy: bool = True) -> List[Tuple[Any, float]]:
+        """
+        Rank experts for an expertise query
+
+        Args:
+            query: Expertise area or free text
+            limit: Number of experts returned
+            availability: Presence states experts must be in; None for any
+            prefix: Expand query terms to indexed terms they prefix
+            fuzzy: Expand unmatched query terms by edit distance
+
+        Returns:
+            (profile, score) pairs, best first
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            mask: Optional[Bitmap] = None
+            if availability is not None:
+                mask = Bitmap()
+                for state in set(availability):
+                    bitmap = self._presence.get(state)
+                    if bitmap is not None:
+                        mask = mask | bitmap
+
+            terms = list(dict.fromkeys(tokenize(query)))
+            if not terms:
+                candidates = ((number, self._weights[number]) for number in self._numbers.values()
+                              if mask is None or number in mask)
+                top = heapq.nlargest(limit, candidates, key=lambda item: (item[1], -item[0]))
+                return [(self._profiles[number], weight) for number, weight in top]
+
+            scores: Dict[int, float] = {}
+            for term in terms:
+                # Best match per expert for this query term
+                matched: Dict[int, float] = {}
+                for indexed, match_weight in self._expand(term, prefix, fuzzy):
+                    for number, weight in self._postings[indexed].items():
+                        if mask is not None and number not in mask:
+                            continue
+                        score = weight * match_weight
+                        if score > matched.get(number, 0.0):
+                            matched[number] = score
+                for number, score in matched.items():
+                    scores[number] = scores.get(number, 0.0) + score
+
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(self._profiles[number], score) for number, score in top]
@@ -0,0 +1,216 @@
+"""
+Federation module for Microsoft 365 Copilot Plugin
+Concurrent fan-out of one query to several search sources with rank fusion
+"""
+
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+from .deadline import bounded_timeout
+
+logger = logging.getLogger('copilot_plugin')
+
+# Source statuses
+SOURCE_OK = 'ok'
+SOURCE_ERROR = 'error'
+SOURCE_TIMEOUT = 'timeout'
+
+# Reciprocal rank fusion constant; larger values flatten the rank discount
+RRF_K = 60
+
+# Seconds a federated query waits for its sources when no deadline is tighter
+DEFAULT_FEDERATION_TIMEOUT = 5.0
+
+# Worker threads shared by all federated queries of one executor
+DEFAULT_FEDERATION_WORKERS = 8
+
+# A source maps (query, limit) to ranked result lists per category; a
+# category set to None is reported as unavailable from that source
+SourceSearch = Callable[[str, int], Mapping[str, Optional[Sequence[Mapping[str, Any]]]]]
+
+
+@dataclass
+class FederatedSource:
+    """Registered search source"""
+    name: str
+    search: SourceSearch
+    weight: float = 1.0
+
+
+@dataclass
+class FederatedResult:
+    """Fused results of one federated query"""
+    results: Dict[str, List[Dict[str, Any]]]
+    sources: Dict[str, Dict[str, Any]]
+    partial: bool = False
+    unavailable: List[str] = field(default_factory=list)
+
+
+def reciprocal_rank_fusion(rankings: Iterable[Tuple[str, Sequence[Mapping[str, Any]], float]],
+                           key: str = 'id', k: int = RRF_K,
+                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Merge ranked lists whose scores are not comparable
+
+    Each item scores weight / (k + rank) in every list it appears in, so
+    only positions matter. Items are matched on key; the first copy seen
+    is kept. Ties keep the order items were first seen in.
+
+    Args:
+        rankings: (source name, ranked items, weight) triples
+        key: Item field identifying the same result across sources
+        k: Rank discount constant
+        limit: Number of items returned
+
+    Returns:
+        Copies of the items, best first, with fused_score and sources added
+    """
+    fused: Dict[Any, Dict[str, Any]] = {}
+    for source, ranking, weight in rankings:
+        for rank, item in enumerate(ranking, 1):
+            item_key = item.get(key)
+            if item_key is None:
+                item_key = (source, rank)
+            entry = fused.get(item_key)
+            if entry is None:
+                entry = fused[item_key] = dict(item, fused_score=0.0, sources=[])
+            entry['fused_score'] += weight / (k + rank)
+            if source not in entry['sources']:
+                entry['sources'].append(source)
+
+    merged = sorted(fused.values(), key=lambda entry: -entry['fused_score'])
+    for entry in merged:
+        entry['fused_score'] = round(entry['fused_score'], 6)
+    return merged if limit is None else merged[:limit]
+
+
+class FederatedSearch:
+    """
+    Runs one query against every registered source at once
+
+    Sources run on a shared worker pool with the caller's context, so the
+    request deadline and principal apply inside them. The query waits
+    until every source has answered or the timeout, clamped to the
+    request deadline, runs out, so its latency is that of the slowest
+    source that finishes in time. Late sources are reported as timed out
+    and the result is marked partial; their calls finish in the
+    background and are discarded.
+    """
+
+    def __init__(self, timeout: float = DEFAULT_FEDERATION_TIMEOUT,
+                 max_workers: int = DEFAULT_FEDERATION_WORKERS, k: int = RRF_K):
+        """
+        Initialize federated search
+
+        Args:
+            timeout: Seconds to wait for sources
+            max_workers: Worker threads running source searches
+            k: Reciprocal rank fusion constant
+        """
+        self.timeout = timeout
+        self.max_workers = max_workers
+        self.k = k
+        self._sources: Dict[str, FederatedSource] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def sources(self) -> List[str]:
+        return list(self._sources)
+
+    def register(self, name: str, search: SourceSearch, weight: float = 1.0):
+        """
+        Register a search source
+
+        Args:
+            name: Source name reported in per-source analytics
+            search: Callable returning ranked result lists per category
+            weight: Weight of the source's rankings in the fusion
+        """
+        self._sources[name] = FederatedSource(name, search, weight)
+
+    def search(self, query: str, limit: int = 10, timeout: Optional[float] = None) -> FederatedResult:
+        """
+        Query every source concurrently and fuse their rankings per category
+
+        Args:
+            query: Search query passed to every source
+            limit: Results per source and per fused category
+            timeout: Seconds to wait, defaults to the configured timeout
+
+        Returns:
+            Fused results, per-source status and latency, and whether any
+            source failed or did not answer in time
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix='federated-search'
+                )
+            executor = self._executor
+
+        start = time.perf_counter()
+        finished: Dict[str, float] = {}
+
+        def run(source: FederatedSource):
+            try:
+                return source.search(query, limit)
+            finally:
+                finished[source.name] = time.perf_counter()
+
+        futures = {
+            name: executor.submit(contextvars.copy_context().run, run, source)
+            for name, source in self._sources.items()
+        }
+        wait(futures.values(), timeout=bounded_timeout(self.timeout if timeout is None else timeout))
+        cutoff = time.perf_counter()
+
+        rankings: Dict[str, List[Tuple[str, Sequence[Mapping[str, Any]], float]]] = {}
+        statuses: Dict[str, Dict[str, Any]] = {}
+        unavailable: List[str] = []
+        partial = False
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                statuses[name] = {'status': SOURCE_TIMEOUT, 'latency_ms': round((cutoff - start) * 1000, 2)}
+                unavailable.append(name)
+                partial = True
+                continue
+
+            latency_ms = round((finished.get(name, cutoff) - start) * 1000, 2)
+            try:
+                outcome = future.result()
+            except Exception as e:
+                logger.warning(f"Federated source {name} failed: {e}")
+                statuses[name] = {'status': SOURCE_ERROR, 'latency_ms': latency_ms, 'error': type(e).__name__}
+                unavailable.append(name)
+                partial = True
+                continue
+
+            count = 0
+            for category, ranking in (outcome or {}).items():
+                if ranking is None:
+                    unavailable.append(f"{name}.{category}")
+                    partial = True
+                    continue
+                rankings.setdefault(category, []).append((name, ranking, self._sources[name].weight))
+                count += len(ranking)
+            statuses[name] = {'status': SOURCE_OK, 'latency_ms': latency_ms, 'results': count}
+
+        results = {
+            category: reciprocal_rank_fusion(ranked, k=self.k, limit=limit)
+            for category, ranked in rankings.items()
+        }
+        return FederatedResult(results, statuses, partial, unavailable)
+
+    def shutdown(self):
+        """Stop the worker pool without waiting for running searches"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
@@ -0,0 +1,288 @@
+"""
+Graph batch module for Microsoft 365 Copilot Plugin
+Packs Microsoft Graph sub-requests into JSON $batch calls
+"""
+
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+from .deadline import remaining
+from .http_client import HttpClient, HttpStatusError
+
+logger = logging.getLogger('copilot_plugin')
+
+# Graph JSON batching endpoint
+GRAPH_BATCH_URL = 'https://graph.microsoft.com/v1.0/$batch'
+
+# Graph accepts at most 20 sub-requests per batch
+MAX_BATCH_SIZE = 20
+
+# Longest Retry-After honoured, in seconds
+MAX_RETRY_AFTER = 30.0
+
+# Sub-request statuses retried after their Retry-After delay
+THROTTLED_STATUS_CODES = frozenset({429, 503})
+
+
+class GraphRequestError(Exception):
+    """Raised when reading the result of a failed Graph sub-request"""
+
+    def __init__(self, request: 'GraphRequest'):
+        body = request.response_body
+        error = body.get('error', {}) if isinstance(body, dict) else {}
+        super().__init__(f"{request.method} {request.url} returned {request.status}: "
+                         f"{error.get('message', 'no details')}")
+        self.status_code = request.status
+        self.request = request
+
+
+class GraphRequest:
+    """One sub-request of a Graph batch and, once executed, its response"""
+
+    __slots__ = ('id', 'method', 'url', 'body', 'headers', 'depends_on',
+                 'status', 'response_headers', 'response_body', '_batch')
+
+    def __init__(self, batch: 'GraphBatch', request_id: str, method: str, url: str,
+                 body: Any = None, headers: Optional[Dict[str, str]] = None,
+                 depends_on: Optional[List['GraphRequest']] = None):
+        self._batch = batch
+        self.id = request_id
+        self.method = method
+        self.url = url
+        self.body = body
+        self.headers = headers
+        self.depends_on = list(depends_on or [])
+        self.status: Optional[int] = None
+        self.response_headers: Dict[str, str] = {}
+        self.response_body: Any = None
+
+    @property
+    def done(self) -> bool:
+        return self.status is not None
+
+    @property
+    def ok(self) -> bool:
+        return self.status is not None and 200 <= self.status < 300
+
+    def result(self) -> Any:
+        """
+        Response body, executing the batch first if it has not run
+
+        Raises:
+            GraphRequestError: If the sub-request failed
+        """
+        if not self.done:
+            self._batch.execute()
+        if not self.ok:
+            raise GraphRequestError(self)
+        return self.response_body
+
+    def to_batch_item(self, in_batch: set) -> Dict[str, Any]:
+        item: Dict[str, Any] = {'id': self.id, 'method': self.method, 'url': self.url}
+        if self.headers:
+            item['headers'] = self.headers
+        if self.body is not None:
+            item['body'] = self.body
+            item.setdefault('headers', {}).setdefault('Content-Type', 'application/json')
+        depends_on = [dependency.id for dependency in self.depends_on if dependency.id in in_batch]
+        if depends_on:
+            item['dependsOn'] = depends_on
+        return item
+
+
+def _retry_after(headers: Dict[str, str]) -> Optional[float]:
+    for name, value in (headers or {}).items():
+        if name.lower() == 'retry-after':
+            try:
+                return max(float(value), 0.0)
+            except (TypeError, ValueError):
+                return None
+    return None
+
+
+class GraphBatch:
+    """
+    Collects Graph sub-requests issued during one operation
+
+    Requests are sent on execute(), or when a result is first read, as
+    $batch calls of up to 20. Dependencies inside a batch use dependsOn so
+    Graph runs them in order. A request whose dependency went in an earlier
+    batch is only sent if that dependency succeeded; otherwise it fails with
+    424 without being sent. Throttled sub-requests are resent after their
+    Retry-After delay while attempts and the request deadline allow.
+
+    Usage:
+        with GraphBatch(http_client) as batch:
+            people = batch.get('/me/people?$search="azure"')
+            sites = batch.get('/sites?search=azure')
+        people.result()
+    """
+
+    def __init__(self, http_client: HttpClient, batch_url: str = GRAPH_BATCH_URL,
+                 max_batch_size: int = MAX_BATCH_SIZE, max_attempts: int = 3,
+                 max_retry_after: float = MAX_RETRY_AFTER):
+        """
+        Initialize Graph batch
+
+        Args:
+            http_client: Pooled client the $batch calls are sent with
+            batch_url: Graph $batch endpoint
+            max_batch_size: Sub-requests per $batch call
+            max_attempts: Attempts per sub-request when throttled
+            max_retry_after: Longest Retry-After delay honoured in seconds
+        """
+        self.http_client = http_client
+        self.batch_url = batch_url
+        self.max_batch_size = max_batch_size
+        self.max_attempts = max_attempts
+        self.max_retry_after = max_retry_after
+        self.requests: List[GraphRequest] = []
+        self.round_trips = 0
+
+    def __enter__(self) -> 'GraphBatch':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.execute()
+
+    def add(self, method: str, url: str, body: Any = None, headers: Optional[Dict[str, str]] = None,
+            depends_on: Optional[List[GraphRequest]] = None) -> GraphRequest:
+        """
+        Queue a sub-request
+
+        Args:
+            method: HTTP method
+            url: URL relative to the Graph version root, e.g. /me/people
+            body: JSON body
+            headers: Sub-request headers
+            depends_on: Requests that must succeed before this one runs
+
+        Returns:
+            Handle whose result() is the response body
+        """
+        request = GraphRequest(self, str(len(self.requests) + 1), method.upper(), url,
+                               body, headers, depends_on)
+        self.requests.append(request)
+        return request
+
+    def get(self, url: str, **kwargs) -> GraphRequest:
+        return self.add('GET', url, **kwargs)
+
+    def post(self, url: str, body: Any = None, **kwargs) -> GraphRequest:
+        return self.add('POST', url, body, **kwargs)
+
+    def execute(self) -> List[GraphRequest]:
+        """
+        Send every pending sub-request
+
+        Returns:
+            All requests of the batch, in the order they were added
+        """
+        pending = [request for request in self.requests if not request.done]
+        attempts = 0
+        while pending:
+            attempts += 1
+            for chunk in self._pack(pending):
+                self._send(chunk)
+
+            throttled = self._throttled(pending)
+            if not throttled or attempts >= self.max_attempts:
+                break
+            delays = [_retry_after(request.response_headers) for request in throttled
+                      if request.status in THROTTLED_STATUS_CODES]
+            delay = min(max(1.0 if d is None else d for d in delays), self.max_retry_after)
+            left = remaining()
+            if left is not None and delay >= left:
+                break
+            logger.info(f"Graph throttled {len(throttled)} requests, retrying in {delay:.2f} s")
+            time.sleep(delay)
+            for request in throttled:
+                request.status = None
+            pending = throttled
+        return self.requests
+
+    def _pack(self, pending: List[GraphRequest]) -> List[List[GraphRequest]]:
+        """Split requests into batches, keeping each after its dependencies"""
+        ordered: List[GraphRequest] = []
+        visiting: set = set()
+        placed: set = set()
+        pending_ids = {request.id for request in pending}
+
+        def visit(request: GraphRequest):
+            if request.id in placed:
+                return
+            if request.id in visiting:
+                raise ValueError(f"Graph request {request.id} depends on itself")
+            visiting.add(request.id)
+            for dependency in request.depends_on:
+                if dependency.id in pending_ids:
+                    visit(dependency)
+            visiting.discard(request.id)
+            placed.add(request.id)
+            ordered.append(request)
+
+        for request in pending:
+            visit(request)
+
+        chunks: List[List[GraphRequest]] = []
+        for request in ordered:
+            if not chunks or len(chunks[-1]) >= self.max_batch_size:
+                chunks.append([])
+            chunks[-1].append(request)
+        return chunks
+
+    def _send(self, chunk: List[GraphRequest]):
+        in_batch = {request.id for request in chunk}
+        items = []
+        for request in chunk:
+            # Dependencies sent in an earlier batch must already have succeeded
+            if any(dependency.id not in in_batch and not dependency.ok for dependency in request.depends_on):
+                request.status = 424
+                request.response_body = {'error': {'code': 'FailedDependency', 'message': 'Dependency failed'}}
+                in_batch.discard(request.id)
+                continue
+            items.append(request.to_batch_item(in_batch))
+        if not items:
+            return
+
+        by_id = {request.id: request for request in chunk}
+        try:
+            self.round_trips += 1
+            # Throttled batches are resent by execute() after their Retry-After
+            # delay, so the resilience guard must not retry the POST as well
+            response = self.http_client.post(self.batch_url, json_body={'requests': items},
+                                             dependency='graph', retry=False)
+            responses = response.json().get('responses', [])
+        except HttpStatusError as e:
+            # The whole batch was rejected; every item shares its status
+            headers = dict(getattr(e.response, 'headers', {}) or {})
+            responses = [{'id': item['id'], 'status': e.status_code, 'headers': headers, 'body': None}
+                         for item in items]
+
+        for item in responses:
+            request = by_id.get(str(item.get('id')))
+            if request is not None:
+                request.status = item.get('status')
+                request.response_headers = item.get('headers') or {}
+                request.response_body = item.get('body')
+
+        for item in items:
+            request = by_id[item['id']]
+            if not request.done:
+                request.status = 502
+                request.response_body = {'error': {'code': 'MissingResponse', 'message': 'No response in batch'}}
+
+    def _throttled(self, pending: List[GraphRequest]) -> List[GraphRequest]:
+        """Throttled requests plus the dependents that failed because of them"""
+        retry = {request.id for request in pending if request.status in THROTTLED_STATUS_CODES}
+        changed = bool(retry)
+        while changed:
+            changed = False
+            for request in pending:
+                if (request.id not in retry and request.status == 424
+                        and any(dependency.id in retry for dependency in request.depends_on)):
+                    retry.add(request.id)
+                    changed = True
+        return [request for request in pending if request.id in retry]
@@ -0,0 +1,254 @@
+"""
+Health module for Microsoft 365 Copilot Plugin
+Background dependency probes with a cached snapshot for the health endpoint
+"""
+
+import logging
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger('copilot_plugin')
+
+# Probe statuses
+STATUS_UP = 'up'
+STATUS_DEGRADED = 'degraded'
+STATUS_DOWN = 'down'
+STATUS_UNKNOWN = 'unknown'
+STATUS_NOT_CONFIGURED = 'not_configured'
+
+# A probe returns a status, optionally with a details dictionary
+ProbeCheck = Callable[[], Any]
+
+
+@dataclass
+class ProbeResult:
+    """Result of a single dependency probe"""
+    status: str
+    latency_ms: float = 0.0
+    checked_at: Optional[str] = None
+    details: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        result = {
+            'status': self.status,
+            'latency_ms': round(self.latency_ms, 2),
+            'checked_at': self.checked_at
+        }
+        if self.details:
+            result['details'] = self.details
+        return result
+
+
+@dataclass
+class HealthProbe:
+    """Registered dependency probe"""
+    name: str
+    check: ProbeCheck
+    timeout: float
+    critical: bool = False
+
+
+class HealthMonitor:
+    """
+    Runs dependency probes on a background schedule
+
+    Probes execute on a worker pool with per-probe timeouts. The health
+    endpoint only reads the last snapshot, so probing never happens on the
+    request path. A probe still running from a previous round is reported as
+    timed out instead of being started again.
+    """
+
+    def __init__(self, interval: float = 30.0, timeout: float = 5.0,
+                 version: str = '1.0.0'):
+        """
+        Initialize health monitor
+
+        Args:
+            interval: Seconds between probe rounds
+            timeout: Default probe timeout in seconds
+            version: Application version reported in snapshots
+        """
+        self.interval = interval
+        self.timeout = timeout
+        self.version = version
+        self._probes: Dict[str, HealthProbe] = {}
+        self._results: Dict[str, ProbeResult] = {}
+        self._in_flight: Dict[str, Future] = {}
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._snapshot_time = 0.0
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started = False
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def register(self, name: str, check: ProbeCheck, timeout: Optional[float] = None,
+                 critical: bool = False):
+        """
+        Register a dependency probe
+
+        Args:
+            name: Dependency name reported in the snapshot
+            check: Callable returning a status string or a (status, details) tuple;
+                   raising an exception reports the dependency as down
+            timeout: Probe timeout in seconds, defaults to the monitor timeout
+            critical: Whether the dependency being down makes the app unhealthy
+        """
+        with self._lock:
+            self._probes[name] = HealthProbe(name, check, timeout or self.timeout, critical)
+            self._results[name] = ProbeResult(STATUS_UNKNOWN)
+            self._snapshot = None
+
+    def start(self):
+        """Start the background probe schedule if it is not already running"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._started = True
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(len(self._probes), 1),
+                    thread_name_prefix='health-probe'
+                )
+            self._thread = threading.Thread(target=self._run, name='health-monitor', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background probe schedule"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.timeout)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.run_probes()
+            except Exception as e:
+                logger.error(f"Health probe round failed: {e}")
+            self._stop.wait(self.interval)
+
+    def run_probes(self) -> Dict[str, Any]:
+        """Run all probes once and refresh the snapshot"""
+        with self._lock:
+            probes = list(self._probes.values())
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=max(len(probes), 1),
+                    thread_name_prefix='health-probe'
+                )
+            executor = self._executor
+
+        started: List[Tuple[HealthProbe, Optional[Future], float]] = []
+        for probe in probes:
+            previous = self._in_flight.get(probe.name)
+            if previous is not None and not previous.done():
+                started.append((probe, None, time.perf_counter()))
+                continue
+            future = executor.submit(probe.check)
+            self._in_flight[probe.name] = future
+            started.append((probe, future, time.perf_counter()))
+
+        results: Dict[str, ProbeResult] = {}
+        for probe, future, start_time in started:
+            results[probe.name] = self._collect(probe, future, start_time)
+
+        with self._lock:
+            self._results.update(results)
+            self._snapshot = self._build_snapshot()
+            self._snapshot_time = time.monotonic()
+            return self._snapshot
+
+    def _collect(self, probe: HealthProbe, future: Optional[Future], start_time: float) -> ProbeResult:
+        checked_at = datetime.now(timezone.utc).isoformat()
+        if future is None:
+            return ProbeResult(STATUS_DOWN, probe.timeout * 1000, checked_at,
+                               {'error': 'previous probe still running'})
+
+        remaining = max(probe.timeout - (time.perf_counter() - start_time), 0.0)
+        try:
+            outcome = future.result(timeout=remaining)
+        except FutureTimeoutError:
+            return ProbeResult(STATUS_DOWN, probe.timeout * 1000, checked_at, {'error': 'timeout'})
+        except Exception as e:
+            return ProbeResult(STATUS_DOWN, (time.perf_counter() - start_time) * 1000, checked_at,
+                               {'error': type(e).__name__})
+
+        latency_ms = (time.perf_counter() - start_time) * 1000
+        if isinstance(outcome, tuple):
+            status, details = outcome
+        else:
+            status, details = outcome, {}
+        return ProbeResult(status, latency_ms, checked_at, dict(details or {}))
+
+    def _build_snapshot(self) -> Dict[str, Any]:
+        overall = 'healthy'
+        for name, result in self._results.items():
+            if result.status == STATUS_DOWN and self._probes[name].critical:
+                overall = 'unhealthy'
+                break
+            if result.status in (STATUS_DOWN, STATUS_DEGRADED, STATUS_UNKNOWN):
+                overall = 'degraded'
+
+        return {
+            'status': overall,
+            'timestamp': datetime.now(timezone.utc).isoformat(),
+            'version': self.version,
+            'dependencies': {name: result.status for name, result in self._results.items()},
+            'probes': {name: result.to_dict() for name, result in self._results.items()}
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the cached health snapshot
+
+        Starts the background schedule on first use. A snapshot older than
+        three probe intervals is reported as degraded and marked stale.
+        """
+        if not self._started:
+            self.start()
+
+        with self._lock:
+            if self._snapshot is None:
+                self._snapshot = self._build_snapshot()
+                self._snapshot_time = time.monotonic()
+            snapshot = self._snapshot
+            age = time.monotonic() - self._snapshot_time
+
+        if age > self.interval * 3:
+            snapshot = dict(snapshot)
+            snapshot['stale'] = True
+            if snapshot['status'] == 'healthy':
+                snapshot['status'] = 'degraded'
+        return snapshot
+
+
+def http_probe(url: Optional[str], timeout: float = 5.0, method: str = 'GET') -> ProbeCheck:
+    """
+    Create a probe that issues an HTTP request to a dependency endpoint
+
+    The dependency is up for 2xx/3xx responses, degraded for 429 and down
+    for any other status or connection failure. Unset URLs report the
+    dependency as not configured.
+    """
+    def check():
+        if not url:
+            return STATUS_NOT_CONFIGURED
+        request = urllib.request.Request(url, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=timeout) as response:
+                return STATUS_UP, {'status_code': response.status}
+        except urllib.error.HTTPError as e:
+            status = STATUS_DEGRADED if e.code == 429 else STATUS_DOWN
+            return status, {'status_code': e.code}
+    return check
@@ -0,0 +1,294 @@
+"""
+HTTP client module for Microsoft 365 Copilot Plugin
+Pooled downstream HTTP client with token attachment and dependency telemetry
+"""
+
+import gzip
+import importlib.util
+import json
+import logging
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from .deadline import bounded_timeout, check_deadline
+from .resilience import ResilienceRegistry, dependency_for_url
+
+# httpx with the h2 package enables HTTP/2; requests (HTTP/1.1) is used otherwise
+try:
+    import httpx
+    HTTP2_AVAILABLE = importlib.util.find_spec('h2') is not None
+except ImportError:
+    httpx = None
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger('copilot_plugin')
+
+# Token scopes by downstream host; suffix entries start with a dot
+DEFAULT_SCOPES: Dict[str, str] = {
+    'graph.microsoft.com': 'https://graph.microsoft.com/.default',
+    'api.synapse.azure.com': 'https://dev.azuresynapse.net/.default',
+    'api.cognitive.microsoft.com': 'https://cognitiveservices.azure.com/.default',
+    '.vault.azure.net': 'https://vault.azure.net/.default',
+}
+
+# Keep-alive connections kept per host
+DEFAULT_POOL_SIZE = 20
+
+# Request timeout in seconds when the caller has no deadline
+DEFAULT_TIMEOUT = 30.0
+
+# Methods safe to send again after a timeout or transient error
+IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'PUT', 'DELETE'})
+
+
+class HttpStatusError(Exception):
+    """Raised for downstream responses with an error status"""
+
+    def __init__(self, method: str, url: str, response: Any):
+        super().__init__(f"{method} {url} returned {response.status_code}")
+        self.status_code = response.status_code
+        self.response = response
+
+
+def scope_for_url(url: str, scopes: Dict[str, str] = DEFAULT_SCOPES) -> Optional[str]:
+    """Token scope for a downstream URL, if its host is known"""
+    host = (urlsplit(url).hostname or '').lower()
+    for pattern, scope in scopes.items():
+        if host == pattern or (pattern.startswith('.') and host.endswith(pattern)):
+            return scope
+    return None
+
+
+class TokenProvider:
+    """
+    Access tokens per scope from a shared credential
+
+    Tokens are reused until they are within refresh_margin seconds of
+    expiry. Inside that window the current token is still served while one
+    background thread fetches its replacement; callers only block on the
+    credential when no token exists or it expires within min_validity.
+    """
+
+    def __init__(self, credential: Any, refresh_margin: float = 300.0, min_validity: float = 30.0):
+        self.credential = credential
+        self.refresh_margin = refresh_margin
+        self.min_validity = min_validity
+        self._tokens: Dict[str, Any] = {}
+        self._refreshing: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def get_token(self, scope: str) -> str:
+        """Bearer token for a scope"""
+        token = self._tokens.get(scope)
+        left = token.expires_on - time.time() if token is not None else 0
+        if left > self.refresh_margin:
+            return token.token
+        if left > self.min_validity:
+            self._refresh_in_background(scope)
+            return token.token
+        return self._refresh(scope).token
+
+    def invalidate(self, scope: str):
+        """Drop a token the downstream rejected"""
+        self._tokens.pop(scope, None)
+
+    def _refresh(self, scope: str) -> Any:
+        with self._lock:
+            token = self._tokens.get(scope)
+            if token is not None and token.expires_on - time.time() > self.min_validity:
+                return token
+            token = self.credential.get_token(scope)
+            self._tokens[scope] = token
+            return token
+
+    def _refresh_in_background(self, scope: str):
+        with self._lock:
+            if scope in self._refreshing:
+                return
+            thread = threading.Thread(target=self._background_refresh, args=(scope,), daemon=True)
+            self._refreshing[scope] = thread
+        thread.start()
+
+    def _background_refresh(self, scope: str):
+        try:
+            self._tokens[scope] = self.credential.get_token(scope)
+        except Exception as e:
+            logger.warning(f"Proactive token refresh for {scope} failed: {e}")
+        finally:
+            with self._lock:
+                self._refreshing.pop(scope, None)
+
+
+class HttpClient:
+    """
+    Shared client for Graph, Synapse, Form Recognizer and other downstreams
+
+    Each host gets its own keep-alive connection pool, over HTTP/2 when
+    httpx and h2 are installed. Bearer tokens for known hosts are attached
+    from the shared credential. Responses may be gzip encoded and request
+    bodies can be gzip compressed. Calls go through the host's resilience
+    guard when one is configured, and each attempt is tracked as a
+    dependency.
+    """
+
+    def __init__(self, credential: Any = None, telemetry: Any = None,
+                 resilience: Optional[ResilienceRegistry] = None,
+                 pool_size: int = DEFAULT_POOL_SIZE, http2: bool = True,
+                 timeout: float = DEFAULT_TIMEOUT, compress_over: Optional[int] = None,
+                 scopes: Optional[Dict[str, str]] = None):
+        """
+        Initialize HTTP client
+
+        Args:
+            credential: Azure credential used for bearer tokens
+            telemetry: TelemetryManager for dependency tracking
+            resilience: Registry guarding calls per dependency
+            pool_size: Keep-alive connections kept per host
+            http2: Use HTTP/2 when httpx and h2 are installed
+            timeout: Request timeout when the caller has no deadline
+            compress_over: Gzip request bodies larger than this many bytes
+            scopes: Token scopes by host, defaults to DEFAULT_SCOPES
+        """
+        self.tokens = TokenProvider(credential) if credential is not None else None
+        self.telemetry = telemetry
+        self.resilience = resilience
+        self.pool_size = pool_size
+        self.http2 = http2 and HTTP2_AVAILABLE
+        self.timeout = timeout
+        self.compress_over = compress_over
+        self.scopes = DEFAULT_SCOPES if scopes is None else scopes
+        self._pools: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def _pool(self, scheme: str, host: str) -> Any:
+        key = (scheme, host)
+        pool = self._pools.get(key)
+        if pool is None:
+            with self._lock:
+                pool = self._pools.get(key)
+                if pool is None:
+                    if self.http2:
+                        pool = httpx.Client(http2=True, limits=httpx.Limits(
+                            max_connections=self.pool_size, max_keepalive_connections=self.pool_size
+                        ))
+                    else:
+                        pool = requests.Session()
+                        pool.mount(f"{scheme}://", HTTPAdapter(
+                            pool_connections=1, pool_maxsize=self.pool_size
+                        ))
+                    self._pools[key] = pool
+        return pool
+
+    def request(self, method: str, url: str, *, json_body: Any = None, data: Optional[bytes] = None,
+                params: Optional[Dict[str, Any]] = None, headers: Optional[Dict[str, str]] = None,
+                scope: Optional[str] = None, compress: Optional[bool] = None,
+                timeout: Optional[float] = None, dependency: Optional[str] = None,
+                retry: Optional[bool] = None) -> Any:
+        """
+        Send a request to a downstream
+
+        Args:
+            method: HTTP method
+            url: Absolute URL
+            json_body: Value sent as a JSON body
+            data: Raw body bytes
+            params: Query string parameters
+            headers: Additional request headers
+            scope: Token scope, defaults to the scope for the URL's host
+            compress: Gzip the body, defaults to bodies over compress_over bytes
+            timeout: Request timeout, capped at the time left on the deadline
+            dependency: Resilience guard name, defaults to the name for the URL's host
+            retry: Retry transient failures, defaults to idempotent methods only;
+                   pass True for read-only POSTs such as search queries
+
+        Returns:
+            Response with status_code, headers, content and json()
+
+        Raises:
+            HttpStatusError: For 4xx and 5xx responses
+            DeadlineExceeded: If the request deadline passes before a call starts
+        """
+        headers = dict(headers or {})
+        headers.setdefault('Accept-Encoding', 'gzip')
+        if json_body is not None:
+            data = json.dumps(json_body, separators=(',', ':')).encode('utf-8')
+            headers.setdefault('Content-Type', 'application/json')
+        if data is not None:
+            if compress is None:
+                compress = self.compress_over is not None and len(data) > self.compress_over
+            if compress:
+                data = gzip.compress(data)
+                headers['Content-Encoding'] = 'gzip'
+
+        scope = scope or scope_for_url(url, self.scopes)
+        name = dependency or dependency_for_url(url)
+        if self.resilience is not None and name:
+            if retry is None:
+                retry = method.upper() in IDEMPOTENT_METHODS
+            return self.resilience.call(name, self._send, method, url, data, params, headers, scope, timeout,
+                                        retry=retry)
+        return self._send(method, url, data, params, headers, scope, timeout)
+
+    def get(self, url: str, **kwargs) -> Any:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> Any:
+        return self.request('POST', url, **kwargs)
+
+    def _send(self, method: str, url: str, data: Optional[bytes], params: Optional[Dict[str, Any]],
+              headers: Dict[str, str], scope: Optional[str], timeout: Optional[float]) -> Any:
+        check_deadline(urlsplit(url).hostname or url)
+        parts = urlsplit(url)
+        pool = self._pool(parts.scheme, parts.netloc)
+
+        for attempt in range(2):
+            if scope and self.tokens is not None:
+                headers['Authorization'] = f"Bearer {self.tokens.get_token(scope)}"
+
+            start_time = time.time()
+            response = None
+            try:
+                body = {'content' if self.http2 else 'data': data}
+                response = pool.request(method, url, params=params, headers=headers,
+                                        timeout=bounded_timeout(timeout or self.timeout), **body)
+            finally:
+                self._track(method, parts, response, start_time)
+
+            # A rejected token is refreshed once; it may have been revoked early
+            if response.status_code == 401 and scope and self.tokens is not None and attempt == 0:
+                self.tokens.invalidate(scope)
+                continue
+            break
+
+        if response.status_code >= 400:
+            raise HttpStatusError(method, url, response)
+        return response
+
+    def _track(self, method: str, parts: Any, response: Any, start_time: float):
+        if not self.telemetry:
+            return
+        status_code = getattr(response, 'status_code', None)
+        self.telemetry.track_dependency(
+            name=f"{method} {parts.path or '/'}",
+            dependency_type='HTTP',
+            target=parts.netloc,
+            success=status_code is not None and status_code < 400,
+            duration_ms=(time.time() - start_time) * 1000,
+            properties={
+                'status_code': status_code,
+                'protocol': getattr(response, 'http_version', 'HTTP/1.1') if response is not None else None
+            }
+        )
+
+    def close(self):
+        """Close every pooled connection"""
+        with self._lock:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.close()
+
@@ -0,0 +1,364 @@
+"""
+Ingestion module for Microsoft 365 Copilot Plugin
+Incremental index ingestion from Graph delta feeds with checkpoints and segments
+"""
+
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+from .deadline import deadline_expired
+from .http_client import HttpClient, HttpStatusError
+
+logger = logging.getLogger('copilot_plugin')
+
+# Segment operations
+OP_UPSERT = 'upsert'
+OP_DELETE = 'delete'
+# Start of a full resync; documents not upserted again before it completes are deleted
+OP_RESYNC = 'resync'
+
+# Segments after which a complete sync compacts the segment log
+DEFAULT_COMPACT_SEGMENTS = 16
+
+# Longest text kept per document
+MAX_TEXT_CHARS = 200_000
+
+# Content types whose bodies are downloaded and extracted
+TEXT_CONTENT_TYPES = ('text/plain', 'text/markdown', 'text/html', 'text/csv', 'application/json')
+
+# (doc_id, fields, facets, document, acl) handed to the index; document is JSON data
+IndexRecord = Tuple[str, Dict[str, Any], Dict[str, Any], Any, Optional[List[str]]]
+
+
+class _TextOnly(HTMLParser):
+    """Collects text content of an HTML document, skipping scripts and styles"""
+
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ('script', 'style'):
+            self._skip += 1
+
+    def handle_endtag(self, tag):
+        if tag in ('script', 'style') and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def extract_text(content: bytes, content_type: str) -> str:
+    """
+    Plain text of a downloaded file
+
+    HTML is reduced to its text content; other supported types are decoded
+    as UTF-8. Text is whitespace-collapsed and truncated to MAX_TEXT_CHARS.
+    """
+    text = content.decode('utf-8', errors='replace')
+    if content_type.startswith('text/html'):
+        parser = _TextOnly()
+        parser.feed(text)
+        text = ' '.join(parser.parts)
+    return re.sub(r'\s+', ' ', text).strip()[:MAX_TEXT_CHARS]
+
+
+class CheckpointStore:
+    """
+    Delta checkpoints persisted as one JSON file per feed
+
+    Writes go to a temporary file that replaces the checkpoint atomically,
+    so a crash leaves either the previous or the new checkpoint.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, feed: str) -> Path:
+        return self.directory / f"{re.sub(r'[^A-Za-z0-9_.-]', '_', feed)}.checkpoint.json"
+
+    def load(self, feed: str) -> Dict[str, Any]:
+        try:
+            return json.loads(self._path(feed).read_text())
+        except FileNotFoundError:
+            return {}
+
+    def save(self, feed: str, state: Dict[str, Any]):
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as handle:
+            json.dump(state, handle)
+        os.replace(temp_path, self._path(feed))
+
+    def clear(self, feed: str):
+        self._path(feed).unlink(missing_ok=True)
+
+
+class SegmentStore:
+    """
+    Append-only index segments
+
+    Each ingested page of changes is written as one JSON-lines segment of
+    upsert/delete operations before it is applied to the index. Replaying
+    the segments in order rebuilds the index after a restart; operations
+    are idempotent, so a page written twice applies the same way.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def segments(self) -> List[Path]:
+        return sorted(self.directory.glob('segment-*.jsonl'))
+
+    def _next_path(self) -> Path:
+        existing = self.segments()
+        number = int(existing[-1].stem.split('-')[1]) + 1 if existing else 1
+        return self.directory / f"segment-{number:08d}.jsonl"
+
+    def write(self, operations: List[Dict[str, Any]]) -> Optional[Path]:
+        """Write operations as a new segment; nothing is written for an empty list"""
+        if not operations:
+            return None
+        with self._lock:
+            path = self._next_path()
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as handle:
+                for operation in operations:
+                    handle.write(json.dumps(operation, separators=(',', ':')) + '\n')
+            os.replace(temp_path, path)
+            return path
+
+    def operations(self) -> Iterator[Dict[str, Any]]:
+        """All operations in write order"""
+        for path in self.segments():
+            with open(path) as handle:
+                for line in handle:
+                    if line.strip():
+                        yield json.loads(line)
+
+    def compact(self) -> int:
+        """
+        Collapse all segments into one holding the latest upsert per live document
+
+        Returns:
+            Number of operations in the compacted segment
+        """
+        with self._lock:
+            paths = self.segments()
+            latest: Dict[str, Dict[str, Any]] = {}
+            for operation in self.operations():
+                if operation['op'] == OP_RESYNC:
+                    continue
+                latest.pop(operation['id'], None)
+                if operation['op'] == OP_UPSERT:
+                    latest[operation['id']] = operation
+            if not paths:
+                return 0
+
+            fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            with os.fdopen(fd, 'w') as handle:
+                for operation in latest.values():
+                    handle.write(json.dumps(operation, separators=(',', ':')) + '\n')
+            os.replace(temp_path, paths[-1])
+            for path in paths[:-1]:
+                path.unlink()
+            return len(latest)
+
+
+class DeltaIngestor:
+    """
+    Keeps an index in step with a Graph drive delta feed
+
+    Each sync() follows the feed from the saved delta link, so the work is
+    proportional to the number of changes since the last sync. Every page
+    is turned into upsert/delete operations: deleted items are removed,
+    folders are skipped and files are indexed with their metadata and, for
+    text formats, their extracted content. A page is written as a segment,
+    applied to the index and only then checkpointed, so an interrupted
+    sync resumes at the first page that was not checkpointed.
+
+    An expired delta token restarts the feed from a full enumeration,
+    which lists live items but not the deletions missed meanwhile. Once
+    it completes, every document this feed indexed that the enumeration
+    did not return again is deleted. Complete syncs compact the segment
+    log once it exceeds compact_segments, so restores replay live
+    documents rather than their whole history.
+    """
+
+    def __init__(self, http_client: HttpClient, feed_url: str, index: Any,
+                 to_record: Callable[[Dict[str, Any], str], Optional[IndexRecord]],
+                 checkpoints: CheckpointStore, segments: Optional[SegmentStore] = None,
+                 feed: str = 'default', extract_content: bool = True,
+                 document_factory: Optional[Callable[[Dict[str, Any]], Any]] = None,
+                 compact_segments: int = DEFAULT_COMPACT_SEGMENTS):
+        """
+        Initialize delta ingestor
+
+        Args:
+            http_client: Pooled client the feed and content are read with
+            feed_url: Initial delta URL, e.g. .../sites/{site-id}/drive/root/delta
+            index: SearchIndex receiving upserts and removals
+            to_record: Builds the index record for a drive item and its text
+            checkpoints: Store for delta links
+            segments: Store for index segments, optional
+            feed: Checkpoint name of this feed
+            extract_content: Download and extract text formats
+            document_factory: Builds the stored document from its JSON data
+            compact_segments: Segments after which a complete sync compacts them
+        """
+        self.http_client = http_client
+        self.feed_url = feed_url
+        self.index = index
+        self.to_record = to_record
+        self.checkpoints = checkpoints
+        self.segments = segments
+        self.feed = feed
+        self.extract_content = extract_content
+        self.document_factory = document_factory
+        self.compact_segments = compact_segments
+        # Documents indexed from this feed, and those upserted since the last resync began
+        self._ids: Set[str] = set()
+        self._seen: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def restore(self) -> int:
+        """
+        Replay persisted segments into the index
+
+        Returns:
+            Number of operations applied
+        """
+        if self.segments is None:
+            return 0
+        count = 0
+        for operation in self.segments.operations():
+            self._apply(operation)
+            count += 1
+        return count
+
+    def sync(self) -> Dict[str, Any]:
+        """
+        Ingest changes since the last checkpoint
+
+        Stops early, keeping its checkpoint, when the request deadline is spent.
+
+        Returns:
+            Counts of pages, upserts, deletes and skipped items
+        """
+        with self._lock:
+            stats = {'pages': 0, 'upserted': 0, 'deleted': 0, 'skipped': 0, 'complete': False}
+            state = self.checkpoints.load(self.feed)
+            url = state.get('next_link') or state.get('delta_link') or self.feed_url
+
+            while url:
+                if deadline_expired():
+                    break
+                try:
+                    page = self.http_client.get(url).json()
+                except HttpStatusError as e:
+                    if e.status_code != 410 or url == self.feed_url:
+                        raise
+                    # The delta token expired; Graph requires a full resync
+                    logger.warning(f"Delta token for {self.feed} expired, resyncing")
+                    self._write([{'op': OP_RESYNC, 'id': self.feed}])
+                    state = {'resync': True}
+                    self.checkpoints.save(self.feed, state)
+                    url = self.feed_url
+                    continue
+
+                self._write(self._operations(page.get('value', []), stats))
+                stats['pages'] += 1
+
+                next_link = page.get('@odata.nextLink')
+                delta_link = page.get('@odata.deltaLink')
+                if next_link:
+                    state = {'next_link': next_link, 'delta_link': state.get('delta_link'),
+                             **({'resync': True} if state.get('resync') else {})}
+                else:
+                    if state.get('resync'):
+                        stats['deleted'] += self._sweep()
+                    state = {'delta_link': delta_link}
+                    stats['complete'] = True
+                self.checkpoints.save(self.feed, state)
+                url = next_link
+
+            if (stats['complete'] and self.segments is not None
+                    and len(self.segments.segments()) > self.compact_segments):
+                self.segments.compact()
+            return stats
+
+    def _write(self, operations: List[Dict[str, Any]]):
+        """Persist operations as a segment, then apply them to the index"""
+        if self.segments is not None:
+            self.segments.write(operations)
+        for operation in operations:
+            self._apply(operation)
+
+    def _sweep(self) -> int:
+        """Delete documents a completed resync did not return; returns how many"""
+        stale = sorted(self._ids - self._seen)
+        self._write([{'op': OP_DELETE, 'id': doc_id} for doc_id in stale])
+        if stale:
+            logger.info(f"Resync of {self.feed} removed {len(stale)} deleted documents")
+        return len(stale)
+
+    def _operations(self, items: List[Dict[str, Any]], stats: Dict[str, Any]) -> List[Dict[str, Any]]:
+        operations = []
+        for item in items:
+            if 'deleted' in item or '@removed' in item:
+                operations.append({'op': OP_DELETE, 'id': item['id']})
+                stats['deleted'] += 1
+                continue
+            if 'file' not in item:
+                stats['skipped'] += 1
+                continue
+            record = self.to_record(item, self._text(item))
+            if record is None:
+                stats['skipped'] += 1
+                continue
+            doc_id, fields, facets, document, acl = record
+            operations.append({'op': OP_UPSERT, 'id': doc_id, 'fields': fields,
+                               'facets': facets, 'document': document,
+                               'acl': None if acl is None else list(acl)})
+            stats['upserted'] += 1
+        return operations
+
+    def _text(self, item: Dict[str, Any]) -> str:
+        mime_type = (item.get('file') or {}).get('mimeType', '')
+        download_url = item.get('@microsoft.graph.downloadUrl')
+        if not self.extract_content or not download_url or not mime_type.startswith(TEXT_CONTENT_TYPES):
+            return ''
+        try:
+            response = self.http_client.get(download_url)
+            return extract_text(response.content, mime_type)
+        except Exception as e:
+            logger.warning(f"Text extraction failed for {item.get('id')}: {e}")
+            return ''
+
+    def _apply(self, operation: Dict[str, Any]):
+        if operation['op'] == OP_RESYNC:
+            self._seen = set()
+        elif operation['op'] == OP_DELETE:
+            self._ids.discard(operation['id'])
+            self._seen.discard(operation['id'])
+            self.index.remove(operation['id'])
+        else:
+            self._ids.add(operation['id'])
+            self._seen.add(operation['id'])
+            document = operation.get('document')
+            if document is not None and self.document_factory is not None:
+                document = self.document_factory(document)
+            self.index.upsert(operation['id'], operation['fields'], operation['facets'], document,
+                              operation.get('acl'))
@@ -0,0 +1,300 @@
+"""
+Knowledge graph module for Microsoft 365 Copilot Plugin
+Typed CSR graph of documents, people, topics and conversations with bounded traversal
+"""
+
+import os
+import struct
+import tempfile
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .deadline import deadline_expired
+
+# Node types
+NODE_DOCUMENT = 1
+NODE_PERSON = 2
+NODE_TOPIC = 3
+NODE_CONVERSATION = 4
+
+NODE_TYPE_NAMES = {
+    NODE_DOCUMENT: 'document',
+    NODE_PERSON: 'person',
+    NODE_TOPIC: 'topic',
+    NODE_CONVERSATION: 'conversation',
+}
+
+# Edge types; every edge is stored in both directions with the same type
+EDGE_AUTHORED = 1       # person - document
+EDGE_ABOUT = 2          # document - topic
+EDGE_EXPERT_IN = 3      # person - topic
+EDGE_DISCUSSES = 4      # conversation - topic
+EDGE_PARTICIPATES = 5   # person - conversation
+
+# Snapshot file layout: magic, then node count, edge count and key bytes
+SNAPSHOT_MAGIC = b'KGCSR001'
+_HEADER = struct.Struct('<8sQQQ')
+
+# Score multiplier per hop beyond the first
+DEFAULT_DECAY = 0.5
+
+# Most nodes one traversal may reach
+DEFAULT_MAX_VISITED = 100_000
+
+
+def _padded(size: int) -> int:
+    return (size + 7) & ~7
+
+
+class KnowledgeGraph:
+    """
+    Immutable typed graph in compressed sparse row (CSR) form
+
+    The neighbours of node n are targets[offsets[n]:offsets[n + 1]], with
+    the edge type of each in the parallel edge_types array, so a graph of
+    any size is four flat arrays. Traversals expand a whole BFS level at a
+    time with array operations and keep a visited mask, so a node is only
+    reached once. Snapshots store the arrays uncompressed and load them
+    memory-mapped, so workers share one copy through the page cache.
+    """
+
+    def __init__(self, node_types: np.ndarray, offsets: np.ndarray, targets: np.ndarray,
+                 edge_types: np.ndarray, keys: Sequence[str]):
+        """
+        Initialize knowledge graph
+
+        Args:
+            node_types: Type per node (uint8)
+            offsets: Start of each node's neighbours, one past the end last (int64)
+            targets: Neighbour node numbers (int32)
+            edge_types: Type per edge (uint8)
+            keys: Key per node, e.g. "document:kb-doc-001"
+        """
+        self.node_types = node_types
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_types = edge_types
+        self.keys = list(keys)
+        self._numbers: Dict[str, int] = {key: number for number, key in enumerate(self.keys)}
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._numbers
+
+    @property
+    def edge_count(self) -> int:
+        """Number of undirected edges"""
+        return len(self.targets) // 2
+
+    def node(self, key: str) -> Optional[int]:
+        """Node number of a key, or None"""
+        return self._numbers.get(key)
+
+    def neighbors(self, key: str, edge_types: Optional[Iterable[int]] = None) -> List[str]:
+        """Keys of the nodes adjacent to key, optionally through some edge types only"""
+        number = self._numbers.get(key)
+        if number is None:
+            return []
+        start, end = self.offsets[number], self.offsets[number + 1]
+        targets = self.targets[start:end]
+        if edge_types is not None:
+            targets = targets[np.isin(self.edge_types[start:end], list(edge_types))]
+        return [self.keys[target] for target in targets]
+
+    def related(self, start_keys: Iterable[str], node_type: Optional[int] = None, max_depth: int = 2,
+                edge_types: Optional[Iterable[int]] = None, limit: int = 10,
+                decay: float = DEFAULT_DECAY,
+                max_visited: int = DEFAULT_MAX_VISITED) -> List[Tuple[str, float]]:
+        """
+        Nodes within max_depth hops of the start nodes, ranked by connection strength
+
+        A node's score is the number of shortest paths reaching it, each
+        weighted decay ** (depth - 1), so nodes linked through several
+        documents or topics outrank nodes linked once. The traversal stops
+        at max_depth, after max_visited nodes or when the request deadline
+        is spent.
+
+        Args:
+            start_keys: Keys the traversal starts from; unknown keys are ignored
+            node_type: Only return nodes of this type
+            max_depth: Largest number of hops
+            edge_types: Only follow edges of these types
+            limit: Number of nodes returned
+            decay: Score multiplier per additional hop
+            max_visited: Bound on the nodes reached
+
+        Returns:
+            (key, score) pairs, best first, excluding the start nodes
+        """
+        sources = np.array(sorted({self._numbers[key] for key in start_keys if key in self._numbers}),
+                           dtype=np.int64)
+        if not len(sources) or limit <= 0:
+            return []
+
+        edge_mask = None
+        if edge_types is not None:
+            edge_mask = np.zeros(256, dtype=bool)
+            edge_mask[list(edge_types)] = True
+
+        visited = np.zeros(len(self.keys), dtype=bool)
+        visited[sources] = True
+        frontier, weights = sources, np.ones(len(sources))
+        reached: List[np.ndarray] = []
+        scores: List[np.ndarray] = []
+        visited_count = len(sources)
+
+        for depth in range(1, max_depth + 1):
+            if deadline_expired() or visited_count >= max_visited:
+                break
+            starts = self.offsets[frontier]
+            counts = self.offsets[frontier + 1] - starts
+            total = int(counts.sum())
+            if not total:
+                break
+            # Edge positions of every frontier node's neighbour range, concatenated
+            edges = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+            targets = self.targets[edges]
+            path_weights = np.repeat(weights, counts)
+            keep = ~visited[targets]
+            if edge_mask is not None:
+                keep &= edge_mask[self.edge_types[edges]]
+            targets, path_weights = targets[keep], path_weights[keep]
+            if not len(targets):
+                break
+
+            frontier, inverse = np.unique(targets, return_inverse=True)
+            weights = np.bincount(inverse, weights=path_weights)
+            if visited_count + len(frontier) > max_visited:
+                frontier, weights = frontier[:max_visited - visited_count], weights[:max_visited - visited_count]
+            visited[frontier] = True
+            visited_count += len(frontier)
+            reached.append(frontier)
+            scores.append(weights * decay ** (depth - 1))
+
+        if not reached:
+            return []
+        nodes = np.concatenate(reached)
+        node_scores = np.concatenate(scores)
+        if node_type is not None:
+            keep = self.node_types[nodes] == node_type
+            nodes, node_scores = nodes[keep], node_scores[keep]
+        top = min(limit, len(nodes))
+        if not top:
+            return []
+        best = np.argpartition(-node_scores, top - 1)[:top]
+        best = best[np.lexsort((nodes[best], -node_scores[best]))]
+        return [(self.keys[nodes[position]], float(node_scores[position])) for position in best]
+
+    def save(self, path: Union[str, Path]):
+        """
+        Write a memory-mappable snapshot
+
+        The file is written next to the target and renamed over it, so a
+        reader never sees a partial snapshot.
+        """
+        path = Path(path)
+        keys = '\n'.join(self.keys).encode('utf-8')
+        sections = [
+            np.ascontiguousarray(self.node_types, dtype=np.uint8),
+            np.ascontiguousarray(self.offsets, dtype=np.int64),
+            np.ascontiguousarray(self.targets, dtype=np.int32),
+            np.ascontiguousarray(self.edge_types, dtype=np.uint8),
+        ]
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(_HEADER.pack(SNAPSHOT_MAGIC, len(self.keys), len(self.targets), len(keys)))
+            for section in sections:
+                data = section.tobytes()
+                handle.write(data + bytes(_padded(len(data)) - len(data)))
+            handle.write(keys)
+        os.replace(temp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[str, Path], mmap: bool = True) -> 'KnowledgeGraph':
+        """
+        Load a snapshot written by save()
+
+        Args:
+            path: Snapshot file
+            mmap: Map the arrays read-only instead of reading them into memory
+
+        Raises:
+            ValueError: If the file is not a knowledge graph snapshot
+        """
+        with open(path, 'rb') as handle:
+            magic, nodes, edges, key_bytes = _HEADER.unpack(handle.read(_HEADER.size))
+            if magic != SNAPSHOT_MAGIC:
+                raise ValueError(f"{path} is not a knowledge graph snapshot")
+
+            arrays = []
+            position = _HEADER.size
+            for dtype, count in ((np.uint8, nodes), (np.int64, nodes + 1), (np.int32, edges), (np.uint8, edges)):
+                if mmap and count:
+                    arrays.append(np.memmap(path, dtype=dtype, mode='r', offset=position, shape=(count,)))
+                else:
+                    handle.seek(position)
+                    arrays.append(np.frombuffer(handle.read(count * np.dtype(dtype).itemsize), dtype=dtype))
+                position += _padded(count * np.dtype(dtype).itemsize)
+
+            handle.seek(position)
+            data = handle.read(key_bytes).decode('utf-8')
+        keys = data.split('\n') if nodes else []
+        return cls(*arrays, keys)
+
+
+class KnowledgeGraphBuilder:
+    """
+    Collects nodes and edges and packs them into a KnowledgeGraph
+
+    Nodes are identified by key; adding a known key returns its number.
+    Duplicate edges are dropped when the graph is built.
+    """
+
+    def __init__(self):
+        self._numbers: Dict[str, int] = {}
+        self._keys: List[str] = []
+        self._types: List[int] = []
+        self._sources: List[int] = []
+        self._targets: List[int] = []
+        self._edge_types: List[int] = []
+
+    def add_node(self, key: str, node_type: int) -> int:
+        """Add a node, returning its number"""
+        number = self._numbers.get(key)
+        if number is None:
+            number = self._numbers[key] = len(self._keys)
+            self._keys.append(key)
+            self._types.append(node_type)
+        return number
+
+    def add_edge(self, source: str, target: str, edge_type: int):
+        """Link two added nodes in both directions"""
+        first, second = self._numbers[source], self._numbers[target]
+        if first == second:
+            return
+        self._sources += (first, second)
+        self._targets += (second, first)
+        self._edge_types += (edge_type, edge_type)
+
+    def build(self) -> KnowledgeGraph:
+        """Pack the collected nodes and edges into CSR arrays"""
+        count = len(self._keys)
+        sources = np.array(self._sources, dtype=np.int64)
+        targets = np.array(self._targets, dtype=np.int64)
+        edge_types = np.array(self._edge_types, dtype=np.int64)
+        if len(sources):
+            # Sort by source and target, dropping duplicate edges
+            packed = np.unique((sources * (count + 1) + targets) * 256 + edge_types)
+            sources = packed // 256 // (count + 1)
+            targets = packed // 256 % (count + 1)
+            edge_types = packed % 256
+        offsets = np.zeros(count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=count), out=offsets[1:])
+        return KnowledgeGraph(
+            np.array(self._types, dtype=np.uint8), offsets,
+            targets.astype(np.int32), edge_types.astype(np.uint8), self._keys
+        )
@@ -3,6 +3,8 @@ Main Azure Functions application for Microsoft 365 Copilot Plugin
 Implements declarative plugin endpoints with telemetry and security best practices
 """
 
+import asyncio
+import itertools
 import json
 import logging
 import os
@@ -15,7 +17,19 @@ from azure.identity import DefaultAzureCredential, ManagedIdentityCredential
 from azure.keyvault.secrets import SecretClient
 
 # Import telemetry module
+from .cache import CachedSecretClient, TieredCache, TTLCache, create_shared_store
+from .deadline import remaining
+from .health import STATUS_DEGRADED, STATUS_DOWN, STATUS_NOT_CONFIGURED, STATUS_UP, HealthMonitor, http_probe
+from .http_client import HttpClient
+from .openapi import get_openapi_spec
+from .plugin_host import PluginHost
+from .request_body import (
+    DEFAULT_MAX_BODY_BYTES, CompiledSchema, RequestBodyTooLarge,
+    load_request_schema, read_json_body
+)
+from .resilience import get_resilience_registry
 from .telemetry import get_telemetry_manager, track_function
+from .validation import RequestContext, sanitize_text
 
 # Initialize the Azure Functions app
 app = func.FunctionApp()
@@ -23,6 +37,10 @@ app = func.FunctionApp()
 # Global telemetry manager
 telemetry = get_telemetry_manager()
 
+# Bulkheads and circuit breakers for downstream dependencies
+resilience = get_resilience_registry()
+resilience.telemetry = telemetry
+
 # Configuration
 class Config:
     """Application configuration with Azure best practices"""
@@ -33,6 +51,7 @@ class Config:
         
         # Azure Key Vault configuration
         self.key_vault_url = os.getenv('KEY_VAULT_URL')
+        self.credential = None
         self.secret_client = None
         
         # Authentication
@@ -43,9 +62,36 @@ class Config:
         self.rate_limit_per_minute = int(os.getenv('RATE_LIMIT_PER_MINUTE', '100'))
         self.burst_limit = int(os.getenv('BURST_LIMIT', '20'))
         
+        # Request body limits
+        self.max_request_body_bytes = int(os.getenv('MAX_REQUEST_BODY_BYTES', str(DEFAULT_MAX_BODY_BYTES)))
+        
+        # Health probes
+        self.health_probe_interval = float(os.getenv('HEALTH_PROBE_INTERVAL_SECONDS', '30'))
+        self.health_probe_timeout = float(os.getenv('HEALTH_PROBE_TIMEOUT_SECONDS', '5'))
+        self.health_telemetry_sample_every = max(int(os.getenv('HEALTH_TELEMETRY_SAMPLE_EVERY', '100')), 1)
+        
+        # Cache shared by the host and all plugins
+        self.cache = TTLCache(
+            ttl=float(os.getenv('SECRET_CACHE_TTL_SECONDS', '300')),
+            maxsize=int(os.getenv('CACHE_MAX_ENTRIES', '1024'))
+        )
+        
+        # Plugin response cache: in-process L1 with an optional shared L2
+        self.response_cache = TieredCache(
+            l1=TTLCache(maxsize=int(os.getenv('CACHE_MAX_ENTRIES', '1024'))),
+            l2=create_shared_store(os.getenv('RESPONSE_CACHE_URL'))
+        )
+        
         # Initialize Key Vault client with managed identity
         self._initialize_key_vault()
     
+    def get_credential(self) -> DefaultAzureCredential:
+        """Get the Azure credential shared by the host and all plugins"""
+        if self.credential is None:
+            # Use managed identity in Azure, default credential locally
+            self.credential = DefaultAzureCredential()
+        return self.credential
+    
     def _initialize_key_vault(self):
         """Initialize Key Vault client using managed identity"""
         if not self.key_vault_url:
@@ -53,11 +99,12 @@ class Config:
             return
         
         try:
-            # Use managed identity in Azure, default credential locally
-            credential = DefaultAzureCredential()
-            self.secret_client = SecretClient(
-                vault_url=self.key_vault_url,
-                credential=credential
+            # Secret lookups are cached for all plugins sharing this client;
+            # misses go through the Key Vault bulkhead and circuit breaker
+            self.secret_client = CachedSecretClient(
+                SecretClient(vault_url=self.key_vault_url, credential=self.get_credential()),
+                self.cache,
+                guard=resilience.get('key_vault').call
             )
             telemetry.logger.info("Key Vault client initialized successfully")
         except Exception as e:
@@ -70,7 +117,10 @@ class Config:
             return os.getenv(secret_name.upper())
         
         try:
-            secret = self.secret_client.get_secret(secret_name)
+            # Cap the Key Vault call at the time left on the request deadline
+            left = remaining()
+            kwargs = {} if left is None else {'timeout': left}
+            secret = self.secret_client.get_secret(secret_name, **kwargs)
             return secret.value
         except Exception as e:
             telemetry.track_exception(e, {
@@ -83,6 +133,69 @@ class Config:
 # Global configuration
 config = Config()
 
+# Plugin API definition used to compile request schemas
+PLUGIN_SPEC_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'plugins', 'openapi.yaml')
+
+def _compile_request_schema(operation_id: str) -> Optional[CompiledSchema]:
+    """Compile a request schema once at startup, falling back to handler checks"""
+    try:
+        return load_request_schema(PLUGIN_SPEC_PATH, operation_id)
+    except Exception as e:
+        telemetry.logger.warning(f"Request schema for {operation_id} not available: {e}")
+        return None
+
+ANALYZE_REQUEST_SCHEMA = _compile_request_schema('analyzeContent')
+
+# Dependency health probes
+def _probe_key_vault():
+    """Probe Key Vault by listing a single secret property page"""
+    if not config.secret_client:
+        return STATUS_NOT_CONFIGURED
+    next(iter(config.secret_client.list_properties_of_secrets(max_page_size=1)), None)
+    return STATUS_UP
+
+def _probe_telemetry():
+    """Probe the telemetry exporter queue"""
+    queue = telemetry.queue_status()
+    if queue is None:
+        return STATUS_DOWN
+    status = STATUS_DEGRADED if queue['depth'] >= queue['capacity'] * 0.8 else STATUS_UP
+    return status, queue
+
+def _probe_circuits():
+    """Report circuit breaker state and export it to telemetry"""
+    circuits = resilience.export()
+    if any(stats['state'] != 'closed' for stats in circuits.values()):
+        return STATUS_DEGRADED, circuits
+    return STATUS_UP, circuits
+
+health_monitor = HealthMonitor(
+    interval=config.health_probe_interval,
+    timeout=config.health_probe_timeout
+)
+health_monitor.register('telemetry', _probe_telemetry)
+health_monitor.register('key_vault', _probe_key_vault)
+health_monitor.register('search_index', http_probe(os.getenv('SEARCH_HEALTH_URL'), config.health_probe_timeout))
+health_monitor.register('graph', http_probe(os.getenv('GRAPH_HEALTH_URL'), config.health_probe_timeout))
+health_monitor.register('circuits', _probe_circuits)
+
+_health_request_counter = itertools.count()
+
+# Pooled client for downstream HTTP calls, injected into plugins that accept it
+http_client = HttpClient(credential=config.get_credential(), telemetry=telemetry, resilience=resilience)
+
+# Plugin modules served from this app with shared telemetry, clients and cache
+plugin_host = PluginHost(
+    telemetry=telemetry,
+    credential=config.get_credential(),
+    secret_client=config.secret_client,
+    cache=config.cache,
+    response_cache=config.response_cache,
+    resilience=resilience,
+    http_client=http_client
+)
+plugin_host.discover()
+
 # Request validation and security
 class SecurityMiddleware:
     """Security middleware for request validation and authentication"""
@@ -117,17 +230,12 @@ class SecurityMiddleware:
         """Validate request body size"""
         content_length = req.headers.get('Content-Length')
         if content_length and int(content_length) > max_size:
-            raise ValueError(f"Request body too large. Maximum size: {max_size} bytes")
+            raise RequestBodyTooLarge(max_size)
     
     @staticmethod
     def sanitize_input(data: str, max_length: int = 10000) -> str:
         """Basic input sanitization"""
-        if len(data) > max_length:
-            raise ValueError(f"Input too long. Maximum length: {max_length}")
-        
-        # Remove potentially dangerous characters
-        sanitized = data.replace('<', '&lt;').replace('>', '&gt;')
-        return sanitized.strip()
+        return sanitize_text(data, max_length=max_length).value
 
 # Business logic services
 class SearchService:
@@ -135,7 +243,7 @@ class SearchService:
     
     @staticmethod
     @track_function(telemetry, "search_data")
-    def search_data(query: str, limit: int = 10, category: Optional[str] = None) -> Dict[str, Any]:
+    async def search_data(query: str, limit: int = 10, category: Optional[str] = None) -> Dict[str, Any]:
         """
         Search for data based on query
         In production, this would integrate with actual data sources
@@ -199,7 +307,7 @@ class AnalysisService:
     
     @staticmethod
     @track_function(telemetry, "analyze_content")
-    def analyze_content(content: str, analysis_type: str, options: Optional[Dict] = None) -> Dict[str, Any]:
+    async def analyze_content(content: str, analysis_type: str, options: Optional[Dict] = None) -> Dict[str, Any]:
         """
         Analyze content based on type
         In production, this would use actual ML/AI services
@@ -273,14 +381,15 @@ class AnalysisService:
 # Azure Functions endpoints
 @app.route(route="search", auth_level=func.AuthLevel.FUNCTION, methods=["GET"])
 @track_function(telemetry, "api_search")
-def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+async def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Search endpoint for the Copilot plugin"""
     
     correlation_context = telemetry.create_correlation_context()
+    context = RequestContext(correlation=correlation_context)
     
     try:
         # Security validation
-        user_context = SecurityMiddleware.validate_bearer_token(req)
+        context.user = SecurityMiddleware.validate_bearer_token(req)
         
         # Extract and validate parameters
         query = req.params.get('query')
@@ -288,7 +397,7 @@ def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             raise ValueError("Query parameter is required")
         
         # Sanitize input
-        query = SecurityMiddleware.sanitize_input(query, max_length=500)
+        query = context.sanitize('query', query, max_length=500).value
         
         limit = min(int(req.params.get('limit', '10')), 100)
         category = req.params.get('category')
@@ -300,7 +409,7 @@ def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         start_time = time.time()
         
         # Perform search
-        search_results = SearchService.search_data(query, limit, category)
+        search_results = await SearchService.search_data(query, limit, category)
         
         # Track successful request
         duration_ms = (time.time() - start_time) * 1000
@@ -310,12 +419,9 @@ def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             success=True,
             duration_ms=duration_ms,
             response_code=200,
-            properties={
-                **correlation_context,
-                'user_id': user_context.get('user_id'),
-                'query_length': len(query),
-                'result_count': len(search_results['results'])
-            }
+            properties=context.telemetry_properties(
+                result_count=len(search_results['results'])
+            )
         )
         
         return func.HttpResponse(
@@ -371,21 +477,22 @@ def search_endpoint(req: func.HttpRequest) -> func.HttpResponse:
 
 @app.route(route="analyze", auth_level=func.AuthLevel.FUNCTION, methods=["POST"])
 @track_function(telemetry, "api_analyze")
-def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+async def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Content analysis endpoint for the Copilot plugin"""
     
     correlation_context = telemetry.create_correlation_context()
+    context = RequestContext(correlation=correlation_context)
     
     try:
         # Security validation
-        user_context = SecurityMiddleware.validate_bearer_token(req)
-        SecurityMiddleware.validate_request_size(req)
+        context.user = SecurityMiddleware.validate_bearer_token(req)
         
-        # Parse request body
-        try:
-            request_data = req.get_json()
-        except ValueError:
-            raise ValueError("Invalid JSON in request body")
+        # Read and parse the request body, rejecting at the first invalid field
+        request_data = read_json_body(
+            req,
+            ANALYZE_REQUEST_SCHEMA,
+            max_bytes=config.max_request_body_bytes
+        )
         
         if not request_data:
             raise ValueError("Request body is required")
@@ -400,7 +507,7 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             raise ValueError("Invalid analysisType. Must be one of: sentiment, keywords, summary, insights")
         
         # Sanitize content
-        content = SecurityMiddleware.sanitize_input(content)
+        content = context.sanitize('content', content).value
         
         options = request_data.get('options', {})
         
@@ -408,7 +515,7 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         start_time = time.time()
         
         # Perform analysis
-        analysis_results = AnalysisService.analyze_content(content, analysis_type, options)
+        analysis_results = await AnalysisService.analyze_content(content, analysis_type, options)
         
         # Track successful request
         duration_ms = (time.time() - start_time) * 1000
@@ -418,12 +525,9 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             success=True,
             duration_ms=duration_ms,
             response_code=200,
-            properties={
-                **correlation_context,
-                'user_id': user_context.get('user_id'),
-                'analysis_type': analysis_type,
-                'content_length': len(content)
-            }
+            properties=context.telemetry_properties(
+                analysis_type=analysis_type
+            )
         )
         
         return func.HttpResponse(
@@ -436,6 +540,7 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         )
         
     except ValueError as e:
+        status_code = getattr(e, 'status_code', 400)
         error_response = {
             'error': 'validation_error',
             'message': str(e),
@@ -448,13 +553,13 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             url=req.url,
             success=False,
             duration_ms=(time.time() - start_time) * 1000 if 'start_time' in locals() else 0,
-            response_code=400,
+            response_code=status_code,
             properties={**correlation_context, 'error': str(e)}
         )
         
         return func.HttpResponse(
             json.dumps(error_response),
-            status_code=400,
+            status_code=status_code,
             headers={'Content-Type': 'application/json'}
         )
         
@@ -478,60 +583,45 @@ def analyze_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 @app.route(route="health", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET"])
-@track_function(telemetry, "api_health")
-def health_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+async def health_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Health check endpoint"""
     
-    correlation_context = telemetry.create_correlation_context()
-    
     try:
-        # Check application health
-        health_status = {
-            'status': 'healthy',
-            'timestamp': datetime.utcnow().isoformat(),
-            'version': '1.0.0',
-            'dependencies': {
-                'telemetry': 'up' if telemetry.client else 'down',
-                'key_vault': 'up' if config.secret_client else 'unknown'
-            }
-        }
-        
-        # Determine overall health
-        if health_status['dependencies']['telemetry'] == 'down':
-            health_status['status'] = 'degraded'
-        
+        # Serve the snapshot maintained by the background probes
+        health_status = health_monitor.snapshot()
         status_code = 200 if health_status['status'] in ['healthy', 'degraded'] else 503
         
-        # Track health check
-        telemetry.track_request(
-            name="health",
-            url=req.url,
-            success=status_code == 200,
-            duration_ms=0,  # Health checks should be fast
-            response_code=status_code,
-            properties=correlation_context
-        )
+        # Health checks are polled continuously; only failures and a sample are tracked
+        probe_count = next(_health_request_counter)
+        if status_code != 200 or probe_count % config.health_telemetry_sample_every == 0:
+            telemetry.track_request(
+                name="health",
+                url=req.url,
+                success=status_code == 200,
+                duration_ms=0,
+                response_code=status_code,
+                properties={
+                    'status': health_status['status'],
+                    'sampled_every': config.health_telemetry_sample_every
+                }
+            )
         
         return func.HttpResponse(
             json.dumps(health_status, default=str),
             status_code=status_code,
             headers={
                 'Content-Type': 'application/json',
-                'X-Request-ID': correlation_context['request_id']
+                'Cache-Control': 'no-store'
             }
         )
         
     except Exception as e:
-        telemetry.track_exception(e, {
-            **correlation_context,
-            'endpoint': 'health'
-        })
+        telemetry.track_exception(e, {'endpoint': 'health'})
         
         error_response = {
             'status': 'unhealthy',
             'timestamp': datetime.utcnow().isoformat(),
-            'error': str(e),
-            'request_id': correlation_context['request_id']
+            'error': str(e)
         }
         
         return func.HttpResponse(
@@ -541,18 +631,21 @@ def health_endpoint(req: func.HttpRequest) -> func.HttpResponse:
         )
 
 @app.route(route="openapi", auth_level=func.AuthLevel.ANONYMOUS, methods=["GET"])
-def openapi_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+async def openapi_endpoint(req: func.HttpRequest) -> func.HttpResponse:
     """Serve OpenAPI specification"""
     
     try:
-        # In production, serve the actual OpenAPI spec from a file or CDN
-        openapi_url = "https://raw.githubusercontent.com/your-org/copilot-plugin/main/plugins/openapi.yaml"
+        # The spec is assembled and compressed once; requests only pick a representation
+        spec = get_openapi_spec(plugin_host.plugins)
+        status_code, body, headers = spec.response(
+            req.headers.get('Accept-Encoding'),
+            req.headers.get('If-None-Match')
+        )
         
-        # For now, return a redirect or the spec content
         return func.HttpResponse(
-            f"OpenAPI specification available at: {openapi_url}",
-            status_code=200,
-            headers={'Content-Type': 'text/plain'}
+            body,
+            status_code=status_code,
+            headers=headers
         )
         
     except Exception as e:
@@ -562,3 +655,78 @@ def openapi_endpoint(req: func.HttpRequest) -> func.HttpResponse:
             status_code=500,
             headers={'Content-Type': 'text/plain'}
         )
+
+@app.route(route="plugins/{plugin}/{operation?}", auth_level=func.AuthLevel.FUNCTION, methods=["GET", "POST"])
+async def plugin_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+    """Serve plugin module operations mounted on the host"""
+    return await plugin_host.handle(req.route_params.get('plugin', '').lower(), req)
+
+@app.timer_trigger(schedule=os.getenv('KNOWLEDGE_SYNC_SCHEDULE', '0 */5 * * * *'), arg_name="timer",
+                   run_on_startup=False, use_monitor=False)
+async def knowledge_sync_timer(timer: func.TimerRequest) -> None:
+    """Keep the knowledge index current from the SharePoint delta feed"""
+    runtime = plugin_host.plugins.get('enterpriseknowledgehub')
+    if runtime is None or getattr(runtime.service, 'ingestor', None) is None:
+        return
+    
+    loop = asyncio.get_running_loop()
+    _, result = await loop.run_in_executor(None, runtime.execute, 'sync_knowledge_index', {})
+    
+    sync = result.get('sync', {})
+    telemetry.track_event('knowledge_index_synced', properties={
+        'success': result.get('success', False),
+        'complete': sync.get('complete', False),
+        'error': result.get('error')
+    }, measurements={
+        'pages': sync.get('pages', 0),
+        'upserted': sync.get('upserted', 0),
+        'deleted': sync.get('deleted', 0),
+        'documents_indexed': result.get('documents_indexed', 0),
+        'duration_ms': result.get('processing_time_ms', 0)
+    })
+
+@app.timer_trigger(schedule=os.getenv('EXPERT_PRESENCE_SCHEDULE', '0 */2 * * * *'), arg_name="timer",
+                   run_on_startup=False, use_monitor=False)
+async def expert_presence_timer(timer: func.TimerRequest) -> None:
+    """Refresh the expert availability filter from Teams presence"""
+    runtime = plugin_host.plugins.get('enterpriseknowledgehub')
+    if runtime is None or not getattr(runtime.service, 'graph_enabled', False):
+        return
+    
+    loop = asyncio.get_running_loop()
+    _, result = await loop.run_in_executor(None, runtime.execute, 'refresh_expert_availability', {})
+    
+    telemetry.track_event('expert_presence_refreshed', properties={
+        'success': result.get('success', False),
+        'error': result.get('error')
+    }, measurements={
+        'experts_refreshed': result.get('experts_refreshed', 0),
+        'status_changes': result.get('status_changes', 0),
+        'duration_ms': result.get('processing_time_ms', 0)
+    })
+
+@app.route(route="cache/plugins/{plugin?}", auth_level=func.AuthLevel.ADMIN, methods=["DELETE"])
+async def purge_plugin_cache_endpoint(req: func.HttpRequest) -> func.HttpResponse:
+    """Purge cached plugin responses by plugin, operation and tenant"""
+    
+    plugin = (req.route_params.get('plugin') or '').lower() or None
+    try:
+        purged = plugin_host.purge(plugin, req.params.get('operation'), req.params.get('tenant'))
+    except KeyError:
+        return func.HttpResponse(
+            json.dumps({'error': f"Unknown plugin: {plugin}"}),
+            status_code=404,
+            headers={'Content-Type': 'application/json'}
+        )
+    
+    telemetry.track_event('plugin_cache_purged', properties={
+        'plugin': plugin or 'all',
+        'operation': req.params.get('operation') or 'all',
+        'tenant_scoped': bool(req.params.get('tenant'))
+    }, measurements={'purged': purged})
+    
+    return func.HttpResponse(
+        json.dumps({'purged': purged}),
+        status_code=200,
+        headers={'Content-Type': 'application/json'}
+    )
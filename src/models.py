@@ -0,0 +1,189 @@
+"""
+Models module for Microsoft 365 Copilot Plugin
+Slotted and columnar result models with a direct JSON encoder
+"""
+
+import json
+from dataclasses import dataclass, fields
+from json.encoder import encode_basestring_ascii
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+# Strict C encoder used for model-free values; raises TypeError on models
+_encode_strict = json.JSONEncoder(separators=(',', ':'), check_circular=False).encode
+
+# Lenient C encoder for leaf values the JSON module cannot encode natively
+_encode_leaf = json.JSONEncoder(separators=(',', ':'), default=str).encode
+
+
+class JsonModel:
+    """
+    Base for compact result models
+
+    Subclasses are declared with @json_model and get slotted instances, a
+    precompiled field plan for dumps() and read-only mapping access
+    (model['field'], model.get('field')) for callers written against the
+    dictionaries asdict() used to produce.
+    """
+
+    __slots__ = ()
+    __json_fields__: Tuple[str, ...] = ()
+    __json_keys__: Tuple[str, ...] = ()
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__json_fields__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return getattr(self, key) if key in self.__json_fields__ else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__json_fields__
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Shallow dictionary of the model fields; values are not copied"""
+        return {name: getattr(self, name) for name in self.__json_fields__}
+
+
+def _compile_keys(names: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Encoded '{"name":' / ',"name":' prefixes written before each field value"""
+    return tuple(('{' if i == 0 else ',') + encode_basestring_ascii(name) + ':'
+                 for i, name in enumerate(names))
+
+
+def json_model(cls: Optional[type] = None, **dataclass_options) -> Any:
+    """
+    Declare a slotted result model
+
+    Works like @dataclass, including defaults, field(default_factory=...)
+    and __post_init__, but instances use __slots__ and the class carries the
+    field plan used by dumps(). The class must derive from JsonModel.
+
+    Usage:
+        @json_model
+        class ExpertProfile(JsonModel):
+            user_id: str
+            display_name: str
+    """
+    def wrap(klass: type) -> type:
+        if not issubclass(klass, JsonModel):
+            raise TypeError(f"{klass.__name__} must derive from JsonModel")
+        model = dataclass(klass, slots=True, **dataclass_options)
+        model.__json_fields__ = tuple(f.name for f in fields(model))
+        model.__json_keys__ = _compile_keys(model.__json_fields__)
+        return model
+
+    return wrap if cls is None else wrap(cls)
+
+
+class ModelColumns:
+    """
+    Columnar storage for large result sets of one model type
+
+    Each field is held in its own list, so a row costs one list slot per
+    field instead of an object. Rows materialize as model instances only
+    when indexed or iterated; dumps() writes rows straight from the columns.
+    """
+
+    __slots__ = ('model', 'columns')
+
+    def __init__(self, model: Type[JsonModel]):
+        self.model = model
+        self.columns: Tuple[List[Any], ...] = tuple([] for _ in model.__json_fields__)
+
+    def append(self, *values: Any):
+        """Append a row given field values in declaration order"""
+        if len(values) != len(self.columns):
+            raise ValueError(f"{self.model.__name__} row requires {len(self.columns)} values")
+        for column, value in zip(self.columns, values):
+            column.append(value)
+
+    def append_model(self, item: JsonModel):
+        """Append a row from a model instance"""
+        for column, name in zip(self.columns, self.model.__json_fields__):
+            column.append(getattr(item, name))
+
+    def column(self, name: str) -> List[Any]:
+        """Values of one field across all rows"""
+        return self.columns[self.model.__json_fields__.index(name)]
+
+    def __len__(self) -> int:
+        return len(self.columns[0]) if self.columns else 0
+
+    def __getitem__(self, index: int) -> JsonModel:
+        return self.model(*(column[index] for column in self.columns))
+
+    def __iter__(self) -> Iterator[JsonModel]:
+        for row in zip(*self.columns):
+            yield self.model(*row)
+
+
+def _key(key: Any) -> str:
+    if type(key) is str:
+        return encode_basestring_ascii(key)
+    if key is True or key is False or key is None:
+        return '"' + json.dumps(key) + '"'
+    return encode_basestring_ascii(str(key))
+
+
+def _write(value: Any, out: Callable[[str], None]):
+    kind = type(value)
+    if kind is str:
+        out(encode_basestring_ascii(value))
+    elif isinstance(value, JsonModel):
+        names = kind.__json_fields__
+        if not names:
+            out('{}')
+            return
+        for prefix, name in zip(kind.__json_keys__, names):
+            out(prefix)
+            _write(getattr(value, name), out)
+        out('}')
+    elif kind is dict or kind is list or kind is tuple:
+        # Model-free containers are encoded in one C call
+        try:
+            out(_encode_strict(value))
+            return
+        except TypeError:
+            pass
+        if kind is dict:
+            out('{')
+            first = True
+            for key, item in value.items():
+                out(_key(key) + ':' if first else ',' + _key(key) + ':')
+                first = False
+                _write(item, out)
+            out('}')
+        else:
+            out('[')
+            for i, item in enumerate(value):
+                if i:
+                    out(',')
+                _write(item, out)
+            out(']')
+    elif kind is ModelColumns:
+        out('[')
+        keys = value.model.__json_keys__
+        for i, row in enumerate(zip(*value.columns)):
+            if i:
+                out(',')
+            for prefix, item in zip(keys, row):
+                out(prefix)
+                _write(item, out)
+            out('}')
+        out(']')
+    else:
+        out(_encode_leaf(value))
+
+
+def dumps(value: Any) -> str:
+    """
+    Serialize a value to compact JSON
+
+    Models and columnar result sets are written field by field without
+    building intermediate dictionaries; containers without models are
+    handed to the C encoder whole. Unsupported leaf values fall back to str().
+    """
+    chunks: List[str] = []
+    _write(value, chunks.append)
+    return ''.join(chunks)
@@ -0,0 +1,391 @@
+"""
+OpenAPI module for Microsoft 365 Copilot Plugin
+Assembles the plugin OpenAPI document once and serves pre-encoded representations
+"""
+
+import copy
+import glob
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import zlib
+from functools import lru_cache
+from typing import Any, Dict, List, Mapping, Optional, Tuple
+
+from .plugin_host import PluginHost, discover_plugin_modules, load_plugin_runtime
+from .plugin_runtime import PluginRuntime
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+logger = logging.getLogger('copilot_plugin')
+
+# Repository root containing plugins/ and the *-module directories
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Base API definition and manifests
+OPENAPI_SPEC_PATH = os.path.join(PROJECT_ROOT, 'plugins', 'openapi.yaml')
+PLUGIN_MANIFEST_PATHS = [os.path.join(PROJECT_ROOT, 'plugins', 'plugin_manifest.json')]
+
+# Connector definitions mounted under the root API base path are already
+# described by the base definition
+ROOT_BASE_PATH = '/api'
+
+# Route the plugin host serves plugin operations under
+PLUGIN_ROUTE = '/api/plugins/{plugin}/{operation}'
+
+# Schema keywords holding a nested schema, and those holding a list of schemas
+_NESTED_SCHEMA_KEYWORDS = ('items', 'additionalProperties', 'not')
+_SCHEMA_LIST_KEYWORDS = ('allOf', 'anyOf', 'oneOf')
+
+# Supported content codings in server preference order
+_PREFERRED_ENCODINGS = ('br', 'gzip', 'deflate')
+
+
+def _load_document(path: str) -> Dict[str, Any]:
+    """Load a JSON or YAML document"""
+    with open(path, 'r', encoding='utf-8') as handle:
+        if path.endswith(('.yaml', '.yml')):
+            import yaml
+            return yaml.safe_load(handle)
+        return json.load(handle)
+
+
+def _rewrite_refs(node: Any, prefix: str) -> Any:
+    """Rewrite Swagger 2.0 definition references to prefixed OpenAPI 3 component references"""
+    if isinstance(node, dict):
+        rewritten = {}
+        for key, value in node.items():
+            if key == '$ref' and isinstance(value, str) and value.startswith('#/definitions/'):
+                rewritten[key] = f"#/components/schemas/{prefix}{value[len('#/definitions/'):]}"
+            else:
+                rewritten[key] = _rewrite_refs(value, prefix)
+        return rewritten
+    if isinstance(node, list):
+        return [_rewrite_refs(item, prefix) for item in node]
+    return node
+
+
+def _clean_schema(schema: Any, location: str) -> Optional[Dict[str, Any]]:
+    """
+    Validate a connector schema and drop nested values that are not schemas
+
+    Exported connector definitions can carry placeholders such as
+    "System.Collections.Hashtable" where a schema object belongs. Invalid
+    property and item schemas are logged and left unconstrained, invalid
+    entries of schema lists are dropped.
+
+    Returns:
+        Cleaned schema, or None if the value itself is not a schema object
+    """
+    if not isinstance(schema, dict):
+        logger.warning(f"Skipping invalid OpenAPI schema at {location}: {schema!r}")
+        return None
+
+    cleaned = dict(schema)
+    if 'properties' in schema:
+        properties = schema['properties'] if isinstance(schema['properties'], dict) else {}
+        cleaned['properties'] = {
+            name: _clean_schema(value, f"{location}.{name}") or {}
+            for name, value in properties.items()
+        }
+    for keyword in _NESTED_SCHEMA_KEYWORDS:
+        value = schema.get(keyword)
+        if value is None or (keyword == 'additionalProperties' and isinstance(value, bool)):
+            continue
+        nested = _clean_schema(value, f"{location}.{keyword}")
+        if nested is not None:
+            cleaned[keyword] = nested
+        elif keyword == 'not':
+            del cleaned[keyword]
+        else:
+            cleaned[keyword] = {}
+    for keyword in _SCHEMA_LIST_KEYWORDS:
+        if keyword in schema:
+            values = schema[keyword] if isinstance(schema[keyword], list) else []
+            nested = (_clean_schema(value, f"{location}.{keyword}[{index}]") for index, value in enumerate(values))
+            cleaned[keyword] = [value for value in nested if value is not None]
+    return cleaned
+
+
+def _convert_operation(operation: Dict[str, Any], prefix: str) -> Dict[str, Any]:
+    """Convert a Swagger 2.0 connector operation to OpenAPI 3"""
+    operation = _rewrite_refs(operation, prefix)
+    location = operation.get('operationId', prefix)
+    produces = operation.pop('produces', None) or ['application/json']
+    operation.pop('consumes', None)
+
+    parameters = []
+    for parameter in operation.pop('parameters', []):
+        if parameter.get('in') == 'body':
+            schema = _clean_schema(parameter.get('schema', {}), f"{location}.requestBody") or {}
+            operation['requestBody'] = {
+                'required': parameter.get('required', False),
+                'content': {'application/json': {'schema': schema}}
+            }
+            continue
+        converted = {k: v for k, v in parameter.items() if k not in ('type', 'format', 'default', 'enum')}
+        converted['schema'] = {k: parameter[k] for k in ('type', 'format', 'default', 'enum') if k in parameter}
+        parameters.append(converted)
+    if parameters:
+        operation['parameters'] = parameters
+
+    responses = {}
+    for code, response in operation.get('responses', {}).items():
+        response = dict(response)
+        schema = response.pop('schema', None)
+        if schema is not None:
+            schema = _clean_schema(schema, f"{location}.responses.{code}")
+        if schema is not None:
+            response['content'] = {produces[0]: {'schema': schema}}
+        responses[str(code)] = response
+    operation['responses'] = responses
+
+    # Connector definitions carry the connector security scheme; the plugin
+    # document applies its own global security requirement
+    operation.pop('security', None)
+    return operation
+
+
+def _operation_key(name: str) -> str:
+    """Normalize a connector path or runtime operation name for matching"""
+    return name.replace('_', '').replace('/', '').lower()
+
+
+def _generated_operation(prefix: str, name: str, params: Dict[str, Any]) -> Dict[str, Any]:
+    """Describe a mounted operation the plugin connector does not define"""
+    return {
+        'operationId': prefix + ''.join(part.title() for part in name.split('_')),
+        'summary': name.replace('_', ' ').capitalize(),
+        'requestBody': {
+            'required': False,
+            'content': {'application/json': {'schema': {
+                'type': 'object',
+                'properties': {field: {} for field in params}
+            }}}
+        },
+        'responses': {'200': {'description': 'Successful response'}}
+    }
+
+
+def _connector_slug(connector: Dict[str, Any]) -> Optional[str]:
+    """Plugin route segment a connector definition describes"""
+    base_path = (connector.get('basePath') or '').rstrip('/')
+    if not base_path or base_path == ROOT_BASE_PATH:
+        return None
+    return base_path.rsplit('/', 1)[-1].lower()
+
+
+def _merge_plugin(document: Dict[str, Any], slug: str, runtime: PluginRuntime,
+                  connector: Dict[str, Any]) -> None:
+    """
+    Merge a mounted plugin into the OpenAPI document
+
+    Paths are generated from the runtime operation table, so every advertised
+    path is served by the plugin host. Connector operations describe the
+    runtime operations whose names they match; connector paths without a
+    mounted operation are not advertised.
+    """
+    prefix = slug.title()
+    described = {
+        _operation_key(path): path_item['post']
+        for path, path_item in connector.get('paths', {}).items()
+        if isinstance(path_item.get('post'), dict)
+    }
+
+    paths = document.setdefault('paths', {})
+    for name, bound in runtime.operations.items():
+        operation = described.get(_operation_key(name))
+        paths.setdefault(PLUGIN_ROUTE.format(plugin=slug, operation=name), {
+            'post': _convert_operation(operation, prefix) if operation is not None
+            else _generated_operation(prefix, name, bound.params)
+        })
+
+    schemas = document.setdefault('components', {}).setdefault('schemas', {})
+    for name, schema in connector.get('definitions', {}).items():
+        schema = _clean_schema(schema, f"{prefix}.definitions.{name}")
+        if schema is not None:
+            schemas.setdefault(f"{prefix}{name}", _rewrite_refs(schema, prefix))
+
+
+def _apply_manifest(document: Dict[str, Any], manifest: Dict[str, Any]) -> None:
+    """Apply plugin manifest function descriptions to matching operations"""
+    descriptions = {
+        function['name']: function['description']
+        for function in manifest.get('functions', [])
+        if function.get('name') and function.get('description')
+    }
+    for path_item in document.get('paths', {}).values():
+        for operation in path_item.values():
+            if isinstance(operation, dict) and operation.get('operationId') in descriptions:
+                operation.setdefault('description', descriptions[operation['operationId']])
+
+    info = document.setdefault('info', {})
+    if manifest.get('description_for_human'):
+        info.setdefault('description', manifest['description_for_human'])
+
+
+def build_openapi_document(spec_path: str = OPENAPI_SPEC_PATH,
+                           connector_paths: Optional[List[str]] = None,
+                           manifest_paths: Optional[List[str]] = None,
+                           plugins: Optional[Mapping[str, PluginRuntime]] = None) -> Dict[str, Any]:
+    """
+    Assemble the plugin OpenAPI document
+
+    Args:
+        spec_path: Base OpenAPI definition for the function app endpoints
+        connector_paths: Plugin module connector definitions describing the
+                         plugin operations, discovered from the *-module
+                         directories if not provided
+        manifest_paths: Plugin manifests whose function descriptions are applied
+        plugins: Plugin runtimes by route segment, as mounted on the plugin
+                 host; the repository plugin modules are discovered if not provided
+
+    Returns:
+        OpenAPI document
+    """
+    document = copy.deepcopy(_load_document(spec_path))
+
+    if connector_paths is None:
+        connector_paths = sorted(
+            glob.glob(os.path.join(PROJECT_ROOT, '*-module', 'connector-definition.json')) +
+            glob.glob(os.path.join(PROJECT_ROOT, 'modules', '*-module', 'connector-definition.json'))
+        )
+    connectors: Dict[str, Dict[str, Any]] = {}
+    for path in connector_paths:
+        connector = _load_document(path)
+        slug = _connector_slug(connector)
+        if slug:
+            connectors.setdefault(slug, connector)
+
+    if plugins is None:
+        runtimes = filter(None, map(load_plugin_runtime, discover_plugin_modules()))
+        plugins = {PluginHost.slug(runtime.plugin_name): runtime for runtime in runtimes}
+    for slug, runtime in sorted(plugins.items()):
+        _merge_plugin(document, slug, runtime, connectors.get(slug, {}))
+
+    for path in PLUGIN_MANIFEST_PATHS if manifest_paths is None else manifest_paths:
+        if os.path.exists(path):
+            _apply_manifest(document, _load_document(path))
+
+    return document
+
+
+class OpenApiSpec:
+    """
+    Pre-serialized OpenAPI document
+
+    The document is serialized once and compressed with every supported
+    content coding, so serving a request is a lookup plus a byte copy.
+    """
+
+    def __init__(self, document: Dict[str, Any], max_age: int = 300):
+        self.document = document
+        self.body = json.dumps(document, separators=(',', ':'), sort_keys=True).encode('utf-8')
+        self.digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.cache_control = f"public, max-age={max_age}, must-revalidate"
+
+        self.representations: Dict[str, bytes] = {
+            'identity': self.body,
+            'gzip': gzip.compress(self.body, compresslevel=9, mtime=0),
+            'deflate': zlib.compress(self.body, 9),
+        }
+        if brotli is not None:
+            self.representations['br'] = brotli.compress(self.body)
+
+        # Strong validators differ per content coding
+        self.etags: Dict[str, str] = {
+            encoding: f'"{self.digest}"' if encoding == 'identity' else f'"{self.digest}-{encoding}"'
+            for encoding in self.representations
+        }
+        self._all_etags = frozenset(self.etags.values())
+        self._available = tuple(e for e in _PREFERRED_ENCODINGS if e in self.representations)
+
+    def negotiate(self, accept_encoding: Optional[str]) -> str:
+        """Select the content coding for an Accept-Encoding header"""
+        return _negotiate_encoding(accept_encoding or '', self._available)
+
+    def not_modified(self, if_none_match: Optional[str]) -> bool:
+        """Check an If-None-Match header against the current representations"""
+        if not if_none_match:
+            return False
+        for tag in if_none_match.split(','):
+            tag = tag.strip()
+            if tag == '*':
+                return True
+            if tag.startswith('W/'):
+                tag = tag[2:]
+            if tag in self._all_etags:
+                return True
+        return False
+
+    def response(self, accept_encoding: Optional[str], if_none_match: Optional[str]) -> Tuple[int, bytes, Dict[str, str]]:
+        """
+        Build the response for a spec request
+
+        Returns:
+            Tuple of status code, body and headers
+        """
+        encoding = self.negotiate(accept_encoding)
+        headers = {
+            'Content-Type': 'application/json',
+            'Cache-Control': self.cache_control,
+            'ETag': self.etags[encoding],
+            'Vary': 'Accept-Encoding'
+        }
+        if self.not_modified(if_none_match):
+            return 304, b'', headers
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+        return 200, self.representations[encoding], headers
+
+
+@lru_cache(maxsize=128)
+def _negotiate_encoding(accept_encoding: str, available: Tuple[str, ...]) -> str:
+    """Pick the preferred available coding accepted with a non-zero quality"""
+    accepted: Dict[str, float] = {}
+    for item in accept_encoding.lower().split(','):
+        name, _, params = item.strip().partition(';')
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name.strip()] = quality
+
+    best, best_quality = 'identity', 0.0
+    for encoding in available:
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+# Global spec instance
+_spec_instance: Optional[OpenApiSpec] = None
+_spec_lock = threading.Lock()
+
+
+def get_openapi_spec(plugins: Optional[Mapping[str, PluginRuntime]] = None) -> OpenApiSpec:
+    """
+    Get or build the global pre-serialized OpenAPI spec
+
+    Args:
+        plugins: Plugin runtimes mounted on the serving plugin host
+    """
+    global _spec_instance
+    if _spec_instance is None:
+        with _spec_lock:
+            if _spec_instance is None:
+                max_age = int(os.getenv('OPENAPI_CACHE_MAX_AGE', '300'))
+                _spec_instance = OpenApiSpec(build_openapi_document(plugins=plugins), max_age=max_age)
+    return _spec_instance
@@ -0,0 +1,231 @@
+"""
+Plugin host module for Microsoft 365 Copilot Plugin
+Discovers plugin business-logic modules and serves them from one Function app
+"""
+
+import asyncio
+import contextvars
+import importlib.util
+import inspect
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache import TieredCache, TTLCache
+from .deadline import deadline_scope, request_budget
+from .http_client import HttpClient
+from .plugin_runtime import PluginRuntime
+from .resilience import ResilienceRegistry
+
+try:
+    import azure.functions as func
+except ImportError:
+    func = None
+
+logger = logging.getLogger('copilot_plugin')
+
+# Repository root holding the *-module directories
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Business-logic modules picked up by discovery, relative to the repository root
+DEFAULT_PLUGIN_PATTERNS = (
+    '*-module/business-logic/*_service.py',
+    'modules/*-module/business-logic/*_service.py',
+)
+
+# Package name plugin modules are imported under
+PLUGIN_PACKAGE = 'copilot_plugins'
+
+
+def discover_plugin_modules(root: Path = REPO_ROOT,
+                            patterns: Iterable[str] = DEFAULT_PLUGIN_PATTERNS) -> List[Path]:
+    """Find plugin business-logic modules under the repository root"""
+    paths = set()
+    for pattern in patterns:
+        paths.update(path for path in root.glob(pattern) if path.is_file())
+    return sorted(paths)
+
+
+def load_plugin_runtime(path: Path) -> Optional[PluginRuntime]:
+    """
+    Import a plugin module and return its runtime
+
+    Plugin modules import the shared runtime from this src package, which
+    is already loaded here, so they need no import path setup of their own.
+    Returns None for modules that do not define a PluginRuntime named runtime.
+    """
+    module_name = f"{PLUGIN_PACKAGE}.{path.stem}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        try:
+            spec.loader.exec_module(module)
+        except Exception:
+            del sys.modules[module_name]
+            raise
+
+    runtime = getattr(module, 'runtime', None)
+    return runtime if isinstance(runtime, PluginRuntime) else None
+
+
+class PluginHost:
+    """
+    Serves every plugin module from a single Function app
+
+    Plugins share the host's telemetry pipeline, Azure credential, Key Vault
+    client, HTTP client, secret cache, response cache and dependency guards.
+    Service classes accepting credential/secret_client/http_client/resilience
+    keyword arguments are constructed with the shared clients instead of
+    creating their own.
+    """
+
+    def __init__(self, telemetry: Any = None, credential: Any = None,
+                 secret_client: Any = None, cache: Optional[TTLCache] = None,
+                 response_cache: Optional[TieredCache] = None,
+                 resilience: Optional[ResilienceRegistry] = None,
+                 http_client: Optional[HttpClient] = None):
+        """
+        Initialize plugin host
+
+        Args:
+            telemetry: Shared TelemetryManager for plugin requests
+            credential: Shared Azure credential injected into services
+            secret_client: Shared Key Vault client injected into services
+            cache: Shared cache layer
+            response_cache: Shared response cache for cacheable operations
+            resilience: Shared bulkheads and circuit breakers for downstream calls
+            http_client: Shared pooled HTTP client injected into services
+        """
+        self.telemetry = telemetry
+        self.credential = credential
+        self.secret_client = secret_client
+        self.cache = cache if cache is not None else TTLCache()
+        self.response_cache = response_cache if response_cache is not None else TieredCache()
+        self.resilience = resilience
+        self.http_client = http_client
+        self.plugins: Dict[str, PluginRuntime] = {}
+
+    @staticmethod
+    def slug(plugin_name: str) -> str:
+        """Route segment for a plugin name"""
+        return plugin_name.lower()
+
+    def mount(self, runtime: PluginRuntime, slug: Optional[str] = None) -> str:
+        """
+        Mount a plugin runtime under its route segment
+
+        Returns:
+            Route segment the plugin is served under
+        """
+        slug = slug or self.slug(runtime.plugin_name)
+        shared = self._shared_service_kwargs(runtime.service_class)
+        if shared:
+            service_class = runtime.service_class
+            runtime.service_factory = lambda: service_class(**shared)
+        runtime.response_cache = self.response_cache
+        runtime.telemetry = self.telemetry
+        self.plugins[slug] = runtime
+        return slug
+
+    def _shared_service_kwargs(self, service_class: type) -> Dict[str, Any]:
+        try:
+            parameters = inspect.signature(service_class).parameters
+        except (TypeError, ValueError):
+            return {}
+        available = {
+            'credential': self.credential,
+            'secret_client': self.secret_client,
+            'resilience': self.resilience,
+            'http_client': self.http_client
+        }
+        return {
+            name: value for name, value in available.items()
+            if value is not None and name in parameters
+        }
+
+    def discover(self, root: Path = REPO_ROOT,
+                 patterns: Iterable[str] = DEFAULT_PLUGIN_PATTERNS) -> List[str]:
+        """
+        Discover and mount plugin modules
+
+        Modules that fail to import are logged and skipped so one broken
+        plugin does not take the host down.
+
+        Returns:
+            Route segments of the mounted plugins
+        """
+        mounted = []
+        for path in discover_plugin_modules(root, patterns):
+            try:
+                runtime = load_plugin_runtime(path)
+            except Exception as e:
+                logger.error(f"Failed to load plugin module {path.name}: {e}")
+                if self.telemetry:
+                    self.telemetry.track_exception(e, {'component': 'plugin_host', 'module': path.name})
+                continue
+            if runtime is not None:
+                mounted.append(self.mount(runtime))
+        return mounted
+
+    def purge(self, plugin: Optional[str] = None, operation_name: Optional[str] = None,
+              tenant: Optional[str] = None) -> int:
+        """
+        Purge cached plugin responses
+
+        Args:
+            plugin: Only purge this plugin, defaults to all mounted plugins
+            operation_name: Only purge this operation
+            tenant: Only purge entries scoped to this tenant
+
+        Returns:
+            Number of entries removed
+
+        Raises:
+            KeyError: If the plugin is not mounted
+        """
+        runtimes = [self.plugins[plugin]] if plugin else list(self.plugins.values())
+        return sum(runtime.purge_cache(operation_name, tenant) for runtime in runtimes)
+
+    def _not_found(self, plugin: str) -> Any:
+        body = json.dumps({
+            "error": f"Unknown plugin: {plugin}",
+            "available_plugins": sorted(self.plugins)
+        }, separators=(',', ':'))
+        return func.HttpResponse(body, status_code=404, mimetype="application/json")
+
+    async def handle(self, plugin: str, req: Any) -> Any:
+        """
+        Serve a plugin request
+
+        Plugin business logic is synchronous and runs on the default executor
+        so it does not block the event loop shared with the other endpoints.
+        The request budget starts on arrival, so time spent waiting for an
+        executor thread counts against it.
+        """
+        runtime = self.plugins.get(plugin)
+        if runtime is None:
+            return self._not_found(plugin)
+
+        start_time = time.time()
+        loop = asyncio.get_running_loop()
+        with deadline_scope(request_budget(req.headers)):
+            context = contextvars.copy_context()
+            response = await loop.run_in_executor(None, context.run, runtime.handle, req)
+
+        if self.telemetry:
+            operation_name = req.params.get('operation') or req.route_params.get('operation') or ''
+            status_code = getattr(response, 'status_code', 200)
+            self.telemetry.track_request(
+                name=f"plugins/{plugin}/{operation_name}",
+                url=req.url,
+                success=status_code < 400,
+                duration_ms=(time.time() - start_time) * 1000,
+                response_code=status_code,
+                properties={'plugin': runtime.plugin_name, 'operation': operation_name}
+            )
+        return response
@@ -0,0 +1,523 @@
+"""
+Plugin runtime module for Microsoft 365 Copilot Plugin
+Table-driven operation dispatch shared by the plugin module entry points
+"""
+
+import contextvars
+import hashlib
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from .cache import CachePolicy, TieredCache
+from .coalescing import DEFAULT_COALESCE_TIMEOUT, SingleFlight, fingerprint
+from .deadline import (
+    DEFAULT_BUDGET_SECONDS, DeadlineExceeded, bounded_timeout, check_deadline,
+    current_deadline, deadline_scope, request_budget
+)
+from .models import dumps
+from .request_body import DEFAULT_MAX_BODY_BYTES, RequestBodyError, parse_json_body, read_body
+from .resilience import DependencyUnavailable
+from .security_trimming import principal_scope, request_principal, request_tenant
+
+try:
+    import azure.functions as func
+except ImportError:
+    func = None
+
+logger = logging.getLogger('copilot_plugin')
+
+# Attribute set on service methods registered with @operation
+OPERATION_ATTRIBUTE = '_plugin_operation'
+
+# Reserved operation executing a batch envelope
+BATCH_OPERATION = 'batch'
+
+# Maximum items in one batch envelope
+MAX_BATCH_ITEMS = 20
+
+# Worker threads executing batch items
+DEFAULT_BATCH_WORKERS = 8
+
+# Compact JSON encoder shared by every plugin response; writes models directly
+_encode_json = dumps
+
+
+class OperationSpec:
+    """Declaration attached to a service method by the operation decorator"""
+
+    __slots__ = ('name', 'params', 'pass_body', 'coalesce', 'coalesce_timeout', 'cache', 'budget')
+
+    def __init__(self, name: Optional[str], params: Dict[str, Any], pass_body: bool,
+                 coalesce: bool = False, coalesce_timeout: float = DEFAULT_COALESCE_TIMEOUT,
+                 cache: Optional[CachePolicy] = None, budget: float = DEFAULT_BUDGET_SECONDS):
+        self.name = name
+        self.params = params
+        self.pass_body = pass_body
+        self.coalesce = coalesce
+        self.coalesce_timeout = coalesce_timeout
+        self.cache = cache
+        self.budget = budget
+
+
+def operation(name: Optional[str] = None, *, params: Optional[Dict[str, Any]] = None,
+              body: bool = False, coalesce: bool = False,
+              coalesce_timeout: float = DEFAULT_COALESCE_TIMEOUT,
+              cache: Optional[CachePolicy] = None,
+              budget: float = DEFAULT_BUDGET_SECONDS) -> Callable:
+    """
+    Register a service method as a plugin operation
+
+    Args:
+        name: Operation name, defaults to the method name
+        params: Ordered mapping of body field to default value; each field is
+                passed to the method as a positional argument
+        body: Pass the whole request body as the only argument
+        coalesce: Run identical concurrent calls once and share the result;
+                  only for read-only operations
+        coalesce_timeout: Seconds a coalesced call waits for the in-flight one
+        cache: Response cache policy; only for read-only operations
+        budget: Default latency budget in seconds; a shorter budget from the
+                request header takes precedence
+
+    Usage:
+        @operation(params={'topic': '', 'limit': 10})
+        def get_faq(self, topic, limit=10): ...
+    """
+    if body and params:
+        raise ValueError("An operation takes either params or the whole body")
+
+    def decorator(method: Callable) -> Callable:
+        setattr(method, OPERATION_ATTRIBUTE, OperationSpec(
+            name, dict(params or {}), body, coalesce, coalesce_timeout, cache, budget
+        ))
+        return method
+    return decorator
+
+
+def _compile_parser(spec: OperationSpec) -> Callable[[Dict[str, Any]], Tuple[Any, ...]]:
+    """Build the argument parser for an operation once, at registration time"""
+    if spec.pass_body:
+        return lambda body: (body,)
+
+    fields = tuple(spec.params.items())
+    if not fields:
+        return lambda body: ()
+    if len(fields) == 1:
+        (key, default), = fields
+        return lambda body: (body.get(key, default),)
+    return lambda body: tuple([body.get(key, default) for key, default in fields])
+
+
+def _compile_cache_key(spec: OperationSpec) -> Optional[Callable[[Dict[str, Any], Tuple[Any, ...]], str]]:
+    """Build the cache key digest function for an operation's declared key fields"""
+    if spec.cache is None:
+        return None
+    if spec.cache.key is None:
+        return lambda body, args: hashlib.sha1(fingerprint(*args).encode('utf-8')).hexdigest()
+
+    fields = tuple((key, spec.params.get(key)) for key in spec.cache.key)
+    return lambda body, args: hashlib.sha1(
+        fingerprint(*[body.get(key, default) for key, default in fields]).encode('utf-8')
+    ).hexdigest()
+
+
+def _cacheable(result: Any) -> bool:
+    """Service failures are reported as success: false and never cached"""
+    return not (isinstance(result, dict) and result.get('success') is False)
+
+
+class BoundOperation:
+    """Dispatch table entry: a service method with its compiled argument parser"""
+
+    __slots__ = ('name', 'method_name', 'params', 'parse', 'coalesce', 'coalesce_timeout', 'cache', 'cache_key', 'budget')
+
+    def __init__(self, name: str, method_name: str, spec: OperationSpec):
+        self.name = name
+        self.method_name = method_name
+        self.params = spec.params
+        self.parse = _compile_parser(spec)
+        self.coalesce = spec.coalesce
+        self.coalesce_timeout = spec.coalesce_timeout
+        self.cache = spec.cache
+        self.cache_key = _compile_cache_key(spec)
+        self.budget = spec.budget
+
+
+class UnknownOperationError(LookupError):
+    """Raised when dispatching an operation the plugin does not register"""
+
+
+class BatchRequestError(RequestBodyError):
+    """Raised for malformed batch envelopes"""
+
+
+def _plan_batch(items: Any) -> List[List[Dict[str, Any]]]:
+    """
+    Validate a batch envelope and order its items into dependency levels
+
+    Items in the same level have no dependencies on each other and run
+    concurrently; each level starts once the previous one has finished.
+
+    Raises:
+        BatchRequestError: For malformed items, duplicate or unknown ids,
+                           and dependency cycles
+    """
+    if not isinstance(items, list) or not items:
+        raise BatchRequestError("Batch requires a non-empty 'requests' list")
+    if len(items) > MAX_BATCH_ITEMS:
+        raise BatchRequestError(f"Batch is limited to {MAX_BATCH_ITEMS} requests")
+
+    by_id: Dict[str, Dict[str, Any]] = {}
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or not item.get('operation'):
+            raise BatchRequestError(f"Batch request {index} requires an 'operation'")
+        item_id = str(item.get('id', index))
+        if item_id in by_id:
+            raise BatchRequestError(f"Duplicate batch request id: {item_id}")
+        if not isinstance(item.get('body', {}), dict):
+            raise BatchRequestError(f"Batch request {item_id} body must be a JSON object")
+        by_id[item_id] = dict(item, id=item_id, depends_on=[str(d) for d in item.get('depends_on') or []])
+
+    for item in by_id.values():
+        for dependency in item['depends_on']:
+            if dependency not in by_id:
+                raise BatchRequestError(f"Batch request {item['id']} depends on unknown id: {dependency}")
+
+    levels = []
+    placed: set = set()
+    pending = list(by_id.values())
+    while pending:
+        level = [item for item in pending if all(d in placed for d in item['depends_on'])]
+        if not level:
+            raise BatchRequestError("Batch dependencies contain a cycle")
+        levels.append(level)
+        placed.update(item['id'] for item in level)
+        pending = [item for item in pending if item['id'] not in placed]
+    return levels
+
+
+class PluginRuntime:
+    """
+    Shared runtime for plugin module entry points
+
+    Collects the @operation methods of a service class into a dispatch table,
+    keeps a single service instance for the lifetime of the worker, and
+    serves every request through one parsing and response path.
+    """
+
+    def __init__(self, plugin_name: str, service_class: type,
+                 service_factory: Optional[Callable[[], Any]] = None,
+                 max_body_bytes: int = DEFAULT_MAX_BODY_BYTES,
+                 response_cache: Optional[TieredCache] = None):
+        """
+        Initialize plugin runtime
+
+        Args:
+            plugin_name: Plugin name used in logs and error messages
+            service_class: Service class declaring @operation methods
+            service_factory: Optional factory for the service instance,
+                             defaults to calling service_class()
+            max_body_bytes: Maximum accepted request body size
+            response_cache: Cache for operations declaring a CachePolicy,
+                            defaults to an in-process cache
+        """
+        self.plugin_name = plugin_name
+        self.service_class = service_class
+        self.service_factory = service_factory or service_class
+        self.max_body_bytes = max_body_bytes
+        self.operations: Dict[str, BoundOperation] = self._build_dispatch_table(service_class)
+        self._service: Any = None
+        self._service_lock = threading.Lock()
+        self.single_flight = SingleFlight()
+        self.response_cache = response_cache if response_cache is not None else TieredCache()
+        self._batch_executor: Optional[ThreadPoolExecutor] = None
+        self.telemetry: Any = None
+        self.deadline_counts = {'shed': 0, 'cancelled': 0, 'partial': 0}
+
+    @staticmethod
+    def _build_dispatch_table(service_class: type) -> Dict[str, BoundOperation]:
+        table: Dict[str, BoundOperation] = {}
+        for klass in reversed(service_class.__mro__):
+            for attr_name, value in vars(klass).items():
+                spec = getattr(value, OPERATION_ATTRIBUTE, None)
+                if isinstance(spec, OperationSpec):
+                    name = spec.name or attr_name
+                    if name == BATCH_OPERATION:
+                        raise ValueError(f"'{BATCH_OPERATION}' is a reserved operation name")
+                    table[name] = BoundOperation(name, attr_name, spec)
+        return table
+
+    @property
+    def service(self) -> Any:
+        """Service instance shared by all requests"""
+        if self._service is None:
+            with self._service_lock:
+                if self._service is None:
+                    self._service = self.service_factory()
+        return self._service
+
+    @property
+    def available_operations(self) -> List[str]:
+        """Registered operation names in declaration order"""
+        return list(self.operations)
+
+    @property
+    def cache_prefix(self) -> str:
+        """Prefix of this plugin's response cache keys"""
+        return self.plugin_name.lower()
+
+    def _cache_key(self, bound: BoundOperation, body: Dict[str, Any], args: Tuple[Any, ...],
+                   tenant: Optional[str]) -> str:
+        scope = (tenant or '-') if bound.cache.tenant_scoped else '_shared'
+        return f"{self.cache_prefix}:{bound.name}:{scope}:{bound.cache_key(body, args)}"
+
+    def dispatch(self, operation_name: str, body: Dict[str, Any], tenant: Optional[str] = None) -> Any:
+        """
+        Execute an operation with a parsed request body
+
+        Operations with a CachePolicy are served from the response cache;
+        operations declared with coalesce=True share one execution between
+        identical concurrent calls.
+
+        Args:
+            operation_name: Registered operation name
+            body: Parsed request body
+            tenant: Caller tenant for tenant-scoped cache entries
+
+        Raises:
+            UnknownOperationError: If the operation is not registered
+            CoalescedCallTimeout: If a coalesced call times out waiting
+        """
+        bound = self.operations.get(operation_name)
+        if bound is None:
+            raise UnknownOperationError(f"Unknown operation: {operation_name}")
+        method = getattr(self.service, bound.method_name)
+        args = bound.parse(body)
+
+        if bound.coalesce:
+            key = (bound.name, tenant, fingerprint(*args))
+            load = lambda: self.single_flight.do(
+                key, lambda: method(*args), bounded_timeout(bound.coalesce_timeout)
+            )[0]
+        else:
+            load = lambda: method(*args)
+
+        if bound.cache is None:
+            return load()
+
+        result, _ = self.response_cache.get_or_load(
+            self._cache_key(bound, body, args, tenant),
+            load,
+            bound.cache.ttl,
+            bound.cache.stale_ttl,
+            _cacheable
+        )
+        return result
+
+    def purge_cache(self, operation_name: Optional[str] = None, tenant: Optional[str] = None) -> int:
+        """
+        Purge cached responses of this plugin
+
+        Args:
+            operation_name: Only purge this operation
+            tenant: Only purge entries scoped to this tenant
+
+        Returns:
+            Number of entries removed
+        """
+        return self.response_cache.purge(
+            f"{self.cache_prefix}:{operation_name or '*'}:{tenant or '*'}:*"
+        )
+
+    def parse_request(self, req: Any) -> Tuple[Optional[str], Dict[str, Any]]:
+        """
+        Extract the operation name and JSON body from a request
+
+        Supports Azure Functions HttpRequest objects as well as simple request
+        objects exposing operation/params and body/get_json for local testing.
+
+        Raises:
+            RequestBodyError: If the body is not a valid JSON object
+        """
+        params = getattr(req, 'params', None)
+        if params is not None:
+            operation_name = params.get('operation')
+        else:
+            operation_name = getattr(req, 'operation', None)
+        if not operation_name:
+            operation_name = (getattr(req, 'route_params', None) or {}).get('operation')
+
+        if func is not None and isinstance(req, func.HttpRequest):
+            raw = read_body(req, max_bytes=self.max_body_bytes)
+            body = parse_json_body(raw).to_dict() if raw.strip() else {}
+        elif hasattr(req, 'get_json'):
+            try:
+                body = req.get_json() or {}
+            except (ValueError, AttributeError):
+                raise RequestBodyError("Invalid JSON in request body")
+        else:
+            body = getattr(req, 'body', None) or {}
+
+        if not isinstance(body, dict):
+            raise RequestBodyError("Request body must be a JSON object")
+        return operation_name, body
+
+    @staticmethod
+    def request_tenant(req: Any) -> Optional[str]:
+        """Caller tenant from the validated token claims or configuration"""
+        return request_tenant(getattr(req, 'headers', None))
+
+    def respond(self, req: Any, payload: Any, status_code: int = 200) -> Union[Any, str]:
+        """Serialize a payload as compact JSON for the request type"""
+        body = _encode_json(payload)
+        if func is not None and isinstance(req, func.HttpRequest):
+            return func.HttpResponse(body, status_code=status_code, mimetype="application/json")
+        return body
+
+    def _track_deadline(self, operation_name: str, outcome: str, overrun: float = 0.0):
+        """Count work shed, cancelled or cut short by the request deadline"""
+        self.deadline_counts[outcome] += 1
+        if self.telemetry:
+            deadline = current_deadline()
+            self.telemetry.track_event(
+                'deadline_exceeded',
+                properties={'plugin': self.plugin_name, 'operation': operation_name, 'outcome': outcome},
+                measurements={
+                    'budget_ms': deadline.budget * 1000 if deadline else 0,
+                    'overrun_ms': overrun * 1000
+                }
+            )
+
+    def execute(self, operation_name: str, body: Dict[str, Any],
+                tenant: Optional[str] = None) -> Tuple[int, Any]:
+        """
+        Execute an operation under its latency budget and map failures to an HTTP status
+
+        Work is not started once the deadline has passed. Services may check
+        the deadline themselves and return partial results marked
+        "partial": true.
+
+        Returns:
+            Tuple of the status code and the response payload
+        """
+        bound = self.operations.get(operation_name)
+        with deadline_scope(bound.budget if bound is not None else None):
+            try:
+                check_deadline('dispatch')
+                result = self.dispatch(operation_name, body, tenant)
+            except UnknownOperationError as e:
+                return 400, {"error": str(e)}
+            except DeadlineExceeded as e:
+                self._track_deadline(operation_name, 'shed', e.overrun)
+                return 504, {"error": "Deadline exceeded", "stage": e.stage}
+            except DependencyUnavailable as e:
+                logger.warning(f"{self.plugin_name} {operation_name} rejected: {e}")
+                return 503, {"error": str(e), "dependency": e.dependency}
+            except TimeoutError as e:
+                logger.warning(f"{self.plugin_name} {operation_name} timed out: {e}")
+                deadline = current_deadline()
+                if deadline is not None and deadline.expired:
+                    self._track_deadline(operation_name, 'cancelled')
+                return 504, {"error": "Operation timed out"}
+            except Exception as e:
+                logger.error(f"{self.plugin_name} error: {e}")
+                return 500, {"error": "Internal server error", "details": str(e)}
+
+            if isinstance(result, dict) and result.get('partial') is True:
+                self._track_deadline(operation_name, 'partial')
+            return 200, result
+
+    def execute_batch(self, items: Any, tenant: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Execute a batch of operations
+
+        Each item is {"id", "operation", "body", "depends_on"}; only operation
+        is required. Independent items run concurrently. An item whose
+        dependency did not succeed is not executed and reports 424.
+
+        Returns:
+            Per-item results {"id", "status", "body"} in request order
+
+        Raises:
+            BatchRequestError: If the envelope is malformed
+        """
+        levels = _plan_batch(items)
+        if self._batch_executor is None:
+            with self._service_lock:
+                if self._batch_executor is None:
+                    self._batch_executor = ThreadPoolExecutor(
+                        max_workers=DEFAULT_BATCH_WORKERS,
+                        thread_name_prefix=f"{self.cache_prefix}-batch"
+                    )
+
+        statuses: Dict[str, int] = {}
+        results: Dict[str, Dict[str, Any]] = {}
+        for level in levels:
+            runnable = []
+            for item in level:
+                failed = [d for d in item['depends_on'] if statuses[d] >= 400]
+                if failed:
+                    statuses[item['id']] = 424
+                    results[item['id']] = {"error": f"Dependency failed: {', '.join(failed)}"}
+                else:
+                    runnable.append(item)
+
+            futures = [
+                (item['id'], self._batch_executor.submit(
+                    contextvars.copy_context().run,
+                    self.execute, item['operation'], item.get('body') or {}, tenant
+                ))
+                for item in runnable
+            ]
+            for item_id, future in futures:
+                statuses[item_id], results[item_id] = future.result()
+
+        return [
+            {"id": item_id, "status": statuses[item_id], "body": results[item_id]}
+            for item_id in (str(item.get('id', index)) for index, item in enumerate(items))
+        ]
+
+    def handle(self, req: Any) -> Union[Any, str]:
+        """
+        Main entry point shared by all plugin modules
+
+        The request deadline and caller principal are set for the whole
+        request. Operations whose results depend on the caller must not
+        declare a cache policy, as cached responses are shared per tenant.
+        """
+        headers = getattr(req, 'headers', None)
+        with deadline_scope(request_budget(headers)), principal_scope(request_principal(headers)):
+            return self._handle(req)
+
+    def _handle(self, req: Any) -> Union[Any, str]:
+        try:
+            try:
+                operation_name, body = self.parse_request(req)
+            except RequestBodyError as e:
+                return self.respond(req, {"error": str(e)}, getattr(e, 'status_code', 400))
+
+            if not operation_name:
+                return self.respond(req, {
+                    "error": "Missing 'operation' parameter",
+                    "available_operations": self.available_operations
+                }, 400)
+
+            tenant = self.request_tenant(req)
+            if operation_name == BATCH_OPERATION:
+                try:
+                    responses = self.execute_batch(body.get('requests'), tenant)
+                except BatchRequestError as e:
+                    return self.respond(req, {"error": str(e)}, 400)
+                return self.respond(req, {"responses": responses})
+
+            status_code, payload = self.execute(operation_name, body, tenant)
+            return self.respond(req, payload, status_code)
+
+        except Exception as e:
+            logger.error(f"{self.plugin_name} error: {e}")
+            return self.respond(req, {
+                "error": "Internal server error",
+                "details": str(e)
+            }, 500)
@@ -0,0 +1,468 @@
+"""
+Request body module for Microsoft 365 Copilot Plugin
+Bounded body reading and incremental JSON parsing against compiled request schemas
+"""
+
+import json
+import os
+import re
+from collections.abc import Mapping
+from json.decoder import scanstring
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+# Default limit applied when no explicit limit is configured
+DEFAULT_MAX_BODY_BYTES = 10 * 1024 * 1024
+
+# Chunk size used when reading from streaming sources
+READ_CHUNK_BYTES = 64 * 1024
+
+# String values with more raw characters than this are kept as lazy views
+LAZY_STRING_THRESHOLD = 1024
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_DECODER = json.JSONDecoder()
+
+_JSON_TYPES = {
+    'string': (str,),
+    'integer': (int,),
+    'number': (int, float),
+    'boolean': (bool,),
+    'object': (dict,),
+    'array': (list,),
+}
+
+
+class RequestBodyError(ValueError):
+    """Raised when a request body is malformed or violates its schema"""
+    status_code = 400
+
+
+class RequestBodyTooLarge(RequestBodyError):
+    """Raised when a request body exceeds the configured byte limit"""
+    status_code = 413
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Request body too large. Maximum size: {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+def read_body(source: Any, max_bytes: int = DEFAULT_MAX_BODY_BYTES,
+              chunk_size: int = READ_CHUNK_BYTES) -> bytes:
+    """
+    Read a request body while enforcing a byte limit
+
+    Accepts an Azure Functions HttpRequest, a file-like object, an iterable of
+    byte chunks or raw bytes. A declared Content-Length above the limit is
+    rejected before anything is read; streaming sources are read in chunks and
+    abandoned as soon as the limit is crossed, so bodies without a
+    Content-Length (chunked transfer) are bounded as well.
+
+    Args:
+        source: Request or body source
+        max_bytes: Maximum accepted body size in bytes
+        chunk_size: Read size for file-like sources
+
+    Returns:
+        Body bytes
+
+    Raises:
+        RequestBodyTooLarge: If the body exceeds max_bytes
+        RequestBodyError: If the Content-Length header is invalid
+    """
+    headers = getattr(source, 'headers', None)
+    if headers is not None:
+        content_length = headers.get('Content-Length')
+        if content_length:
+            try:
+                declared = int(content_length)
+            except ValueError:
+                raise RequestBodyError("Invalid Content-Length header")
+            if declared > max_bytes:
+                raise RequestBodyTooLarge(max_bytes)
+
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        chunks: Any = (source,)
+    elif hasattr(source, 'get_body'):
+        chunks = (source.get_body() or b'',)
+    elif hasattr(source, 'read'):
+        chunks = iter(lambda: source.read(chunk_size), b'')
+    else:
+        chunks = source
+
+    buffer = bytearray()
+    for chunk in chunks:
+        if len(buffer) + len(chunk) > max_bytes:
+            raise RequestBodyTooLarge(max_bytes)
+        buffer += chunk
+    return bytes(buffer)
+
+
+class LazyText:
+    """
+    View over a JSON string value that is only unescaped on first access
+
+    The view keeps a reference to the decoded body text and the span of the
+    quoted value, so large fields cost nothing until a handler reads them.
+    """
+
+    __slots__ = ('_source', '_start', '_end', '_value')
+
+    def __init__(self, source: str, start: int, end: int):
+        self._source = source
+        self._start = start
+        self._end = end
+        self._value: Optional[str] = None
+
+    @property
+    def raw_length(self) -> int:
+        """Length of the escaped value, an upper bound of the decoded length"""
+        return self._end - self._start - 2
+
+    @property
+    def value(self) -> str:
+        """Decoded string value"""
+        if self._value is None:
+            try:
+                self._value, _ = scanstring(self._source, self._start + 1)
+            except ValueError:
+                raise RequestBodyError("Invalid JSON in request body")
+        return self._value
+
+    def __str__(self) -> str:
+        return self.value
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+    def __repr__(self) -> str:
+        return f"LazyText(raw_length={self.raw_length})"
+
+
+class CompiledSchema:
+    """
+    JSON schema compiled into a flat validator
+
+    Supports the subset of OpenAPI schema keywords used by the plugin
+    definitions: type, required, properties, additionalProperties, enum,
+    minLength, maxLength, minimum, maximum, pattern and items.
+    """
+
+    __slots__ = ('types', 'required', 'properties', 'additional', 'enum',
+                 'min_length', 'max_length', 'minimum', 'maximum', 'pattern',
+                 'items', 'default')
+
+    def __init__(self, schema: Dict[str, Any], resolver: Optional['_RefResolver'] = None):
+        resolver = resolver or _RefResolver({})
+        schema = resolver.resolve(schema)
+
+        schema_type = schema.get('type')
+        self.types = _JSON_TYPES.get(schema_type) if isinstance(schema_type, str) else None
+        self.required = frozenset(schema.get('required', ()))
+        self.properties = {
+            name: CompiledSchema(prop, resolver)
+            for name, prop in (schema.get('properties') or {}).items()
+            if isinstance(prop, dict)
+        }
+        self.additional = schema.get('additionalProperties', True) is not False
+        self.enum = frozenset(schema['enum']) if 'enum' in schema else None
+        self.min_length = schema.get('minLength')
+        self.max_length = schema.get('maxLength')
+        self.minimum = schema.get('minimum')
+        self.maximum = schema.get('maximum')
+        self.pattern = re.compile(schema['pattern']) if 'pattern' in schema else None
+        items = schema.get('items')
+        self.items = CompiledSchema(items, resolver) if isinstance(items, dict) else None
+        self.default = schema.get('default')
+
+    @property
+    def needs_value(self) -> bool:
+        """Whether validating a string requires its decoded value"""
+        return self.enum is not None or self.pattern is not None
+
+    def validate(self, value: Any, path: str = 'body') -> None:
+        """
+        Validate a decoded value
+
+        Raises:
+            RequestBodyError: If the value violates the schema
+        """
+        if self.types is not None:
+            if isinstance(value, bool) and bool not in self.types:
+                raise RequestBodyError(f"Invalid type for '{path}'")
+            if not isinstance(value, self.types):
+                raise RequestBodyError(f"Invalid type for '{path}'")
+
+        if self.enum is not None and value not in self.enum:
+            raise RequestBodyError(
+                f"Invalid value for '{path}'. Must be one of: {', '.join(sorted(map(str, self.enum)))}"
+            )
+
+        if isinstance(value, str):
+            if self.min_length is not None and len(value) < self.min_length:
+                raise RequestBodyError(f"'{path}' must be at least {self.min_length} characters")
+            if self.max_length is not None and len(value) > self.max_length:
+                raise RequestBodyError(f"'{path}' must be at most {self.max_length} characters")
+            if self.pattern is not None and not self.pattern.search(value):
+                raise RequestBodyError(f"Invalid format for '{path}'")
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            if self.minimum is not None and value < self.minimum:
+                raise RequestBodyError(f"'{path}' must be at least {self.minimum}")
+            if self.maximum is not None and value > self.maximum:
+                raise RequestBodyError(f"'{path}' must be at most {self.maximum}")
+        elif isinstance(value, dict):
+            self.validate_members(value.keys(), path)
+            for name, member in value.items():
+                self.validate_member(name, member, path)
+        elif isinstance(value, list) and self.items is not None:
+            for index, item in enumerate(value):
+                self.items.validate(item, f"{path}[{index}]")
+
+    def validate_member(self, name: str, value: Any, path: str = 'body') -> None:
+        """Validate a single object member as soon as it is parsed"""
+        prop = self.properties.get(name)
+        if prop is None:
+            if not self.additional:
+                raise RequestBodyError(f"Unexpected field '{name}' in {path}")
+            return
+        prop.validate(value, f"{path}.{name}" if path != 'body' else name)
+
+    def validate_lazy(self, name: str, view: LazyText) -> None:
+        """Validate a lazily decoded string member without decoding it where possible"""
+        prop = self.properties.get(name)
+        if prop is None:
+            if not self.additional:
+                raise RequestBodyError(f"Unexpected field '{name}' in body")
+            return
+        if prop.types is not None and str not in prop.types:
+            raise RequestBodyError(f"Invalid type for '{name}'")
+        # A JSON escape never decodes to more characters than it occupies and
+        # never to fewer than one per twelve, so the value is only decoded when
+        # the raw length cannot decide the length limits on its own.
+        if prop.max_length is not None and view.raw_length > prop.max_length:
+            prop.validate(view.value, name)
+        elif prop.min_length is not None and view.raw_length < prop.min_length * 12:
+            prop.validate(view.value, name)
+
+    def validate_members(self, names: Any, path: str = 'body') -> None:
+        """Check that all required members are present"""
+        missing = self.required.difference(names)
+        if missing:
+            raise RequestBodyError(f"Missing required field '{sorted(missing)[0]}' in {path}")
+
+
+class _RefResolver:
+    """Resolves local $ref pointers in OpenAPI and Swagger documents"""
+
+    def __init__(self, document: Dict[str, Any]):
+        self.document = document
+
+    def resolve(self, schema: Dict[str, Any]) -> Dict[str, Any]:
+        seen = set()
+        while '$ref' in schema:
+            ref = schema['$ref']
+            if ref in seen or not ref.startswith('#/'):
+                raise ValueError(f"Unsupported schema reference: {ref}")
+            seen.add(ref)
+            node: Any = self.document
+            for part in ref[2:].split('/'):
+                node = node[part.replace('~1', '/').replace('~0', '~')]
+            schema = node
+        return schema
+
+
+def load_request_schema(definition_path: str, operation_id: str) -> CompiledSchema:
+    """
+    Compile the JSON request body schema of an operation from an API definition
+
+    Works with OpenAPI 3 documents (requestBody) as well as the Swagger 2.0
+    connector definitions (body parameters), in JSON or YAML.
+
+    Args:
+        definition_path: Path to the OpenAPI or connector definition file
+        operation_id: operationId whose request body schema is compiled
+
+    Returns:
+        Compiled schema for the request body
+
+    Raises:
+        KeyError: If the operation or its body schema is not found
+    """
+    with open(definition_path, 'r', encoding='utf-8') as handle:
+        if definition_path.endswith(('.yaml', '.yml')):
+            import yaml
+            document = yaml.safe_load(handle)
+        else:
+            document = json.load(handle)
+
+    resolver = _RefResolver(document)
+    for path_item in (document.get('paths') or {}).values():
+        for operation in path_item.values():
+            if not isinstance(operation, dict) or operation.get('operationId') != operation_id:
+                continue
+
+            request_body = operation.get('requestBody')
+            if request_body:
+                request_body = resolver.resolve(request_body)
+                media = request_body.get('content', {}).get('application/json', {})
+                if 'schema' in media:
+                    return CompiledSchema(media['schema'], resolver)
+
+            for parameter in operation.get('parameters', []):
+                parameter = resolver.resolve(parameter)
+                if parameter.get('in') == 'body' and 'schema' in parameter:
+                    return CompiledSchema(parameter['schema'], resolver)
+
+            raise KeyError(f"Operation {operation_id} has no JSON request body schema")
+
+    raise KeyError(f"Operation {operation_id} not found in {os.path.basename(definition_path)}")
+
+
+class RequestBody(Mapping):
+    """
+    Parsed JSON object body
+
+    Behaves like a read-only dict. Large string members are stored as
+    LazyText views and decoded on first item access; use ``view`` to get
+    the undecoded view itself.
+    """
+
+    __slots__ = ('_members', 'size')
+
+    def __init__(self, members: Dict[str, Any], size: int):
+        self._members = members
+        self.size = size
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._members[key]
+        if isinstance(value, LazyText):
+            return value.value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._members)
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def view(self, key: str) -> Any:
+        """Get a member without decoding lazy string views"""
+        return self._members[key]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Materialize the body as a plain dict"""
+        return {key: self[key] for key in self._members}
+
+
+def parse_json_body(body: bytes, schema: Optional[CompiledSchema] = None,
+                    lazy_threshold: int = LAZY_STRING_THRESHOLD) -> RequestBody:
+    """
+    Parse a JSON object body member by member
+
+    Each top-level member is validated against the schema as soon as it has
+    been parsed, so a malformed or invalid body is rejected at the first bad
+    member without parsing the rest. String members longer than
+    lazy_threshold are not unescaped until they are accessed.
+
+    Args:
+        body: Raw body bytes
+        schema: Compiled schema for the body object
+        lazy_threshold: Raw length above which strings are kept as views
+
+    Returns:
+        Parsed request body
+
+    Raises:
+        RequestBodyError: If the body is not a valid JSON object or violates the schema
+    """
+    try:
+        text = body.decode('utf-8-sig') if isinstance(body, (bytes, bytearray)) else str(body)
+    except UnicodeDecodeError:
+        raise RequestBodyError("Request body is not valid UTF-8")
+
+    members: Dict[str, Any] = {}
+    end = len(text)
+    idx = _WHITESPACE.match(text, 0).end()
+    if idx == end:
+        raise RequestBodyError("Request body is required")
+    if text[idx] != '{':
+        raise RequestBodyError("Request body must be a JSON object")
+
+    idx = _WHITESPACE.match(text, idx + 1).end()
+    if idx < end and text[idx] == '}':
+        idx += 1
+    else:
+        while True:
+            name, idx = _parse_key(text, idx)
+            idx = _WHITESPACE.match(text, idx).end()
+            if idx >= end:
+                raise RequestBodyError("Invalid JSON in request body")
+
+            value, idx = _parse_value(text, idx, name, schema, lazy_threshold)
+            members[name] = value
+
+            idx = _WHITESPACE.match(text, idx).end()
+            if idx < end and text[idx] == ',':
+                idx = _WHITESPACE.match(text, idx + 1).end()
+                continue
+            if idx < end and text[idx] == '}':
+                idx += 1
+                break
+            raise RequestBodyError("Invalid JSON in request body")
+
+    if _WHITESPACE.match(text, idx).end() != end:
+        raise RequestBodyError("Invalid JSON in request body")
+
+    if schema is not None:
+        schema.validate_members(members.keys())
+
+    return RequestBody(members, len(body))
+
+
+def _parse_key(text: str, idx: int) -> Tuple[str, int]:
+    """Parse an object key followed by its colon"""
+    if idx >= len(text) or text[idx] != '"':
+        raise RequestBodyError("Invalid JSON in request body")
+    try:
+        name, idx = scanstring(text, idx + 1)
+    except ValueError:
+        raise RequestBodyError("Invalid JSON in request body")
+    idx = _WHITESPACE.match(text, idx).end()
+    if idx >= len(text) or text[idx] != ':':
+        raise RequestBodyError("Invalid JSON in request body")
+    return name, idx + 1
+
+
+def _parse_value(text: str, idx: int, name: str, schema: Optional[CompiledSchema],
+                 lazy_threshold: int) -> Tuple[Any, int]:
+    """Parse and validate a single member value"""
+    if text[idx] == '"':
+        match = _STRING.match(text, idx)
+        if match is None:
+            raise RequestBodyError("Invalid JSON in request body")
+        start, stop = match.span()
+        prop = schema.properties.get(name) if schema is not None else None
+        if stop - start - 2 > lazy_threshold and (prop is None or not prop.needs_value):
+            view = LazyText(text, start, stop)
+            if schema is not None:
+                schema.validate_lazy(name, view)
+            return view, stop
+        try:
+            value, _ = scanstring(text, start + 1)
+        except ValueError:
+            raise RequestBodyError("Invalid JSON in request body")
+    else:
+        try:
+            value, stop = _DECODER.raw_decode(text, idx)
+        except ValueError:
+            raise RequestBodyError("Invalid JSON in request body")
+
+    if schema is not None:
+        schema.validate_member(name, value)
+    return value, stop
+
+
+def read_json_body(source: Any, schema: Optional[CompiledSchema] = None,
+                   max_bytes: int = DEFAULT_MAX_BODY_BYTES) -> RequestBody:
+    """Read a bounded request body and parse it against a compiled schema"""
+    return parse_json_body(read_body(source, max_bytes=max_bytes), schema)
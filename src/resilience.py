@@ -0,0 +1,454 @@
+"""
+Resilience module for Microsoft 365 Copilot Plugin
+Per-dependency bulkheads, circuit breakers and deadline-bounded retries
+"""
+
+import logging
+import os
+import random
+import threading
+import time
+import urllib.error
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .deadline import DeadlineExceeded, bounded_timeout, check_deadline, remaining
+
+logger = logging.getLogger('copilot_plugin')
+
+# Circuit breaker states
+STATE_CLOSED = 'closed'
+STATE_OPEN = 'open'
+STATE_HALF_OPEN = 'half_open'
+
+# Downstream status codes worth retrying
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+# Dependency names by downstream host; suffix entries start with a dot
+DEPENDENCY_HOSTS: Dict[str, str] = {
+    'graph.microsoft.com': 'graph',
+    'api.synapse.azure.com': 'synapse',
+    'api.cognitive.microsoft.com': 'form_recognizer',
+    '.vault.azure.net': 'key_vault',
+}
+
+
+class DependencyUnavailable(Exception):
+    """Raised when a call is rejected to protect a dependency or its callers"""
+    status_code = 503
+
+    def __init__(self, dependency: str, message: str):
+        super().__init__(message)
+        self.dependency = dependency
+
+
+class CircuitOpenError(DependencyUnavailable):
+    """Raised when the dependency's circuit is open"""
+
+    def __init__(self, dependency: str):
+        super().__init__(dependency, f"Circuit open for {dependency}")
+
+
+class BulkheadFullError(DependencyUnavailable):
+    """Raised when no concurrency slot for the dependency frees up in time"""
+
+    def __init__(self, dependency: str):
+        super().__init__(dependency, f"Too many concurrent calls to {dependency}")
+
+
+def dependency_for_url(url: str) -> Optional[str]:
+    """Dependency name for a downstream URL, if its host is known"""
+    host = (urlsplit(url).hostname or '').lower()
+    for pattern, name in DEPENDENCY_HOSTS.items():
+        if host == pattern or (pattern.startswith('.') and host.endswith(pattern)):
+            return name
+    return None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Whether a failed call may succeed on retry
+
+    Connection failures, timeouts and throttling or 5xx responses are
+    retryable. Rejections by this module and spent deadlines are not.
+    """
+    if isinstance(error, (DependencyUnavailable, DeadlineExceeded)):
+        return False
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code in RETRYABLE_STATUS_CODES
+    status_code = getattr(error, 'status_code', None)
+    if status_code is None:
+        status_code = getattr(getattr(error, 'response', None), 'status_code', None)
+    if status_code is not None:
+        return status_code in RETRYABLE_STATUS_CODES
+    return isinstance(error, (ConnectionError, TimeoutError, OSError))
+
+
+class Bulkhead:
+    """
+    Concurrency slots for one dependency
+
+    Plugin business logic runs on executor threads, so slots are a thread
+    semaphore. Callers wait at most max_wait, and never past the request
+    deadline, before the call is rejected.
+    """
+
+    def __init__(self, name: str, limit: int, max_wait: float = 1.0):
+        self.name = name
+        self.limit = limit
+        self.max_wait = max_wait
+        self._semaphore = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.rejected = 0
+
+    @contextmanager
+    def acquire(self) -> Iterator[None]:
+        """
+        Hold a concurrency slot for a call
+
+        Raises:
+            BulkheadFullError: If no slot frees up in time
+        """
+        if not self._semaphore.acquire(timeout=bounded_timeout(self.max_wait)):
+            with self._lock:
+                self.rejected += 1
+            raise BulkheadFullError(self.name)
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+            self._semaphore.release()
+
+
+class CircuitBreaker:
+    """
+    Failure-rate and latency circuit breaker over a sliding window of calls
+
+    The circuit opens when, over the last window_size calls (at least
+    minimum_calls), the failure rate or the rate of calls slower than
+    slow_call_seconds reaches its threshold. After open_seconds it lets
+    half_open_calls trial calls through; the circuit closes if all succeed
+    in time and opens again on the first bad one.
+    """
+
+    def __init__(self, name: str, failure_rate_threshold: float = 0.5,
+                 slow_call_seconds: float = 5.0, slow_call_rate_threshold: float = 0.8,
+                 window_size: int = 20, minimum_calls: int = 10,
+                 open_seconds: float = 30.0, half_open_calls: int = 3,
+                 on_state_change: Optional[Callable[[str, str, str], None]] = None):
+        """
+        Initialize circuit breaker
+
+        Args:
+            name: Dependency name
+            failure_rate_threshold: Failure rate that opens the circuit
+            slow_call_seconds: Duration above which a call counts as slow
+            slow_call_rate_threshold: Slow call rate that opens the circuit
+            window_size: Number of recent calls considered
+            minimum_calls: Calls required before rates are evaluated
+            open_seconds: Time the circuit stays open before trial calls
+            half_open_calls: Successful trial calls required to close
+            on_state_change: Called with (name, old_state, new_state)
+        """
+        self.name = name
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_seconds = slow_call_seconds
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.minimum_calls = minimum_calls
+        self.open_seconds = open_seconds
+        self.half_open_calls = half_open_calls
+        self.on_state_change = on_state_change
+        self._window: Deque[Tuple[bool, bool]] = deque(maxlen=window_size)
+        self._lock = threading.Lock()
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._trials = 0
+        self._trial_successes = 0
+        self.times_opened = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance()
+            return self._state
+
+    def _advance(self):
+        if self._state == STATE_OPEN and time.monotonic() - self._opened_at >= self.open_seconds:
+            self._transition(STATE_HALF_OPEN)
+
+    def _transition(self, state: str):
+        old_state, self._state = self._state, state
+        if state == STATE_OPEN:
+            self._opened_at = time.monotonic()
+            self.times_opened += 1
+        elif state == STATE_HALF_OPEN:
+            self._trials = 0
+            self._trial_successes = 0
+        else:
+            self._window.clear()
+        if self.on_state_change:
+            self.on_state_change(self.name, old_state, state)
+
+    def allow(self) -> bool:
+        """Whether a call may proceed; trial calls are counted in half-open state"""
+        with self._lock:
+            self._advance()
+            if self._state == STATE_CLOSED:
+                return True
+            if self._state == STATE_HALF_OPEN and self._trials < self.half_open_calls:
+                self._trials += 1
+                return True
+            return False
+
+    def record(self, success: bool, duration: float):
+        """Record the outcome of a call let through by allow()"""
+        slow = duration >= self.slow_call_seconds
+        with self._lock:
+            if self._state == STATE_HALF_OPEN:
+                if not success or slow:
+                    self._transition(STATE_OPEN)
+                else:
+                    self._trial_successes += 1
+                    if self._trial_successes >= self.half_open_calls:
+                        self._transition(STATE_CLOSED)
+                return
+            if self._state != STATE_CLOSED:
+                return
+
+            self._window.append((not success, slow))
+            if len(self._window) < self.minimum_calls:
+                return
+            failure_rate, slow_rate = self._rates()
+            if failure_rate >= self.failure_rate_threshold or slow_rate >= self.slow_call_rate_threshold:
+                self._transition(STATE_OPEN)
+
+    def _rates(self) -> Tuple[float, float]:
+        if not self._window:
+            return 0.0, 0.0
+        count = len(self._window)
+        failures = sum(1 for failed, _ in self._window if failed)
+        slow = sum(1 for _, is_slow in self._window if is_slow)
+        return failures / count, slow / count
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state and window rates"""
+        with self._lock:
+            self._advance()
+            failure_rate, slow_rate = self._rates()
+            return {
+                'state': self._state,
+                'calls': len(self._window),
+                'failure_rate': round(failure_rate, 3),
+                'slow_call_rate': round(slow_rate, 3),
+                'times_opened': self.times_opened
+            }
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Retry schedule with full-jitter exponential backoff
+
+    The delay before retry n is uniform in [0, min(max_delay, base_delay * 2**n)].
+    A retry is skipped when its delay would not leave time on the deadline.
+    """
+    attempts: int = 3
+    base_delay: float = 0.1
+    max_delay: float = 2.0
+
+    def delay(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+# Concurrent call limits per dependency, overridable through
+# DOWNSTREAM_CONCURRENCY_<NAME>
+DEFAULT_DOWNSTREAM_LIMITS: Dict[str, int] = {
+    'key_vault': 10,
+    'graph': 20,
+    'synapse': 4,
+    'form_recognizer': 8,
+}
+
+# Concurrent call limit for dependencies without an explicit entry
+DEFAULT_DOWNSTREAM_LIMIT = 10
+
+# Breaker and retry settings per dependency; others use the defaults
+DEFAULT_DEPENDENCY_SETTINGS: Dict[str, Dict[str, Any]] = {
+    'key_vault': {'slow_call_seconds': 2.0},
+    'graph': {'slow_call_seconds': 5.0},
+    'synapse': {'slow_call_seconds': 20.0, 'open_seconds': 60.0},
+    'form_recognizer': {'slow_call_seconds': 15.0},
+}
+
+
+class Dependency:
+    """Bulkhead, circuit breaker and retry policy guarding one downstream"""
+
+    def __init__(self, name: str, bulkhead: Bulkhead, breaker: CircuitBreaker,
+                 retry: Optional[RetryPolicy] = None,
+                 retryable: Callable[[BaseException], bool] = is_retryable):
+        self.name = name
+        self.bulkhead = bulkhead
+        self.breaker = breaker
+        self.retry = retry or RetryPolicy()
+        self.retryable = retryable
+        self.retries = 0
+
+    def call(self, fn: Callable[..., Any], *args, retry: bool = True, **kwargs) -> Any:
+        """
+        Call the dependency through its bulkhead and circuit breaker
+
+        Retryable failures are retried with jittered backoff while attempts
+        and the request deadline allow. Calls that are not safe to repeat,
+        such as non-idempotent writes, pass retry=False and are attempted once.
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+            BulkheadFullError: If no concurrency slot frees up in time
+            DeadlineExceeded: If the request deadline passes before a call starts
+        """
+        attempt = 0
+        while True:
+            check_deadline(self.name)
+            try:
+                return self._attempt(fn, args, kwargs)
+            except Exception as e:
+                attempt += 1
+                if not retry or attempt >= self.retry.attempts or not self.retryable(e):
+                    raise
+                delay = self.retry.delay(attempt - 1)
+                left = remaining()
+                if left is not None and delay >= left:
+                    raise
+                logger.info(f"Retrying {self.name} in {delay * 1000:.0f} ms after: {e}")
+                self.retries += 1
+                time.sleep(delay)
+
+    def _attempt(self, fn: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        with self.bulkhead.acquire():
+            if not self.breaker.allow():
+                raise CircuitOpenError(self.name)
+            start_time = time.monotonic()
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                # Errors the caller caused do not count against the dependency
+                self.breaker.record(not self.retryable(e), time.monotonic() - start_time)
+                raise
+            self.breaker.record(True, time.monotonic() - start_time)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        stats = self.breaker.stats()
+        stats.update({
+            'in_flight': self.bulkhead.in_flight,
+            'limit': self.bulkhead.limit,
+            'rejected': self.bulkhead.rejected,
+            'retries': self.retries
+        })
+        return stats
+
+
+class ResilienceRegistry:
+    """
+    Dependencies by name, created on first use
+
+    Bulkhead limits follow the per-dependency concurrency limits, including
+    the DOWNSTREAM_CONCURRENCY_<NAME> environment overrides. Circuit state
+    changes are tracked as telemetry events as they happen; export() reports
+    the state of every dependency.
+    """
+
+    def __init__(self, telemetry: Any = None, limits: Optional[Dict[str, int]] = None,
+                 settings: Optional[Dict[str, Dict[str, Any]]] = None,
+                 retry: Optional[RetryPolicy] = None, max_wait: float = 1.0):
+        """
+        Initialize resilience registry
+
+        Args:
+            telemetry: TelemetryManager for state changes and exports
+            limits: Concurrency limits per dependency
+            settings: CircuitBreaker keyword arguments per dependency
+            retry: Retry policy shared by all dependencies
+            max_wait: Longest wait for a bulkhead slot in seconds
+        """
+        self.telemetry = telemetry
+        self.limits = DEFAULT_DOWNSTREAM_LIMITS if limits is None else limits
+        self.settings = DEFAULT_DEPENDENCY_SETTINGS if settings is None else settings
+        self.retry = retry or RetryPolicy()
+        self.max_wait = max_wait
+        self._dependencies: Dict[str, Dependency] = {}
+        self._lock = threading.Lock()
+
+    def limit_for(self, name: str) -> int:
+        """Bulkhead limit for a dependency, honouring the environment override"""
+        override = os.getenv(f"DOWNSTREAM_CONCURRENCY_{name.upper()}")
+        if override:
+            return max(int(override), 1)
+        return self.limits.get(name, DEFAULT_DOWNSTREAM_LIMIT)
+
+    def get(self, name: str) -> Dependency:
+        """Get or create the guard for a dependency"""
+        dependency = self._dependencies.get(name)
+        if dependency is None:
+            with self._lock:
+                dependency = self._dependencies.get(name)
+                if dependency is None:
+                    dependency = Dependency(
+                        name,
+                        Bulkhead(name, self.limit_for(name), self.max_wait),
+                        CircuitBreaker(name, on_state_change=self._state_changed,
+                                       **self.settings.get(name, {})),
+                        self.retry
+                    )
+                    self._dependencies[name] = dependency
+        return dependency
+
+    def call(self, name: str, fn: Callable[..., Any], *args, retry: bool = True, **kwargs) -> Any:
+        """Call fn guarded by the named dependency, retrying transient failures unless retry is False"""
+        return self.get(name).call(fn, *args, retry=retry, **kwargs)
+
+    def _state_changed(self, name: str, old_state: str, new_state: str):
+        log = logger.warning if new_state == STATE_OPEN else logger.info
+        log(f"Circuit for {name} changed from {old_state} to {new_state}")
+        if self.telemetry:
+            self.telemetry.track_event(
+                'circuit_state_changed',
+                properties={'dependency': name, 'from_state': old_state, 'to_state': new_state}
+            )
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """Stats for every dependency used so far"""
+        return {name: dependency.stats() for name, dependency in list(self._dependencies.items())}
+
+    def export(self, telemetry: Any = None) -> Dict[str, Dict[str, Any]]:
+        """Report dependency state to telemetry and return the snapshot"""
+        telemetry = telemetry or self.telemetry
+        snapshot = self.snapshot()
+        if telemetry:
+            for name, stats in snapshot.items():
+                telemetry.track_event(
+                    'dependency_resilience',
+                    properties={'dependency': name, 'state': stats['state']},
+                    measurements={key: value for key, value in stats.items() if key != 'state'}
+                )
+        return snapshot
+
+
+# Global registry instance
+_registry_instance: Optional[ResilienceRegistry] = None
+
+
+def get_resilience_registry() -> ResilienceRegistry:
+    """Get or create the global resilience registry"""
+    global _registry_instance
+    if _registry_instance is None:
+        _registry_instance = ResilienceRegistry()
+    return _registry_instance
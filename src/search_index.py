@@ -0,0 +1,413 @@
+"""
+Search index module for Microsoft 365 Copilot Plugin
+In-memory BM25F index with bitmap facet filters and maintained counters
+"""
+
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Terms dropped by the tokenizer
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'how', 'in', 'is',
+    'it', 'of', 'on', 'or', 'the', 'to', 'what', 'with'
+})
+
+# Field weights used by the knowledge hub
+DEFAULT_FIELD_WEIGHTS: Dict[str, float] = {'title': 3.0, 'topic_categories': 2.0, 'body': 1.0}
+
+# Removed document slots, relative to live documents, at which numbers are compacted
+COMPACT_TOMBSTONE_RATIO = 0.5
+
+# Removed document slots always tolerated before compacting
+COMPACT_MIN_TOMBSTONES = 64
+
+_TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lower-case alphanumeric terms without stopwords; lists are joined"""
+    if not text:
+        return []
+    if not isinstance(text, str):
+        text = ' '.join(str(part) for part in text)
+    return [term for term in _TOKEN_PATTERN.findall(text.lower()) if term not in STOPWORDS]
+
+
+class Bitmap:
+    """
+    Growable bitset over document numbers
+
+    Membership tests are a byte lookup; intersections and unions convert
+    to Python integers and run at C speed over the whole set.
+    """
+
+    __slots__ = ('bits',)
+
+    def __init__(self, bits: Optional[bytearray] = None):
+        self.bits = bits if bits is not None else bytearray()
+
+    @classmethod
+    def of(cls, numbers: Iterable[int]) -> 'Bitmap':
+        bitmap = cls()
+        for number in numbers:
+            bitmap.add(number)
+        return bitmap
+
+    def add(self, number: int):
+        index = number >> 3
+        if index >= len(self.bits):
+            self.bits.extend(bytes(index - len(self.bits) + 1))
+        self.bits[index] |= 1 << (number & 7)
+
+    def discard(self, number: int):
+        index = number >> 3
+        if index < len(self.bits):
+            self.bits[index] &= ~(1 << (number & 7)) & 0xFF
+
+    def __contains__(self, number: int) -> bool:
+        index = number >> 3
+        return index < len(self.bits) and (self.bits[index] >> (number & 7)) & 1 == 1
+
+    def _as_int(self) -> int:
+        return int.from_bytes(self.bits, 'little')
+
+    @classmethod
+    def _from_int(cls, value: int) -> 'Bitmap':
+        return cls(bytearray(value.to_bytes((value.bit_length() + 7) >> 3, 'little')))
+
+    def __and__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap._from_int(self._as_int() & other._as_int())
+
+    def __or__(self, other: 'Bitmap') -> 'Bitmap':
+        return Bitmap._from_int(self._as_int() | other._as_int())
+
+    def __len__(self) -> int:
+        return self._as_int().bit_count()
+
+    def __iter__(self) -> Iterator[int]:
+        for index, byte in enumerate(self.bits):
+            while byte:
+                low = byte & -byte
+                yield (index << 3) + low.bit_length() - 1
+                byte ^= low
+
+
+class SearchIndex:
+    """
+    Field-weighted BM25 (BM25F) index
+
+    Documents are numbered densely as they are added. Each term maps to the
+    documents containing it with per-field term frequencies, so scoring
+    only visits documents that match a query term. Facet values (such as
+    content type or access level) are kept as bitmaps, and a filter is the
+    intersection of the unions of the selected values, checked per candidate
+    inside the scoring loop. Facet counts and the live document count are
+    maintained on every write, so reading them never scans the index.
+    Removed and replaced documents leave empty slots behind; once they
+    outnumber a fraction of the live documents, the live documents are
+    renumbered densely in their original order.
+
+    Documents may carry an ACL of principals (users or groups) allowed to
+    read them. Each principal maps to a bitmap of its documents, so a
+    caller's readable set is the union of their principals' bitmaps and
+    security trimming is one more membership test in the scoring loop
+    rather than a permission check per result.
+    """
+
+    def __init__(self, field_weights: Optional[Mapping[str, float]] = None,
+                 facets: Sequence[str] = ('content_type', 'access_level'),
+                 k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize search index
+
+        Args:
+            field_weights: Weight per indexed text field
+            facets: Document attributes available as filters and counts
+            k1: BM25 term frequency saturation
+            b: BM25 length normalization
+        """
+        self.field_weights = dict(DEFAULT_FIELD_WEIGHTS if field_weights is None else field_weights)
+        self.fields = tuple(self.field_weights)
+        self.facets = tuple(facets)
+        self.k1 = k1
+        self.b = b
+
+        self._postings: Dict[str, Dict[int, Tuple[int, ...]]] = {}
+        self._lengths: List[Optional[Tuple[int, ...]]] = []
+        self._terms: List[Optional[Tuple[str, ...]]] = []
+        self._total_lengths = [0] * len(self.fields)
+        self._documents: List[Optional[Any]] = []
+        self._facet_values: List[Optional[Tuple[str, ...]]] = []
+        self._numbers: Dict[str, int] = {}
+        self._facet_bitmaps: Dict[str, Dict[str, Bitmap]] = {facet: {} for facet in self.facets}
+        self._facet_counts: Dict[str, Counter] = {facet: Counter() for facet in self.facets}
+        self._facet_labels: Dict[str, Dict[str, str]] = {facet: {} for facet in self.facets}
+        self._acls: List[Optional[Tuple[str, ...]]] = []
+        self._acl_bitmaps: Dict[str, Bitmap] = {}
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._numbers)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self._numbers
+
+    @staticmethod
+    def _facet_key(value: Any) -> str:
+        return str(value).strip().lower()
+
+    def upsert(self, doc_id: str, fields: Mapping[str, Any], facets: Optional[Mapping[str, Any]] = None,
+               document: Any = None, acl: Optional[Iterable[str]] = None) -> int:
+        """
+        Add or replace a document
+
+        Args:
+            doc_id: Stable document identifier
+            fields: Text per indexed field; lists are joined
+            facets: Value per facet
+            document: Object returned with search hits, defaults to doc_id
+            acl: Principals allowed to read the document; without one it is
+                 hidden from every trimmed search
+
+        Returns:
+            Document number assigned to this version
+        """
+        term_fields: Dict[str, List[int]] = {}
+        lengths = []
+        for position, field_name in enumerate(self.fields):
+            terms = tokenize(fields.get(field_name))
+            lengths.append(len(terms))
+            for term in terms:
+                counts = term_fields.get(term)
+                if counts is None:
+                    counts = term_fields[term] = [0] * len(self.fields)
+                counts[position] += 1
+        labels = [str((facets or {}).get(facet, '')).strip() for facet in self.facets]
+        facet_values = tuple(label.lower() for label in labels)
+        principals = tuple(dict.fromkeys(acl or ()))
+
+        with self._lock:
+            self._remove(doc_id)
+            number = len(self._documents)
+            self._documents.append(doc_id if document is None else document)
+            self._lengths.append(tuple(lengths))
+            self._terms.append(tuple(term_fields))
+            self._facet_values.append(facet_values)
+            self._acls.append(principals)
+            self._numbers[doc_id] = number
+            for position, length in enumerate(lengths):
+                self._total_lengths[position] += length
+            for term, counts in term_fields.items():
+                self._postings.setdefault(term, {})[number] = tuple(counts)
+            for facet, value, label in zip(self.facets, facet_values, labels):
+                self._facet_labels[facet].setdefault(value, label)
+                bitmap = self._facet_bitmaps[facet].get(value)
+                if bitmap is None:
+                    bitmap = self._facet_bitmaps[facet][value] = Bitmap()
+                bitmap.add(number)
+                self._facet_counts[facet][value] += 1
+            for principal in principals:
+                bitmap = self._acl_bitmaps.get(principal)
+                if bitmap is None:
+                    bitmap = self._acl_bitmaps[principal] = Bitmap()
+                bitmap.add(number)
+            if self._compact_due():
+                self._compact()
+                number = self._numbers[doc_id]
+            return number
+
+    def remove(self, doc_id: str) -> bool:
+        """
+        Remove a document
+
+        Returns:
+            Whether the document was indexed
+        """
+        with self._lock:
+            removed = self._remove(doc_id)
+            if removed and self._compact_due():
+                self._compact()
+            return removed
+
+    def _remove(self, doc_id: str) -> bool:
+        number = self._numbers.pop(doc_id, None)
+        if number is None:
+            return False
+        for position, length in enumerate(self._lengths[number]):
+            self._total_lengths[position] -= length
+        for term in self._terms[number]:
+            docs = self._postings[term]
+            del docs[number]
+            if not docs:
+                del self._postings[term]
+        for facet, value in zip(self.facets, self._facet_values[number]):
+            self._facet_bitmaps[facet][value].discard(number)
+            counts = self._facet_counts[facet]
+            counts[value] -= 1
+            if counts[value] <= 0:
+                del counts[value]
+        for principal in self._acls[number]:
+            self._acl_bitmaps[principal].discard(number)
+        self._documents[number] = None
+        self._lengths[number] = None
+        self._terms[number] = None
+        self._facet_values[number] = None
+        self._acls[number] = None
+        return True
+
+    def _compact_due(self) -> bool:
+        tombstones = len(self._documents) - len(self._numbers)
+        return tombstones > max(COMPACT_MIN_TOMBSTONES, COMPACT_TOMBSTONE_RATIO * len(self._numbers))
+
+    def _compact(self):
+        """Renumber live documents densely, keeping their order"""
+        live = sorted(self._numbers.items(), key=lambda item: item[1])
+        renumbered = {old: new for new, (_, old) in enumerate(live)}
+        self._documents = [self._documents[old] for _, old in live]
+        self._lengths = [self._lengths[old] for _, old in live]
+        self._terms = [self._terms[old] for _, old in live]
+        self._facet_values = [self._facet_values[old] for _, old in live]
+        self._acls = [self._acls[old] for _, old in live]
+        self._numbers = {doc_id: new for new, (doc_id, _) in enumerate(live)}
+        for term, docs in self._postings.items():
+            self._postings[term] = {renumbered[number]: counts for number, counts in docs.items()}
+
+        self._facet_bitmaps = {facet: {} for facet in self.facets}
+        self._acl_bitmaps = {}
+        for number, (facet_values, principals) in enumerate(zip(self._facet_values, self._acls)):
+            for facet, value in zip(self.facets, facet_values):
+                self._facet_bitmaps[facet].setdefault(value, Bitmap()).add(number)
+            for principal in principals:
+                self._acl_bitmaps.setdefault(principal, Bitmap()).add(number)
+
+    def get(self, doc_id: str) -> Any:
+        """Stored document for an identifier, or None"""
+        with self._lock:
+            number = self._numbers.get(doc_id)
+            return None if number is None else self._documents[number]
+
+    def items(self) -> List[Tuple[str, Any]]:
+        """(doc_id, document) of every live document"""
+        with self._lock:
+            return [(doc_id, self._documents[number]) for doc_id, number in self._numbers.items()]
+
+    def acl(self, doc_id: str) -> Tuple[str, ...]:
+        """Principals a document's ACL grants; empty for unknown documents"""
+        with self._lock:
+            number = self._numbers.get(doc_id)
+            return () if number is None else self._acls[number]
+
+    def can_read(self, doc_id: str, principals: Iterable[str]) -> bool:
+        """Whether a document's ACL grants any of the principals"""
+        granted = set(principals)
+        with self._lock:
+            number = self._numbers.get(doc_id)
+            return number is not None and any(principal in granted for principal in self._acls[number])
+
+    def facet_counts(self, facet: str) -> Dict[str, int]:
+        """Live document count per value of a facet, keyed by its first-seen spelling"""
+        labels = self._facet_labels[facet]
+        return {labels[value]: count for value, count in self._facet_counts[facet].items()}
+
+    def facet_filter(self, selections: Mapping[str, Optional[Iterable[str]]]) -> Optional[Bitmap]:
+        """
+        Bitmap of documents matching every facet selection
+
+        A selection of None or containing 'all' leaves that facet
+        unfiltered. Returns None when nothing is filtered.
+        """
+        result: Optional[Bitmap] = None
+        for facet, values in selections.items():
+            if values is None:
+                continue
+            keys = {self._facet_key(value) for value in values}
+            if 'all' in keys:
+                continue
+            selected = Bitmap()
+            for key in keys:
+                bitmap = self._facet_bitmaps[facet].get(key)
+                if bitmap is not None:
+                    selected = selected | bitmap
+            result = selected if result is None else result & selected
+        return result
+
+    def readable_by(self, principals: Iterable[str]) -> Bitmap:
+        """Bitmap of documents whose ACL grants any of the principals"""
+        readable = Bitmap()
+        for principal in set(principals):
+            bitmap = self._acl_bitmaps.get(principal)
+            if bitmap is not None:
+                readable = readable | bitmap
+        return readable
+
+    def search(self, query: str, limit: int = 10,
+               filters: Optional[Mapping[str, Optional[Iterable[str]]]] = None,
+               allowed: Optional[Bitmap] = None,
+               principals: Optional[Iterable[str]] = None) -> List[Tuple[Any, float]]:
+        """
+        Rank documents for a query
+
+        Args:
+            query: Free-text query
+            limit: Number of hits returned
+            filters: Facet selections, e.g. {'content_type': ['Checklist']}
+            allowed: Additional bitmap of document numbers hits must be in
+            principals: Caller's principals; hits are trimmed to documents
+                        their ACLs grant. None searches untrimmed
+
+        Returns:
+            (document, score) pairs, best first
+        """
+        if limit <= 0:
+            return []
+        with self._lock:
+            mask = self.facet_filter(filters or {})
+            if allowed is not None:
+                mask = allowed if mask is None else mask & allowed
+            if principals is not None:
+                readable = self.readable_by(principals)
+                mask = readable if mask is None else mask & readable
+
+            terms = list(dict.fromkeys(tokenize(query)))
+            if not terms:
+                candidates = iter(self._numbers.values())
+                if mask is not None:
+                    candidates = (n for n in candidates if n in mask)
+                return [(self._documents[n], 0.0) for n in heapq.nsmallest(limit, candidates)]
+
+            scores = self._score(terms, mask)
+            top = heapq.nlargest(limit, scores.items(), key=lambda item: (item[1], -item[0]))
+            return [(self._documents[number], score) for number, score in top]
+
+    def _score(self, terms: List[str], mask: Optional[Bitmap]) -> Dict[int, float]:
+        count = len(self._numbers)
+        k1 = self.k1
+        weights = [self.field_weights[name] for name in self.fields]
+        # Per-field length normalization: w_f / (1 - b + b * len_f / avg_len_f)
+        averages = [total / count if count else 0.0 for total in self._total_lengths]
+        b = self.b
+        lengths = self._lengths
+        norm_cache: Dict[int, Tuple[float, ...]] = {}
+
+        scores: Dict[int, float] = {}
+        for term in terms:
+            docs = self._postings.get(term)
+            if not docs:
+                continue
+            idf = math.log(1 + (count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for number, counts in docs.items():
+                if mask is not None and number not in mask:
+                    continue
+                norms = norm_cache.get(number)
+                if norms is None:
+                    norms = norm_cache[number] = tuple(
+                        weight / (1 - b + b * length / average) if average else weight
+                        for weight, length, average in zip(weights, lengths[number], averages)
+                    )
+                tf = sum(c * n for c, n in zip(counts, norms) if c)
+                scores[number] = scores.get(number, 0.0) + idf * tf * (k1 + 1) / (tf + k1)
+        return scores
@@ -0,0 +1,164 @@
+"""
+Security trimming module for Microsoft 365 Copilot Plugin
+Caller principal propagation and cached group memberships for ACL-trimmed search
+"""
+
+import base64
+import json
+import logging
+import os
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Iterator, Mapping, Optional
+
+from .cache import TTLCache
+from .coalescing import SingleFlight
+
+logger = logging.getLogger('copilot_plugin')
+
+# Base64-encoded claims of the signed-in caller, set by App Service authentication
+CLIENT_PRINCIPAL_HEADER = 'X-MS-CLIENT-PRINCIPAL'
+
+# Claim types carrying the caller object id and tenant id
+OBJECT_ID_CLAIMS = ('http://schemas.microsoft.com/identity/claims/objectidentifier', 'oid')
+TENANT_ID_CLAIMS = ('http://schemas.microsoft.com/identity/claims/tenantid', 'tid')
+
+# Principal every caller holds, authenticated or not
+EVERYONE = 'everyone'
+
+# Seconds a resolved group membership is reused
+DEFAULT_MEMBERSHIP_TTL = 300.0
+
+_current_principal: ContextVar[Optional[str]] = ContextVar('copilot_plugin_principal', default=None)
+
+
+def current_principal() -> Optional[str]:
+    """Object id of the current caller, if known"""
+    return _current_principal.get()
+
+
+@contextmanager
+def principal_scope(principal: Optional[str]) -> Iterator[Optional[str]]:
+    """
+    Run a block on behalf of a caller
+
+    Usage:
+        with principal_scope(user_id):
+            service.search_documents(...)
+    """
+    token = _current_principal.set(principal)
+    try:
+        yield principal
+    finally:
+        _current_principal.reset(token)
+
+
+def easy_auth_enabled() -> bool:
+    """Whether App Service authentication is configured in front of the app"""
+    return os.getenv('EASYAUTH_ENABLED', 'false').lower() == 'true'
+
+
+def request_claims(headers: Optional[Mapping[str, Any]]) -> Dict[str, str]:
+    """
+    Claims of the caller validated by App Service authentication
+
+    App Service authentication validates the caller's token and replaces any
+    X-MS-CLIENT-PRINCIPAL headers sent by the client, so the header is only
+    trusted when EASYAUTH_ENABLED confirms authentication is configured.
+    Otherwise no claims are returned and the caller is anonymous.
+    """
+    if not headers or not easy_auth_enabled():
+        return {}
+    value = headers.get(CLIENT_PRINCIPAL_HEADER)
+    if not isinstance(value, str) or not value.strip():
+        return {}
+    try:
+        payload = json.loads(base64.b64decode(value, validate=True))
+    except ValueError:
+        logger.warning("Ignoring malformed client principal header")
+        return {}
+
+    claims: Dict[str, str] = {}
+    for claim in (payload.get('claims') if isinstance(payload, dict) else None) or []:
+        if isinstance(claim, dict) and isinstance(claim.get('typ'), str) and isinstance(claim.get('val'), str):
+            claims.setdefault(claim['typ'], claim['val'].strip())
+    return claims
+
+
+def request_principal(headers: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """Caller object id from the validated App Service authentication claims, if present"""
+    claims = request_claims(headers)
+    return next((claims[typ] for typ in OBJECT_ID_CLAIMS if claims.get(typ)), None)
+
+
+def request_tenant(headers: Optional[Mapping[str, Any]]) -> Optional[str]:
+    """
+    Caller tenant id for tenant-scoped data
+
+    Read from the validated App Service authentication claims, falling back
+    to the configured AZURE_TENANT_ID for single-tenant deployments. Request
+    headers the client controls are never used, so a caller cannot select
+    another tenant's entries.
+    """
+    claims = request_claims(headers)
+    tenant = next((claims[typ] for typ in TENANT_ID_CLAIMS if claims.get(typ)), None)
+    return tenant or os.getenv('AZURE_TENANT_ID') or None
+
+
+class GroupMembershipCache:
+    """
+    Per-user group memberships for security trimming
+
+    Resolving transitive memberships is a directory round trip, so results
+    are kept for ttl seconds and concurrent lookups for the same user share
+    one resolution. Every caller additionally holds EVERYONE and their own
+    object id, so documents can be granted to individual users.
+    """
+
+    def __init__(self, resolver: Callable[[str], Iterable[str]],
+                 ttl: float = DEFAULT_MEMBERSHIP_TTL, maxsize: int = 10000):
+        """
+        Initialize group membership cache
+
+        Args:
+            resolver: Returns the group ids a user belongs to
+            ttl: Seconds a membership is reused
+            maxsize: Maximum number of users kept
+        """
+        self.resolver = resolver
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+        self._flight = SingleFlight()
+
+    def principals(self, user_id: Optional[str]) -> FrozenSet[str]:
+        """
+        Principals a caller holds
+
+        Anonymous callers hold only EVERYONE. A failed lookup is not cached
+        and falls back to the caller's own id, so trimming fails closed.
+        """
+        if not user_id:
+            return frozenset((EVERYONE,))
+        cached = self._cache.get(user_id)
+        if cached is not None:
+            return cached
+        try:
+            principals, _ = self._flight.do(user_id, lambda: self._load(user_id))
+        except Exception as e:
+            logger.warning(f"Group membership lookup failed for {user_id}: {e}")
+            return frozenset((EVERYONE, user_id))
+        return principals
+
+    def _load(self, user_id: str) -> FrozenSet[str]:
+        principals = frozenset((EVERYONE, user_id, *self.resolver(user_id)))
+        self._cache.set(user_id, principals)
+        return principals
+
+    def invalidate(self, user_id: Optional[str] = None):
+        """Forget one user's memberships, or everyone's"""
+        if user_id is None:
+            self._cache.clear()
+        else:
+            self._cache.invalidate(user_id)
+
+    def stats(self) -> Mapping[str, int]:
+        return {'users': len(self._cache), 'hits': self._cache.hits, 'misses': self._cache.misses}
@@ -0,0 +1,401 @@
+"""
+Suggestions module for Microsoft 365 Copilot Plugin
+Prefix completions with precomputed top-k and sliding-window trending counters
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Callable, Deque, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Completions kept at every prefix node
+DEFAULT_TOP_K = 8
+
+# Items tracked per Space-Saving sketch
+DEFAULT_SKETCH_CAPACITY = 64
+
+# Distinct queries kept as suggestions, and the longest query suggested
+DEFAULT_QUERY_LOG_CAPACITY = 1000
+DEFAULT_MAX_QUERY_LENGTH = 80
+
+# Trending window in seconds and the panes it is counted in
+DEFAULT_TRENDING_WINDOW = 3600.0
+DEFAULT_TRENDING_PANES = 6
+
+
+def normalize_phrase(text: Any) -> str:
+    """Lower-case text with runs of whitespace collapsed; one trailing space is kept"""
+    text = str(text or '')
+    phrase = ' '.join(text.lower().split())
+    if phrase and text[-1:].isspace():
+        phrase += ' '
+    return phrase
+
+
+class _Node:
+    __slots__ = ('children', 'phrase', 'top')
+
+    def __init__(self):
+        self.children: Dict[str, '_Node'] = {}
+        self.phrase: Optional[int] = None
+        self.top: List[int] = []
+
+
+class CompletionTrie:
+    """
+    Character trie whose nodes hold their k best completions
+
+    Every node keeps the ids of the highest weighted phrases below it, so a
+    lookup walks the prefix and returns that node's list: O(prefix length)
+    regardless of how many phrases share the prefix. Raising a weight
+    updates the lists along the phrase's path in O(k) per node; lowering or
+    removing one recomputes them bottom-up from the children's lists.
+    Removed phrases free their id for the next new phrase.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        """
+        Initialize completion trie
+
+        Args:
+            k: Completions kept per node, the most a lookup can return
+        """
+        self.k = k
+        self.root = _Node()
+        self._phrases: List[str] = []
+        self._weights: List[float] = []
+        self._ids: Dict[str, int] = {}
+        self._free: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, phrase: str) -> bool:
+        return normalize_phrase(phrase).strip() in self._ids
+
+    def weight(self, phrase: str) -> float:
+        """Current weight of a phrase, 0 when absent"""
+        phrase_id = self._ids.get(normalize_phrase(phrase).strip())
+        return 0.0 if phrase_id is None else self._weights[phrase_id]
+
+    def _rank(self, phrase_id: int) -> Tuple[float, str]:
+        return -self._weights[phrase_id], self._phrases[phrase_id]
+
+    def add(self, phrase: str, weight: float = 1.0) -> float:
+        """
+        Add weight to a phrase; a phrase whose weight drops to 0 or below is removed
+
+        Returns:
+            The phrase's new weight
+        """
+        phrase = normalize_phrase(phrase).strip()
+        if not phrase or not weight:
+            return self.weight(phrase)
+
+        phrase_id = self._ids.get(phrase)
+        if phrase_id is None:
+            if weight < 0:
+                return 0.0
+            if self._free:
+                phrase_id = self._free.pop()
+                self._phrases[phrase_id], self._weights[phrase_id] = phrase, 0.0
+            else:
+                phrase_id = len(self._phrases)
+                self._phrases.append(phrase)
+                self._weights.append(0.0)
+            self._ids[phrase] = phrase_id
+        self._weights[phrase_id] += weight
+
+        path = [self.root]
+        for char in phrase:
+            node = path[-1].children.get(char)
+            if node is None:
+                node = path[-1].children[char] = _Node()
+            path.append(node)
+        path[-1].phrase = phrase_id
+
+        if self._weights[phrase_id] <= 0:
+            self._remove(phrase_id, path)
+        elif weight > 0:
+            self._promote(phrase_id, path)
+        else:
+            self._recompute(path)
+        return max(self._weights[phrase_id], 0.0)
+
+    def discard(self, phrase: str):
+        """Remove a phrase"""
+        weight = self.weight(phrase)
+        if weight:
+            self.add(phrase, -weight)
+
+    def _promote(self, phrase_id: int, path: List[_Node]):
+        rank = self._rank(phrase_id)
+        for node in path:
+            top = node.top
+            if phrase_id in top:
+                top.sort(key=self._rank)
+            elif len(top) < self.k or rank < self._rank(top[-1]):
+                top.append(phrase_id)
+                top.sort(key=self._rank)
+                del top[self.k:]
+
+    def _recompute(self, path: List[_Node]):
+        for node in reversed(path):
+            candidates = [] if node.phrase is None else [node.phrase]
+            for child in node.children.values():
+                candidates.extend(child.top)
+            node.top = sorted(candidates, key=self._rank)[:self.k]
+
+    def _remove(self, phrase_id: int, path: List[_Node]):
+        phrase = self._phrases[phrase_id]
+        del self._ids[phrase]
+        self._weights[phrase_id] = 0.0
+        path[-1].phrase = None
+        for depth in range(len(phrase), 0, -1):
+            node = path[depth]
+            if node.children or node.phrase is not None:
+                break
+            del path[depth - 1].children[phrase[depth - 1]]
+            path.pop()
+        self._recompute(path)
+        self._free.append(phrase_id)
+
+    def complete(self, prefix: str, limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Best completions of a prefix
+
+        Args:
+            prefix: Typed text; matched case-insensitively
+            limit: Completions returned, at most k
+
+        Returns:
+            (phrase, weight) pairs, highest weight first
+        """
+        node = self.root
+        for char in normalize_phrase(prefix):
+            node = node.children.get(char)
+            if node is None:
+                return []
+        top = node.top if limit is None else node.top[:limit]
+        return [(self._phrases[phrase_id], self._weights[phrase_id]) for phrase_id in top]
+
+
+class SuggestionIndex:
+    """
+    Completion tries partitioned by the principals allowed to see them
+
+    A phrase drawn from a trimmed document is only suggested to callers
+    who can read that document. Lookups walk one trie per caller
+    principal and merge their precomputed lists.
+    """
+
+    def __init__(self, k: int = DEFAULT_TOP_K):
+        self.k = k
+        self._tries: Dict[str, CompletionTrie] = {}
+        self._lock = threading.Lock()
+
+    def add(self, phrase: str, weight: float, principals: Iterable[str]):
+        """Add weight to a phrase for each principal; tries left empty are dropped"""
+        with self._lock:
+            for principal in set(principals):
+                trie = self._tries.get(principal)
+                if trie is None:
+                    if weight <= 0:
+                        continue
+                    trie = self._tries[principal] = CompletionTrie(self.k)
+                trie.add(phrase, weight)
+                if not trie:
+                    del self._tries[principal]
+
+    def complete(self, prefix: str, principals: Iterable[str], limit: int = DEFAULT_TOP_K) -> List[Tuple[str, float]]:
+        """Best completions visible to any of the principals, highest weight first"""
+        best: Dict[str, float] = {}
+        with self._lock:
+            for principal in set(principals):
+                trie = self._tries.get(principal)
+                if trie is None:
+                    continue
+                for phrase, weight in trie.complete(prefix, limit):
+                    if weight > best.get(phrase, 0.0):
+                        best[phrase] = weight
+        return sorted(best.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+
+class SpaceSaving:
+    """
+    Space-Saving heavy-hitters sketch
+
+    Tracks at most capacity items. An untracked item replaces one with the
+    smallest count and inherits that count as its error, so counts are
+    overestimates by at most error and every item occurring more than
+    total / capacity times is tracked. Items are kept in buckets by count
+    with the smallest count maintained, making each update O(1).
+    """
+
+    def __init__(self, capacity: int = DEFAULT_SKETCH_CAPACITY):
+        self.capacity = capacity
+        self.total = 0
+        self._counts: Dict[Hashable, int] = {}
+        self._errors: Dict[Hashable, int] = {}
+        self._buckets: Dict[int, Dict[Hashable, None]] = {}
+        self._min = 0
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, item: Hashable) -> Optional[Hashable]:
+        """
+        Count one occurrence of an item
+
+        Returns:
+            The item evicted to make room for it, if any
+        """
+        self.total += 1
+        victim = None
+        count = self._counts.get(item)
+        if count is None:
+            if len(self._counts) < self.capacity:
+                count = 0
+                self._errors[item] = 0
+                self._min = 0
+            else:
+                count = self._min
+                bucket = self._buckets[count]
+                victim = next(iter(bucket))
+                self._unlink(victim, count)
+                del self._counts[victim], self._errors[victim]
+                self._errors[item] = count
+        else:
+            self._unlink(item, count)
+
+        self._counts[item] = count + 1
+        self._buckets.setdefault(count + 1, {})[item] = None
+        if self._min == 0 or (self._min == count and count not in self._buckets):
+            self._min = count + 1
+        return victim
+
+    def _unlink(self, item: Hashable, count: int):
+        bucket = self._buckets[count]
+        del bucket[item]
+        if not bucket:
+            del self._buckets[count]
+
+    def counts(self) -> Dict[Hashable, int]:
+        """Estimated count of every tracked item"""
+        return dict(self._counts)
+
+    def count(self, item: Hashable) -> int:
+        """Estimated count of an item, 0 when untracked"""
+        return self._counts.get(item, 0)
+
+    def error(self, item: Hashable) -> int:
+        """Most the item's count may be overestimated by"""
+        return self._errors.get(item, 0)
+
+    def top(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """Most frequent tracked items, highest count first"""
+        return sorted(self._counts.items(), key=lambda item: -item[1])[:limit]
+
+
+class QueryLog:
+    """
+    Bounded log of successful queries feeding a SuggestionIndex
+
+    Queries are counted per phrase and principals in a Space-Saving sketch
+    of capacity entries, so the log and the suggestions it adds never
+    outgrow it. A query evicted from the sketch is withdrawn from the
+    suggestions. A tracked query is suggested with the occurrences counted
+    since it was tracked, its count minus its error, so a new query does
+    not inherit the weight of the one it displaced.
+    """
+
+    def __init__(self, suggestions: SuggestionIndex, capacity: int = DEFAULT_QUERY_LOG_CAPACITY,
+                 weight: float = 1.0, max_length: int = DEFAULT_MAX_QUERY_LENGTH):
+        """
+        Initialize query log
+
+        Args:
+            suggestions: Index the queries are suggested from
+            capacity: Distinct queries kept
+            weight: Suggestion weight per occurrence
+            max_length: Longest normalized query suggested, in characters
+        """
+        self.suggestions = suggestions
+        self.weight = weight
+        self.max_length = max_length
+        self._sketch = SpaceSaving(capacity)
+        self._suggested: Dict[Tuple[str, Tuple[str, ...]], float] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._suggested)
+
+    def add(self, query: str, principals: Iterable[str]) -> bool:
+        """
+        Count a successful query, visible to the principals
+
+        Returns:
+            Whether the query is suggested; empty and overlong queries are not
+        """
+        phrase = normalize_phrase(query).strip()
+        if not phrase or len(phrase) > self.max_length:
+            return False
+        key = (phrase, tuple(sorted(set(principals))))
+        with self._lock:
+            victim = self._sketch.add(key)
+            if victim is not None:
+                self.suggestions.add(victim[0], -self._suggested.pop(victim, 0.0), victim[1])
+            weight = (self._sketch.count(key) - self._sketch.error(key)) * self.weight
+            self.suggestions.add(phrase, weight - self._suggested.get(key, 0.0), key[1])
+            self._suggested[key] = weight
+        return True
+
+
+class TrendingCounter:
+    """
+    Heavy hitters over a sliding time window
+
+    The window is split into panes, each counted by its own Space-Saving
+    sketch. Updates only touch the current pane; expired panes are dropped
+    whole as the window slides, and a query sums the live panes.
+    """
+
+    def __init__(self, window: float = DEFAULT_TRENDING_WINDOW, panes: int = DEFAULT_TRENDING_PANES,
+                 capacity: int = DEFAULT_SKETCH_CAPACITY, clock: Callable[[], float] = time.monotonic):
+        """
+        Initialize trending counter
+
+        Args:
+            window: Seconds counted
+            panes: Panes the window is split into; more panes expire counts more smoothly
+            capacity: Items tracked per pane
+            clock: Source of the current time in seconds
+        """
+        self.pane_length = window / panes
+        self.panes = panes
+        self.capacity = capacity
+        self.clock = clock
+        self._panes: Deque[Tuple[int, SpaceSaving]] = deque()
+        self._lock = threading.Lock()
+
+    def _current(self) -> SpaceSaving:
+        pane = int(self.clock() // self.pane_length)
+        while self._panes and self._panes[0][0] <= pane - self.panes:
+            self._panes.popleft()
+        if not self._panes or self._panes[-1][0] != pane:
+            self._panes.append((pane, SpaceSaving(self.capacity)))
+        return self._panes[-1][1]
+
+    def add(self, item: Hashable):
+        """Count one occurrence of an item now"""
+        with self._lock:
+            self._current().add(item)
+
+    def top(self, limit: int = 10) -> List[Tuple[Hashable, int]]:
+        """Most frequent items in the window, highest count first"""
+        with self._lock:
+            self._current()
+            totals: Counter = Counter()
+            for _, sketch in self._panes:
+                totals.update(sketch.counts())
+        return sorted(totals.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
@@ -3,10 +3,13 @@ Telemetry module for Microsoft 365 Copilot Plugin
 Implements Application Insights integration with best practices for Azure monitoring
 """
 
+import inspect
 import logging
 import os
+import threading
 import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from typing import Any, Dict, Optional, Union
 from functools import wraps
@@ -43,6 +46,11 @@ class TelemetryManager:
         self.tracer = None
         self.logger = self._setup_logger()
         
+        # Flushes run on a single background thread so tracking never blocks callers
+        self._flush_executor: Optional[ThreadPoolExecutor] = None
+        self._flush_pending = False
+        self._flush_lock = threading.Lock()
+        
         if self.connection_string:
             self._initialize_telemetry()
         else:
@@ -104,6 +112,32 @@ class TelemetryManager:
             pass
         return None
     
+    def _schedule_flush(self):
+        """Schedule a background flush unless one is already pending"""
+        with self._flush_lock:
+            if self._flush_pending:
+                return
+            self._flush_pending = True
+            if self._flush_executor is None:
+                self._flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='telemetry-flush')
+        
+        try:
+            self._flush_executor.submit(self._flush)
+        except RuntimeError:
+            # Executor already shut down (interpreter exit); flush inline
+            self._flush()
+    
+    def _flush(self):
+        """Flush queued telemetry to Application Insights"""
+        with self._flush_lock:
+            self._flush_pending = False
+        
+        try:
+            if self.client:
+                self.client.flush()
+        except Exception as e:
+            self.logger.error(f"Failed to flush telemetry: {e}")
+    
     def track_event(self, name: str, properties: Optional[Dict[str, Any]] = None, 
                    measurements: Optional[Dict[str, Union[int, float]]] = None):
         """
@@ -130,7 +164,7 @@ class TelemetryManager:
                 default_properties.update(properties)
             
             self.client.track_event(name, default_properties, measurements)
-            self.client.flush()
+            self._schedule_flush()
             
         except Exception as e:
             self.logger.error(f"Failed to track event {name}: {e}")
@@ -172,7 +206,7 @@ class TelemetryManager:
                 response_code=response_code,
                 properties=default_properties
             )
-            self.client.flush()
+            self._schedule_flush()
             
         except Exception as e:
             self.logger.error(f"Failed to track request {name}: {e}")
@@ -201,7 +235,7 @@ class TelemetryManager:
                 default_properties.update(properties)
             
             self.client.track_exception(exception, properties=default_properties)
-            self.client.flush()
+            self._schedule_flush()
             
         except Exception as e:
             self.logger.error(f"Failed to track exception: {e}")
@@ -241,11 +275,31 @@ class TelemetryManager:
                 duration=duration_ms,
                 properties=default_properties
             )
-            self.client.flush()
+            self._schedule_flush()
             
         except Exception as e:
             self.logger.error(f"Failed to track dependency {name}: {e}")
     
+    def queue_status(self) -> Optional[Dict[str, int]]:
+        """
+        Get the exporter queue depth and capacity
+        
+        Returns:
+            Dictionary with queue depth and capacity, or None if telemetry is disabled
+        """
+        if not self.client:
+            return None
+        
+        try:
+            queue = self.client.channel.queue
+            return {
+                'depth': queue._queue.qsize(),
+                'capacity': queue.max_queue_length
+            }
+        except Exception as e:
+            self.logger.error(f"Failed to read telemetry queue status: {e}")
+            return None
+    
     def start_operation(self, operation_name: str) -> Optional[Any]:
         """
         Start a distributed tracing operation
@@ -319,53 +373,77 @@ def track_function(telemetry_manager: TelemetryManager, operation_name: Optional
         operation_name: Optional custom operation name
     """
     def decorator(func):
+        op_name = operation_name or f"{func.__module__}.{func.__name__}"
+        
+        def on_success(span, start_time):
+            duration_ms = (time.time() - start_time) * 1000
+            
+            telemetry_manager.track_event(
+                f"function_executed",
+                properties={
+                    'function_name': func.__name__,
+                    'module': func.__module__,
+                    'success': True
+                },
+                measurements={'duration_ms': duration_ms}
+            )
+            
+            telemetry_manager.end_operation(span, success=True)
+        
+        def on_error(span, start_time, e):
+            duration_ms = (time.time() - start_time) * 1000
+            
+            telemetry_manager.track_exception(
+                e,
+                properties={
+                    'function_name': func.__name__,
+                    'module': func.__module__
+                }
+            )
+            
+            telemetry_manager.track_event(
+                f"function_error",
+                properties={
+                    'function_name': func.__name__,
+                    'module': func.__module__,
+                    'error_type': type(e).__name__,
+                    'error_message': str(e)
+                },
+                measurements={'duration_ms': duration_ms}
+            )
+            
+            telemetry_manager.end_operation(span, success=False, error_message=str(e))
+        
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                start_time = time.time()
+                span = telemetry_manager.start_operation(op_name)
+                
+                try:
+                    result = await func(*args, **kwargs)
+                except Exception as e:
+                    on_error(span, start_time, e)
+                    raise
+                
+                on_success(span, start_time)
+                return result
+            
+            return async_wrapper
+        
         @wraps(func)
         def wrapper(*args, **kwargs):
-            op_name = operation_name or f"{func.__module__}.{func.__name__}"
             start_time = time.time()
             span = telemetry_manager.start_operation(op_name)
             
             try:
                 result = func(*args, **kwargs)
-                duration_ms = (time.time() - start_time) * 1000
-                
-                telemetry_manager.track_event(
-                    f"function_executed",
-                    properties={
-                        'function_name': func.__name__,
-                        'module': func.__module__,
-                        'success': True
-                    },
-                    measurements={'duration_ms': duration_ms}
-                )
-                
-                telemetry_manager.end_operation(span, success=True)
-                return result
-                
             except Exception as e:
-                duration_ms = (time.time() - start_time) * 1000
-                
-                telemetry_manager.track_exception(
-                    e,
-                    properties={
-                        'function_name': func.__name__,
-                        'module': func.__module__
-                    }
-                )
-                
-                telemetry_manager.track_event(
-                    f"function_error",
-                    properties={
-                        'function_name': func.__name__,
-                        'module': func.__module__,
-                        'error_type': type(e).__name__,
-                        'error_message': str(e)
-                    },
-                    measurements={'duration_ms': duration_ms}
-                )
-                
-                telemetry_manager.end_operation(span, success=False, error_message=str(e))
+                on_error(span, start_time, e)
                 raise
+            
+            on_success(span, start_time)
+            return result
         
         return wrapper
     return decorator
@@ -0,0 +1,119 @@
+"""
+Request validation module for Microsoft 365 Copilot Plugin
+Single-pass input sanitization with request-scoped metadata for the endpoint handlers
+"""
+
+import unicodedata
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+# Characters escaped for HTML contexts; C0 control characters (other than
+# tab, newline and carriage return) and DEL are dropped outright.
+_SANITIZE_TABLE = str.maketrans(
+    {
+        '<': '&lt;',
+        '>': '&gt;',
+        **{chr(code): None for code in range(0x20) if chr(code) not in '\t\n\r'},
+        '\x7f': None,
+    }
+)
+
+# Normalization form applied to all user supplied text
+UNICODE_FORM = 'NFC'
+
+
+@dataclass(frozen=True)
+class SanitizedText:
+    """Sanitized input value with the statistics computed while sanitizing it"""
+    value: str
+    original_length: int
+    length: int
+    normalized: bool = False
+
+    @property
+    def modified(self) -> bool:
+        """Whether sanitization changed the original input"""
+        return self.normalized or self.length != self.original_length
+
+
+def sanitize_text(data: str, max_length: int = 10000) -> SanitizedText:
+    """
+    Validate and sanitize user supplied text
+
+    The length limit is enforced before any copy is made. Surrounding
+    whitespace is stripped, the text is normalized to NFC only when it is not
+    already normalized, and escaping plus control character removal happen in
+    a single ``str.translate`` pass.
+
+    Args:
+        data: Raw input value
+        max_length: Maximum accepted length of the raw input
+
+    Returns:
+        SanitizedText carrying the sanitized value and its statistics
+
+    Raises:
+        ValueError: If the input is not a string or exceeds max_length
+    """
+    if not isinstance(data, str):
+        raise ValueError("Input must be a string")
+
+    original_length = len(data)
+    if original_length > max_length:
+        raise ValueError(f"Input too long. Maximum length: {max_length}")
+
+    value = data.strip()
+
+    normalized = False
+    if not value.isascii() and not unicodedata.is_normalized(UNICODE_FORM, value):
+        value = unicodedata.normalize(UNICODE_FORM, value)
+        normalized = True
+
+    value = value.translate(_SANITIZE_TABLE)
+
+    return SanitizedText(
+        value=value,
+        original_length=original_length,
+        length=len(value),
+        normalized=normalized
+    )
+
+
+@dataclass
+class RequestContext:
+    """
+    Request-scoped state shared by the endpoint handlers
+
+    Holds the correlation context, the authenticated user and every sanitized
+    input so that handlers and telemetry reuse the computed values instead of
+    measuring the raw inputs again.
+    """
+    correlation: Dict[str, str]
+    user: Dict[str, Any] = field(default_factory=dict)
+    inputs: Dict[str, SanitizedText] = field(default_factory=dict)
+
+    @property
+    def request_id(self) -> str:
+        """Correlation request ID"""
+        return self.correlation['request_id']
+
+    def sanitize(self, name: str, data: str, max_length: int = 10000) -> SanitizedText:
+        """Sanitize an input and record it on the context under the given name"""
+        sanitized = sanitize_text(data, max_length=max_length)
+        self.inputs[name] = sanitized
+        return sanitized
+
+    def value(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        """Get a sanitized input value by name"""
+        sanitized = self.inputs.get(name)
+        return sanitized.value if sanitized is not None else default
+
+    def telemetry_properties(self, **extra: Any) -> Dict[str, Any]:
+        """Build telemetry properties from the correlation context and input statistics"""
+        properties: Dict[str, Any] = dict(self.correlation)
+        if self.user:
+            properties['user_id'] = self.user.get('user_id')
+        for name, sanitized in self.inputs.items():
+            properties[f'{name}_length'] = sanitized.length
+        properties.update(extra)
+        return properties
@@ -0,0 +1,279 @@
+"""
+Vector index module for Microsoft 365 Copilot Plugin
+Deterministic hashed sentence embeddings and nearest-neighbour search over float32 rows
+"""
+
+import hashlib
+import math
+import threading
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .search_index import tokenize
+
+# Embedding width used by the knowledge hub
+DEFAULT_DIMENSIONS = 256
+
+# Rows at which an inverted file (IVF) index replaces exhaustive search
+DEFAULT_IVF_THRESHOLD = 4096
+
+# Clusters scanned per query once the IVF index is built
+DEFAULT_NPROBE = 8
+
+# Share of unclustered or deleted rows that triggers a rebuild
+REBUILD_FRACTION = 0.1
+
+# k-means iterations when clustering rows
+KMEANS_ITERATIONS = 8
+
+# Rows sampled per cluster to train the k-means centroids
+KMEANS_SAMPLE_PER_CLUSTER = 64
+
+
+@lru_cache(maxsize=65536)
+def _feature(feature: str, dimensions: int) -> Tuple[int, float]:
+    """Bucket and sign of a hashed feature; blake2b keeps them stable across processes"""
+    value = int.from_bytes(hashlib.blake2b(feature.encode('utf-8'), digest_size=8).digest(), 'little')
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+class HashingEmbedder:
+    """
+    Sentence vectors from signed feature hashing
+
+    Words, adjacent word pairs and character trigrams of each word are
+    hashed into a fixed number of buckets, so vectors need no model or
+    vocabulary, are identical on every instance and tolerate inflections
+    ("pipeline" and "pipelines" share most trigrams). Vectors are L2
+    normalized, making the dot product their cosine similarity.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, word_weight: float = 1.0,
+                 pair_weight: float = 0.5, trigram_weight: float = 0.3):
+        """
+        Initialize hashing embedder
+
+        Args:
+            dimensions: Vector width
+            word_weight: Weight of each word
+            pair_weight: Weight of each adjacent word pair
+            trigram_weight: Weight of each character trigram
+        """
+        self.dimensions = dimensions
+        self.word_weight = word_weight
+        self.pair_weight = pair_weight
+        self.trigram_weight = trigram_weight
+
+    def _features(self, text: str) -> Iterable[Tuple[str, float]]:
+        words = tokenize(text)
+        for word in words:
+            yield f"w:{word}", self.word_weight
+            padded = f"#{word}#"
+            for start in range(len(padded) - 2):
+                yield f"c:{padded[start:start + 3]}", self.trigram_weight
+        for first, second in zip(words, words[1:]):
+            yield f"p:{first}_{second}", self.pair_weight
+
+    def embed(self, text: str) -> np.ndarray:
+        """Unit float32 vector for a text; all zeros when it has no terms"""
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        for feature, weight in self._features(text):
+            bucket, sign = _feature(feature, self.dimensions)
+            vector[bucket] += sign * weight
+        norm = float(np.linalg.norm(vector))
+        if norm:
+            vector /= norm
+        return vector
+
+    def embed_many(self, texts: Sequence[str]) -> np.ndarray:
+        """Row-per-text float32 matrix"""
+        matrix = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            matrix[row] = self.embed(text)
+        return matrix
+
+
+class VectorIndex:
+    """
+    Maximum inner product search over unit vectors
+
+    Vectors are rows of one contiguous float32 matrix, so an exhaustive
+    query is a single matrix-vector product. Beyond ivf_threshold rows the
+    matrix is clustered with spherical k-means and reordered so every
+    cluster is a contiguous slice; a query scores the centroids and only
+    the nprobe best slices, plus rows added since the last build. Deletes
+    leave tombstones; the matrix is compacted and reclustered once added
+    or deleted rows exceed REBUILD_FRACTION of the index.
+    """
+
+    def __init__(self, dimensions: int = DEFAULT_DIMENSIONS, ivf_threshold: int = DEFAULT_IVF_THRESHOLD,
+                 nprobe: int = DEFAULT_NPROBE, seed: int = 0):
+        """
+        Initialize vector index
+
+        Args:
+            dimensions: Vector width
+            ivf_threshold: Rows at which clustering starts; 0 disables it
+            nprobe: Clusters scanned per query
+            seed: Seed of the k-means initialization, for reproducible builds
+        """
+        self.dimensions = dimensions
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.seed = seed
+
+        self._matrix = np.zeros((16, dimensions), dtype=np.float32)
+        self._live = np.zeros(16, dtype=bool)
+        self._ids: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._deleted = 0
+        self._centroids: Optional[np.ndarray] = None
+        self._offsets: Optional[np.ndarray] = None
+        self._clustered = 0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, item_id: str) -> bool:
+        return item_id in self._rows
+
+    @property
+    def clustered(self) -> bool:
+        """Whether queries currently use the IVF index"""
+        return self._centroids is not None
+
+    def add(self, item_id: str, vector: np.ndarray):
+        """Add or replace the vector of an item"""
+        vector = np.asarray(vector, dtype=np.float32).reshape(self.dimensions)
+        with self._lock:
+            self._delete(item_id)
+            row = len(self._ids)
+            if row == len(self._matrix):
+                self._grow(row * 2)
+            self._matrix[row] = vector
+            self._live[row] = True
+            self._ids.append(item_id)
+            self._rows[item_id] = row
+
+    def remove(self, item_id: str) -> bool:
+        """
+        Remove an item
+
+        Returns:
+            Whether the item was indexed
+        """
+        with self._lock:
+            return self._delete(item_id)
+
+    def _delete(self, item_id: str) -> bool:
+        row = self._rows.pop(item_id, None)
+        if row is None:
+            return False
+        self._live[row] = False
+        self._ids[row] = None
+        self._deleted += 1
+        return True
+
+    def _grow(self, capacity: int):
+        matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        matrix[:len(self._ids)] = self._matrix[:len(self._ids)]
+        live = np.zeros(capacity, dtype=bool)
+        live[:len(self._ids)] = self._live[:len(self._ids)]
+        self._matrix, self._live = matrix, live
+
+    def search(self, vector: np.ndarray, limit: int = 10, min_score: float = -1.0) -> List[Tuple[str, float]]:
+        """
+        Nearest items by inner product
+
+        Args:
+            vector: Query vector
+            limit: Number of hits returned
+            min_score: Lowest score returned
+
+        Returns:
+            (item id, score) pairs, best first
+        """
+        query = np.asarray(vector, dtype=np.float32).reshape(self.dimensions)
+        with self._lock:
+            if limit <= 0 or not self._rows:
+                return []
+            self._maintain()
+            rows = len(self._ids)
+
+            if self._centroids is None:
+                candidates = None
+                scores = self._matrix[:rows] @ query
+            else:
+                probe = min(self.nprobe, len(self._centroids))
+                clusters = np.argpartition(self._centroids @ query, -probe)[-probe:]
+                slices = [np.arange(self._offsets[c], self._offsets[c + 1]) for c in clusters]
+                slices.append(np.arange(self._clustered, rows))
+                candidates = np.concatenate(slices)
+                scores = self._matrix[candidates] @ query
+
+            live = self._live[:rows] if candidates is None else self._live[candidates]
+            scores = np.where(live & (scores >= min_score), scores, -np.inf)
+            top = min(limit, len(scores))
+            best = np.argpartition(scores, -top)[-top:]
+            best = best[np.argsort(-scores[best], kind='stable')]
+            return [
+                (self._ids[row if candidates is None else candidates[row]], float(scores[row]))
+                for row in best if scores[row] != -np.inf
+            ]
+
+    def _maintain(self):
+        """Compact and recluster once enough rows changed since the last build"""
+        rows = len(self._ids)
+        cluster = 0 < self.ivf_threshold <= len(self._rows)
+        if self._centroids is None:
+            if cluster or self._deleted > REBUILD_FRACTION * rows:
+                self._rebuild(cluster)
+        elif self._deleted + rows - self._clustered > REBUILD_FRACTION * rows:
+            self._rebuild(cluster)
+
+    def _rebuild(self, cluster: bool):
+        order = np.flatnonzero(self._live[:len(self._ids)])
+        matrix = self._matrix[order]
+        ids = [self._ids[row] for row in order]
+        self._centroids = self._offsets = None
+
+        if cluster:
+            centroids, assignment = self._kmeans(matrix, max(1, int(math.sqrt(len(matrix)))))
+            by_cluster = np.argsort(assignment, kind='stable')
+            matrix = matrix[by_cluster]
+            ids = [ids[row] for row in by_cluster]
+            counts = np.bincount(assignment, minlength=len(centroids))
+            self._centroids = centroids
+            self._offsets = np.concatenate(([0], np.cumsum(counts)))
+
+        capacity = max(16, len(matrix) * 2)
+        self._matrix = np.zeros((capacity, self.dimensions), dtype=np.float32)
+        self._matrix[:len(matrix)] = matrix
+        self._live = np.zeros(capacity, dtype=bool)
+        self._live[:len(matrix)] = True
+        self._ids = ids
+        self._rows = {item_id: row for row, item_id in enumerate(ids)}
+        self._deleted = 0
+        self._clustered = len(ids) if cluster else 0
+
+    def _kmeans(self, matrix: np.ndarray, clusters: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Spherical k-means: centroids are renormalized means, similarity is the inner product"""
+        rng = np.random.default_rng(self.seed)
+        sample = matrix
+        if len(matrix) > clusters * KMEANS_SAMPLE_PER_CLUSTER:
+            sample = matrix[rng.choice(len(matrix), clusters * KMEANS_SAMPLE_PER_CLUSTER, replace=False)]
+        centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            counts = np.bincount(assignment, minlength=clusters)
+            filled = counts > 0
+            starts = np.cumsum(counts) - counts
+            sums = np.add.reduceat(sample[np.argsort(assignment, kind='stable')], starts[filled], axis=0)
+            norms = np.linalg.norm(sums, axis=1, keepdims=True)
+            # Empty clusters keep their previous centroid
+            centroids[filled] = sums / np.maximum(norms, 1e-12)
+        return centroids, np.argmax(matrix @ centroids.T, axis=1)
@@ -0,0 +1,206 @@
+"""
+Unit tests for the Copilot Plugin article catalog module
+"""
+
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+from src.article_catalog import ArticleCatalog, ShardedCounter
+from src.plugin_runtime import PluginRuntime
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+DAY = 86400.0
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1_700_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _article(article_id, title, category, tags, rating=4.0, **extra):
+    return dict(id=article_id, title=title, summary=extra.pop('summary', ''), category=category,
+                tags=tags, rating=rating, **extra)
+
+
+def _catalog(clock=None, **options):
+    catalog = ArticleCatalog(clock=clock or _Clock(), **options)
+    catalog.upsert(_article('a1', 'Zero Trust Networking', 'Security', ['Security', 'Zero Trust'], 4.8))
+    catalog.upsert(_article('a2', 'Incident Response', 'Security', ['Security', 'Operations'], 4.2))
+    catalog.upsert(_article('a3', 'Kubernetes Operations', 'Technology', ['Kubernetes', 'Operations'], 4.5,
+                            summary='Running clusters with zero downtime'))
+    return catalog
+
+
+class TestShardedCounter:
+    """Test cases for ShardedCounter"""
+
+    def test_concurrent_adds(self):
+        """Test writers on many threads lose no increments"""
+        counter = ShardedCounter()
+
+        def write():
+            for number in range(5000):
+                counter.add(number % 3)
+
+        threads = [threading.Thread(target=write) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert counter.snapshot() == {0: 13336, 1: 13336, 2: 13328}
+        assert counter.value(0) == 13336
+        assert len(counter._shards) == 8
+
+    def test_discard(self):
+        """Test discarded keys are reset in every shard"""
+        counter = ShardedCounter()
+        counter.add('a', 2)
+        thread = threading.Thread(target=counter.add, args=('a', 3))
+        thread.start()
+        thread.join()
+        assert counter.value('a') == 5
+        counter.discard('a')
+        assert counter.value('a') == 0 and counter.snapshot() == {}
+
+
+class TestArticleCatalog:
+    """Test cases for ArticleCatalog"""
+
+    def test_text_relevance_leads(self):
+        """Test text matches outrank better rated articles that match less"""
+        hits = _catalog().search('zero trust networking')
+        assert [article['id'] for article, _ in hits] == ['a1', 'a3']
+        assert hits[0][1] > hits[1][1]
+
+    def test_tag_and_category_filters(self):
+        """Test tags and categories select articles by rating and popularity"""
+        catalog = _catalog()
+        assert [article['id'] for article, _ in catalog.search('Operations')] == ['a3', 'a2']
+        assert [article['id'] for article, _ in catalog.search('operations', 'Security')] == ['a2']
+        assert [article['id'] for article, _ in catalog.search('', 'technology')] == ['a3']
+        assert [article['id'] for article, _ in catalog.search('', 'all')] == ['a1', 'a3', 'a2']
+        assert catalog.search('', 'Legal') == []
+
+    def test_views_counted(self):
+        """Test views raise the view count and popularity"""
+        catalog = _catalog()
+        catalog.upsert(_article('a4', 'Runbook', 'Security', ['Security'], view_count=10))
+        assert catalog.record_view('a4') and not catalog.record_view('missing')
+        assert catalog.get('a4')['view_count'] == 11
+        assert catalog.decayed_views('a4') == pytest.approx(11.0)
+
+    def test_popularity_decays(self):
+        """Test a view's weight halves every half-life"""
+        clock = _Clock()
+        catalog = _catalog(clock, half_life=DAY)
+        catalog.record_view('a2')
+        clock.now += DAY
+        assert catalog.decayed_views('a2') == pytest.approx(0.5)
+        catalog.record_view('a2')
+        clock.now += 2 * DAY
+        assert catalog.decayed_views('a2') == pytest.approx(1.5 / 4)
+        assert catalog.get('a2')['view_count'] == 2
+
+    def test_views_promote_articles(self):
+        """Test viewed articles move up the materialized views without a rebuild"""
+        catalog = _catalog(rebuild_interval=DAY)
+        assert catalog.search('')[0][0]['id'] == 'a1'
+        built_at = catalog._built_at
+        for _ in range(200):
+            catalog.record_view('a2')
+        assert [article['id'] for article, _ in catalog.search('')] == ['a2', 'a1', 'a3']
+        assert [article['id'] for article, _ in catalog.search('Operations')] == ['a2', 'a3']
+        assert catalog._built_at == built_at
+
+    def test_views_match_full_ranking(self):
+        """Test incrementally maintained views equal a ranking from scratch"""
+        rng = random.Random(5)
+        clock = _Clock()
+        catalog = ArticleCatalog(view_size=5, rebuild_interval=DAY, clock=clock)
+        for number in range(40):
+            catalog.upsert(_article(f"a{number}", f"Article {number}", rng.choice(['X', 'Y']),
+                                    rng.sample(['t1', 't2', 't3', 't4'], 2), round(rng.uniform(3, 5), 1)))
+        catalog.search('')
+        for _ in range(500):
+            catalog.record_view(f"a{rng.randrange(40)}")
+            if rng.random() < 0.05:
+                catalog.search('t1')
+
+        incremental = {topic: catalog.search(topic, limit=5) for topic in ('', 't1', 't3')}
+        # A limit beyond the view size ranks every candidate from scratch
+        for topic, hits in incremental.items():
+            assert [article['id'] for article, _ in hits] == [
+                article['id'] for article, _ in catalog.search(topic, limit=40)[:5]
+            ]
+
+    def test_pending_views_bounded(self):
+        """Test a full queue of pending views forces a rebuild instead of growing"""
+        catalog = _catalog(rebuild_interval=DAY, max_pending_views=8)
+        catalog.search('')
+        for _ in range(100):
+            catalog.record_view('a3')
+        assert len(catalog._viewed) == 8
+
+        assert [article['id'] for article, _ in catalog.search('')] == ['a3', 'a1', 'a2']
+        assert not catalog._viewed
+        assert catalog.get('a3')['view_count'] == 100
+
+    def test_remove(self):
+        """Test removed articles leave the indexes and views"""
+        catalog = _catalog()
+        catalog.search('')
+        assert catalog.remove('a1') and not catalog.remove('a1')
+        assert [article['id'] for article, _ in catalog.search('')] == ['a3', 'a2']
+        assert catalog.search('zero trust networking')[0][0]['id'] == 'a3'
+        assert 'Zero Trust' not in catalog.tag_counts()
+        assert catalog.category_counts() == {'Security': 1, 'Technology': 1}
+
+
+class TestKnowledgeHubArticles:
+    """Test get_articles ranks the article catalog"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        yield module.EnterpriseKnowledgeHubService()
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_topic_and_category(self, service):
+        """Test topics and categories select the articles returned"""
+        result = service.get_articles('privacy compliance')
+        assert result['articles'][0]['id'] == 'art-003'
+        assert [article['id'] for article in service.get_articles('', 'Security')['articles']] == [
+            'art-001', 'art-005'
+        ]
+        assert result['analytics']['total_articles'] == 6
+
+    def test_views_raise_ranking(self, service):
+        """Test viewed articles rise in the top articles"""
+        for _ in range(50):
+            viewed = service.view_article('art-006')
+        assert viewed['article']['view_count'] == 348
+        assert service.get_articles('', 'all')['articles'][0]['id'] == 'art-006'
+        assert service.view_article('art-999')['success'] is False
+
+    def test_views_visible_through_runtime(self, service):
+        """Test repeated reads through the plugin runtime see new views at once"""
+        runtime = PluginRuntime('EnterpriseKnowledgeHub', type(service), service_factory=lambda: service)
+        first = runtime.dispatch('get_articles', {'topic': '', 'category': 'all'})
+        for _ in range(50):
+            service.view_article('art-006')
+        second = runtime.dispatch('get_articles', {'topic': '', 'category': 'all'})
+        assert first['articles'][0]['id'] != 'art-006'
+        assert second['articles'][0]['id'] == 'art-006'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,212 @@
+"""
+Unit tests for the Copilot Plugin cache module
+"""
+
+import threading
+import time
+import pytest
+from src.cache import (
+    CACHE_FRESH, CACHE_MISS, CACHE_STALE, CachedSecretClient, CachePolicy,
+    LocalSharedStore, TieredCache, TTLCache, create_shared_store
+)
+from src.plugin_runtime import PluginRuntime, operation
+
+
+class _Secret:
+    def __init__(self, value):
+        self.value = value
+
+
+class _SecretClientStandIn:
+    """Key Vault client stand-in counting lookups"""
+    vault_url = 'https://stand-in.vault.azure.net/'
+
+    def __init__(self):
+        self.calls = 0
+
+    def get_secret(self, name, version=None, **kwargs):
+        self.calls += 1
+        return _Secret(f"{name}-value")
+
+    def list_properties_of_secrets(self, max_page_size=None):
+        return iter(['secret'])
+
+
+class TestTTLCache:
+    """Test cases for TTLCache"""
+
+    def test_get_set(self):
+        """Test basic storage and defaults"""
+        cache = TTLCache(ttl=60)
+        cache.set('a', 1)
+        assert cache.get('a') == 1
+        assert cache.get('b', 'missing') == 'missing'
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_expiry(self):
+        """Test entries expire after their TTL"""
+        cache = TTLCache(ttl=60)
+        cache.set('a', 1, ttl=0.01)
+        time.sleep(0.02)
+        assert cache.get('a') is None
+        assert len(cache) == 0
+
+    def test_lru_eviction(self):
+        """Test least recently used entries are evicted first"""
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        assert cache.get('b') is None
+        assert cache.get('a') == 1 and cache.get('c') == 3
+
+    def test_get_or_load(self):
+        """Test loader only runs on a miss"""
+        cache = TTLCache(ttl=60)
+        calls = []
+        for _ in range(3):
+            assert cache.get_or_load('k', lambda: calls.append(1) or 'v') == 'v'
+        assert len(calls) == 1
+
+        cache.invalidate('k')
+        cache.get_or_load('k', lambda: calls.append(1) or 'v')
+        assert len(calls) == 2
+
+
+class TestCachedSecretClient:
+    """Test cases for CachedSecretClient"""
+
+    def test_secret_cached(self):
+        """Test repeated lookups hit Key Vault once"""
+        inner = _SecretClientStandIn()
+        client = CachedSecretClient(inner, TTLCache(ttl=60))
+        assert client.get_secret('api-key').value == 'api-key-value'
+        assert client.get_secret('api-key').value == 'api-key-value'
+        assert inner.calls == 1
+
+    def test_passthrough(self):
+        """Test other client methods reach the wrapped client"""
+        client = CachedSecretClient(_SecretClientStandIn(), TTLCache())
+        assert client.vault_url == 'https://stand-in.vault.azure.net/'
+        assert list(client.list_properties_of_secrets(max_page_size=1)) == ['secret']
+
+
+class TestTieredCache:
+    """Test cases for TieredCache with the local shared store stand-in"""
+
+    def test_fresh_hit_skips_loader(self):
+        """Test fresh entries are served without loading"""
+        cache = TieredCache()
+        calls = []
+        loader = lambda: calls.append(1) or {'models': 15}
+
+        assert cache.get_or_load('k', loader, ttl=60) == ({'models': 15}, CACHE_MISS)
+        assert cache.get_or_load('k', loader, ttl=60) == ({'models': 15}, CACHE_FRESH)
+        assert len(calls) == 1
+
+    def test_l2_shared_between_instances(self):
+        """Test a second instance is served from the shared store"""
+        store = LocalSharedStore()
+        TieredCache(l2=store).set('k', {'v': 1}, ttl=60)
+
+        other = TieredCache(l2=store)
+        assert other.get('k') == ({'v': 1}, CACHE_FRESH)
+        assert other.stats['l2_hits'] == 1
+        assert other.l1.get('k') is not None
+
+    def test_stale_while_revalidate(self):
+        """Test stale entries are served while one background refresh runs"""
+        cache = TieredCache()
+        cache.set('k', 'old', ttl=0, stale_ttl=60)
+        refreshed = threading.Event()
+        calls = []
+
+        def loader():
+            calls.append(1)
+            refreshed.wait(2)
+            return 'new'
+
+        assert cache.get_or_load('k', loader, ttl=60, stale_ttl=60) == ('old', CACHE_STALE)
+        assert cache.get_or_load('k', loader, ttl=60, stale_ttl=60) == ('old', CACHE_STALE)
+        refreshed.set()
+
+        deadline = time.time() + 2
+        while cache.get('k')[1] != CACHE_FRESH and time.time() < deadline:
+            time.sleep(0.01)
+        assert cache.get('k') == ('new', CACHE_FRESH)
+        assert len(calls) == 1
+
+    def test_uncacheable_results_not_stored(self):
+        """Test values rejected by the predicate are not cached"""
+        cache = TieredCache()
+        cache.get_or_load('k', lambda: {'success': False}, ttl=60, cacheable=lambda v: v['success'])
+        assert cache.get('k') == (None, CACHE_MISS)
+
+    def test_purge(self):
+        """Test pattern purges remove entries from both tiers"""
+        store = LocalSharedStore()
+        cache = TieredCache(l2=store)
+        cache.set('faq:tenant-a:1', 1, ttl=60)
+        cache.set('faq:tenant-b:1', 2, ttl=60)
+
+        assert cache.purge('faq:tenant-a:*') == 2
+        assert cache.get('faq:tenant-a:1')[1] == CACHE_MISS
+        assert cache.get('faq:tenant-b:1')[1] == CACHE_FRESH
+
+    def test_create_shared_store(self):
+        """Test L2 store selection from configuration"""
+        assert create_shared_store(None) is None
+        assert isinstance(create_shared_store('local'), LocalSharedStore)
+        assert create_shared_store('memcached://host') is None
+
+
+class _CatalogService:
+    def __init__(self):
+        self.calls = 0
+
+    @operation(params={'category': 'all', 'limit': 10}, cache=CachePolicy(ttl=60, key=('category',)))
+    def list_models(self, category, limit):
+        self.calls += 1
+        return {'success': True, 'category': category}
+
+    @operation(params={'category': 'all'}, cache=CachePolicy(ttl=60, tenant_scoped=False))
+    def shared_models(self, category):
+        self.calls += 1
+        return {'success': True}
+
+
+class TestRuntimeCaching:
+    """Test declarative caching through the plugin runtime"""
+
+    def test_declared_key_fields(self):
+        """Test only declared key fields distinguish entries"""
+        runtime = PluginRuntime('Catalog', _CatalogService)
+        runtime.dispatch('list_models', {'category': 'ocr', 'limit': 1}, tenant='a')
+        runtime.dispatch('list_models', {'category': 'ocr', 'limit': 5}, tenant='a')
+        runtime.dispatch('list_models', {'category': 'forms'}, tenant='a')
+        assert runtime.service.calls == 2
+
+    def test_tenant_scoping(self):
+        """Test tenant-scoped entries are not shared across tenants"""
+        runtime = PluginRuntime('Catalog', _CatalogService)
+        for tenant in ['a', 'b', 'a']:
+            runtime.dispatch('list_models', {}, tenant=tenant)
+        for tenant in ['a', 'b']:
+            runtime.dispatch('shared_models', {}, tenant=tenant)
+        assert runtime.service.calls == 3
+
+    def test_purge_cache(self):
+        """Test purging by operation and tenant"""
+        runtime = PluginRuntime('Catalog', _CatalogService)
+        runtime.dispatch('list_models', {}, tenant='a')
+        runtime.dispatch('list_models', {}, tenant='b')
+
+        assert runtime.purge_cache('list_models', tenant='a') == 1
+        runtime.dispatch('list_models', {}, tenant='a')
+        runtime.dispatch('list_models', {}, tenant='b')
+        assert runtime.service.calls == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,125 @@
+"""
+Unit tests for the Copilot Plugin coalescing module
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from src.coalescing import CoalescedCallTimeout, SingleFlight, fingerprint
+from src.plugin_runtime import PluginRuntime, operation
+
+
+class TestSingleFlight:
+    """Test cases for SingleFlight"""
+
+    def test_identical_calls_execute_once(self):
+        """Test concurrent callers share one execution"""
+        flight = SingleFlight()
+        gate = threading.Event()
+        calls = []
+
+        def backend():
+            calls.append(1)
+            gate.wait(2)
+            return {'models': 15}
+
+        def caller():
+            return flight.do('key', backend)
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(caller) for _ in range(5)]
+            while flight.coalesced < 4:
+                threading.Event().wait(0.005)
+            gate.set()
+            results = [future.result() for future in futures]
+
+        assert len(calls) == 1
+        assert [result for result, _ in results] == [{'models': 15}] * 5
+        assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+        assert flight.in_flight() == 0
+
+    def test_error_propagates_to_waiters(self):
+        """Test every waiter receives the backend exception"""
+        flight = SingleFlight()
+        gate = threading.Event()
+
+        def backend():
+            gate.wait(2)
+            raise RuntimeError('backend unavailable')
+
+        def caller():
+            return flight.do('key', backend)
+
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            futures = [pool.submit(caller) for _ in range(3)]
+            while flight.coalesced < 2:
+                threading.Event().wait(0.005)
+            gate.set()
+            errors = [future.exception() for future in futures]
+
+        assert all(isinstance(error, RuntimeError) for error in errors)
+        assert flight.executions == 1
+
+    def test_waiter_timeout(self):
+        """Test waiters give up after the timeout while the leader completes"""
+        flight = SingleFlight()
+        gate = threading.Event()
+        leader = threading.Thread(target=flight.do, args=('key', lambda: gate.wait(2)))
+        leader.start()
+        while flight.in_flight() == 0:
+            threading.Event().wait(0.005)
+
+        with pytest.raises(CoalescedCallTimeout):
+            flight.do('key', lambda: None, timeout=0.01)
+        gate.set()
+        leader.join()
+
+    def test_sequential_calls_not_cached(self):
+        """Test completed calls are not reused"""
+        flight = SingleFlight()
+        calls = []
+        flight.do('key', lambda: calls.append(1))
+        flight.do('key', lambda: calls.append(1))
+        assert len(calls) == 2
+
+    def test_fingerprint_ignores_key_order(self):
+        """Test argument fingerprints are canonical"""
+        assert fingerprint({'a': 1, 'b': 2}) == fingerprint({'b': 2, 'a': 1})
+        assert fingerprint('faq', 10) != fingerprint('faq', 5)
+
+
+class _Service:
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+
+    @operation(params={'topic': ''}, coalesce=True, coalesce_timeout=2)
+    def get_faq(self, topic):
+        self.calls += 1
+        self.gate.wait(2)
+        return {'topic': topic}
+
+
+class TestRuntimeCoalescing:
+    """Test coalescing through the plugin runtime"""
+
+    def test_dispatch_coalesces_identical_arguments(self):
+        """Test identical operation calls reach the service once"""
+        runtime = PluginRuntime('Test', _Service)
+        service = runtime.service
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            futures = [pool.submit(runtime.dispatch, 'get_faq', {'topic': topic})
+                       for topic in ['vpn', 'vpn', 'vpn', 'mfa', 'mfa', 'mfa']]
+            while runtime.single_flight.coalesced < 4:
+                threading.Event().wait(0.005)
+            service.gate.set()
+            results = [future.result() for future in futures]
+
+        assert service.calls == 2
+        assert results.count({'topic': 'vpn'}) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,168 @@
+"""
+Unit tests for the Copilot Plugin deadline module
+"""
+
+import asyncio
+import json
+import time
+from unittest.mock import Mock
+
+import azure.functions as func
+import pytest
+from src.deadline import (
+    DEADLINE_HEADER,
+    DeadlineExceeded,
+    bounded_timeout,
+    check_deadline,
+    current_deadline,
+    deadline_expired,
+    deadline_scope,
+    request_budget,
+)
+from src.plugin_host import PluginHost
+from src.plugin_runtime import PluginRuntime, operation
+
+
+class _Service:
+    """Service stand-in with slow and partial operations"""
+
+    @operation(params={'delay': 0.0}, budget=0.05)
+    def slow(self, delay=0.0):
+        time.sleep(delay)
+        check_deadline('slow')
+        return {'success': True}
+
+    @operation(params={'delay': 0.0})
+    def optional_work(self, delay=0.0):
+        time.sleep(delay)
+        if deadline_expired():
+            return {'success': True, 'partial': True}
+        return {'success': True, 'extra': 'insights'}
+
+    @operation()
+    def remaining_budget(self):
+        return {'remaining': bounded_timeout(None)}
+
+
+def _http_request(operation, budget_ms=None, body=b''):
+    headers = {DEADLINE_HEADER: str(budget_ms)} if budget_ms is not None else {}
+    return func.HttpRequest(
+        method='POST', url='/api/plugin', body=body, headers=headers,
+        params={'operation': operation}, route_params={}
+    )
+
+
+class TestDeadline:
+    """Test cases for deadline scopes"""
+
+    def test_no_deadline(self):
+        """Test helpers are no-ops without a deadline"""
+        assert current_deadline() is None
+        assert not deadline_expired()
+        check_deadline()
+        assert bounded_timeout(5) == 5
+
+    def test_scope_tightens_only(self):
+        """Test nested scopes cannot extend the enclosing deadline"""
+        with deadline_scope(0.5) as outer:
+            with deadline_scope(10) as inner:
+                assert inner is outer
+            with deadline_scope(0.1) as inner:
+                assert inner is not outer
+                assert bounded_timeout(5) <= 0.1
+            assert current_deadline() is outer
+        assert current_deadline() is None
+
+    def test_check_raises_when_spent(self):
+        """Test checks raise with the stage and overrun once the budget is spent"""
+        with deadline_scope(0):
+            assert deadline_expired()
+            with pytest.raises(DeadlineExceeded) as exc_info:
+                check_deadline('fetch')
+        assert exc_info.value.stage == 'fetch'
+        assert exc_info.value.status_code == 504
+
+    @pytest.mark.parametrize('headers,expected', [
+        (None, None),
+        ({}, None),
+        ({DEADLINE_HEADER: '250'}, 0.25),
+        ({DEADLINE_HEADER: '-5'}, 0.0),
+        ({DEADLINE_HEADER: 'soon'}, None),
+    ])
+    def test_request_budget(self, headers, expected):
+        """Test budgets are read from the request header"""
+        assert request_budget(headers) == expected
+
+
+class TestRuntimeDeadlines:
+    """Test deadline enforcement in the plugin runtime"""
+
+    def setup_method(self):
+        self.runtime = PluginRuntime('Test', _Service)
+        self.runtime.telemetry = Mock()
+
+    def test_operation_budget(self):
+        """Test work past the operation budget returns 504 and is reported"""
+        status, payload = self.runtime.execute('slow', {'delay': 0.1})
+        assert status == 504
+        assert payload == {'error': 'Deadline exceeded', 'stage': 'slow'}
+        assert self.runtime.deadline_counts['shed'] == 1
+
+        event = self.runtime.telemetry.track_event.call_args
+        assert event.args[0] == 'deadline_exceeded'
+        assert event.kwargs['properties']['outcome'] == 'shed'
+        assert event.kwargs['measurements']['overrun_ms'] > 0
+
+    def test_within_budget(self):
+        """Test operations finishing in time are unaffected"""
+        assert self.runtime.execute('slow', {}) == (200, {'success': True})
+        assert self.runtime.deadline_counts['shed'] == 0
+
+    def test_spent_budget_skips_dispatch(self):
+        """Test no work starts once the request budget is spent"""
+        response = self.runtime.handle(_http_request('slow', budget_ms=0))
+        assert response.status_code == 504
+        assert json.loads(response.get_body())['stage'] == 'dispatch'
+
+    def test_request_budget_header(self):
+        """Test the request header bounds the operation budget"""
+        response = self.runtime.handle(_http_request('remaining_budget', budget_ms=200))
+        assert 0 < json.loads(response.get_body())['remaining'] <= 0.2
+
+        # Default operation budget applies without the header
+        response = self.runtime.handle(_http_request('remaining_budget'))
+        assert 0.2 < json.loads(response.get_body())['remaining'] <= 30
+
+    def test_partial_results(self):
+        """Test partial results are returned and counted"""
+        response = self.runtime.handle(_http_request('optional_work', 20, b'{"delay": 0.05}'))
+        assert response.status_code == 200
+        assert json.loads(response.get_body()) == {'success': True, 'partial': True}
+        assert self.runtime.deadline_counts['partial'] == 1
+
+    def test_batch_items_inherit_deadline(self):
+        """Test batch items run under the request deadline"""
+        with deadline_scope(0.2):
+            responses = self.runtime.execute_batch([
+                {'id': 'a', 'operation': 'remaining_budget'},
+                {'id': 'b', 'operation': 'remaining_budget'},
+            ])
+        assert all(0 < r['body']['remaining'] <= 0.2 for r in responses)
+
+
+class TestHostDeadlines:
+    """Test the request budget starts on arrival at the host"""
+
+    def test_budget_covers_queue_time(self):
+        """Test the handler sees the budget set by the host"""
+        host = PluginHost(telemetry=Mock())
+        runtime = PluginRuntime('Test', _Service)
+        host.mount(runtime)
+
+        response = asyncio.run(host.handle('test', _http_request('remaining_budget', budget_ms=150)))
+        assert 0 < json.loads(response.get_body())['remaining'] <= 0.15
+        assert runtime.telemetry is host.telemetry
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
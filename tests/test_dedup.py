@@ -0,0 +1,156 @@
+"""
+Unit tests for the Copilot Plugin dedup module
+"""
+
+import random
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+from src.dedup import DeduplicatingIndex, LSHIndex, MinHasher, shingles, similarity
+from src.search_index import SearchIndex
+from src.security_trimming import principal_scope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+VOCABULARY = [f"word{number}" for number in range(2000)]
+
+
+def _text(rng, words=200):
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(words))
+
+
+def _edit(rng, text, changes):
+    words = text.split()
+    for position in rng.sample(range(len(words)), changes):
+        words[position] = 'changed'
+    return ' '.join(words)
+
+
+class TestMinHasher:
+    """Test cases for shingling and MinHash signatures"""
+
+    def test_shingles(self):
+        """Test texts are hashed as overlapping word shingles"""
+        assert len(shingles('One two three four five')) == 3
+        assert shingles('One, TWO three') == shingles('one two three') and len(shingles('one two')) == 1
+        assert shingles('') == set()
+
+    def test_estimates_jaccard(self):
+        """Test agreeing positions estimate the Jaccard similarity of the shingles"""
+        rng = random.Random(11)
+        hasher = MinHasher()
+        errors = []
+        for _ in range(100):
+            text = _text(rng)
+            edited = _edit(rng, text, rng.choice([2, 5, 10, 20]))
+            first, second = shingles(text), shingles(edited)
+            exact = len(first & second) / len(first | second)
+            errors.append(abs(exact - similarity(hasher.signature(text), hasher.signature(edited))))
+        assert sum(errors) / len(errors) < 0.05
+        assert hasher.signature('') is None
+
+    def test_unrelated_texts(self):
+        """Test unrelated texts agree on almost no positions"""
+        rng = random.Random(12)
+        hasher = MinHasher()
+        assert max(similarity(hasher.signature(_text(rng)), hasher.signature(_text(rng))) for _ in range(50)) < 0.1
+
+
+class TestLSHIndex:
+    """Test cases for LSHIndex"""
+
+    def test_candidates(self):
+        """Test near-duplicates share a band and removed keys leave the buckets"""
+        rng = random.Random(13)
+        hasher, lsh = MinHasher(), LSHIndex()
+        texts = [_text(rng) for _ in range(50)]
+        for number, text in enumerate(texts):
+            lsh.insert(f"d{number}", hasher.signature(text))
+        assert lsh.candidates(hasher.signature(_edit(rng, texts[7], 2))) == {'d7'}
+        assert lsh.remove('d7') and not lsh.remove('d7')
+        assert lsh.candidates(hasher.signature(texts[7])) == set() and len(lsh) == 49
+
+    def test_bands_must_divide_signature(self):
+        """Test a signature that cannot be split into bands is rejected"""
+        with pytest.raises(ValueError):
+            LSHIndex(num_perm=128, bands=10)
+
+
+class TestDeduplicatingIndex:
+    """Test cases for DeduplicatingIndex"""
+
+    def test_copies_collapse(self):
+        """Test near-duplicates collapse into the first document seen"""
+        rng = random.Random(14)
+        index = SearchIndex(facets=())
+        dedup = DeduplicatingIndex(index)
+        texts = [_text(rng) for _ in range(300)]
+        for number, text in enumerate(texts):
+            assert dedup.upsert(f"d{number}", {'body': text}, document=number) == f"d{number}"
+        for number, text in enumerate(texts[:100]):
+            assert dedup.upsert(f"copy{number}", {'body': _edit(rng, text, 1)}, document=-number) == f"d{number}"
+
+        assert len(index) == 300 and len(dedup) == 400 and dedup.duplicate_count == 100
+        assert dedup.canonical('copy5') == 'd5'
+        assert dedup.duplicates('d5') == [('copy5', -5)] and dedup.duplicates('copy5') == [('d5', 5)]
+        assert dedup.duplicates('d200') == [] and dedup.duplicates('missing') == []
+
+    def test_acl_and_facets_separate_clusters(self):
+        """Test identical texts with different ACLs or facets stay apart"""
+        index = SearchIndex(facets=('content_type',))
+        dedup = DeduplicatingIndex(index)
+        text = {'body': 'quarterly security review of the identity platform and its access policies'}
+        dedup.upsert('a', text, {'content_type': 'Guide'}, acl=['everyone'])
+        assert dedup.upsert('b', text, {'content_type': 'Guide'}, acl=['legal']) == 'b'
+        assert dedup.upsert('c', text, {'content_type': 'Policy'}, acl=['everyone']) == 'c'
+        assert dedup.upsert('d', text, {'content_type': 'Guide'}, acl=['everyone']) == 'a'
+        assert len(index) == 3
+        assert [doc_id for doc_id, _ in index.search('identity', principals=['legal'])] == ['b']
+
+    def test_remove_promotes_member(self):
+        """Test removing a canonical puts the next member of its cluster in the index"""
+        index = SearchIndex(facets=())
+        dedup = DeduplicatingIndex(index)
+        text = 'migration runbook for moving file shares to sharepoint online libraries'
+        for doc_id in ('a', 'b', 'c'):
+            dedup.upsert(doc_id, {'body': text}, document=doc_id)
+        assert dedup.remove('a') and not dedup.remove('a')
+        assert [doc_id for doc_id, _ in index.search('runbook')] == ['b']
+        assert dedup.canonical('c') == 'b' and dedup.duplicates('b') == [('c', 'c')]
+
+        dedup.upsert('b', {'body': 'an unrelated note about the cafeteria menu'}, document='b')
+        assert dedup.canonical('c') == 'c' and dedup.canonical('b') == 'b'
+        assert {doc_id for doc_id, _ in index.search('runbook')} == {'c'} and dedup.duplicate_count == 0
+
+
+class TestKnowledgeHubDuplicates:
+    """Test the knowledge hub collapses copied documents"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        service = module.EnterpriseKnowledgeHubService()
+        yield module, service
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_copies_expand_on_request(self, service):
+        """Test a copied document is collapsed and listed only when expanded"""
+        module, service = service
+        original, body = module.SEED_DOCUMENTS[0]
+        service.index_item(replace(original, id='kb-doc-copy', title=f"Copy of {original.title}"), body)
+
+        with principal_scope('user-001'):
+            collapsed = service.search_documents({'query': 'azure landing zones'})
+            expanded = service.search_documents({'query': 'azure landing zones', 'expand_duplicates': True})
+
+        assert [document.id for document in collapsed['documents']] == [original.id]
+        assert 'duplicates' not in collapsed
+        assert collapsed['search_insights']['duplicates_collapsed'] == 1
+        assert [document.id for document in expanded['duplicates'][original.id]] == ['kb-doc-copy']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,196 @@
+"""
+Unit tests for the Copilot Plugin expert index module
+"""
+
+import json
+import sys
+import threading
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import List
+
+import pytest
+from src.expert_index import (
+    PRESENCE_AVAILABLE,
+    PRESENCE_AWAY,
+    PRESENCE_BUSY,
+    PRESENCE_UNKNOWN,
+    ExpertIndex,
+    TermTrie,
+    expertise_weight,
+    normalize_presence,
+)
+from src.http_client import HttpClient
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+@dataclass
+class _Profile:
+    user_id: str
+    expertise_areas: List[str]
+    credibility_score: float = 0.8
+    recent_contributions: int = 10
+    availability_status: str = 'Available'
+
+
+def _index():
+    index = ExpertIndex()
+    index.upsert(_Profile('kim', ['Kubernetes', 'Cloud Security'], 0.9, 30))
+    index.upsert(_Profile('lee', ['Security Operations', 'Incident Response'], 0.7, 5, 'Busy'))
+    index.upsert(_Profile('ola', ['Kubernetes Networking'], 0.6, 0, 'Away'))
+    return index
+
+
+class TestTermTrie:
+    """Test cases for TermTrie"""
+
+    def test_prefix(self):
+        """Test prefix lookups return terms below the prefix, shortest first"""
+        trie = TermTrie()
+        for term in ('kube', 'kubernetes', 'kubectl', 'python'):
+            trie.add(term)
+        assert trie.with_prefix('kub') == ['kube', 'kubectl', 'kubernetes']
+        assert trie.with_prefix('java') == []
+
+    def test_within_distance(self):
+        """Test fuzzy lookups find terms within the edit distance"""
+        trie = TermTrie()
+        for term in ('security', 'secure', 'compliance'):
+            trie.add(term)
+        assert trie.within('secuirty', 2) == [('security', 2)]
+        assert trie.within('compliance', 0) == [('compliance', 0)]
+        assert trie.within('python', 2) == []
+
+    def test_discard_prunes(self):
+        """Test removed terms leave no empty branches"""
+        trie = TermTrie()
+        trie.add('data')
+        trie.add('database')
+        trie.discard('database')
+        assert 'database' not in trie and 'data' in trie
+        assert trie.root.children['d'].children['a'].children['t'].children['a'].children == {}
+        trie.discard('data')
+        assert trie.root.children == {} and len(trie) == 0
+
+
+class TestExpertIndex:
+    """Test cases for ExpertIndex"""
+
+    @pytest.mark.parametrize('status,expected', [
+        ('Available', PRESENCE_AVAILABLE),
+        ('AvailableIdle', PRESENCE_AVAILABLE),
+        ('Busy until Friday', PRESENCE_BUSY),
+        ('DoNotDisturb', PRESENCE_BUSY),
+        ('BeRightBack', PRESENCE_AWAY),
+        ('PresenceUnknown', PRESENCE_UNKNOWN),
+        (None, PRESENCE_UNKNOWN),
+    ])
+    def test_normalize_presence(self, status, expected):
+        """Test Graph availability values and free-text statuses map to states"""
+        assert normalize_presence(status) == expected
+
+    def test_weights_rank_matches(self):
+        """Test credibility and recent activity order experts with the same match"""
+        hits = _index().search('kubernetes')
+        assert [profile.user_id for profile, _ in hits] == ['kim', 'ola']
+        assert hits[0][1] == pytest.approx(expertise_weight(0.9, 30))
+
+    def test_more_matched_terms_rank_higher(self):
+        """Test experts matching every query term outrank partial matches"""
+        hits = _index().search('security incident')
+        assert [profile.user_id for profile, _ in hits] == ['lee', 'kim']
+
+    def test_prefix_and_fuzzy_expansion(self):
+        """Test partial and misspelled terms are expanded through the trie"""
+        index = _index()
+        assert [profile.user_id for profile, _ in index.search('kube')] == ['kim', 'ola']
+        assert [profile.user_id for profile, _ in index.search('incidnet')] == ['lee']
+        assert index.search('kube', prefix=False) == []
+        assert index.search('incidnet', fuzzy=False) == []
+
+    def test_availability_filter(self):
+        """Test presence states restrict the experts returned"""
+        index = _index()
+        hits = index.search('security', availability=[PRESENCE_AVAILABLE])
+        assert [profile.user_id for profile, _ in hits] == ['kim']
+        assert [profile.user_id for profile, _ in index.search('', availability=[PRESENCE_AWAY])] == ['ola']
+
+    def test_refresh_presence(self):
+        """Test refreshed presence replaces statuses and the filter bitmaps"""
+        index = _index()
+        assert index.refresh_presence({'kim': 'Busy', 'ola': 'Away', 'nobody': 'Available'}) == 1
+        assert index.get('kim').availability_status == 'Busy'
+        assert index.presence_counts() == {PRESENCE_BUSY: 2, PRESENCE_AWAY: 1}
+        assert index.search('kubernetes', availability=[PRESENCE_AVAILABLE]) == []
+
+    def test_upsert_and_remove(self):
+        """Test replaced and removed experts update postings and counts"""
+        index = _index()
+        index.upsert(_Profile('ola', ['Data Engineering']))
+        assert [profile.user_id for profile, _ in index.search('kubernetes')] == ['kim']
+        assert index.remove('kim') and not index.remove('kim')
+        assert index.search('kubernetes') == []
+        assert index.area_counts() == {'Security Operations': 1, 'Incident Response': 1, 'Data Engineering': 1}
+        assert len(index) == 2
+
+
+class _PresenceStandIn(BaseHTTPRequestHandler):
+    """Local Graph getPresencesByUserId stand-in reporting everyone as Busy"""
+    protocol_version = 'HTTP/1.1'
+    requested = []
+
+    def do_POST(self):
+        ids = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['ids']
+        type(self).requested.append(ids)
+        body = json.dumps({'value': [{'id': user_id, 'availability': 'Busy'} for user_id in ids]}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestKnowledgeHubExperts:
+    """Test find_experts is served from the expert index"""
+
+    @pytest.fixture
+    def module(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        yield __import__('enterpriseknowledgehub_service')
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_find_experts(self, module):
+        """Test expertise and availability select the experts returned"""
+        service = module.EnterpriseKnowledgeHubService()
+        result = service.find_experts('risk managment')
+        assert [expert.user_id for expert in result['experts']] == ['user-003']
+        assert result['insights']['total_experts_in_system'] == 3
+
+        assert [expert.user_id for expert in service.find_experts('', 'busy')['experts']] == ['user-002']
+        assert len(service.find_experts('', 'all', limit=2)['experts']) == 2
+
+    def test_refresh_availability(self, module, monkeypatch):
+        """Test presence from Graph refreshes the availability filter"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _PresenceStandIn)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        monkeypatch.setenv('KNOWLEDGE_HUB_GRAPH_ENABLED', 'true')
+        monkeypatch.setenv('GRAPH_PRESENCE_URL', f"http://127.0.0.1:{server.server_address[1]}/presence")
+        try:
+            service = module.EnterpriseKnowledgeHubService(http_client=HttpClient(http2=False))
+            result = service.refresh_expert_availability()
+        finally:
+            server.shutdown()
+
+        assert result['success'] is True
+        assert result['status_changes'] == 3
+        assert sorted(_PresenceStandIn.requested[0]) == ['user-001', 'user-002', 'user-003']
+        assert service.find_experts('', 'available')['experts'] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,194 @@
+"""
+Unit tests for the Copilot Plugin federation module
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+from src.deadline import deadline_scope, remaining
+from src.federation import (
+    SOURCE_ERROR,
+    SOURCE_OK,
+    SOURCE_TIMEOUT,
+    FederatedSearch,
+    reciprocal_rank_fusion,
+)
+from src.security_trimming import current_principal, principal_scope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _source(category, ids, delay=0.0):
+    def search(query, limit):
+        time.sleep(delay)
+        return {category: [{'id': item_id} for item_id in ids[:limit]]}
+    return search
+
+
+@pytest.fixture
+def federation():
+    federation = FederatedSearch(timeout=2.0)
+    yield federation
+    federation.shutdown()
+
+
+class TestReciprocalRankFusion:
+    """Test cases for reciprocal_rank_fusion"""
+
+    def test_items_in_several_lists_rank_first(self):
+        """Test agreement between sources outranks a single top position"""
+        fused = reciprocal_rank_fusion([
+            ('a', [{'id': 'x'}, {'id': 'y'}], 1.0),
+            ('b', [{'id': 'z'}, {'id': 'y'}], 1.0),
+        ], k=60)
+        assert [item['id'] for item in fused] == ['y', 'x', 'z']
+        assert fused[0]['fused_score'] == pytest.approx(2 / 62, abs=1e-6)
+        assert fused[0]['sources'] == ['a', 'b']
+
+    def test_weights_and_first_copy(self):
+        """Test source weights scale contributions and the first copy is kept"""
+        fused = reciprocal_rank_fusion([
+            ('a', [{'id': 'x', 'title': 'first'}], 1.0),
+            ('b', [{'id': 'y'}, {'id': 'x', 'title': 'second'}], 3.0),
+        ], limit=1)
+        assert fused == [{'id': 'x', 'title': 'first', 'fused_score': pytest.approx(1 / 61 + 3 / 62, abs=1e-6),
+                          'sources': ['a', 'b']}]
+
+    def test_items_without_key_kept_apart(self):
+        """Test items missing the key are never merged"""
+        fused = reciprocal_rank_fusion([('a', [{'title': 'one'}, {'title': 'two'}], 1.0)])
+        assert [item['title'] for item in fused] == ['one', 'two']
+
+
+class TestFederatedSearch:
+    """Test cases for FederatedSearch"""
+
+    def test_sources_run_concurrently(self, federation):
+        """Test latency follows the slowest source rather than their sum"""
+        for name in ('a', 'b', 'c'):
+            federation.register(name, _source('documents', [f"{name}-1"], delay=0.2))
+        start = time.perf_counter()
+        result = federation.search('query')
+        assert time.perf_counter() - start < 0.5
+        assert not result.partial
+        assert {item['id'] for item in result.results['documents']} == {'a-1', 'b-1', 'c-1'}
+        assert all(status['status'] == SOURCE_OK and status['latency_ms'] >= 200
+                   for status in result.sources.values())
+
+    def test_late_sources_are_partial(self, federation):
+        """Test sources missing the deadline are dropped without waiting for them"""
+        federation.register('fast', _source('documents', ['fast-1']))
+        federation.register('slow', _source('documents', ['slow-1'], delay=1.0))
+        start = time.perf_counter()
+        with deadline_scope(0.2):
+            result = federation.search('query')
+        assert time.perf_counter() - start < 0.6
+        assert result.partial and result.unavailable == ['slow']
+        assert [item['id'] for item in result.results['documents']] == ['fast-1']
+        assert result.sources['slow']['status'] == SOURCE_TIMEOUT
+        assert result.sources['fast']['results'] == 1
+
+    def test_failed_sources_and_categories(self, federation):
+        """Test errors and unavailable categories are reported per source"""
+        def broken(query, limit):
+            raise ConnectionError('down')
+
+        federation.register('broken', broken)
+        federation.register('mixed', lambda query, limit: {'documents': [{'id': 'd'}], 'people': None})
+        result = federation.search('query')
+        assert result.partial
+        assert result.unavailable == ['broken', 'mixed.people']
+        assert result.sources['broken'] == {'status': SOURCE_ERROR, 'latency_ms': pytest.approx(0, abs=50),
+                                            'error': 'ConnectionError'}
+        assert result.results == {'documents': [{'id': 'd', 'fused_score': pytest.approx(1 / 61, abs=1e-6),
+                                                 'sources': ['mixed']}]}
+
+    def test_sources_see_request_context(self, federation):
+        """Test the caller's deadline and principal apply inside sources"""
+        seen = {}
+
+        def search(query, limit):
+            seen.update(principal=current_principal(), remaining=remaining(), thread=threading.current_thread())
+            return {}
+
+        federation.register('context', search)
+        with deadline_scope(1.0), principal_scope('user-001'):
+            federation.search('query')
+        assert seen['principal'] == 'user-001'
+        assert 0 < seen['remaining'] <= 1.0
+        assert seen['thread'] is not threading.current_thread()
+
+
+class TestKnowledgeHubFederation:
+    """Test search_content fans out to every knowledge source"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        yield module.EnterpriseKnowledgeHubService()
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_local_sources(self, service):
+        """Test documents, people and conversations come from the local sources"""
+        with principal_scope('user-003'):
+            result = service.search_content({'query': 'security compliance'})
+        assert 'partial' not in result
+        search_results = result['search_results']
+        assert search_results['documents'][0]['id'] == 'kb-doc-003'
+        assert search_results['people'][0]['id'] == 'user-003'
+        assert search_results['conversations'][0]['id'] == 'conv-002'
+        assert set(result['analytics']['sources']) == {'knowledge_index', 'expert_directory', 'knowledge_graph'}
+
+    def test_slow_source_returns_partial(self, service):
+        """Test a source missing the deadline leaves the others' results"""
+        service.federation.register('slow_archive', _source('documents', ['archived'], delay=1.0))
+        with deadline_scope(0.2), principal_scope('user-003'):
+            result = service.search_content({'query': 'security'})
+        assert result['partial'] is True
+        assert result['search_results']['unavailable_sources'] == ['slow_archive']
+        assert 'archived' not in [document['id'] for document in result['search_results']['documents']]
+        assert result['analytics']['sources']['slow_archive']['status'] == SOURCE_TIMEOUT
+        assert result['analytics']['sources']['knowledge_index']['status'] == SOURCE_OK
+
+    @pytest.mark.parametrize('query', ['', 'the and of'])
+    def test_queries_without_terms(self, service, query):
+        """Test queries without searchable terms list documents unscored instead of failing"""
+        with principal_scope('user-003'):
+            result = service.search_content({'query': query})
+        assert 'partial' not in result
+        assert result['search_results']['unavailable_sources'] == []
+        documents = result['search_results']['documents']
+        assert documents and all(document['relevance'] == 0.0 for document in documents)
+        assert result['analytics']['sources']['knowledge_index']['status'] == SOURCE_OK
+
+    def test_filters_exclude_results(self, service):
+        """Test content type, department and date filters drop results that do not match"""
+        def search(**filters):
+            return service.search_content({'query': 'security compliance', **filters})['search_results']
+
+        with principal_scope('user-003'):
+            unfiltered = search()
+            assert [document['id'] for document in unfiltered['documents']] == ['kb-doc-003']
+            assert [person['id'] for person in unfiltered['people']] == ['user-003', 'user-001']
+
+            assert search(content_types=['Technical Guide'])['documents'] == []
+            assert [document['id'] for document in search(content_types=['checklist'])['documents']] == ['kb-doc-003']
+            assert [person['id'] for person in search(departments=['Security'])['people']] == ['user-003']
+
+            # Seeded documents and conversations are older than a week
+            recent = search(date_range='last_week')
+            assert recent['documents'] == [] and recent['conversations'] == []
+            assert recent['people'] == unfiltered['people']
+
+    def test_unknown_date_range(self, service):
+        """Test an unsupported date range is reported instead of ignored"""
+        result = service.search_content({'query': 'security', 'date_range': 'yesterday'})
+        assert result['success'] is False and 'date_range' in result['error']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
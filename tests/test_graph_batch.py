@@ -0,0 +1,233 @@
+"""
+Unit tests for the Copilot Plugin Graph batch module
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from src.deadline import deadline_scope
+from src.graph_batch import GraphBatch, GraphRequestError
+from src.http_client import HttpClient
+from src.resilience import ResilienceRegistry, RetryPolicy
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _GraphStandIn(BaseHTTPRequestHandler):
+    """
+    Local Microsoft Graph $batch stand-in
+
+    /echo returns the sub-request body, /fail returns 500 and /throttle
+    returns 429 with Retry-After until throttle_count is used up. Setting
+    batch_throttle_count rejects whole batches with 429 first.
+    """
+    protocol_version = 'HTTP/1.1'
+    batches = []
+    posts = 0
+    throttle_count = 0
+    batch_throttle_count = 0
+
+    def _respond(self, status, payload, headers=None):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        items = json.loads(self.rfile.read(int(self.headers['Content-Length'])))['requests']
+        stand_in = type(self)
+        stand_in.posts += 1
+        if stand_in.batch_throttle_count > 0:
+            stand_in.batch_throttle_count -= 1
+            self._respond(429, {'error': {'code': 'TooManyRequests'}}, {'Retry-After': '0.05'})
+            return
+
+        stand_in.batches.append(items)
+        statuses = {}
+        responses = []
+        for item in items:
+            if any(statuses.get(dependency, 200) >= 400 for dependency in item.get('dependsOn', [])):
+                response = {'status': 424, 'body': {'error': {'code': 'FailedDependency'}}}
+            else:
+                response = self._sub_response(item)
+            statuses[item['id']] = response['status']
+            responses.append(dict(response, id=item['id']))
+        # Graph does not preserve request order in the response
+        self._respond(200, {'responses': list(reversed(responses))})
+
+    def _sub_response(self, item):
+        url = item['url']
+        if url.startswith('/fail'):
+            return {'status': 500, 'body': {'error': {'message': 'backend failure'}}}
+        if url.startswith('/throttle') and type(self).throttle_count > 0:
+            type(self).throttle_count -= 1
+            return {'status': 429, 'headers': {'Retry-After': '0.05'}, 'body': {}}
+        if url.startswith('/search/query'):
+            entity_types = item['body']['requests'][0]['entityTypes']
+            return {'status': 200, 'body': {'value': [{'hitsContainers': [{'hits': [
+                {'hitId': f"hit-{entity_types[0]}", 'rank': 1, 'summary': 'Enterprise API Strategy',
+                 'resource': {'name': 'api-strategy.docx'}}
+            ]}]}]}}
+        return {'status': 200, 'body': {'url': url, 'echo': item.get('body')}}
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def graph_url():
+    """Local Graph stand-in server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _GraphStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/v1.0/$batch"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_stand_in():
+    _GraphStandIn.batches = []
+    _GraphStandIn.posts = 0
+    _GraphStandIn.throttle_count = 0
+    _GraphStandIn.batch_throttle_count = 0
+
+
+@pytest.fixture
+def client():
+    http_client = HttpClient(http2=False)
+    yield http_client
+    http_client.close()
+
+
+class TestGraphBatch:
+    """Test cases for GraphBatch against the stand-in"""
+
+    def test_packs_twenty_per_batch(self, client, graph_url):
+        """Test requests are sent in batches of at most 20 and demultiplexed by id"""
+        batch = GraphBatch(client, graph_url)
+        requests = [batch.get(f"/echo/{i}") for i in range(45)]
+        batch.execute()
+
+        assert [len(items) for items in _GraphStandIn.batches] == [20, 20, 5]
+        assert batch.round_trips == 3
+        assert [request.result()['url'] for request in requests] == [f"/echo/{i}" for i in range(45)]
+
+    def test_result_executes_pending(self, client, graph_url):
+        """Test reading a result sends the batch once"""
+        batch = GraphBatch(client, graph_url)
+        first = batch.post('/echo', {'a': 1})
+        second = batch.get('/echo/2')
+
+        assert first.result() == {'url': '/echo', 'echo': {'a': 1}}
+        assert second.done
+        assert batch.round_trips == 1
+        assert _GraphStandIn.batches[0][0]['headers'] == {'Content-Type': 'application/json'}
+
+    def test_dependencies_in_batch(self, client, graph_url):
+        """Test dependencies are sent as dependsOn and failures cascade"""
+        with GraphBatch(client, graph_url) as batch:
+            failed = batch.get('/fail')
+            dependent = batch.get('/echo/after', depends_on=[failed])
+            independent = batch.get('/echo/other')
+
+        assert _GraphStandIn.batches[0][1]['dependsOn'] == ['1']
+        assert dependent.status == 424
+        assert independent.ok
+        with pytest.raises(GraphRequestError) as exc_info:
+            failed.result()
+        assert exc_info.value.status_code == 500
+        assert 'backend failure' in str(exc_info.value)
+
+    def test_dependencies_across_batches(self, client, graph_url):
+        """Test dependencies are sent first and failed ones stop dependents locally"""
+        with GraphBatch(client, graph_url, max_batch_size=2) as batch:
+            third = batch.get('/echo/3')
+            failed = batch.get('/fail')
+            first = batch.get('/echo/1')
+            second = batch.get('/echo/2', depends_on=[first])
+            third.depends_on.append(second)
+            after_failure = batch.get('/echo/4', depends_on=[failed, first])
+
+        assert [[item['url'] for item in items] for items in _GraphStandIn.batches] == [
+            ['/echo/1', '/echo/2'], ['/echo/3', '/fail']
+        ]
+        assert third.ok and second.ok
+        assert after_failure.status == 424
+
+    def test_throttled_requests_retried(self, client, graph_url):
+        """Test throttled sub-requests and their dependents are resent after Retry-After"""
+        _GraphStandIn.throttle_count = 1
+        with GraphBatch(client, graph_url) as batch:
+            throttled = batch.get('/throttle')
+            dependent = batch.get('/echo/after', depends_on=[throttled])
+            other = batch.get('/echo/other')
+
+        assert throttled.ok and dependent.ok and other.ok
+        assert [len(items) for items in _GraphStandIn.batches] == [3, 2]
+
+    def test_throttling_respects_deadline(self, client, graph_url):
+        """Test no retry is scheduled past the request deadline"""
+        _GraphStandIn.throttle_count = 1
+        with deadline_scope(0.02):
+            with GraphBatch(client, graph_url) as batch:
+                throttled = batch.get('/throttle')
+
+        assert throttled.status == 429
+        assert len(_GraphStandIn.batches) == 1
+
+    def test_whole_batch_throttled(self, client, graph_url):
+        """Test a batch rejected with 429 is resent"""
+        _GraphStandIn.batch_throttle_count = 1
+        with GraphBatch(client, graph_url) as batch:
+            request = batch.get('/echo/1')
+        assert request.ok
+        assert batch.round_trips == 2
+
+    def test_throttled_batch_not_retried_by_resilience(self, graph_url):
+        """Test a throttled batch is only resent by the batch, after its Retry-After delay"""
+        _GraphStandIn.batch_throttle_count = 10
+        http_client = HttpClient(http2=False, resilience=ResilienceRegistry(
+            retry=RetryPolicy(attempts=3, base_delay=0.01)
+        ))
+        try:
+            with GraphBatch(http_client, graph_url, max_attempts=3) as batch:
+                request = batch.get('/echo/1')
+        finally:
+            http_client.close()
+        assert request.status == 429
+        assert _GraphStandIn.posts == 3
+
+
+class TestKnowledgeHubSearch:
+    """Test unified search fans out through one Graph batch"""
+
+    def test_search_content(self, monkeypatch, client, graph_url):
+        """Test Graph contributes documents only; app-only tokens cannot search people or chats"""
+        monkeypatch.setenv('KNOWLEDGE_HUB_GRAPH_ENABLED', 'true')
+        monkeypatch.setenv('GRAPH_BATCH_URL', graph_url)
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        try:
+            service = module.EnterpriseKnowledgeHubService(http_client=client)
+            result = service.search_content({'query': 'api strategy'})
+        finally:
+            sys.modules.pop('enterpriseknowledgehub_service', None)
+
+        assert result['success'] is True
+        assert [item['url'] for item in _GraphStandIn.batches[0]] == ['/search/query']
+        search_results = result['search_results']
+        assert search_results['documents'][0]['id'] == 'hit-driveItem'
+        assert search_results['unavailable_sources'] == []
+        assert 'partial' not in result
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
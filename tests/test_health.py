@@ -0,0 +1,132 @@
+"""
+Unit tests for the Copilot Plugin health module
+"""
+
+import threading
+import time
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.health import (
+    STATUS_DOWN, STATUS_NOT_CONFIGURED, STATUS_UP, HealthMonitor, http_probe
+)
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Dependency stand-in answering by path"""
+
+    def do_GET(self):
+        if self.path == '/slow':
+            time.sleep(1.0)
+        self.send_response(503 if self.path == '/fail' else 200)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def stand_in_url():
+    """Local dependency stand-in server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class TestHealthMonitor:
+    """Test cases for HealthMonitor"""
+
+    def test_snapshot_before_first_round(self):
+        """Test snapshot is available immediately with unknown dependencies"""
+        monitor = HealthMonitor(interval=60)
+        gate = threading.Event()
+        monitor.register('blocked', lambda: gate.wait(1) and STATUS_UP)
+
+        snapshot = monitor.snapshot()
+        gate.set()
+        monitor.stop()
+
+        assert snapshot['dependencies']['blocked'] == 'unknown'
+        assert snapshot['status'] == 'degraded'
+
+    def test_run_probes(self):
+        """Test probe results are collected into the snapshot"""
+        monitor = HealthMonitor(interval=60)
+        monitor.register('ok', lambda: STATUS_UP)
+        monitor.register('queue', lambda: (STATUS_UP, {'depth': 3}))
+        monitor.register('broken', lambda: 1 / 0)
+
+        snapshot = monitor.run_probes()
+
+        assert snapshot['dependencies'] == {'ok': 'up', 'queue': 'up', 'broken': 'down'}
+        assert snapshot['probes']['queue']['details'] == {'depth': 3}
+        assert snapshot['probes']['broken']['details'] == {'error': 'ZeroDivisionError'}
+        assert snapshot['status'] == 'degraded'
+
+    def test_critical_dependency_down(self):
+        """Test critical dependencies make the snapshot unhealthy"""
+        monitor = HealthMonitor(interval=60)
+        monitor.register('database', lambda: STATUS_DOWN, critical=True)
+
+        assert monitor.run_probes()['status'] == 'unhealthy'
+
+    def test_probe_timeout(self):
+        """Test hung probes time out and are not restarted while running"""
+        monitor = HealthMonitor(interval=60, timeout=0.05)
+        calls = []
+        gate = threading.Event()
+
+        def hung():
+            calls.append(1)
+            gate.wait(2)
+            return STATUS_UP
+
+        monitor.register('hung', hung)
+        first = monitor.run_probes()
+        second = monitor.run_probes()
+        gate.set()
+
+        assert first['probes']['hung']['details'] == {'error': 'timeout'}
+        assert second['probes']['hung']['details'] == {'error': 'previous probe still running'}
+        assert len(calls) == 1
+
+    def test_background_schedule(self):
+        """Test the background thread refreshes the snapshot"""
+        monitor = HealthMonitor(interval=0.01)
+        monitor.register('ok', lambda: STATUS_UP)
+
+        monitor.start()
+        deadline = time.time() + 2
+        while monitor.snapshot()['dependencies']['ok'] != 'up' and time.time() < deadline:
+            time.sleep(0.01)
+        monitor.stop()
+
+        assert monitor.snapshot()['status'] == 'healthy'
+
+
+class TestHttpProbe:
+    """Test cases for HTTP dependency probes against a local stand-in"""
+
+    def test_up(self, stand_in_url):
+        """Test healthy stand-in"""
+        assert http_probe(f"{stand_in_url}/ok")() == (STATUS_UP, {'status_code': 200})
+
+    def test_down(self, stand_in_url):
+        """Test failing stand-in"""
+        assert http_probe(f"{stand_in_url}/fail")() == (STATUS_DOWN, {'status_code': 503})
+
+    def test_not_configured(self):
+        """Test unset dependency URL"""
+        assert http_probe(None)() == STATUS_NOT_CONFIGURED
+
+    def test_timeout_reports_down(self, stand_in_url):
+        """Test slow stand-in is reported down by the monitor"""
+        monitor = HealthMonitor(interval=60, timeout=0.2)
+        monitor.register('slow', http_probe(f"{stand_in_url}/slow", timeout=5))
+
+        assert monitor.run_probes()['dependencies']['slow'] == 'down'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
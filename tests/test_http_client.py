@@ -0,0 +1,227 @@
+"""
+Unit tests for the Copilot Plugin HTTP client module
+"""
+
+import gzip
+import json
+import threading
+import time
+from collections import namedtuple
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock
+
+import pytest
+from src.deadline import DeadlineExceeded, deadline_scope
+from src.http_client import HttpClient, HttpStatusError, TokenProvider, scope_for_url
+from src.resilience import CircuitOpenError, ResilienceRegistry, RetryPolicy
+
+AccessToken = namedtuple('AccessToken', ['token', 'expires_on'])
+
+SCOPE = 'https://stand-in/.default'
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Downstream stand-in echoing what it received, with keep-alive"""
+    protocol_version = 'HTTP/1.1'
+    requests = []
+    reject_token = None
+
+    def _respond(self, status, payload, compress=False):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        if compress:
+            body = gzip.compress(body)
+            self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+        if self.headers.get('Content-Encoding') == 'gzip':
+            body = gzip.decompress(body)
+        type(self).requests.append({
+            'path': self.path,
+            'port': self.client_address[1],
+            'authorization': self.headers.get('Authorization'),
+            'content_encoding': self.headers.get('Content-Encoding'),
+            'body': body.decode()
+        })
+
+        if self.path == '/fail':
+            self._respond(503, {'error': 'unavailable'})
+        elif type(self).reject_token and self.headers.get('Authorization') == type(self).reject_token:
+            self._respond(401, {'error': 'invalid token'})
+        else:
+            compress = 'gzip' in (self.headers.get('Accept-Encoding') or '')
+            self._respond(200, {'path': self.path, 'body': body.decode()}, compress)
+
+    do_GET = _handle
+    do_POST = _handle
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def stand_in_url():
+    """Local downstream stand-in server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _StandInHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def reset_stand_in():
+    _StandInHandler.requests = []
+    _StandInHandler.reject_token = None
+
+
+class _Credential:
+    """Credential stand-in issuing numbered tokens"""
+
+    def __init__(self, lifetime=3600):
+        self.lifetime = lifetime
+        self.calls = 0
+
+    def get_token(self, scope):
+        self.calls += 1
+        return AccessToken(f"token-{self.calls}", time.time() + self.lifetime)
+
+
+def _client(credential=None, **kwargs):
+    return HttpClient(credential=credential, http2=False, scopes={'127.0.0.1': SCOPE}, **kwargs)
+
+
+class TestHttpClient:
+    """Test cases for HttpClient against the stand-in"""
+
+    def test_connections_are_reused(self, stand_in_url):
+        """Test sequential calls to a host share one keep-alive connection"""
+        client = _client()
+        for _ in range(3):
+            assert client.get(f"{stand_in_url}/ok").status_code == 200
+
+        assert len({request['port'] for request in _StandInHandler.requests}) == 1
+        assert len(client._pools) == 1
+        client.close()
+
+    def test_token_attached_and_cached(self, stand_in_url):
+        """Test bearer tokens are attached and acquired once"""
+        credential = _Credential()
+        client = _client(credential)
+        client.get(f"{stand_in_url}/a")
+        client.get(f"{stand_in_url}/b")
+
+        assert [r['authorization'] for r in _StandInHandler.requests] == ['Bearer token-1'] * 2
+        assert credential.calls == 1
+
+    def test_rejected_token_is_refreshed(self, stand_in_url):
+        """Test a 401 drops the token and retries once with a new one"""
+        _StandInHandler.reject_token = 'Bearer token-1'
+        client = _client(_Credential())
+
+        assert client.get(f"{stand_in_url}/ok").status_code == 200
+        assert [r['authorization'] for r in _StandInHandler.requests] == ['Bearer token-1', 'Bearer token-2']
+
+    def test_gzip_bodies(self, stand_in_url):
+        """Test request bodies are compressed and responses decoded"""
+        client = _client(compress_over=16)
+        response = client.post(f"{stand_in_url}/ingest", json_body={'text': 'x' * 100})
+
+        assert _StandInHandler.requests[0]['content_encoding'] == 'gzip'
+        assert json.loads(response.json()['body']) == {'text': 'x' * 100}
+
+        client.post(f"{stand_in_url}/ingest", json_body={'a': 1})
+        assert _StandInHandler.requests[1]['content_encoding'] is None
+
+    def test_dependency_telemetry(self, stand_in_url):
+        """Test each call is tracked as a dependency"""
+        telemetry = Mock()
+        client = _client(telemetry=telemetry)
+        with pytest.raises(HttpStatusError) as exc_info:
+            client.get(f"{stand_in_url}/fail")
+
+        assert exc_info.value.status_code == 503
+        call = telemetry.track_dependency.call_args.kwargs
+        assert call['name'] == 'GET /fail'
+        assert call['dependency_type'] == 'HTTP'
+        assert call['success'] is False
+        assert call['properties']['status_code'] == 503
+
+    def test_calls_go_through_resilience(self, stand_in_url):
+        """Test failing calls trip the dependency's circuit"""
+        registry = ResilienceRegistry(retry=RetryPolicy(attempts=1),
+                                      settings={'stand_in': {'window_size': 2, 'minimum_calls': 2}})
+        client = _client(resilience=registry)
+        for _ in range(2):
+            with pytest.raises(HttpStatusError):
+                client.get(f"{stand_in_url}/fail", dependency='stand_in')
+
+        with pytest.raises(CircuitOpenError):
+            client.get(f"{stand_in_url}/ok", dependency='stand_in')
+        assert len(_StandInHandler.requests) == 2
+
+    def test_only_idempotent_methods_retried(self, stand_in_url):
+        """Test POSTs are sent once unless the caller opts in to retries"""
+        registry = ResilienceRegistry(retry=RetryPolicy(attempts=3, base_delay=0.01))
+        client = _client(resilience=registry)
+
+        with pytest.raises(HttpStatusError):
+            client.post(f"{stand_in_url}/fail", json_body={}, dependency='stand_in')
+        assert len(_StandInHandler.requests) == 1
+
+        with pytest.raises(HttpStatusError):
+            client.get(f"{stand_in_url}/fail", dependency='stand_in')
+        assert len(_StandInHandler.requests) == 4
+
+        with pytest.raises(HttpStatusError):
+            client.post(f"{stand_in_url}/fail", json_body={}, dependency='stand_in', retry=True)
+        assert len(_StandInHandler.requests) == 7
+
+    def test_spent_deadline(self, stand_in_url):
+        """Test no request is sent after the deadline"""
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                _client().get(f"{stand_in_url}/ok")
+        assert _StandInHandler.requests == []
+
+
+class TestTokenProvider:
+    """Test cases for token refresh"""
+
+    def test_proactive_refresh(self):
+        """Test tokens near expiry are served while a replacement is fetched"""
+        credential = _Credential(lifetime=120)
+        tokens = TokenProvider(credential, refresh_margin=300, min_validity=30)
+
+        assert tokens.get_token(SCOPE) == 'token-1'
+        assert tokens.get_token(SCOPE) == 'token-1'
+        deadline = time.time() + 2
+        while tokens._tokens[SCOPE].token == 'token-1' and time.time() < deadline:
+            time.sleep(0.01)
+        assert tokens.get_token(SCOPE) == 'token-2'
+
+    def test_expiring_token_blocks(self):
+        """Test tokens about to expire are replaced before use"""
+        credential = _Credential(lifetime=10)
+        tokens = TokenProvider(credential, refresh_margin=300, min_validity=30)
+        assert tokens.get_token(SCOPE) == 'token-1'
+        assert tokens.get_token(SCOPE) == 'token-2'
+
+    @pytest.mark.parametrize('url,expected', [
+        ('https://graph.microsoft.com/v1.0/search/query', 'https://graph.microsoft.com/.default'),
+        ('https://contoso.vault.azure.net/secrets/x', 'https://vault.azure.net/.default'),
+        ('https://example.com/', None),
+    ])
+    def test_scope_for_url(self, url, expected):
+        """Test token scopes are chosen by host"""
+        assert scope_for_url(url) == expected
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
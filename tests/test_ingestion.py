@@ -0,0 +1,320 @@
+"""
+Unit tests for the Copilot Plugin ingestion module
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from src.deadline import DEFAULT_BUDGET_SECONDS
+from src.http_client import HttpClient, HttpStatusError
+from src.ingestion import CheckpointStore, DeltaIngestor, SegmentStore, extract_text
+from src.search_index import SearchIndex
+from src.security_trimming import principal_scope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PAGE_SIZE = 2
+
+
+class _DriveStandIn(BaseHTTPRequestHandler):
+    """
+    Local SharePoint drive delta feed stand-in
+
+    Changes are kept as a versioned log. /delta without a token returns
+    every live item, /delta?token=N the latest state of items changed after
+    version N, PAGE_SIZE items per page. /content/{id} serves file bodies.
+    """
+    protocol_version = 'HTTP/1.1'
+    log = []
+    contents = {}
+    requested = []
+    fail_pages = set()
+    expired_tokens = set()
+
+    @classmethod
+    def change(cls, item):
+        cls.log.append((len(cls.log) + 1, item))
+
+    def _respond(self, status, payload, content_type='application/json'):
+        body = payload if isinstance(payload, bytes) else json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        stand_in = type(self)
+        stand_in.requested.append(self.path)
+        parts = urlsplit(self.path)
+        base = f"http://{self.headers['Host']}"
+        if parts.path.startswith('/content/'):
+            self._respond(200, stand_in.contents[parts.path.rsplit('/', 1)[1]].encode(), 'text/html')
+            return
+
+        query = {key: values[0] for key, values in parse_qs(parts.query).items()}
+        token = int(query.get('token', 0))
+        skip = int(query.get('skip', 0))
+        if query.get('token') in stand_in.expired_tokens:
+            self._respond(410, {'error': {'code': 'resyncRequired'}})
+            return
+        if skip in stand_in.fail_pages:
+            stand_in.fail_pages.discard(skip)
+            self._respond(500, {'error': {'code': 'generalException'}})
+            return
+
+        latest = {}
+        for version, item in stand_in.log:
+            if version > token:
+                latest.pop(item['id'], None)
+                latest[item['id']] = item
+        items = [item for item in latest.values() if token or 'deleted' not in item]
+        page = items[skip:skip + PAGE_SIZE]
+        for item in page:
+            if item['id'] in stand_in.contents:
+                item['@microsoft.graph.downloadUrl'] = f"{base}/content/{item['id']}"
+
+        payload = {'value': page}
+        if skip + PAGE_SIZE < len(items):
+            payload['@odata.nextLink'] = f"{base}/delta?token={token}&skip={skip + PAGE_SIZE}"
+        else:
+            payload['@odata.deltaLink'] = f"{base}/delta?token={len(stand_in.log)}"
+        self._respond(200, payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def _file(item_id, name, content_type='Technical Guide', **extra):
+    item = {'id': item_id, 'name': name, 'file': {'mimeType': 'text/html'},
+            'createdDateTime': '2025-07-01T10:00:00Z', 'lastModifiedDateTime': '2025-07-20T10:00:00Z',
+            'listItem': {'fields': {'ContentType': content_type, 'TopicCategories': 'Azure;Networking'}}}
+    item.update(extra)
+    return item
+
+
+@pytest.fixture(scope='module')
+def drive_url():
+    """Local drive delta stand-in server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _DriveStandIn)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}/delta"
+    server.shutdown()
+
+
+@pytest.fixture(autouse=True)
+def seed_drive():
+    _DriveStandIn.log = []
+    _DriveStandIn.contents = {
+        'f1': '<html><body><h1>Hub</h1><p>Hub and spoke topology</p><script>x()</script></body></html>',
+        'f2': '<p>Private endpoints for storage accounts</p>',
+    }
+    _DriveStandIn.requested = []
+    _DriveStandIn.fail_pages = set()
+    _DriveStandIn.expired_tokens = set()
+    _DriveStandIn.change({'id': 'root', 'name': 'root', 'folder': {}, 'root': {}})
+    _DriveStandIn.change(_file('f1', 'network-design.html'))
+    _DriveStandIn.change(_file('f2', 'storage-guide.html', 'FAQ'))
+    _DriveStandIn.change(_file('f3', 'release-notes.txt', file={'mimeType': 'application/pdf'}))
+
+
+def _record(item, text):
+    fields = item['listItem']['fields']
+    return (item['id'], {'title': item['name'], 'topic_categories': fields['TopicCategories'], 'body': text},
+            {'content_type': fields['ContentType']}, {'name': item['name']}, None)
+
+
+@pytest.fixture
+def client():
+    http_client = HttpClient(http2=False)
+    yield http_client
+    http_client.close()
+
+
+def _ingestor(client, drive_url, tmp_path, index=None):
+    return DeltaIngestor(client, drive_url, index if index is not None else SearchIndex(), _record,
+                         CheckpointStore(tmp_path), SegmentStore(tmp_path / 'segments'), feed='site')
+
+
+class TestDeltaIngestor:
+    """Test cases for DeltaIngestor against the drive stand-in"""
+
+    def test_initial_sync(self, client, drive_url, tmp_path):
+        """Test a first sync indexes every file across pages and saves the delta link"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        stats = ingestor.sync()
+
+        assert stats == {'pages': 2, 'upserted': 3, 'deleted': 0, 'skipped': 1, 'complete': True}
+        assert len(ingestor.index) == 3
+        assert [doc for doc, _ in ingestor.index.search('spoke topology')] == [{'name': 'network-design.html'}]
+        assert ingestor.index.search('script') == []
+        assert CheckpointStore(tmp_path).load('site') == {'delta_link': f"{drive_url}?token=4"}
+
+    def test_incremental_sync(self, client, drive_url, tmp_path):
+        """Test later syncs only process changed items"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.change(_file('f2', 'storage-guide.html', 'Technical Guide'))
+        _DriveStandIn.change({'id': 'f3', 'deleted': {'state': 'deleted'}})
+
+        stats = ingestor.sync()
+        assert (stats['pages'], stats['upserted'], stats['deleted']) == (1, 1, 1)
+        assert ingestor.index.facet_counts('content_type') == {'Technical Guide': 2}
+        assert 'f3' not in ingestor.index
+
+        assert ingestor.sync()['upserted'] == 0
+
+    def test_resume_after_failure(self, client, drive_url, tmp_path):
+        """Test an interrupted sync resumes at the first unfinished page"""
+        _DriveStandIn.fail_pages = {2}
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        with pytest.raises(HttpStatusError):
+            ingestor.sync()
+        assert len(ingestor.index) == 1
+
+        _DriveStandIn.requested = []
+        stats = ingestor.sync()
+        assert _DriveStandIn.requested[0].endswith('skip=2')
+        assert stats['upserted'] == 2
+        assert len(ingestor.index) == 3
+
+    def test_expired_token_resyncs(self, client, drive_url, tmp_path):
+        """Test an expired delta token restarts from a full crawl"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.expired_tokens = {'4'}
+
+        stats = ingestor.sync()
+        assert stats['upserted'] == 3 and stats['complete']
+        assert len(ingestor.index) == 3
+
+    def test_resync_sweeps_missed_deletions(self, client, drive_url, tmp_path):
+        """Test items deleted while the token was expired leave the index after a resync"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.change({'id': 'f1', 'deleted': {}})
+        _DriveStandIn.expired_tokens = {'4'}
+
+        stats = ingestor.sync()
+        assert (stats['upserted'], stats['deleted'], stats['complete']) == (2, 1, True)
+        assert 'f1' not in ingestor.index and len(ingestor.index) == 2
+        assert CheckpointStore(tmp_path).load('site') == {'delta_link': f"{drive_url}?token=5"}
+
+        restored = _ingestor(client, drive_url, tmp_path)
+        restored.restore()
+        assert 'f1' not in restored.index and len(restored.index) == 2
+
+    def test_interrupted_resync_sweeps_after_restart(self, client, drive_url, tmp_path):
+        """Test a resync resumed by a new process still removes missed deletions"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.change({'id': 'f3', 'deleted': {}})
+        _DriveStandIn.expired_tokens = {'4'}
+        _DriveStandIn.fail_pages = {2}
+        with pytest.raises(HttpStatusError):
+            ingestor.sync()
+        assert CheckpointStore(tmp_path).load('site')['resync'] is True
+
+        restored = _ingestor(client, drive_url, tmp_path)
+        restored.restore()
+        stats = restored.sync()
+        assert stats['deleted'] == 1 and 'f3' not in restored.index
+        assert sorted(doc['name'] for doc, _ in restored.index.search('')) == [
+            'network-design.html', 'storage-guide.html'
+        ]
+
+    def test_restore_is_idempotent(self, client, drive_url, tmp_path):
+        """Test segments rebuild the same index, however often they are replayed"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.change({'id': 'f1', 'deleted': {}})
+        ingestor.sync()
+
+        restored = _ingestor(client, drive_url, tmp_path)
+        assert restored.restore() == 4
+        restored.restore()
+        assert len(restored.index) == 2
+        assert restored.index.facet_counts('content_type') == ingestor.index.facet_counts('content_type')
+
+    def test_compact(self, client, drive_url, tmp_path):
+        """Test compaction keeps one upsert per live document"""
+        ingestor = _ingestor(client, drive_url, tmp_path)
+        ingestor.sync()
+        _DriveStandIn.change({'id': 'f1', 'deleted': {}})
+        ingestor.sync()
+
+        assert ingestor.segments.compact() == 2
+        assert len(ingestor.segments.segments()) == 1
+        restored = _ingestor(client, drive_url, tmp_path)
+        assert restored.restore() == 2
+
+    def test_complete_sync_compacts_segments(self, client, drive_url, tmp_path):
+        """Test complete syncs compact the segment log once it passes the threshold"""
+        ingestor = DeltaIngestor(client, drive_url, SearchIndex(), _record, CheckpointStore(tmp_path),
+                                 SegmentStore(tmp_path / 'segments'), feed='site', compact_segments=3)
+        ingestor.sync()
+        assert len(ingestor.segments.segments()) == 2
+        for version in range(2):
+            _DriveStandIn.change(_file('f2', f"storage-guide-v{version}.html"))
+            ingestor.sync()
+        assert len(ingestor.segments.segments()) == 1
+
+        restored = _ingestor(client, drive_url, tmp_path)
+        assert restored.restore() == 3
+        assert [doc for doc, _ in restored.index.search('v1')] == [{'name': 'storage-guide-v1.html'}]
+
+    def test_extract_text(self):
+        """Test HTML is reduced to its visible text"""
+        html = b'<html><style>p {}</style><p>Zero\n  Trust</p><script>a()</script></html>'
+        assert extract_text(html, 'text/html') == 'Zero Trust'
+        assert extract_text(b'plain  text', 'text/plain') == 'plain text'
+
+
+class TestKnowledgeHubIngestion:
+    """Test the knowledge hub keeps its index in step with the drive"""
+
+    def test_sync_operation(self, monkeypatch, drive_url, tmp_path):
+        """Test synced documents are searchable and survive a restart"""
+        monkeypatch.setenv('KNOWLEDGE_HUB_DELTA_URL', drive_url)
+        monkeypatch.setenv('KNOWLEDGE_HUB_INDEX_DIR', str(tmp_path))
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        try:
+            service = module.EnterpriseKnowledgeHubService(http_client=HttpClient(http2=False))
+            result = service.sync_knowledge_index()
+            assert result['success'] is True
+            assert result['documents_indexed'] == 6
+
+            with principal_scope('user-001'):
+                documents = service.search_documents({'query': 'private endpoints storage'})['documents']
+            assert documents[0]['id'] == 'f2'
+            assert documents[0]['content_type'] == 'FAQ'
+            assert documents[0]['topic_categories'] == ['Azure', 'Networking']
+
+            restarted = module.EnterpriseKnowledgeHubService(http_client=HttpClient(http2=False))
+            assert len(restarted.index) == 6
+        finally:
+            sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_timer_operations_budget(self, monkeypatch):
+        """Test timer-driven operations declare budgets beyond the request default"""
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        try:
+            operations = module.runtime.operations
+            assert operations['sync_knowledge_index'].budget == module.SYNC_BUDGET_SECONDS
+            assert operations['refresh_expert_availability'].budget == module.PRESENCE_REFRESH_BUDGET_SECONDS
+            assert min(module.SYNC_BUDGET_SECONDS, module.PRESENCE_REFRESH_BUDGET_SECONDS) > DEFAULT_BUDGET_SECONDS
+            assert operations['search_content'].budget == DEFAULT_BUDGET_SECONDS
+        finally:
+            sys.modules.pop('enterpriseknowledgehub_service', None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
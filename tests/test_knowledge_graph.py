@@ -0,0 +1,143 @@
+"""
+Unit tests for the Copilot Plugin knowledge graph module
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.deadline import deadline_scope
+from src.knowledge_graph import (
+    EDGE_ABOUT,
+    EDGE_AUTHORED,
+    EDGE_EXPERT_IN,
+    NODE_DOCUMENT,
+    NODE_PERSON,
+    NODE_TOPIC,
+    KnowledgeGraph,
+    KnowledgeGraphBuilder,
+)
+from src.security_trimming import principal_scope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _graph():
+    builder = KnowledgeGraphBuilder()
+    for key, node_type in (('topic:azure', NODE_TOPIC), ('topic:security', NODE_TOPIC),
+                           ('document:a', NODE_DOCUMENT), ('document:b', NODE_DOCUMENT),
+                           ('person:kim', NODE_PERSON), ('person:lee', NODE_PERSON)):
+        builder.add_node(key, node_type)
+    builder.add_edge('document:a', 'topic:azure', EDGE_ABOUT)
+    builder.add_edge('document:b', 'topic:azure', EDGE_ABOUT)
+    builder.add_edge('document:b', 'topic:security', EDGE_ABOUT)
+    builder.add_edge('person:kim', 'document:a', EDGE_AUTHORED)
+    builder.add_edge('person:kim', 'document:b', EDGE_AUTHORED)
+    builder.add_edge('person:lee', 'topic:security', EDGE_EXPERT_IN)
+    builder.add_edge('person:lee', 'topic:security', EDGE_EXPERT_IN)
+    return builder.build()
+
+
+class TestKnowledgeGraph:
+    """Test cases for KnowledgeGraph"""
+
+    def test_csr_layout(self):
+        """Test edges are stored both ways, sorted and without duplicates"""
+        graph = _graph()
+        assert len(graph) == 6 and graph.edge_count == 6
+        assert graph.offsets[-1] == len(graph.targets) == 12
+        assert graph.neighbors('topic:security') == ['document:b', 'person:lee']
+        assert graph.neighbors('document:b', [EDGE_AUTHORED]) == ['person:kim']
+        assert graph.neighbors('topic:missing') == []
+
+    def test_related_scores_paths(self):
+        """Test nodes reached through more and shorter paths score higher"""
+        graph = _graph()
+        assert graph.related(['topic:azure'], NODE_PERSON) == [('person:kim', 1.0)]
+        assert graph.related(['topic:azure'], NODE_DOCUMENT) == [('document:a', 1.0), ('document:b', 1.0)]
+        assert graph.related(['topic:security'], NODE_PERSON) == [('person:lee', 1.0), ('person:kim', 0.5)]
+
+    def test_related_bounds(self):
+        """Test depth, edge types, visited count and the deadline stop the traversal"""
+        graph = _graph()
+        assert graph.related(['topic:security'], NODE_PERSON, max_depth=1) == [('person:lee', 1.0)]
+        assert graph.related(['topic:security'], edge_types=[EDGE_EXPERT_IN]) == [('person:lee', 1.0)]
+        assert len(graph.related(['topic:security'], max_visited=2, max_depth=4)) == 1
+        assert graph.related(['topic:unknown']) == []
+        with deadline_scope(0):
+            assert graph.related(['topic:security']) == []
+
+    def test_snapshot_round_trip(self, tmp_path):
+        """Test snapshots load memory-mapped with identical arrays and keys"""
+        graph = _graph()
+        graph.save(tmp_path / 'graph.kg')
+        loaded = KnowledgeGraph.load(tmp_path / 'graph.kg')
+
+        assert isinstance(loaded.targets, np.memmap)
+        assert loaded.keys == graph.keys
+        for name in ('node_types', 'offsets', 'targets', 'edge_types'):
+            assert np.array_equal(getattr(loaded, name), getattr(graph, name))
+        assert loaded.related(['topic:security'], NODE_PERSON) == graph.related(['topic:security'], NODE_PERSON)
+        assert KnowledgeGraph.load(tmp_path / 'graph.kg', mmap=False).neighbors('person:lee') == ['topic:security']
+
+    def test_snapshot_rejects_other_files(self, tmp_path):
+        """Test files without the snapshot header are refused"""
+        (tmp_path / 'other.kg').write_bytes(b'not a graph' * 4)
+        with pytest.raises(ValueError):
+            KnowledgeGraph.load(tmp_path / 'other.kg')
+
+    def test_empty_graph(self, tmp_path):
+        """Test graphs without nodes build, save and load"""
+        KnowledgeGraphBuilder().build().save(tmp_path / 'empty.kg')
+        loaded = KnowledgeGraph.load(tmp_path / 'empty.kg')
+        assert len(loaded) == 0 and loaded.related(['topic:azure']) == []
+
+
+class TestKnowledgeHubGraph:
+    """Test the knowledge hub recommends through the knowledge graph"""
+
+    @pytest.fixture
+    def module(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        yield __import__('enterpriseknowledgehub_service')
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_authors_linked_to_experts(self, module):
+        """Test document authors resolve to expert profiles by name"""
+        service = module.EnterpriseKnowledgeHubService()
+        assert service.graph.neighbors('document:kb-doc-001', [EDGE_AUTHORED]) == ['person:user-001']
+        assert 'conversation:conv-001' in service.graph
+
+    def test_find_experts_uses_connections(self, module):
+        """Test experts connected through documents and conversations are found"""
+        service = module.EnterpriseKnowledgeHubService()
+        assert [expert.user_id for expert in service.find_experts('api')['experts']] == ['user-001', 'user-002']
+        assert [expert.user_id for expert in service.find_experts('security')['experts']] == ['user-001', 'user-003']
+
+    def test_recommendations_are_trimmed(self, module):
+        """Test recommended documents respect the caller's access"""
+        service = module.EnterpriseKnowledgeHubService()
+        with principal_scope('user-003'):
+            recommendations = service.search_content({'query': 'security'})['search_results']['recommendations']
+        assert recommendations['documents'][0]['id'] == 'kb-doc-003'
+        assert recommendations['conversations'][0]['id'] == 'conv-002'
+
+        with principal_scope('user-001'):
+            recommendations = service.search_content({'query': 'security'})['search_results']['recommendations']
+        assert 'kb-doc-003' not in [document['id'] for document in recommendations['documents']]
+
+    def test_snapshot_reused(self, module, monkeypatch, tmp_path):
+        """Test services with ingestion state map the saved snapshot"""
+        monkeypatch.setenv('KNOWLEDGE_HUB_DELTA_URL', 'http://127.0.0.1:9/delta')
+        monkeypatch.setenv('KNOWLEDGE_HUB_INDEX_DIR', str(tmp_path))
+        first = module.EnterpriseKnowledgeHubService()
+        assert (tmp_path / 'knowledge-graph.kg').exists()
+
+        second = module.EnterpriseKnowledgeHubService()
+        assert isinstance(second.graph.targets, np.memmap)
+        assert second.graph.keys == first.graph.keys
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,94 @@
+"""
+Unit tests for the Copilot Plugin models module
+"""
+
+import json
+from dataclasses import field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import pytest
+from src.models import JsonModel, ModelColumns, dumps, json_model
+
+
+@json_model
+class _Event(JsonModel):
+    event_name: str
+    tags: List[str] = field(default_factory=list)
+    properties: Dict[str, object] = field(default_factory=dict)
+    timestamp: Optional[str] = None
+
+    def __post_init__(self):
+        if self.timestamp is None:
+            self.timestamp = '2025-07-22T00:00:00+00:00'
+
+
+class TestJsonModel:
+    """Test cases for @json_model classes"""
+
+    def test_slotted(self):
+        """Test instances have no per-instance dictionary"""
+        event = _Event('login')
+        assert not hasattr(event, '__dict__')
+        with pytest.raises(AttributeError):
+            event.unknown = 1
+
+    def test_dataclass_behaviour(self):
+        """Test defaults, factories and __post_init__ behave like dataclasses"""
+        first, second = _Event('a'), _Event('b')
+        first.tags.append('x')
+        assert second.tags == []
+        assert first.timestamp == '2025-07-22T00:00:00+00:00'
+        assert _Event('a', ['x']) == first
+
+    def test_mapping_access(self):
+        """Test dictionary-style reads used by existing callers"""
+        event = _Event('login', ['t'])
+        assert event['event_name'] == 'login'
+        assert event.get('tags') == ['t']
+        assert event.get('missing', 0) == 0
+        assert dict(event) == event.to_dict()
+        with pytest.raises(KeyError):
+            event['missing']
+
+    def test_requires_base(self):
+        """Test models must derive from JsonModel"""
+        with pytest.raises(TypeError):
+            @json_model
+            class _Plain:
+                name: str
+
+
+class TestDumps:
+    """Test cases for the direct JSON encoder"""
+
+    def test_matches_json_module(self):
+        """Test output matches json.dumps of the equivalent dictionaries"""
+        event = _Event('café', ['a', 'b'], {'n': 1.5, 'ok': True, 'none': None})
+        payload = {'success': True, 'events': [event, event], 'count': 2, 'nested': {'event': event}}
+        expected = {'success': True, 'events': [event.to_dict()] * 2, 'count': 2,
+                    'nested': {'event': event.to_dict()}}
+
+        assert dumps(payload) == json.dumps(expected, separators=(',', ':'))
+
+    def test_leaf_fallback(self):
+        """Test unsupported values fall back to str() like default=str"""
+        moment = datetime(2025, 7, 22)
+        assert json.loads(dumps({'at': moment, 1: 'one'})) == {'at': str(moment), '1': 'one'}
+
+    def test_columns(self):
+        """Test columnar result sets serialize and materialize rows"""
+        rows = ModelColumns(_Event)
+        rows.append('a', [], {}, 't1')
+        rows.append_model(_Event('b'))
+
+        assert len(rows) == 2
+        assert rows[1] == _Event('b')
+        assert rows.column('event_name') == ['a', 'b']
+        assert json.loads(dumps(rows)) == [event.to_dict() for event in rows]
+        with pytest.raises(ValueError):
+            rows.append('too few')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,152 @@
+"""
+Unit tests for the Copilot Plugin OpenAPI module
+"""
+
+import asyncio
+import gzip
+import json
+
+import azure.functions as func
+import pytest
+from src.openapi import OpenApiSpec, build_openapi_document
+from src.plugin_host import PluginHost, discover_plugin_modules, load_plugin_runtime
+from src.plugin_runtime import PluginRuntime
+
+
+class TestBuildOpenApiDocument:
+    """Test cases for OpenAPI document assembly"""
+
+    @classmethod
+    def setup_class(cls):
+        """Build the document for the repository plugins mounted on a host"""
+        cls.host = PluginHost()
+        for path in discover_plugin_modules():
+            runtime = load_plugin_runtime(path)
+            cls.host.mount(PluginRuntime(runtime.plugin_name, runtime.service_class))
+        cls.document = build_openapi_document(plugins=cls.host.plugins)
+
+    def test_includes_function_app_endpoints(self):
+        """Test the base definition endpoints are present"""
+        assert '/api/search' in self.document['paths']
+        assert '/api/analyze' in self.document['paths']
+
+    def test_merges_plugin_connectors(self):
+        """Test plugin module connector operations are converted to OpenAPI 3"""
+        operation = self.document['paths']['/api/plugins/enterpriseknowledgehub/get_faq']['post']
+
+        assert operation['operationId'] == 'GetFAQ'
+
+        assert 'requestBody' in operation
+        assert 'schema' not in operation['responses']['200']
+        ref = operation['responses']['400']['content']['application/json']['schema']['$ref']
+        assert ref == '#/components/schemas/EnterpriseknowledgehubErrorResponse'
+        assert 'EnterpriseknowledgehubErrorResponse' in self.document['components']['schemas']
+
+    def test_describes_operations_without_connector_paths(self):
+        """Test mounted operations the connector does not define are still advertised"""
+        operation = self.document['paths']['/api/plugins/enterpriseknowledgehub/suggest_queries']['post']
+
+        assert operation['operationId'] == 'EnterpriseknowledgehubSuggestQueries'
+        assert 'prefix' in operation['requestBody']['content']['application/json']['schema']['properties']
+        assert '/api/enterpriseknowledgehub/getfaq' not in self.document['paths']
+        assert '/api/plugins/appinsightstelemetryextension/customoperation' not in self.document['paths']
+
+    def test_advertised_plugin_paths_are_served(self):
+        """Test every advertised plugin path reaches an operation on the host"""
+        plugin_paths = [path for path in self.document['paths'] if path.startswith('/api/plugins/')]
+        assert len(plugin_paths) == sum(len(runtime.operations) for runtime in self.host.plugins.values())
+
+        for path in plugin_paths:
+            plugin, operation_name = path[len('/api/plugins/'):].split('/')
+            request = func.HttpRequest(
+                method='POST', url=path, body=b'{}',
+                route_params={'plugin': plugin, 'operation': operation_name}
+            )
+            response = asyncio.run(self.host.handle(plugin, request))
+            assert response.status_code != 404, path
+
+    def test_placeholder_schemas_cleaned(self):
+        """Test placeholder values exported in place of schemas are left unconstrained"""
+        operation = self.document['paths']['/api/plugins/enterpriseknowledgehub/get_articles']['post']
+        schema = operation['responses']['200']['content']['application/json']['schema']
+
+        assert schema['properties']['results']['items']['properties']['title'] == {}
+        assert 'System.Collections.Hashtable' not in json.dumps(self.document)
+
+    def test_invalid_definitions_skipped(self, tmp_path, caplog):
+        """Test connector definitions that are not schema objects are logged and skipped"""
+        connector = tmp_path / 'connector-definition.json'
+        connector.write_text(json.dumps({
+            'basePath': '/api/enterpriseknowledgehub',
+            'paths': {},
+            'definitions': {
+                'Broken': 'System.Collections.Hashtable',
+                'Article': {'type': 'object', 'properties': {'id': 'System.Collections.Hashtable'},
+                            'allOf': [{'type': 'object'}, 'System.Collections.Hashtable']}
+            }
+        }))
+        document = build_openapi_document(connector_paths=[str(connector)], plugins=self.host.plugins)
+        schemas = document['components']['schemas']
+
+        assert 'EnterpriseknowledgehubBroken' not in schemas
+        assert schemas['EnterpriseknowledgehubArticle'] == {
+            'type': 'object', 'properties': {'id': {}}, 'allOf': [{'type': 'object'}]
+        }
+        assert 'Enterpriseknowledgehub.definitions.Broken' in caplog.text
+
+    def test_skips_root_connector(self):
+        """Test connectors mounted on the root API base path are not merged"""
+        assert 'post' not in self.document['paths']['/api/search']
+
+
+class TestOpenApiSpec:
+    """Test cases for pre-serialized spec serving"""
+
+    def setup_method(self):
+        """Setup spec"""
+        self.spec = OpenApiSpec({'openapi': '3.0.1', 'paths': {}}, max_age=60)
+
+    def test_identity_response(self):
+        """Test uncompressed response with validators"""
+        status, body, headers = self.spec.response(None, None)
+
+        assert status == 200
+        assert json.loads(body) == {'openapi': '3.0.1', 'paths': {}}
+        assert headers['ETag'] == f'"{self.spec.digest}"'
+        assert headers['Cache-Control'].startswith('public, max-age=60')
+        assert 'Content-Encoding' not in headers
+
+    def test_gzip_response(self):
+        """Test negotiated gzip representation"""
+        status, body, headers = self.spec.response('deflate;q=0.5, gzip', None)
+
+        assert status == 200
+        assert headers['Content-Encoding'] == 'gzip'
+        assert gzip.decompress(body) == self.spec.body
+        assert headers['ETag'] != self.spec.etags['identity']
+
+    def test_refused_encoding(self):
+        """Test codings with zero quality are not used"""
+        _, _, headers = self.spec.response('gzip;q=0, deflate;q=0', None)
+
+        assert 'Content-Encoding' not in headers
+
+    @pytest.mark.parametrize('header_template', ['{etag}', 'W/{etag}', '"other", {etag}', '*'])
+    def test_not_modified(self, header_template):
+        """Test If-None-Match revalidation"""
+        header = header_template.format(etag=self.spec.etags['identity'])
+        status, body, headers = self.spec.response(None, header)
+
+        assert status == 304
+        assert body == b''
+        assert headers['ETag'] == self.spec.etags['identity']
+
+    def test_modified(self):
+        """Test stale validators get the full representation"""
+        status, _, _ = self.spec.response(None, '"stale"')
+
+        assert status == 200
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
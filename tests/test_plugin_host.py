@@ -0,0 +1,104 @@
+"""
+Unit tests for the Copilot Plugin host module
+"""
+
+import asyncio
+import json
+
+import azure.functions as func
+import pytest
+from src.cache import TTLCache
+from src.plugin_host import PluginHost, discover_plugin_modules
+from src.plugin_runtime import PluginRuntime, operation
+
+
+class _TelemetryStandIn:
+    """Telemetry stand-in recording tracked requests"""
+
+    def __init__(self):
+        self.requests = []
+
+    def track_request(self, **kwargs):
+        self.requests.append(kwargs)
+
+    def track_exception(self, exception, properties=None):
+        pass
+
+
+class _SharedService:
+    def __init__(self, credential=None, secret_client=None):
+        self.credential = credential
+        self.secret_client = secret_client
+
+    @operation()
+    def clients(self):
+        return {'credential': self.credential, 'secret_client': self.secret_client}
+
+
+class _LegacyService:
+    @operation()
+    def ping(self):
+        return {'pong': True}
+
+
+def _request(plugin, operation_name, body=b''):
+    return func.HttpRequest(
+        method='POST', url=f'/api/plugins/{plugin}/{operation_name}', body=body,
+        route_params={'plugin': plugin, 'operation': operation_name}
+    )
+
+
+class TestPluginHost:
+    """Test cases for PluginHost"""
+
+    def test_discover_repository_plugins(self):
+        """Test all business-logic modules are discovered and mounted"""
+        assert len(discover_plugin_modules()) == 4
+
+        host = PluginHost(credential='shared-credential')
+        mounted = host.discover()
+
+        assert sorted(mounted) == [
+            'appinsightstelemetryextension', 'enterpriseknowledgehub',
+            'purviewgovernanceconnector', 'syntexsynapseconnector'
+        ]
+        service = host.plugins['enterpriseknowledgehub'].service
+        assert service.credential == 'shared-credential'
+
+    def test_shared_clients_injected(self):
+        """Test services accepting shared clients receive the host's"""
+        host = PluginHost(credential='credential', secret_client='secret-client', cache=TTLCache())
+        host.mount(PluginRuntime('Shared', _SharedService))
+        host.mount(PluginRuntime('Legacy', _LegacyService))
+
+        assert host.plugins['shared'].dispatch('clients', {}) == {
+            'credential': 'credential', 'secret_client': 'secret-client'
+        }
+        assert host.plugins['legacy'].dispatch('ping', {}) == {'pong': True}
+
+    def test_handle_tracks_request(self):
+        """Test plugin requests are served and tracked on the shared pipeline"""
+        telemetry = _TelemetryStandIn()
+        host = PluginHost(telemetry=telemetry)
+        host.mount(PluginRuntime('Legacy', _LegacyService))
+
+        response = asyncio.run(host.handle('legacy', _request('legacy', 'ping')))
+
+        assert response.status_code == 200
+        assert json.loads(response.get_body()) == {'pong': True}
+        assert telemetry.requests[0]['name'] == 'plugins/legacy/ping'
+        assert telemetry.requests[0]['success'] is True
+
+    def test_unknown_plugin(self):
+        """Test unknown plugins return 404 with the mounted plugins"""
+        host = PluginHost()
+        host.mount(PluginRuntime('Legacy', _LegacyService))
+
+        response = asyncio.run(host.handle('missing', _request('missing', 'ping')))
+
+        assert response.status_code == 404
+        assert json.loads(response.get_body())['available_plugins'] == ['legacy']
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
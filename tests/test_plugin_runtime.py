@@ -0,0 +1,213 @@
+"""
+Unit tests for the Copilot Plugin runtime module
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import azure.functions as func
+import pytest
+from src.plugin_runtime import BatchRequestError, PluginRuntime, UnknownOperationError, operation
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+class _Service:
+    """Service stand-in counting instantiations"""
+    instances = 0
+
+    def __init__(self):
+        type(self).instances += 1
+
+    @operation(params={'topic': '', 'limit': 10})
+    def get_faq(self, topic, limit=10):
+        return {'topic': topic, 'limit': limit}
+
+    @operation(body=True)
+    def search(self, body):
+        return {'query': body.get('query')}
+
+    @operation('fail')
+    def failing_operation(self):
+        raise RuntimeError('backend unavailable')
+
+    def helper(self):
+        return 'not an operation'
+
+
+class _Request:
+    """Local request stand-in as used by the plugin modules"""
+
+    def __init__(self, operation=None, body=None):
+        self.params = {'operation': operation} if operation else {}
+        self.body = body or {}
+
+    def get_json(self):
+        return self.body
+
+
+def _http_request(operation, body=b''):
+    return func.HttpRequest(
+        method='POST', url='/api/plugin', body=body,
+        params={'operation': operation} if operation else {}
+    )
+
+
+class TestPluginRuntime:
+    """Test cases for PluginRuntime"""
+
+    def setup_method(self):
+        _Service.instances = 0
+        self.runtime = PluginRuntime('Test', _Service)
+
+    def test_dispatch_table(self):
+        """Test only decorated methods are registered, in declaration order"""
+        assert self.runtime.available_operations == ['get_faq', 'search', 'fail']
+
+    def test_params_defaults(self):
+        """Test declared parameters are read from the body with defaults"""
+        assert self.runtime.dispatch('get_faq', {'topic': 'vpn'}) == {'topic': 'vpn', 'limit': 10}
+        assert self.runtime.dispatch('search', {'query': 'q'}) == {'query': 'q'}
+
+    def test_service_reused(self):
+        """Test one service instance serves all requests"""
+        for _ in range(3):
+            self.runtime.handle(_Request('get_faq'))
+        assert _Service.instances == 1
+
+    def test_unknown_operation(self):
+        """Test unknown operations"""
+        with pytest.raises(UnknownOperationError):
+            self.runtime.dispatch('helper', {})
+        assert json.loads(self.runtime.handle(_Request('helper'))) == {'error': 'Unknown operation: helper'}
+
+    def test_missing_operation(self):
+        """Test missing operation lists the available operations"""
+        result = json.loads(self.runtime.handle(_Request()))
+        assert result['available_operations'] == ['get_faq', 'search', 'fail']
+
+    def test_internal_error(self):
+        """Test operation failures are reported as internal errors"""
+        result = json.loads(self.runtime.handle(_Request('fail')))
+        assert result == {'error': 'Internal server error', 'details': 'backend unavailable'}
+
+    def test_http_request(self):
+        """Test Azure Functions requests get compact JSON responses"""
+        response = self.runtime.handle(_http_request('get_faq', b'{"topic": "vpn", "limit": 2}'))
+        assert response.status_code == 200
+        assert response.mimetype == 'application/json'
+        assert response.get_body() == b'{"topic":"vpn","limit":2}'
+
+    def test_http_request_empty_body(self):
+        """Test an empty body is treated as an empty object"""
+        response = self.runtime.handle(_http_request('get_faq'))
+        assert json.loads(response.get_body()) == {'topic': '', 'limit': 10}
+
+    def test_http_request_invalid_json(self):
+        """Test invalid JSON bodies"""
+        response = self.runtime.handle(_http_request('search', b'{"query":'))
+        assert response.status_code == 400
+
+        response = self.runtime.handle(_http_request('search', b'[1, 2]'))
+        assert response.status_code == 400
+
+    def test_operation_requires_one_binding(self):
+        """Test params and body cannot both be declared"""
+        with pytest.raises(ValueError):
+            operation(params={'a': 1}, body=True)
+
+
+class TestBatch:
+    """Test cases for batch envelopes"""
+
+    def setup_method(self):
+        self.runtime = PluginRuntime('Test', _Service)
+
+    def test_batch_per_item_status(self):
+        """Test each item reports its own status in request order"""
+        result = json.loads(self.runtime.handle(_Request('batch', {'requests': [
+            {'id': 'faq', 'operation': 'get_faq', 'body': {'topic': 'vpn'}},
+            {'id': 'search', 'operation': 'search', 'body': {'query': 'q'}},
+            {'id': 'bad', 'operation': 'missing'},
+            {'id': 'fail', 'operation': 'fail'},
+        ]})))
+
+        assert [(r['id'], r['status']) for r in result['responses']] == [
+            ('faq', 200), ('search', 200), ('bad', 400), ('fail', 500)
+        ]
+        assert result['responses'][0]['body'] == {'topic': 'vpn', 'limit': 10}
+
+    def test_batch_dependencies(self):
+        """Test dependent items wait for and require successful dependencies"""
+        order = []
+
+        class _Ordered(_Service):
+            @operation(params={'step': ''})
+            def record(self, step):
+                order.append(step)
+                return {'step': step}
+
+        runtime = PluginRuntime('Ordered', _Ordered)
+        responses = runtime.execute_batch([
+            {'id': 'c', 'operation': 'record', 'body': {'step': 'c'}, 'depends_on': ['b']},
+            {'id': 'b', 'operation': 'record', 'body': {'step': 'b'}, 'depends_on': ['a']},
+            {'id': 'a', 'operation': 'record', 'body': {'step': 'a'}},
+            {'id': 'f', 'operation': 'fail'},
+            {'id': 'after_fail', 'operation': 'record', 'body': {'step': 'x'}, 'depends_on': ['f']},
+        ])
+
+        assert order == ['a', 'b', 'c']
+        assert [r['status'] for r in responses] == [200, 200, 200, 500, 424]
+
+    @pytest.mark.parametrize('items', [
+        [],
+        [{'id': 'a'}],
+        [{'id': 'a', 'operation': 'search'}, {'id': 'a', 'operation': 'search'}],
+        [{'id': 'a', 'operation': 'search', 'depends_on': ['z']}],
+        [{'id': 'a', 'operation': 'search', 'depends_on': ['b']},
+         {'id': 'b', 'operation': 'search', 'depends_on': ['a']}],
+        [{'operation': 'search'}] * 21,
+    ])
+    def test_invalid_envelopes(self, items):
+        """Test malformed envelopes are rejected before anything runs"""
+        with pytest.raises(BatchRequestError):
+            self.runtime.execute_batch(items)
+        response = self.runtime.handle(_http_request('batch', json.dumps({'requests': items}).encode()))
+        assert response.status_code == 400
+
+    def test_reserved_name(self):
+        """Test services cannot register the batch operation"""
+        class _Reserved:
+            @operation()
+            def batch(self):
+                pass
+
+        with pytest.raises(ValueError):
+            PluginRuntime('Reserved', _Reserved)
+
+
+class TestPluginModules:
+    """Test the plugin modules are served by the shared runtime"""
+
+    @pytest.mark.parametrize('directory,module_name,operation_name', [
+        ('EnterpriseKnowledgeHub-module', 'enterpriseknowledgehub_service', 'get_faq'),
+        ('PurviewGovernanceConnector-module', 'purviewgovernanceconnector_service', 'get_governance_policies'),
+        ('SyntexSynapseConnector-module', 'syntexsynapseconnector_service', 'get_prebuilt_models'),
+        ('modules/AppInsightsTelemetryExtension-module', 'appinsightstelemetryextension_service',
+         'track_custom_event'),
+    ])
+    def test_module_main(self, monkeypatch, directory, module_name, operation_name):
+        """Test each plugin main() dispatches through its runtime"""
+        monkeypatch.syspath_prepend(str(REPO_ROOT / directory / 'business-logic'))
+        module = __import__(module_name)
+        try:
+            assert operation_name in module.runtime.available_operations
+            result = json.loads(module.main(_Request(operation_name, {'event_name': 'test'})))
+            assert result['success'] is True
+        finally:
+            sys.modules.pop(module_name, None)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,156 @@
+"""
+Unit tests for the Copilot Plugin request body module
+"""
+
+import io
+import os
+import json
+import pytest
+from unittest.mock import Mock
+from src.request_body import (
+    CompiledSchema, LazyText, RequestBodyError, RequestBodyTooLarge,
+    load_request_schema, parse_json_body, read_body
+)
+
+PLUGIN_SPEC = os.path.join(os.path.dirname(__file__), '..', 'plugins', 'openapi.yaml')
+
+ANALYZE_SCHEMA = {
+    'type': 'object',
+    'required': ['content', 'analysisType'],
+    'properties': {
+        'content': {'type': 'string', 'minLength': 1, 'maxLength': 10000},
+        'analysisType': {'type': 'string', 'enum': ['sentiment', 'keywords']},
+        'options': {
+            'type': 'object',
+            'properties': {'includeConfidence': {'type': 'boolean'}}
+        }
+    }
+}
+
+
+class TestReadBody:
+    """Test cases for bounded body reading"""
+
+    def test_rejects_declared_length_before_reading(self):
+        """Test Content-Length above the limit fails without reading the body"""
+        req = Mock()
+        req.headers = {'Content-Length': '2048'}
+
+        with pytest.raises(RequestBodyTooLarge):
+            read_body(req, max_bytes=1024)
+
+        req.get_body.assert_not_called()
+
+    def test_enforces_limit_without_content_length(self):
+        """Test chunked sources are abandoned once the limit is crossed"""
+        chunks = iter([b'a' * 512, b'b' * 512, b'c' * 512])
+
+        with pytest.raises(RequestBodyTooLarge) as exc_info:
+            read_body(chunks, max_bytes=1000)
+
+        assert exc_info.value.status_code == 413
+        assert next(chunks) == b'c' * 512
+
+    def test_reads_file_like_source(self):
+        """Test file-like sources are read in chunks"""
+        body = read_body(io.BytesIO(b'{"a": 1}'), max_bytes=100, chunk_size=3)
+
+        assert body == b'{"a": 1}'
+
+    def test_reads_request_body(self):
+        """Test HttpRequest-like sources"""
+        req = Mock()
+        req.headers = {}
+        req.get_body.return_value = b'{}'
+
+        assert read_body(req) == b'{}'
+
+
+class TestParseJsonBody:
+    """Test cases for incremental JSON parsing"""
+
+    def setup_method(self):
+        """Setup compiled schema"""
+        self.schema = CompiledSchema(ANALYZE_SCHEMA)
+
+    def test_parses_valid_body(self):
+        """Test a valid body parses like json.loads"""
+        payload = {'content': 'hello', 'analysisType': 'sentiment', 'options': {'includeConfidence': True}}
+        body = parse_json_body(json.dumps(payload).encode(), self.schema)
+
+        assert body.to_dict() == payload
+        assert body.get('missing') is None
+
+    def test_large_strings_are_lazy(self):
+        """Test large string members are decoded on access only"""
+        content = 'line \\"quoted\\"\\n' * 200
+        raw = ('{"content": "%s", "analysisType": "keywords"}' % content).encode()
+
+        body = parse_json_body(raw, self.schema)
+
+        view = body.view('content')
+        assert isinstance(view, LazyText)
+        assert view._value is None
+        assert body['content'] == json.loads(raw)['content']
+
+    def test_rejects_at_first_invalid_member(self):
+        """Test an invalid member fails before the rest of the body is parsed"""
+        raw = b'{"analysisType": "bogus", "content": ' + b'[' * 5000
+
+        with pytest.raises(RequestBodyError, match='analysisType'):
+            parse_json_body(raw, self.schema)
+
+    def test_rejects_oversized_lazy_string(self):
+        """Test maxLength is enforced for lazy string members"""
+        raw = json.dumps({'content': 'x' * 10001, 'analysisType': 'sentiment'}).encode()
+
+        with pytest.raises(RequestBodyError, match='at most'):
+            parse_json_body(raw, self.schema)
+
+    def test_rejects_missing_required_field(self):
+        """Test required fields are checked"""
+        with pytest.raises(RequestBodyError, match='analysisType'):
+            parse_json_body(b'{"content": "text"}', self.schema)
+
+    @pytest.mark.parametrize('raw', [
+        b'', b'[]', b'{"content": }', b'{"content": "a" "b"}', b'{"content": "a"} trailing', b'\xff\xfe'
+    ])
+    def test_rejects_malformed_json(self, raw):
+        """Test malformed bodies raise validation errors"""
+        with pytest.raises(RequestBodyError):
+            parse_json_body(raw, self.schema)
+
+    def test_parses_without_schema(self):
+        """Test parsing without a schema accepts any object"""
+        body = parse_json_body(b' {"a": [1, 2], "b": null} ')
+
+        assert body.to_dict() == {'a': [1, 2], 'b': None}
+
+
+class TestLoadRequestSchema:
+    """Test cases for compiling schemas from API definitions"""
+
+    def test_loads_openapi_request_body(self):
+        """Test the analyze schema compiles from the plugin OpenAPI definition"""
+        schema = load_request_schema(PLUGIN_SPEC, 'analyzeContent')
+
+        assert schema.required == {'content', 'analysisType'}
+        assert 'insights' in schema.properties['analysisType'].enum
+
+    def test_loads_connector_body_parameter(self):
+        """Test Swagger 2.0 connector body parameters compile"""
+        path = os.path.join(
+            os.path.dirname(__file__), '..', 'EnterpriseKnowledgeHub-module', 'connector-definition.json'
+        )
+        schema = load_request_schema(path, 'SearchDocuments')
+
+        assert 'query' in schema.required
+
+    def test_unknown_operation(self):
+        """Test unknown operations raise KeyError"""
+        with pytest.raises(KeyError):
+            load_request_schema(PLUGIN_SPEC, 'doesNotExist')
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
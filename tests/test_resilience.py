@@ -0,0 +1,284 @@
+"""
+Unit tests for the Copilot Plugin resilience module
+"""
+
+import os
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import Mock, patch
+
+import pytest
+from src.deadline import DeadlineExceeded, deadline_scope
+from src.plugin_runtime import PluginRuntime, operation
+from src.resilience import (
+    STATE_CLOSED, STATE_HALF_OPEN, STATE_OPEN, Bulkhead, BulkheadFullError, CircuitBreaker,
+    CircuitOpenError, Dependency, ResilienceRegistry, RetryPolicy, dependency_for_url, is_retryable
+)
+
+
+class _FaultInjectingHandler(BaseHTTPRequestHandler):
+    """
+    Dependency stand-in injecting faults by path
+
+    /ok answers 200, /fail 503, /missing 404 and /slow answers after 0.3 s.
+    /flaky fails with 503 until flaky_failures is used up.
+    """
+    flaky_failures = 0
+    lock = threading.Lock()
+
+    def do_GET(self):
+        status = 200
+        if self.path == '/slow':
+            time.sleep(0.3)
+        elif self.path == '/fail':
+            status = 503
+        elif self.path == '/missing':
+            status = 404
+        elif self.path == '/flaky':
+            with self.lock:
+                if type(self).flaky_failures > 0:
+                    type(self).flaky_failures -= 1
+                    status = 503
+        self.send_response(status)
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope='module')
+def stand_in_url():
+    """Local fault-injecting dependency server"""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), _FaultInjectingHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=2) as response:
+        return response.status
+
+
+def _dependency(limit=4, retry=None, **breaker_settings):
+    settings = {'window_size': 4, 'minimum_calls': 4, 'open_seconds': 0.1, 'half_open_calls': 2}
+    settings.update(breaker_settings)
+    return Dependency('stand_in', Bulkhead('stand_in', limit, max_wait=0.05),
+                      CircuitBreaker('stand_in', **settings),
+                      retry or RetryPolicy(attempts=1))
+
+
+class TestCircuitBreaker:
+    """Test cases for circuit breakers against the stand-in"""
+
+    def test_opens_on_failure_rate(self, stand_in_url):
+        """Test the circuit opens after the failure rate is reached and rejects calls"""
+        dependency = _dependency()
+        for _ in range(4):
+            with pytest.raises(urllib.error.HTTPError):
+                dependency.call(_get, f"{stand_in_url}/fail")
+
+        assert dependency.breaker.state == STATE_OPEN
+        with pytest.raises(CircuitOpenError):
+            dependency.call(_get, f"{stand_in_url}/ok")
+
+    def test_opens_on_slow_calls(self, stand_in_url):
+        """Test successful but slow calls open the circuit"""
+        dependency = _dependency(slow_call_seconds=0.2, slow_call_rate_threshold=0.5, minimum_calls=2)
+        for _ in range(2):
+            assert dependency.call(_get, f"{stand_in_url}/slow") == 200
+        assert dependency.breaker.state == STATE_OPEN
+
+    def test_client_errors_do_not_open(self, stand_in_url):
+        """Test non-retryable errors do not count against the dependency"""
+        dependency = _dependency()
+        for _ in range(6):
+            with pytest.raises(urllib.error.HTTPError):
+                dependency.call(_get, f"{stand_in_url}/missing")
+        assert dependency.breaker.state == STATE_CLOSED
+
+    def test_half_open_recovery(self, stand_in_url):
+        """Test trial calls close the circuit once the dependency recovers"""
+        changes = []
+        dependency = _dependency(on_state_change=lambda *change: changes.append(change[1:]))
+        for _ in range(4):
+            with pytest.raises(urllib.error.HTTPError):
+                dependency.call(_get, f"{stand_in_url}/fail")
+
+        time.sleep(0.15)
+        assert dependency.breaker.state == STATE_HALF_OPEN
+        for _ in range(2):
+            assert dependency.call(_get, f"{stand_in_url}/ok") == 200
+
+        assert dependency.breaker.state == STATE_CLOSED
+        assert changes == [
+            (STATE_CLOSED, STATE_OPEN), (STATE_OPEN, STATE_HALF_OPEN), (STATE_HALF_OPEN, STATE_CLOSED)
+        ]
+
+    def test_half_open_failure_reopens(self, stand_in_url):
+        """Test a failed trial call opens the circuit again"""
+        dependency = _dependency()
+        for _ in range(4):
+            with pytest.raises(urllib.error.HTTPError):
+                dependency.call(_get, f"{stand_in_url}/fail")
+        time.sleep(0.15)
+
+        with pytest.raises(urllib.error.HTTPError):
+            dependency.call(_get, f"{stand_in_url}/fail")
+        assert dependency.breaker.state == STATE_OPEN
+        assert dependency.breaker.times_opened == 2
+
+
+class TestBulkhead:
+    """Test cases for bulkheads"""
+
+    def test_rejects_when_full(self, stand_in_url):
+        """Test calls beyond the limit are rejected after the wait"""
+        dependency = _dependency(limit=2)
+        results = []
+
+        def call(path):
+            try:
+                results.append(dependency.call(_get, f"{stand_in_url}{path}"))
+            except BulkheadFullError:
+                results.append('rejected')
+
+        threads = [threading.Thread(target=call, args=('/slow',)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sorted(results, key=str) == [200, 200, 'rejected', 'rejected']
+        assert dependency.bulkhead.rejected == 2
+        assert dependency.bulkhead.in_flight == 0
+
+    def test_dependencies_are_isolated(self, stand_in_url):
+        """Test a saturated dependency does not block others"""
+        registry = ResilienceRegistry(limits={'synapse': 1, 'graph': 1}, max_wait=0.05)
+        slow = threading.Thread(target=registry.call, args=('synapse', _get, f"{stand_in_url}/slow"))
+        slow.start()
+        time.sleep(0.05)
+
+        with pytest.raises(BulkheadFullError):
+            registry.call('synapse', _get, f"{stand_in_url}/ok")
+        assert registry.call('graph', _get, f"{stand_in_url}/ok") == 200
+        slow.join()
+
+
+class TestRetry:
+    """Test cases for retries"""
+
+    def test_retries_transient_failures(self, stand_in_url):
+        """Test retryable failures are retried with backoff"""
+        _FaultInjectingHandler.flaky_failures = 2
+        dependency = _dependency(retry=RetryPolicy(attempts=3, base_delay=0.01))
+
+        assert dependency.call(_get, f"{stand_in_url}/flaky") == 200
+        assert dependency.retries == 2
+
+    def test_retry_disabled(self, stand_in_url):
+        """Test calls made with retry=False are attempted once"""
+        _FaultInjectingHandler.flaky_failures = 2
+        dependency = _dependency(retry=RetryPolicy(attempts=3, base_delay=0.01))
+
+        with pytest.raises(urllib.error.HTTPError):
+            dependency.call(_get, f"{stand_in_url}/flaky", retry=False)
+        assert dependency.retries == 0
+
+    def test_no_retry_for_client_errors(self, stand_in_url):
+        """Test non-retryable failures are raised immediately"""
+        dependency = _dependency(retry=RetryPolicy(attempts=3, base_delay=0.01))
+        with pytest.raises(urllib.error.HTTPError):
+            dependency.call(_get, f"{stand_in_url}/missing")
+        assert dependency.retries == 0
+
+    def test_retries_stop_at_deadline(self, stand_in_url):
+        """Test no retry is attempted when its delay would overrun the deadline"""
+        dependency = _dependency(retry=RetryPolicy(attempts=5, base_delay=1.0, max_delay=1.0))
+        start = time.monotonic()
+        with deadline_scope(0.2):
+            with pytest.raises((urllib.error.HTTPError, DeadlineExceeded)):
+                dependency.call(_get, f"{stand_in_url}/fail")
+        assert time.monotonic() - start < 0.5
+
+    def test_spent_deadline(self, stand_in_url):
+        """Test no call starts after the deadline"""
+        with deadline_scope(0):
+            with pytest.raises(DeadlineExceeded):
+                _dependency().call(_get, f"{stand_in_url}/ok")
+
+    def test_jitter_bounds(self):
+        """Test backoff delays stay within the exponential cap"""
+        policy = RetryPolicy(base_delay=0.1, max_delay=0.3)
+        assert all(0 <= policy.delay(0) <= 0.1 for _ in range(50))
+        assert all(0 <= policy.delay(5) <= 0.3 for _ in range(50))
+
+
+class TestRegistry:
+    """Test cases for the resilience registry"""
+
+    def test_bulkhead_limits(self):
+        """Test bulkheads are sized from the limits and environment overrides"""
+        registry = ResilienceRegistry(limits={'graph': 3})
+
+        with patch.dict(os.environ, {'DOWNSTREAM_CONCURRENCY_KEY_VAULT': '2'}):
+            assert registry.get('graph').bulkhead.limit == 3
+            assert registry.get('key_vault').bulkhead.limit == 2
+        assert registry.limit_for('key_vault') == 10
+
+    def test_state_changes_and_export(self, stand_in_url):
+        """Test circuit state is reported to telemetry"""
+        telemetry = Mock()
+        registry = ResilienceRegistry(
+            telemetry=telemetry, retry=RetryPolicy(attempts=1),
+            settings={'graph': {'window_size': 2, 'minimum_calls': 2}}
+        )
+        for _ in range(2):
+            with pytest.raises(urllib.error.HTTPError):
+                registry.call('graph', _get, f"{stand_in_url}/fail")
+
+        telemetry.track_event.assert_called_once_with(
+            'circuit_state_changed',
+            properties={'dependency': 'graph', 'from_state': STATE_CLOSED, 'to_state': STATE_OPEN}
+        )
+        snapshot = registry.export()
+        assert snapshot['graph']['state'] == STATE_OPEN
+        assert telemetry.track_event.call_args.args[0] == 'dependency_resilience'
+        assert telemetry.track_event.call_args.kwargs['measurements']['failure_rate'] == 1.0
+
+    @pytest.mark.parametrize('url,expected', [
+        ('https://graph.microsoft.com/v1.0/search/query', 'graph'),
+        ('https://api.synapse.azure.com/v1', 'synapse'),
+        ('https://contoso.vault.azure.net/secrets/x', 'key_vault'),
+        ('https://example.com/', None),
+    ])
+    def test_dependency_for_url(self, url, expected):
+        """Test downstream URLs map to dependency names"""
+        assert dependency_for_url(url) == expected
+
+    def test_retryable_classification(self):
+        """Test rejections and spent deadlines are not retried"""
+        assert is_retryable(ConnectionResetError())
+        assert not is_retryable(CircuitOpenError('graph'))
+        assert not is_retryable(DeadlineExceeded('graph', 0.1))
+        assert not is_retryable(ValueError())
+
+    def test_runtime_maps_rejection_to_503(self):
+        """Test plugin operations rejected by a guard return 503"""
+        class _Service:
+            @operation()
+            def search(self):
+                raise CircuitOpenError('graph')
+
+        status, payload = PluginRuntime('Test', _Service).execute('search', {})
+        assert status == 503
+        assert payload == {'error': 'Circuit open for graph', 'dependency': 'graph'}
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,170 @@
+"""
+Unit tests for the Copilot Plugin search index module
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+from src.search_index import Bitmap, SearchIndex, tokenize
+from src.security_trimming import principal_scope
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _index():
+    index = SearchIndex()
+    index.upsert('guide', {'title': 'Azure networking guide', 'topic_categories': ['Azure', 'Networking'],
+                           'body': 'Virtual networks, peering and private endpoints'},
+                 {'content_type': 'Technical Guide', 'access_level': 'internal'})
+    index.upsert('policy', {'title': 'Data retention policy', 'topic_categories': ['Compliance'],
+                            'body': 'Azure storage retention rules for regulated data'},
+                 {'content_type': 'Policy', 'access_level': 'confidential'})
+    index.upsert('faq', {'title': 'VPN FAQ', 'topic_categories': ['Networking'],
+                         'body': 'Connecting to the corporate network from home'},
+                 {'content_type': 'FAQ', 'access_level': 'public'})
+    return index
+
+
+class TestBitmap:
+    """Test cases for Bitmap"""
+
+    def test_membership_and_iteration(self):
+        """Test bits can be set, cleared and listed in order"""
+        bitmap = Bitmap.of([3, 17, 0, 64])
+        bitmap.discard(17)
+        assert list(bitmap) == [0, 3, 64]
+        assert len(bitmap) == 3
+        assert 64 in bitmap and 17 not in bitmap and 1000 not in bitmap
+
+    def test_set_operations(self):
+        """Test intersections and unions of bitmaps of different sizes"""
+        a, b = Bitmap.of([1, 2, 200]), Bitmap.of([2, 3])
+        assert list(a & b) == [2]
+        assert list(a | b) == [1, 2, 3, 200]
+
+
+class TestSearchIndex:
+    """Test cases for SearchIndex"""
+
+    def test_tokenize(self):
+        """Test terms are lower-cased, split and stripped of stopwords"""
+        assert tokenize('How to configure the Azure VPN?') == ['configure', 'azure', 'vpn']
+        assert tokenize(['CI/CD', 'DevOps']) == ['ci', 'cd', 'devops']
+
+    def test_field_weights(self):
+        """Test title matches outrank body matches"""
+        hits = _index().search('azure')
+        assert [doc for doc, _ in hits] == ['guide', 'policy']
+        assert hits[0][1] > hits[1][1] > 0
+
+    def test_rare_terms_score_higher(self):
+        """Test inverse document frequency favours rarer terms"""
+        hits = _index().search('retention networking')
+        assert hits[0][0] == 'policy'
+
+    def test_facet_filters(self):
+        """Test filters restrict hits, are case-insensitive and 'all' disables them"""
+        index = _index()
+        assert [doc for doc, _ in index.search('networking', filters={'content_type': ['faq']})] == ['faq']
+        assert index.search('azure', filters={'access_level': ['public']}) == []
+        assert len(index.search('networking', filters={'content_type': ['all']})) == 2
+        assert [doc for doc, _ in index.search('azure networking', filters={
+            'content_type': ['Technical Guide', 'Policy'], 'access_level': ['confidential']
+        })] == ['policy']
+
+    def test_limit(self):
+        """Test only the top hits are returned"""
+        index = SearchIndex()
+        for i in range(50):
+            index.upsert(f"doc-{i}", {'title': 'azure ' * (i % 5 + 1), 'body': 'filler text ' * 10})
+        hits = index.search('azure', limit=3)
+        assert len(hits) == 3
+        assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+
+    def test_empty_query_lists_filtered_documents(self):
+        """Test a query without terms returns documents in index order"""
+        index = _index()
+        assert index.search('', limit=2) == [('guide', 0.0), ('policy', 0.0)]
+        assert index.search('the', filters={'content_type': ['FAQ']}) == [('faq', 0.0)]
+
+    def test_upsert_and_remove_maintain_counters(self):
+        """Test counts and postings follow replacements and removals"""
+        index = _index()
+        assert len(index) == 3
+        assert index.facet_counts('content_type') == {'Technical Guide': 1, 'Policy': 1, 'FAQ': 1}
+
+        index.upsert('faq', {'title': 'Azure VPN guide'}, {'content_type': 'Technical Guide'})
+        assert len(index) == 3
+        assert index.facet_counts('content_type') == {'Technical Guide': 2, 'Policy': 1}
+        assert 'faq' in [doc for doc, _ in index.search('azure')]
+        assert index.search('home') == []
+
+        assert index.remove('policy')
+        assert not index.remove('policy')
+        assert index.facet_counts('content_type') == {'Technical Guide': 2}
+        assert index.search('retention') == []
+
+    def test_replacements_compact_slots(self):
+        """Test repeated upserts and removals keep slots bounded and searches unchanged"""
+        def guide(index, version):
+            index.upsert('guide', {'title': f"Azure networking guide v{version}", 'body': 'Private endpoints'},
+                         {'content_type': 'Technical Guide'}, acl=['network-team'])
+
+        def draft(index, version):
+            index.upsert(f"draft-{version}", {'title': 'Draft networking notes'}, {'content_type': 'Draft'},
+                         acl=['everyone'])
+
+        index = _index()
+        for version in range(500):
+            guide(index, version)
+            draft(index, version)
+            if version:
+                index.remove(f"draft-{version - 1}")
+        assert len(index) == 4 and len(index._documents) <= 4 + 64
+
+        fresh = _index()
+        fresh.remove('guide')
+        guide(fresh, 499)
+        draft(fresh, 499)
+        for query, principals in (('', None), ('networking', None), ('networking', ['everyone']),
+                                  ('azure', ['network-team']), ('retention', None)):
+            assert index.search(query, principals=principals) == fresh.search(query, principals=principals)
+        assert index.facet_counts('content_type') == {'Technical Guide': 1, 'Policy': 1, 'FAQ': 1, 'Draft': 1}
+        assert index.search('', filters={'content_type': ['Draft']}) == [('draft-499', 0.0)]
+        assert index.get('draft-499') == 'draft-499' and index.acl('guide') == ('network-team',)
+
+class TestKnowledgeHubSearch:
+    """Test search_documents is served from the index"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        with principal_scope('user-001'):
+            yield module.EnterpriseKnowledgeHubService()
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_query_and_filters(self, service):
+        """Test query, content type filter and limit are applied"""
+        result = service.search_documents({'query': 'Azure architecture', 'limit': 5})
+        assert result['documents'][0]['id'] == 'kb-doc-001'
+        assert result['documents'][0]['relevance_score'] == 1.0
+
+        result = service.search_documents({'query': 'security', 'content_types': ['Technical Guide']})
+        assert result['documents'] == []
+
+        result = service.search_documents({'query': '', 'limit': 2})
+        assert len(result['documents']) == 2
+
+    def test_insights_from_index(self, service):
+        """Test insights report the index counters"""
+        insights = service.search_documents({'query': 'devops'})['search_insights']
+        assert insights['total_documents_searched'] == 3
+        assert insights['content_distribution'] == {
+            'Technical Guide': 1, 'Process Document': 1, 'Checklist': 1
+        }
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,228 @@
+"""
+Unit tests for the Copilot Plugin security trimming module
+"""
+
+import base64
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+import azure.functions as func
+import pytest
+from src.search_index import SearchIndex
+from src.security_trimming import (
+    CLIENT_PRINCIPAL_HEADER,
+    EVERYONE,
+    GroupMembershipCache,
+    current_principal,
+    principal_scope,
+    request_principal,
+    request_tenant,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _client_principal(object_id, tenant_id=None):
+    claims = [{'typ': 'oid', 'val': object_id}]
+    if tenant_id:
+        claims.append({'typ': 'http://schemas.microsoft.com/identity/claims/tenantid', 'val': tenant_id})
+    payload = {'auth_typ': 'aad', 'claims': claims}
+    return base64.b64encode(json.dumps(payload).encode()).decode()
+
+
+def _index():
+    index = SearchIndex()
+    index.upsert('handbook', {'title': 'Employee handbook azure'}, acl=['employees'])
+    index.upsert('audit', {'title': 'Azure audit findings'}, acl=['auditors', 'user-9'])
+    index.upsert('news', {'title': 'Azure newsletter'}, acl=[EVERYONE])
+    index.upsert('draft', {'title': 'Azure draft without acl'})
+    return index
+
+
+class TestPrincipal:
+    """Test cases for caller principal propagation"""
+
+    def test_scope(self):
+        """Test the principal is set for the block only"""
+        assert current_principal() is None
+        with principal_scope('user-1'):
+            assert current_principal() == 'user-1'
+        assert current_principal() is None
+
+    @pytest.mark.parametrize('headers,expected', [
+        (None, None),
+        ({}, None),
+        ({CLIENT_PRINCIPAL_HEADER: _client_principal(' 00000000-aaaa ')}, '00000000-aaaa'),
+        ({CLIENT_PRINCIPAL_HEADER: ''}, None),
+        ({CLIENT_PRINCIPAL_HEADER: 'not base64!'}, None),
+        ({'X-MS-CLIENT-PRINCIPAL-ID': '00000000-aaaa'}, None),
+    ])
+    def test_request_principal(self, headers, expected, monkeypatch):
+        """Test the caller is read from the validated authentication claims"""
+        monkeypatch.setenv('EASYAUTH_ENABLED', 'true')
+        assert request_principal(headers) == expected
+
+    def test_requires_easy_auth(self, monkeypatch):
+        """Test principal headers are ignored unless App Service authentication is configured"""
+        monkeypatch.delenv('EASYAUTH_ENABLED', raising=False)
+        assert request_principal({CLIENT_PRINCIPAL_HEADER: _client_principal('user-1')}) is None
+
+    def test_request_tenant(self, monkeypatch):
+        """Test the tenant comes from the validated claims or configuration, never a header"""
+        monkeypatch.setenv('EASYAUTH_ENABLED', 'true')
+        monkeypatch.setenv('AZURE_TENANT_ID', 'home-tenant')
+        assert request_tenant({CLIENT_PRINCIPAL_HEADER: _client_principal('user-1', 'tenant-a')}) == 'tenant-a'
+        assert request_tenant({CLIENT_PRINCIPAL_HEADER: _client_principal('user-1')}) == 'home-tenant'
+        assert request_tenant({'X-Tenant-ID': 'tenant-b'}) == 'home-tenant'
+
+        monkeypatch.delenv('AZURE_TENANT_ID')
+        assert request_tenant({'X-Tenant-ID': 'tenant-b'}) is None
+
+
+class TestGroupMembershipCache:
+    """Test cases for GroupMembershipCache"""
+
+    def test_memberships_cached(self):
+        """Test each user is resolved once within the TTL"""
+        calls = []
+        cache = GroupMembershipCache(lambda user: calls.append(user) or ['g1'])
+        assert cache.principals('u1') == {EVERYONE, 'u1', 'g1'}
+        assert cache.principals('u1') == {EVERYONE, 'u1', 'g1'}
+        assert calls == ['u1']
+
+        cache.invalidate('u1')
+        cache.principals('u1')
+        assert calls == ['u1', 'u1']
+
+    def test_anonymous(self):
+        """Test anonymous callers hold only everyone and are not resolved"""
+        cache = GroupMembershipCache(lambda user: pytest.fail('resolved anonymous caller'))
+        assert cache.principals(None) == {EVERYONE}
+
+    def test_concurrent_lookups_share_resolution(self):
+        """Test concurrent misses for one user resolve once"""
+        calls = []
+
+        def resolve(user):
+            calls.append(user)
+            time.sleep(0.05)
+            return ['g1']
+
+        cache = GroupMembershipCache(resolve)
+        threads = [threading.Thread(target=cache.principals, args=('u1',)) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert calls == ['u1']
+
+    def test_failure_fails_closed(self):
+        """Test a failed lookup grants no groups and is retried next time"""
+        attempts = []
+
+        def resolve(user):
+            attempts.append(user)
+            if len(attempts) == 1:
+                raise ConnectionError('directory unavailable')
+            return ['g1']
+
+        cache = GroupMembershipCache(resolve)
+        assert cache.principals('u1') == {EVERYONE, 'u1'}
+        assert cache.principals('u1') == {EVERYONE, 'u1', 'g1'}
+
+
+class TestTrimmedSearch:
+    """Test cases for ACL-trimmed SearchIndex queries"""
+
+    def test_trimmed_to_principals(self):
+        """Test hits are limited to documents granted to the caller"""
+        index = _index()
+        assert {doc for doc, _ in index.search('azure', principals=[EVERYONE, 'employees'])} == {
+            'handbook', 'news'
+        }
+        assert {doc for doc, _ in index.search('azure', principals=[EVERYONE, 'user-9'])} == {'audit', 'news'}
+        assert {doc for doc, _ in index.search('', principals=[EVERYONE])} == {'news'}
+
+    def test_untrimmed_search(self):
+        """Test searches without principals see every document"""
+        assert len(_index().search('azure')) == 4
+
+    def test_acl_follows_updates(self):
+        """Test replacing or removing a document updates its grants"""
+        index = _index()
+        index.upsert('handbook', {'title': 'Employee handbook azure'}, acl=['auditors'])
+        assert list(index.readable_by(['employees'])) == []
+        assert {doc for doc, _ in index.search('azure', principals=['auditors'])} == {'handbook', 'audit'}
+
+        index.remove('audit')
+        assert [doc for doc, _ in index.search('azure', principals=['user-9'])] == []
+
+    def test_trimming_combines_with_filters(self):
+        """Test trimming applies together with facet filters"""
+        index = SearchIndex()
+        index.upsert('a', {'title': 'vpn'}, {'content_type': 'FAQ'}, acl=['employees'])
+        index.upsert('b', {'title': 'vpn'}, {'content_type': 'Policy'}, acl=['employees'])
+        index.upsert('c', {'title': 'vpn'}, {'content_type': 'FAQ'}, acl=['auditors'])
+        hits = index.search('vpn', filters={'content_type': ['FAQ']}, principals=['employees'])
+        assert [doc for doc, _ in hits] == ['a']
+
+
+class TestKnowledgeHubTrimming:
+    """Test knowledge hub searches are trimmed to the caller"""
+
+    @pytest.fixture
+    def module(self, monkeypatch):
+        monkeypatch.setenv('EASYAUTH_ENABLED', 'true')
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        yield __import__('enterpriseknowledgehub_service')
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    @staticmethod
+    def _search(module, principal=None, headers=None):
+        body = json.dumps({'query': 'security compliance azure devops'}).encode()
+        headers = dict(headers or {})
+        if principal:
+            headers[CLIENT_PRINCIPAL_HEADER] = _client_principal(principal)
+        response = module.runtime.handle(func.HttpRequest(
+            method='POST', url='/api/plugin', body=body, headers=headers,
+            params={'operation': 'search_documents'}, route_params={}
+        ))
+        return {document['id'] for document in json.loads(response.get_body())['documents']}
+
+    def test_access_levels(self, module):
+        """Test callers only see documents their groups may read"""
+        assert self._search(module) == set()
+        assert self._search(module, 'user-001') == {'kb-doc-001', 'kb-doc-002'}
+        assert self._search(module, 'user-003') == {'kb-doc-001', 'kb-doc-002', 'kb-doc-003'}
+
+    def test_spoofed_principal(self, module, monkeypatch):
+        """Test principal headers sent by the client grant no extra documents"""
+        spoofed = {'X-MS-CLIENT-PRINCIPAL-ID': 'user-003'}
+        assert self._search(module, headers=spoofed) == set()
+
+        monkeypatch.setenv('EASYAUTH_ENABLED', 'false')
+        assert self._search(module, 'user-003') == set()
+
+    def test_explicit_groups(self, module, monkeypatch):
+        """Test restricted documents are readable by their listed groups only"""
+        monkeypatch.setenv('KNOWLEDGE_HUB_ACCESS_GROUPS', json.dumps({'confidential': []}))
+        service = module.EnterpriseKnowledgeHubService()
+        record = service._drive_item_record({'id': 'r1', 'name': 'board-minutes.docx', 'listItem': {'fields': {
+            'AccessLevel': 'Restricted', 'AllowedGroups': 'board; user-002'
+        }}}, 'Quarterly board minutes')
+        doc_id, fields, facets, data, acl = record
+        service.index.upsert(doc_id, fields, facets, module.KnowledgeItem(**data), acl)
+
+        with principal_scope('user-002'):
+            documents = service.search_documents({'query': 'board minutes'})['documents']
+            assert [document['id'] for document in documents] == ['r1']
+        with principal_scope('user-003'):
+            assert service.search_documents({'query': 'board minutes'})['documents'] == []
+            assert service.search_documents({'query': 'security checklist'})['documents'] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
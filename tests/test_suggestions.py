@@ -0,0 +1,234 @@
+"""
+Unit tests for the Copilot Plugin suggestions module
+"""
+
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+
+import pytest
+from src.security_trimming import principal_scope
+from src.suggestions import (
+    CompletionTrie,
+    QueryLog,
+    SpaceSaving,
+    SuggestionIndex,
+    TrendingCounter,
+    normalize_phrase,
+)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _expected(weights, prefix, k):
+    matches = [(phrase, weight) for phrase, weight in weights.items() if phrase.startswith(prefix) and weight > 0]
+    return sorted(matches, key=lambda item: (-item[1], item[0]))[:k]
+
+
+class TestCompletionTrie:
+    """Test cases for CompletionTrie"""
+
+    def test_normalize_phrase(self):
+        """Test case and whitespace are folded, keeping one trailing space"""
+        assert normalize_phrase('  Azure   DevOps ') == 'azure devops '
+        assert normalize_phrase('Azure') == 'azure'
+        assert normalize_phrase(None) == ''
+
+    def test_completions_ranked(self):
+        """Test completions come highest weight first, ties alphabetical"""
+        trie = CompletionTrie(k=3)
+        trie.add('azure devops', 2)
+        trie.add('azure functions', 5)
+        trie.add('azure ad')
+        trie.add('azure architecture')
+        trie.add('aws')
+        assert trie.complete('Azure ') == [('azure functions', 5), ('azure devops', 2), ('azure ad', 1)]
+        assert trie.complete('a', limit=1) == [('azure functions', 5)]
+        assert trie.complete('gcp') == []
+
+    def test_matches_brute_force(self):
+        """Test precomputed lists stay exact through increments, decrements and removals"""
+        rng = random.Random(7)
+        words = ['api', 'apim', 'app', 'apply', 'azure', 'az', 'b', 'build', 'builds', 'bug']
+        trie, weights = CompletionTrie(k=4), Counter()
+        for _ in range(2000):
+            phrase = rng.choice(words)
+            change = rng.choice([1, 1, 2, -1, -3])
+            if weights[phrase] <= 0 and change < 0:
+                assert trie.add(phrase, change) == 0.0
+                continue
+            weights[phrase] += change
+            assert trie.add(phrase, change) == max(weights[phrase], 0)
+            weights[phrase] = max(weights[phrase], 0)
+        for prefix in ('', 'a', 'ap', 'app', 'az', 'b', 'bu', 'build', 'x'):
+            assert trie.complete(prefix) == _expected(weights, prefix, 4)
+        assert len(trie) == sum(1 for weight in weights.values() if weight > 0)
+
+    def test_discard_prunes(self):
+        """Test removed phrases leave no empty branches"""
+        trie = CompletionTrie()
+        trie.add('azure')
+        trie.add('azure devops')
+        trie.discard('azure devops')
+        assert trie.complete('azure') == [('azure', 1)]
+        assert trie.root.children['a'].children['z'].children['u'].children['r'].children['e'].children == {}
+        trie.discard('azure')
+        assert trie.root.children == {} and trie.root.top == []
+
+    def test_ids_reused(self):
+        """Test removed phrases free their slot for new phrases"""
+        trie = CompletionTrie()
+        for number in range(100):
+            trie.add(f"query {number}")
+            trie.discard(f"query {number}")
+        trie.add('azure', 2)
+        trie.add('aws')
+        assert len(trie._phrases) == 2
+        assert trie.complete('a') == [('azure', 2), ('aws', 1)]
+
+
+class TestSuggestionIndex:
+    """Test cases for SuggestionIndex"""
+
+    def test_trimmed_by_principal(self):
+        """Test callers only see phrases added for their principals"""
+        index = SuggestionIndex()
+        index.add('merger plan', 1, ['board'])
+        index.add('merge request guide', 2, ['everyone'])
+        index.add('merger plan', 3, ['legal'])
+        assert index.complete('merge', ['everyone']) == [('merge request guide', 2)]
+        assert index.complete('merge', ['everyone', 'board', 'legal']) == [
+            ('merger plan', 3), ('merge request guide', 2)
+        ]
+
+
+class TestQueryLog:
+    """Test cases for QueryLog"""
+
+    def test_bounded_by_capacity(self):
+        """Test evicted queries are withdrawn so suggestions stay within capacity"""
+        index = SuggestionIndex()
+        log = QueryLog(index, capacity=10)
+        for number in range(200):
+            if number % 4 == 0:
+                log.add('azure landing zones', ['everyone'])
+            log.add(f"azure one-off {number}", ['everyone'])
+
+        assert len(log) == 10 and len(index._tries['everyone']) == 10
+        suggestions = index.complete('azure', ['everyone'])
+        assert suggestions[0] == ('azure landing zones', 50)
+        # Queries that displaced others are weighted by their own occurrences
+        assert all(weight == 1 for _, weight in suggestions[1:])
+
+    def test_withdrawal_keeps_other_weight(self):
+        """Test evicting a query leaves weight added for the same phrase elsewhere"""
+        index = SuggestionIndex()
+        index.add('security baseline', 1, ['everyone'])
+        log = QueryLog(index, capacity=1)
+        log.add('Security   Baseline', ['everyone'])
+        assert index.complete('sec', ['everyone']) == [('security baseline', 2)]
+        log.add('zero trust', ['everyone'])
+        assert index.complete('sec', ['everyone']) == [('security baseline', 1)]
+
+    def test_normalized_and_length_limited(self):
+        """Test queries are normalized and overlong queries are not suggested"""
+        index = SuggestionIndex()
+        log = QueryLog(index, max_length=20)
+        assert log.add('  Azure   DevOps ', ['everyone'])
+        assert not log.add('azure ' * 10, ['everyone']) and not log.add('   ', ['everyone'])
+        assert index.complete('', ['everyone']) == [('azure devops', 1)]
+
+
+class TestSpaceSaving:
+    """Test cases for SpaceSaving"""
+
+    def test_exact_below_capacity(self):
+        """Test counts are exact while every item fits"""
+        sketch = SpaceSaving(capacity=4)
+        for item in 'aabacb':
+            sketch.add(item)
+        assert sketch.top(2) == [('a', 3), ('b', 2)]
+        assert sketch.error('a') == 0 and sketch.total == 6
+
+    def test_eviction_reported(self):
+        """Test adding an untracked item to a full sketch returns the evicted item"""
+        sketch = SpaceSaving(capacity=2)
+        assert sketch.add('a') is None and sketch.add('a') is None and sketch.add('b') is None
+        assert sketch.add('c') == 'b'
+        assert (sketch.count('c'), sketch.error('c'), sketch.count('b')) == (2, 1, 0)
+
+    def test_heavy_hitters_tracked(self):
+        """Test frequent items survive a long tail with bounded overestimates"""
+        rng = random.Random(3)
+        stream = ['hot'] * 500 + ['warm'] * 300 + [f"tail-{rng.randrange(5000)}" for _ in range(2000)]
+        rng.shuffle(stream)
+        sketch = SpaceSaving(capacity=20)
+        for item in stream:
+            sketch.add(item)
+
+        assert len(sketch) == 20
+        assert [item for item, _ in sketch.top(2)] == ['hot', 'warm']
+        counts = sketch.counts()
+        for item, true_count in (('hot', 500), ('warm', 300)):
+            assert true_count <= counts[item] <= true_count + sketch.error(item)
+        assert sum(counts.values()) == len(stream)
+
+
+class TestTrendingCounter:
+    """Test cases for TrendingCounter"""
+
+    def test_window_slides(self):
+        """Test counts expire once their pane leaves the window"""
+        now = [0.0]
+        trending = TrendingCounter(window=60, panes=6, clock=lambda: now[0])
+        trending.add('azure')
+        trending.add('azure')
+        now[0] = 30
+        trending.add('security')
+        assert trending.top() == [('azure', 2), ('security', 1)]
+
+        now[0] = 65
+        trending.add('security')
+        assert trending.top() == [('security', 2)]
+        now[0] = 200
+        assert trending.top() == []
+
+
+class TestKnowledgeHubSuggestions:
+    """Test the knowledge hub suggests queries and trending topics"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        yield module.EnterpriseKnowledgeHubService()
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    def test_suggestions_are_trimmed(self, service):
+        """Test titles are only suggested to readers of their documents"""
+        with principal_scope('user-003'):
+            assert [s['text'] for s in service.suggest_queries('sec')['suggestions']] == [
+                'security', 'security compliance checklist'
+            ]
+        with principal_scope('user-001'):
+            assert service.suggest_queries('sec')['suggestions'] == []
+            assert 'devops implementation strategy' in [s['text'] for s in service.suggest_queries('dev')['suggestions']]
+
+    def test_queries_feed_suggestions_and_trending(self, service):
+        """Test successful searches raise their query and their hits' topics"""
+        with principal_scope('user-001'):
+            for _ in range(2):
+                service.search_documents({'query': 'azure landing zones'})
+            service.search_documents({'query': 'quantum entanglement'})
+            result = service.search_documents({'query': 'azure'})
+
+        insights = result['search_insights']
+        assert insights['query_interpretation']['suggested_refinements'][0] == 'azure landing zones'
+        assert insights['trending_topics'][0] == {'topic': 'Architecture', 'popularity': 3}
+        with principal_scope('user-001'):
+            assert [s['text'] for s in service.suggest_queries('qu')['suggestions']] == []
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -2,6 +2,7 @@
 Unit tests for the Copilot Plugin telemetry module
 """
 
+import asyncio
 import pytest
 import os
 from unittest.mock import Mock, patch, MagicMock
@@ -165,6 +166,41 @@ class TestTrackFunctionDecorator:
         )
 
 
+    @patch('src.telemetry.TelemetryManager')
+    def test_async_function_tracking(self, mock_manager_class):
+        """Test decorator tracks coroutine functions after they complete"""
+        mock_manager = Mock()
+        mock_manager.start_operation.return_value = "mock_span"
+        
+        @track_function(mock_manager, "async_operation")
+        async def async_function(x):
+            await asyncio.sleep(0)
+            return x * 2
+        
+        assert asyncio.iscoroutinefunction(async_function)
+        assert asyncio.run(async_function(21)) == 42
+        mock_manager.start_operation.assert_called_once_with("async_operation")
+        mock_manager.end_operation.assert_called_once_with("mock_span", success=True)
+    
+    @patch('src.telemetry.TelemetryManager')
+    def test_async_exception_tracking(self, mock_manager_class):
+        """Test decorator tracks coroutine function exceptions"""
+        mock_manager = Mock()
+        mock_manager.start_operation.return_value = "mock_span"
+        
+        @track_function(mock_manager, "async_operation")
+        async def failing_function():
+            raise ValueError("Async error")
+        
+        with pytest.raises(ValueError):
+            asyncio.run(failing_function())
+        
+        mock_manager.track_exception.assert_called_once()
+        mock_manager.end_operation.assert_called_once_with(
+            "mock_span", success=False, error_message="Async error"
+        )
+
+
 class TestGlobalTelemetryManager:
     """Test cases for global telemetry manager"""
     
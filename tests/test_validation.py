@@ -0,0 +1,83 @@
+"""
+Unit tests for the Copilot Plugin request validation module
+"""
+
+import pytest
+from src.validation import RequestContext, SanitizedText, sanitize_text
+
+
+class TestSanitizeText:
+    """Test cases for sanitize_text"""
+
+    def test_escapes_angle_brackets_and_strips(self):
+        """Test HTML escaping and whitespace stripping"""
+        result = sanitize_text("  <script>alert(1)</script>  ")
+
+        assert result.value == "&lt;script&gt;alert(1)&lt;/script&gt;"
+        assert result.original_length == 29
+        assert result.length == len(result.value)
+        assert result.modified
+
+    def test_removes_control_characters(self):
+        """Test control characters are dropped but tabs and newlines kept"""
+        result = sanitize_text("a\x00b\x1bc\td\ne\x7f")
+
+        assert result.value == "abc\td\ne"
+
+    def test_normalizes_unicode(self):
+        """Test decomposed text is normalized to NFC"""
+        result = sanitize_text("cafe\u0301")
+
+        assert result.value == "caf\u00e9"
+        assert result.normalized
+        assert result.length == 4
+
+    def test_unmodified_input(self):
+        """Test clean input passes through unchanged"""
+        result = sanitize_text("plain query")
+
+        assert result.value == "plain query"
+        assert not result.modified
+
+    def test_rejects_long_input(self):
+        """Test maximum length is enforced on the raw input"""
+        with pytest.raises(ValueError, match="Input too long"):
+            sanitize_text("x" * 11, max_length=10)
+
+    def test_rejects_non_string(self):
+        """Test non-string input is rejected as a validation error"""
+        with pytest.raises(ValueError):
+            sanitize_text(12345)
+
+
+class TestRequestContext:
+    """Test cases for RequestContext"""
+
+    def test_sanitize_records_input(self):
+        """Test sanitized inputs are kept on the context"""
+        context = RequestContext(correlation={'request_id': 'req-1'})
+        sanitized = context.sanitize('query', ' <b> ', max_length=500)
+
+        assert isinstance(sanitized, SanitizedText)
+        assert context.value('query') == '&lt;b&gt;'
+        assert context.value('missing', 'default') == 'default'
+        assert context.request_id == 'req-1'
+
+    def test_telemetry_properties(self):
+        """Test telemetry properties reuse the computed input statistics"""
+        context = RequestContext(
+            correlation={'request_id': 'req-2'},
+            user={'user_id': 'user-1'}
+        )
+        context.sanitize('content', 'hello')
+
+        properties = context.telemetry_properties(analysis_type='sentiment')
+
+        assert properties['request_id'] == 'req-2'
+        assert properties['user_id'] == 'user-1'
+        assert properties['content_length'] == 5
+        assert properties['analysis_type'] == 'sentiment'
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
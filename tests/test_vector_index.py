@@ -0,0 +1,157 @@
+"""
+Unit tests for the Copilot Plugin vector index module
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from src.vector_index import HashingEmbedder, VectorIndex
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def _unit_rows(count, dimensions=32, seed=1):
+    matrix = np.random.default_rng(seed).standard_normal((count, dimensions)).astype(np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+class TestHashingEmbedder:
+    """Test cases for HashingEmbedder"""
+
+    def test_deterministic_unit_vectors(self):
+        """Test vectors are stable, normalized float32"""
+        embedder = HashingEmbedder()
+        vector = embedder.embed('Reset my VPN password')
+        assert vector.dtype == np.float32 and vector.shape == (256,)
+        assert np.linalg.norm(vector) == pytest.approx(1.0, abs=1e-6)
+        assert np.array_equal(vector, HashingEmbedder().embed('reset my vpn password!'))
+        assert not HashingEmbedder().embed('the of and').any()
+
+    def test_similar_questions_score_higher(self):
+        """Test shared words and inflections raise similarity"""
+        embedder = HashingEmbedder()
+        question = embedder.embed('How do I set up Azure DevOps pipelines?')
+        assert question @ embedder.embed('devops pipeline setup') > 0.2
+        assert question @ embedder.embed('devops pipeline setup') > question @ embedder.embed('reduce cloud spend')
+
+    def test_embed_many(self):
+        """Test batches are embedded row by row"""
+        embedder = HashingEmbedder(dimensions=64)
+        matrix = embedder.embed_many(['vpn access', 'azure costs'])
+        assert matrix.shape == (2, 64)
+        assert np.array_equal(matrix[1], embedder.embed('azure costs'))
+
+
+class TestVectorIndex:
+    """Test cases for VectorIndex"""
+
+    def test_exact_search(self):
+        """Test exhaustive search returns the nearest rows best first"""
+        rows = _unit_rows(100)
+        index = VectorIndex(32, ivf_threshold=0)
+        for number, row in enumerate(rows):
+            index.add(f"item-{number}", row)
+
+        hits = index.search(rows[42], limit=3)
+        assert hits[0] == ('item-42', pytest.approx(1.0))
+        assert [score for _, score in hits] == sorted((score for _, score in hits), reverse=True)
+        expected = np.argsort(-(rows @ rows[42]))[:3]
+        assert [item for item, _ in hits] == [f"item-{number}" for number in expected]
+        assert not index.clustered
+
+    def test_replace_and_remove(self):
+        """Test replaced and removed items no longer match their old vectors"""
+        rows = _unit_rows(10)
+        index = VectorIndex(32)
+        for number, row in enumerate(rows):
+            index.add(f"item-{number}", row)
+        index.add('item-1', rows[2])
+        assert index.remove('item-3') and not index.remove('item-3')
+
+        assert len(index) == 9
+        assert {item for item, _ in index.search(rows[2], limit=2)} == {'item-1', 'item-2'}
+        assert 'item-3' not in [item for item, _ in index.search(rows[3], limit=10)]
+
+    def test_min_score(self):
+        """Test hits below min_score are dropped"""
+        rows = _unit_rows(20)
+        index = VectorIndex(32)
+        for number, row in enumerate(rows):
+            index.add(f"item-{number}", row)
+        assert index.search(rows[0], limit=5, min_score=0.99) == [('item-0', pytest.approx(1.0))]
+        assert index.search(np.zeros(32), limit=5, min_score=0.1) == []
+
+    def test_ivf_recall(self):
+        """Test clustered search finds the same neighbours as exhaustive search"""
+        centers = _unit_rows(20, seed=2)
+        noise = np.random.default_rng(3).standard_normal((2000, 32)).astype(np.float32) * 0.1
+        rows = centers[np.arange(2000) % 20] + noise
+        rows /= np.linalg.norm(rows, axis=1, keepdims=True)
+
+        index = VectorIndex(32, ivf_threshold=500, nprobe=8)
+        for number, row in enumerate(rows):
+            index.add(str(number), row)
+        queries = range(0, 2000, 97)
+        hits = [index.search(rows[number], limit=5) for number in queries]
+        assert index.clustered
+
+        found = 0
+        for number, result in zip(queries, hits):
+            expected = {str(row) for row in np.argsort(-(rows @ rows[number]))[:5]}
+            found += len(expected & {item for item, _ in result})
+        assert found / (5 * len(hits)) >= 0.9
+
+    def test_ivf_updates(self):
+        """Test rows added or removed after clustering are honoured and rebuilt"""
+        rows = _unit_rows(600)
+        index = VectorIndex(32, ivf_threshold=500)
+        for number, row in enumerate(rows[:550]):
+            index.add(str(number), row)
+        index.search(rows[0])
+        assert index.clustered
+
+        index.add('late', rows[599])
+        index.remove('7')
+        assert index.search(rows[599], limit=1)[0][0] == 'late'
+        assert '7' not in [item for item, _ in index.search(rows[7], limit=20)]
+
+        for number in range(100):
+            index.remove(str(number + 100))
+        index.search(rows[0])
+        assert len(index) == 450 and not index.clustered
+
+
+class TestKnowledgeHubFaq:
+    """Test get_faq matches questions to the topic"""
+
+    @pytest.fixture
+    def service(self, monkeypatch):
+        monkeypatch.syspath_prepend(str(REPO_ROOT / 'EnterpriseKnowledgeHub-module' / 'business-logic'))
+        module = __import__('enterpriseknowledgehub_service')
+        yield module.EnterpriseKnowledgeHubService()
+        sys.modules.pop('enterpriseknowledgehub_service', None)
+
+    @pytest.mark.parametrize('topic,expected', [
+        ('devops pipeline setup', 'faq-001'),
+        ('security best practice', 'faq-002'),
+        ('optimizing costs', 'faq-003'),
+    ])
+    def test_topic_matching(self, service, topic, expected):
+        """Test the closest question comes first"""
+        result = service.get_faq(topic)
+        assert result['success'] is True
+        assert result['faqs'][0]['id'] == expected
+        assert 0 < result['faqs'][0]['match_score'] <= 1
+
+    def test_unrelated_and_empty_topics(self, service):
+        """Test unrelated topics match nothing and an empty topic lists FAQs"""
+        assert service.get_faq('quantum entanglement')['faqs'] == []
+        result = service.get_faq('', limit=2)
+        assert [faq['id'] for faq in result['faqs']] == ['faq-001', 'faq-002']
+        assert result['analytics']['total_faqs_available'] == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])